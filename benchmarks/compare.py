@@ -0,0 +1,209 @@
+import argparse
+import csv
+import io
+import random
+import statistics
+import sys
+
+from deserialize import ResultsBuilder
+
+# Metrics for which a larger value is better, every other metric (time, memory) is lower-is-better
+HIGHER_IS_BETTER = {"gb_per_s", "gflop_per_s", "roofline_fraction"}
+
+
+class CaseComparison:
+    def __init__(self, suite_name, arch, case_name, tags, baseline, candidate, threshold):
+        self.suite_name = suite_name
+        self.arch = arch
+        self.case_name = case_name  # key of the case in the plan results, the plan name and the tags joined by '_'
+        self.tags = tags  # the case tags without the plan name, which ResultsBuilder strips; the last one is the metric
+        self.higher_is_better = tags[-1] in HIGHER_IS_BETTER
+        self.baseline = baseline
+        self.candidate = candidate
+        self.threshold = threshold
+        self.change = None
+        self.ci_low = None
+        self.ci_high = None
+        self.status = None
+
+    @property
+    def name(self):
+        return f"{self.arch}/{self.case_name}"
+
+    def evaluate(self, confidence, num_resamples, rng):
+        self.change = statistics.fmean(self.candidate) / statistics.fmean(self.baseline) - 1
+        if len(self.baseline) > 1 and len(self.candidate) > 1:
+            # Bootstrap the relative change of the means, skipping the resamples of a baseline made of zeros
+            changes = []
+            for _ in range(num_resamples):
+                baseline_mean = statistics.fmean(rng.choices(self.baseline, k=len(self.baseline)))
+                if baseline_mean != 0:
+                    candidate_mean = statistics.fmean(rng.choices(self.candidate, k=len(self.candidate)))
+                    changes.append(candidate_mean / baseline_mean - 1)
+            changes.sort()
+            alpha = (1 - confidence) / 2
+            self.ci_low = changes[int(alpha * (len(changes) - 1))]
+            self.ci_high = changes[int((1 - alpha) * (len(changes) - 1))]
+        else:
+            self.ci_low = self.ci_high = self.change
+        # Change in the direction of a regression, e.g. a drop of throughput
+        worse_low, worse_high = self.ci_low, self.ci_high
+        if self.higher_is_better:
+            worse_low, worse_high = -self.ci_high, -self.ci_low
+        if worse_low > self.threshold:
+            self.status = "regression"
+        elif worse_high < -self.threshold:
+            self.status = "improvement"
+        elif abs(self.change) > self.threshold:
+            self.status = "inconclusive"
+        else:
+            self.status = "unchanged"
+
+    def row(self):
+        return [
+            self.name,
+            f"{statistics.fmean(self.baseline):.4g}",
+            f"{statistics.fmean(self.candidate):.4g}",
+            f"{self.change * 100:+.2f}%",
+            f"[{self.ci_low * 100:+.2f}%, {self.ci_high * 100:+.2f}%]",
+            f"{len(self.baseline)}/{len(self.candidate)}",
+            self.status,
+        ]
+
+
+header = ["case", "baseline", "candidate", "change", "confidence interval", "samples", "status"]
+
+
+def parse_thresholds(specs):
+    """Parses '--threshold_for tag1,tag2=0.1' overrides into (set of tags, threshold) pairs."""
+    thresholds = []
+    for spec in specs:
+        tags, value = spec.rsplit("=", 1)
+        thresholds.append((set(tags.split(",")), float(value)))
+    return thresholds
+
+
+def get_threshold(case_tags, default_threshold, thresholds):
+    # The override matching the most tags wins
+    threshold, num_matched = default_threshold, 0
+    for tags, value in thresholds:
+        if tags.issubset(case_tags) and len(tags) > num_matched:
+            threshold, num_matched = value, len(tags)
+    return threshold
+
+
+def get_samples(data):
+    # Results saved before samples were recorded only have a single number, failed cases are recorded as None
+    samples = data.get("samples") or [data["result"]]
+    return [sample for sample in samples if sample is not None]
+
+
+def compare(baseline_results, candidate_results, default_threshold, thresholds):
+    comparisons = []
+    for suite_name, archs in baseline_results.items():
+        for arch, plans in archs.items():
+            for plan_name, plan in plans.items():
+                candidate_plan = candidate_results.get(suite_name, {}).get(arch, {}).get(plan_name)
+                if candidate_plan is None:
+                    continue
+                for case_name, data in plan["results"].items():
+                    candidate_data = candidate_plan["results"].get(case_name)
+                    if candidate_data is None:
+                        continue
+                    baseline, candidate = get_samples(data), get_samples(candidate_data)
+                    # A relative change is meaningless without a non-zero baseline, e.g. a compile stage that was
+                    # not recorded
+                    if not baseline or not candidate or statistics.fmean(baseline) == 0:
+                        continue
+                    tags = data["tags"]
+                    threshold = get_threshold(set(tags) | {arch, plan_name}, default_threshold, thresholds)
+                    comparisons.append(
+                        CaseComparison(
+                            suite_name,
+                            arch,
+                            case_name,
+                            tags,
+                            baseline,
+                            candidate,
+                            threshold,
+                        )
+                    )
+    return comparisons
+
+
+def to_markdown(comparisons):
+    lines = ["| " + " | ".join(header) + " |", "|" + "---|" * len(header)]
+    for comparison in comparisons:
+        lines.append("| " + " | ".join(comparison.row()) + " |")
+    return "\n".join(lines)
+
+
+def to_csv(comparisons):
+    output = io.StringIO()
+    writer = csv.writer(output)
+    writer.writerow(header)
+    for comparison in comparisons:
+        writer.writerow(comparison.row())
+    return output.getvalue()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare two benchmark results folders written by run.py")
+    parser.add_argument("baseline", type=str, help="Path of the baseline result folder")
+    parser.add_argument("candidate", type=str, help="Path of the candidate result folder")
+    parser.add_argument(
+        "-t",
+        "--threshold",
+        default=0.05,
+        dest="threshold",
+        type=float,
+        help="Relative change above which a case is flagged. Defaults to 0.05",
+    )
+    parser.add_argument(
+        "--threshold_for",
+        default=[],
+        dest="threshold_for",
+        action="append",
+        help="Threshold for the cases having all the given tags, e.g. 'x64,saxpy=0.1'. Can be repeated",
+    )
+    parser.add_argument(
+        "-c",
+        "--confidence",
+        default=0.95,
+        dest="confidence",
+        type=float,
+        help="Confidence level of the intervals. Defaults to 0.95",
+    )
+    parser.add_argument(
+        "--format",
+        default="markdown",
+        dest="format",
+        choices=["markdown", "csv"],
+        help="Report format. Defaults to markdown",
+    )
+    parser.add_argument(
+        "--all",
+        default=False,
+        dest="show_all",
+        action="store_true",
+        help="Report unchanged cases too",
+    )
+    args = parser.parse_args()
+
+    baseline_results = ResultsBuilder(args.baseline).get_suites_result()
+    candidate_results = ResultsBuilder(args.candidate).get_suites_result()
+    comparisons = compare(baseline_results, candidate_results, args.threshold, parse_thresholds(args.threshold_for))
+    rng = random.Random(0)
+    for comparison in comparisons:
+        comparison.evaluate(args.confidence, 2000, rng)
+
+    reported = [c for c in comparisons if args.show_all or c.status != "unchanged"]
+    print(to_markdown(reported) if args.format == "markdown" else to_csv(reported))
+
+    num_regressions = sum(c.status == "regression" for c in comparisons)
+    print(f"{len(comparisons)} cases compared, {num_regressions} regressions", file=sys.stderr)
+    return 1 if num_regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
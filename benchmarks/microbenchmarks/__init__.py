@@ -1,17 +1,35 @@
 from .atomic_ops import AtomicOpsPlan
+from .autodiff_checkpoint import AutodiffCheckpointPlan
+from .compile_time import CompileTimePlan
+from .cpu_vectorize import CpuVectorizePlan
 from .fill import FillPlan
+from .launch_overhead import LaunchOverheadPlan
+from .loop_schedule import LoopSchedulePlan
 from .math_opts import MathOpsPlan
 from .matrix_ops import MatrixOpsPlan
 from .memcpy import MemcpyPlan
+from .parallel_for_latency import ParallelForLatencyPlan
+from .roofline import RooflinePlan
 from .saxpy import SaxpyPlan
+from .sparse_solver import SparseSolverPlan
+from .spmv import SpMVPlan
 from .stencil2d import Stencil2DPlan
 
 benchmark_plan_list = [
     AtomicOpsPlan,
+    AutodiffCheckpointPlan,
+    CompileTimePlan,
+    CpuVectorizePlan,
     FillPlan,
+    LaunchOverheadPlan,
+    LoopSchedulePlan,
     MathOpsPlan,
     MatrixOpsPlan,
     MemcpyPlan,
+    ParallelForLatencyPlan,
+    RooflinePlan,
     SaxpyPlan,
+    SparseSolverPlan,
+    SpMVPlan,
     Stencil2DPlan,
 ]
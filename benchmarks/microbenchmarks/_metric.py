@@ -1,3 +1,5 @@
+import tracemalloc
+
 import gstaichi as ti
 from microbenchmarks._items import BenchmarkItem
 from microbenchmarks._utils import End2EndTimer, get_ti_arch
@@ -26,6 +28,16 @@ def kernel_executor(repeat, func, *args):
     return ti.profiler.get_kernel_profiler_total_time() * 1000 / repeat  # ms
 
 
+def memory_executor(repeat, func, *args):
+    # `func` returns the bytes it allocates in GsTaichi fields and ndarrays, host allocations are traced
+    func(*args)  # compile & warmup
+    tracemalloc.start()
+    device_bytes = func(*args)
+    _, host_peak_bytes = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return (device_bytes + host_peak_bytes) / 1024**2  # MB
+
+
 class MetricType(BenchmarkItem):
     name = "get_metric"
 
@@ -36,11 +48,13 @@ class MetricType(BenchmarkItem):
         }
 
     @staticmethod
-    def init_gstaichi(arch: str, tag_list: list):
-        if set(["kernel_elapsed_time_ms"]).issubset(tag_list):
-            ti.init(kernel_profiler=True, arch=get_ti_arch(arch))
-        elif set(["end2end_time_ms"]).issubset(tag_list):
-            ti.init(kernel_profiler=False, arch=get_ti_arch(arch))
+    def init_gstaichi(arch: str, tag_list: list, **options):
+        profiled_metrics = {"kernel_elapsed_time_ms", "gb_per_s", "gflop_per_s", "roofline_fraction"}
+        host_metrics = {"end2end_time_ms", "peak_memory_mb", "ns_per_launch", "us_per_launch", "compile_time_ms"}
+        if profiled_metrics & set(tag_list):
+            ti.init(kernel_profiler=True, arch=get_ti_arch(arch), **options)
+        elif host_metrics & set(tag_list):
+            ti.init(kernel_profiler=False, arch=get_ti_arch(arch), **options)
         else:
             return False
         return True
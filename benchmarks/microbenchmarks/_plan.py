@@ -1,4 +1,5 @@
 import itertools
+import statistics
 
 import gstaichi as ti
 from microbenchmarks._items import AtomicOps, DataType
@@ -44,17 +45,28 @@ class BenchmarkPlan:
     def add_func(self, tag_list, func):
         self.funcs.add_func(tag_list, func)
 
-    def run(self):
+    def run(self, num_samples=1):
         for case, plan in self.plan.items():
             tag_list = plan["tags"]
-            MetricType.init_gstaichi(self.arch, tag_list)
-            _ms = self.funcs.get_func(tag_list)(self.arch, self.basic_repeat_times, **self._get_kwargs(tag_list))
+            samples = []
+            for _ in range(num_samples):
+                MetricType.init_gstaichi(self.arch, tag_list, **self.init_options(tag_list))
+                samples.append(
+                    self.funcs.get_func(tag_list)(self.arch, self.basic_repeat_times, **self._get_kwargs(tag_list))
+                )
+                ti.reset()
+            # 'result' keeps a single number per case, the samples are used by compare.py
+            _ms = statistics.median(samples) if None not in samples else None
             plan["result"] = _ms
+            plan["samples"] = samples
             print(f"{tag_list}={_ms}")
-            ti.reset()
         rdict = {"results": self.plan, "info": self.info}
         return rdict
 
+    def init_options(self, tag_list) -> dict:
+        # Extra 'ti.init' arguments of a case, e.g. the CPU thread count it runs with
+        return {}
+
     def _get_kwargs(self, tags, impl=True):
         kwargs = {}
         tags = tags[1:]  # tags = [case_name, item1_tag, item2_tag, ...]
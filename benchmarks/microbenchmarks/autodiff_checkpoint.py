@@ -0,0 +1,201 @@
+import gstaichi as ti
+from microbenchmarks._items import BenchmarkItem
+from microbenchmarks._metric import MetricType, memory_executor
+from microbenchmarks._plan import BenchmarkPlan
+
+dim = 2
+n_particles = 30 * 30
+n_grid = 64
+dx = 1 / n_grid
+inv_dx = 1 / dx
+dt = 3e-4
+p_mass = 1
+p_vol = 1
+E = 100
+gravity = 9.8
+bound = 3
+target = [0.3, 0.6]
+
+
+def mpm_default(arch, repeat, tape_mode, steps, get_metric):
+    """Differentiable MPM rollout, adapted from test_ad_gdar_diffmpm.py.
+
+    With the plain tape every step writes to its own slice of the particle and grid fields. With a checkpointed tape
+    the particle state lives in two slices used as a ring buffer and the grid is reused by every step.
+    """
+    particle_slots = steps + 1 if tape_mode == 0 else 2
+    grid_slots = steps if tape_mode == 0 else 1
+    real = ti.f32
+
+    x = ti.Vector.field(dim, dtype=real, shape=(particle_slots, n_particles), needs_grad=True)
+    v = ti.Vector.field(dim, dtype=real, shape=(particle_slots, n_particles), needs_grad=True)
+    C = ti.Matrix.field(dim, dim, dtype=real, shape=(particle_slots, n_particles), needs_grad=True)
+    F = ti.Matrix.field(dim, dim, dtype=real, shape=(particle_slots, n_particles), needs_grad=True)
+    grid_v_in = ti.Vector.field(dim, dtype=real, shape=(grid_slots, n_grid, n_grid), needs_grad=True)
+    grid_v_out = ti.Vector.field(dim, dtype=real, shape=(grid_slots, n_grid, n_grid), needs_grad=True)
+    grid_m_in = ti.field(dtype=real, shape=(grid_slots, n_grid, n_grid), needs_grad=True)
+    x_avg = ti.Vector.field(dim, dtype=real, shape=(), needs_grad=True)
+    init_v = ti.Vector.field(dim, dtype=real, shape=(), needs_grad=True)
+    loss = ti.field(dtype=real, shape=(), needs_grad=True)
+    # Fields and their gradients
+    nbytes = 2 * sum(f.to_numpy().nbytes for f in [x, v, C, F, grid_v_in, grid_v_out, grid_m_in, x_avg, init_v, loss])
+
+    @ti.kernel
+    def init_particles():
+        for i in range(n_particles):
+            x[0, i] = [dx * ((i // 30) * 0.7 + 10), dx * ((i % 30) * 0.7 + 25)]
+            F[0, i] = [[1, 0], [0, 1]]
+            C[0, i] = [[0, 0], [0, 0]]
+
+    @ti.kernel
+    def set_v():
+        for i in range(n_particles):
+            v[0, i] = init_v[None]
+
+    @ti.kernel
+    def clear_grid(f: ti.i32):
+        g = f % grid_slots
+        for i, j in ti.ndrange(n_grid, n_grid):
+            grid_v_in[g, i, j] = [0, 0]
+            grid_m_in[g, i, j] = 0
+
+    @ti.kernel
+    def clear_step_grad(f: ti.i32):
+        g = f % grid_slots
+        for i, j in ti.ndrange(n_grid, n_grid):
+            grid_v_in.grad[g, i, j] = [0, 0]
+            grid_v_out.grad[g, i, j] = [0, 0]
+            grid_m_in.grad[g, i, j] = 0
+        q = (f + 1) % particle_slots
+        for p in range(n_particles):
+            x.grad[q, p] = [0, 0]
+            v.grad[q, p] = [0, 0]
+            C.grad[q, p] = [[0, 0], [0, 0]]
+            F.grad[q, p] = [[0, 0], [0, 0]]
+
+    @ti.ad.grad_replaced
+    def begin_step(f):
+        clear_grid(f)
+
+    @ti.ad.grad_for(begin_step)
+    def begin_step_grad(f):
+        # The reverse pass of step f has consumed the adjoints of its outputs, which step f - 1 reuses.
+        clear_step_grad(f)
+
+    @ti.kernel
+    def p2g(f: ti.i32):
+        s = f % particle_slots
+        g = f % grid_slots
+        for p in range(n_particles):
+            base = ti.cast(x[s, p] * inv_dx - 0.5, ti.i32)
+            fx = x[s, p] * inv_dx - ti.cast(base, ti.i32)
+            w = [0.5 * (1.5 - fx) ** 2, 0.75 - (fx - 1) ** 2, 0.5 * (fx - 0.5) ** 2]
+            new_F = (ti.Matrix.diag(dim=2, val=1) + dt * C[s, p]) @ F[s, p]
+            F[(f + 1) % particle_slots, p] = new_F
+            J = new_F.determinant()
+            r, _ = ti.polar_decompose(new_F)
+            cauchy = 2 * E * (new_F - r) @ new_F.transpose() + ti.Matrix.diag(2, E * (J - 1) * J)
+            stress = -(dt * p_vol * 4 * inv_dx * inv_dx) * cauchy
+            affine = stress + p_mass * C[s, p]
+            for i in ti.static(range(3)):
+                for j in ti.static(range(3)):
+                    offset = ti.Vector([i, j])
+                    dpos = (ti.cast(ti.Vector([i, j]), real) - fx) * dx
+                    weight = w[i][0] * w[j][1]
+                    grid_v_in[g, base + offset] += weight * (p_mass * v[s, p] + affine @ dpos)
+                    grid_m_in[g, base + offset] += weight * p_mass
+
+    @ti.kernel
+    def grid_op(f: ti.i32):
+        g = f % grid_slots
+        for i, j in ti.ndrange(n_grid, n_grid):
+            inv_m = 1 / (grid_m_in[g, i, j] + 1e-10)
+            v_out = inv_m * grid_v_in[g, i, j]
+            v_out[1] -= dt * gravity
+            if i < bound and v_out[0] < 0:
+                v_out[0] = 0
+            if i > n_grid - bound and v_out[0] > 0:
+                v_out[0] = 0
+            if j < bound and v_out[1] < 0:
+                v_out[1] = 0
+            if j > n_grid - bound and v_out[1] > 0:
+                v_out[1] = 0
+            grid_v_out[g, i, j] = v_out
+
+    @ti.kernel
+    def g2p(f: ti.i32):
+        s = f % particle_slots
+        g = f % grid_slots
+        for p in range(n_particles):
+            base = ti.cast(x[s, p] * inv_dx - 0.5, ti.i32)
+            fx = x[s, p] * inv_dx - ti.cast(base, real)
+            w = [0.5 * (1.5 - fx) ** 2, 0.75 - (fx - 1.0) ** 2, 0.5 * (fx - 0.5) ** 2]
+            new_v = ti.Vector([0.0, 0.0])
+            new_C = ti.Matrix([[0.0, 0.0], [0.0, 0.0]])
+            for i in ti.static(range(3)):
+                for j in ti.static(range(3)):
+                    dpos = ti.cast(ti.Vector([i, j]), real) - fx
+                    g_v = grid_v_out[g, base[0] + i, base[1] + j]
+                    weight = w[i][0] * w[j][1]
+                    new_v += weight * g_v
+                    new_C += 4 * weight * g_v.outer_product(dpos) * inv_dx
+            v[(f + 1) % particle_slots, p] = new_v
+            x[(f + 1) % particle_slots, p] = x[s, p] + dt * new_v
+            C[(f + 1) % particle_slots, p] = new_C
+
+    @ti.kernel
+    def compute_x_avg():
+        for i in range(n_particles):
+            x_avg[None] += (1 / n_particles) * x[steps % particle_slots, i]
+
+    @ti.kernel
+    def compute_loss():
+        dist = (x_avg[None] - ti.Vector(target)) ** 2
+        loss[None] = 0.5 * (dist(0) + dist(1))
+
+    def rollout():
+        init_particles()
+        x_avg[None] = [0, 0]
+        with ti.ad.Tape(loss=loss, checkpoint_every=tape_mode or None):
+            set_v()
+            for s in range(steps):
+                begin_step(s)
+                p2g(s)
+                grid_op(s)
+                g2p(s)
+            compute_x_avg()
+            compute_loss()
+        return nbytes
+
+    return get_metric(repeat, rollout)
+
+
+class TapeMode(BenchmarkItem):
+    name = "tape_mode"
+
+    def __init__(self):
+        self._items = {
+            "full": 0,
+            "checkpoint8": 8 * 4,  # a step records 4 calls
+            "checkpoint32": 32 * 4,
+        }
+
+
+class Steps(BenchmarkItem):
+    name = "steps"
+
+    def __init__(self):
+        self._items = {
+            "steps128": 128,
+            "steps1024": 1024,
+        }
+
+
+class AutodiffCheckpointPlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__("autodiff_checkpoint", arch, basic_repeat_times=1)
+        metric = MetricType()
+        metric.remove(["kernel_elapsed_time_ms"])
+        metric.update({"peak_memory_mb": memory_executor})
+        self.create_plan(TapeMode(), Steps(), metric)
+        self.add_func(["autodiff_checkpoint"], mpm_default)
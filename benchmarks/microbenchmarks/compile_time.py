@@ -0,0 +1,213 @@
+import tempfile
+from dataclasses import dataclass
+from time import perf_counter
+
+import gstaichi as ti
+import gstaichi.lang.kernel as kernel_module
+from microbenchmarks._items import BenchmarkItem
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+from microbenchmarks._utils import get_ti_arch
+
+arr_size = 1024
+
+
+def compile_time_executor(repeat, func, *args):
+    # every call compiles from scratch, so there is no warmup
+    return sum(func(*args) for _ in range(repeat)) / repeat  # ms
+
+
+def _wrap_twice(g):
+    @ti.func
+    def f(x):
+        return g(x) + g(x * 0.5)
+
+    return f
+
+
+def deep_func_calls():
+    @ti.func
+    def leaf(x):
+        return x * 1.0001 + 1.0
+
+    f = leaf
+    for _ in range(6):
+        f = _wrap_twice(f)
+    y = ti.field(ti.f32, shape=arr_size)
+
+    @ti.kernel
+    def k():
+        for i in y:
+            y[i] = f(y[i])
+
+    return lambda: k()
+
+
+def static_unroll():
+    x = ti.field(ti.f32, shape=arr_size)
+
+    @ti.kernel
+    def k():
+        for i in x:
+            acc = 0.0
+            for j in ti.static(range(256)):
+                acc += ti.sin(x[(i + j) % arr_size] * j)
+            x[i] = acc
+
+    return lambda: k()
+
+
+@dataclass(frozen=True)
+class BigArgs:
+    a0: ti.types.NDArray[ti.f32, 1]
+    a1: ti.types.NDArray[ti.f32, 1]
+    a2: ti.types.NDArray[ti.f32, 1]
+    a3: ti.types.NDArray[ti.f32, 1]
+    a4: ti.types.NDArray[ti.f32, 1]
+    a5: ti.types.NDArray[ti.f32, 1]
+    a6: ti.types.NDArray[ti.f32, 1]
+    a7: ti.types.NDArray[ti.f32, 1]
+    a8: ti.types.NDArray[ti.f32, 1]
+    a9: ti.types.NDArray[ti.f32, 1]
+    a10: ti.types.NDArray[ti.f32, 1]
+    a11: ti.types.NDArray[ti.f32, 1]
+    a12: ti.types.NDArray[ti.f32, 1]
+    a13: ti.types.NDArray[ti.f32, 1]
+    a14: ti.types.NDArray[ti.f32, 1]
+    a15: ti.types.NDArray[ti.f32, 1]
+
+
+def dataclass_args():
+    @ti.kernel
+    def k(s: BigArgs):
+        for i in range(arr_size):
+            s.a0[i] = (
+                s.a1[i] + s.a2[i] + s.a3[i] + s.a4[i] + s.a5[i] + s.a6[i] + s.a7[i] + s.a8[i]
+                + s.a9[i] + s.a10[i] + s.a11[i] + s.a12[i] + s.a13[i] + s.a14[i] + s.a15[i]
+            )  # fmt: skip
+
+    args = BigArgs(*[ti.ndarray(ti.f32, shape=arr_size) for _ in range(16)])
+    return lambda: k(args)
+
+
+def autodiff():
+    x = ti.field(ti.f32, shape=arr_size, needs_grad=True)
+    loss = ti.field(ti.f32, shape=(), needs_grad=True)
+
+    @ti.kernel
+    def k():
+        for i in x:
+            v = x[i]
+            for _ in ti.static(range(8)):
+                v = ti.sin(v) * ti.exp(-v * v)
+            loss[None] += v
+
+    def run():
+        k()
+        k.grad()
+
+    return run
+
+
+def compile_time_default(arch, repeat, corpus, opt_level, offline_cache, stage, get_metric):
+    def compile_once():
+        with tempfile.TemporaryDirectory() as cache_dir:
+            config = dict(arch=get_ti_arch(arch), opt_level=opt_level, offline_cache_file_path=cache_dir)
+            if offline_cache == "warm":
+                ti.init(**config)
+                corpus()()
+            ti.init(**config)
+            run = corpus()
+
+            python_ast_s = 0.0
+            transform_tree = kernel_module.transform_tree
+
+            def timed_transform_tree(*args, **kwargs):
+                nonlocal python_ast_s
+                t0 = perf_counter()
+                try:
+                    return transform_tree(*args, **kwargs)
+                finally:
+                    python_ast_s += perf_counter() - t0
+
+            kernel_module.transform_tree = timed_transform_tree
+            ti.profiler.clear_scoped_profiler_info()
+            try:
+                t0 = perf_counter()
+                run()
+                ti.sync()
+                total_s = perf_counter() - t0
+            finally:
+                kernel_module.transform_tree = transform_tree
+            info = ti.profiler.get_scoped_profiler_info()
+            ti.reset()
+
+        def scope_s(name):
+            return info.get(name, {"total_time": 0.0})["total_time"]
+
+        stages = {
+            "total": total_s,
+            "python_ast": python_ast_s,
+            # 'compile_to_offloads' runs the frontend passes, 'offload_to_executable' the per-task lowering
+            "ir_passes": scope_s("compile_to_offloads") + scope_s("offload_to_executable"),
+            "llvm_codegen": scope_s("emit_to_module"),
+            "llvm_optimize": scope_s("optimize_module"),
+        }
+        return stages[stage] * 1000  # ms
+
+    return get_metric(repeat, compile_once)
+
+
+class Corpus(BenchmarkItem):
+    name = "corpus"
+
+    def __init__(self):
+        self._items = {
+            "deep_func_calls": deep_func_calls,
+            "static_unroll": static_unroll,
+            "dataclass_args": dataclass_args,
+            "autodiff": autodiff,
+        }
+
+
+class OptLevel(BenchmarkItem):
+    name = "opt_level"
+
+    def __init__(self):
+        self._items = {
+            "opt0": 0,
+            "opt1": 1,
+        }
+
+
+class OfflineCache(BenchmarkItem):
+    name = "offline_cache"
+
+    def __init__(self):
+        self._items = {
+            "cold": "cold",
+            "warm": "warm",
+        }
+
+
+class CompileStage(BenchmarkItem):
+    name = "stage"
+
+    def __init__(self):
+        self._items = {
+            "total": "total",
+            "python_ast": "python_ast",
+            "ir_passes": "ir_passes",
+            "llvm_codegen": "llvm_codegen",
+            "llvm_optimize": "llvm_optimize",
+        }
+
+
+class CompileTimePlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__("compile_time", arch, basic_repeat_times=3)
+        metric = MetricType()
+        metric.remove(["kernel_elapsed_time_ms", "end2end_time_ms"])
+        metric.update({"compile_time_ms": compile_time_executor})
+        self.create_plan(Corpus(), OptLevel(), OfflineCache(), CompileStage(), metric)
+        self.add_func(["compile_time"], compile_time_default)
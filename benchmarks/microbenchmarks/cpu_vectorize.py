@@ -0,0 +1,52 @@
+import gstaichi as ti
+from microbenchmarks._items import BenchmarkItem, Container, DataSize
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+from microbenchmarks.saxpy import saxpy_default
+from microbenchmarks.stencil2d import stencil_2d_default
+
+
+# Both workloads run on f32, the type with the most SIMD lanes
+def _saxpy(arch, repeat, container, dsize, get_metric):
+    return saxpy_default(arch, repeat, container, ti.f32, dsize, get_metric)
+
+
+def _stencil_2d(arch, repeat, container, dsize, get_metric):
+    # Square 2D arrays of the same total size as the saxpy arrays
+    side = int((dsize // 4 // 2) ** 0.5)
+    return stencil_2d_default(arch, repeat, False, False, container, ti.f32, (side * 4, side * 2), get_metric)
+
+
+class Workload(BenchmarkItem):
+    name = "workload"
+
+    def __init__(self):
+        self._items = {
+            "saxpy": _saxpy,
+            "stencil_2d": _stencil_2d,
+        }
+
+
+class Vectorize(BenchmarkItem):
+    name = "vectorize"
+
+    def __init__(self):
+        self._items = {"vectorize_on": True, "vectorize_off": False}
+
+
+def cpu_vectorize_default(arch, repeat, workload, vectorize, container, dsize, get_metric):
+    # 'vectorize' is applied by 'CpuVectorizePlan.init_options'
+    return workload(arch, repeat, container, dsize, get_metric)
+
+
+class CpuVectorizePlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__("cpu_vectorize", arch, basic_repeat_times=10)
+        self.create_plan(Workload(), Vectorize(), Container(), DataSize(), MetricType())
+        self.add_func(["cpu_vectorize"], cpu_vectorize_default)
+        if arch != "x64":
+            # The option only changes the CPU codegen
+            self.plan.clear()
+
+    def init_options(self, tag_list):
+        return {"cpu_vectorize": self._get_kwargs(tag_list)["vectorize"]}
@@ -0,0 +1,233 @@
+from dataclasses import dataclass
+from time import perf_counter
+
+import numpy as np
+
+import gstaichi as ti
+from gstaichi.lang import impl
+from microbenchmarks._items import BenchmarkItem
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+
+try:
+    import torch
+except ImportError:
+    torch = None
+
+num_args = 8
+arr_size = 16
+
+
+def ns_per_call_executor(repeat, func, *args):
+    # warmup, which also compiles the kernel
+    for i in range(repeat // 10 + 1):
+        func(*args)
+    ti.sync()
+    t0 = perf_counter()
+    for i in range(repeat):
+        func(*args)
+    return (perf_counter() - t0) * 1e9 / repeat  # ns
+
+
+@dataclass(frozen=True)
+class Inner:
+    a: ti.types.NDArray[ti.f32, 1]
+    b: ti.types.NDArray[ti.f32, 1]
+    scale: ti.f32
+
+
+@dataclass(frozen=True)
+class Outer:
+    x: ti.types.NDArray[ti.f32, 1]
+    y: ti.types.NDArray[ti.f32, 1]
+    inner: Inner
+
+
+@ti.data_oriented
+class Solver:
+    def __init__(self):
+        self.x = ti.field(ti.f32, shape=arr_size)
+        self.y = ti.field(ti.f32, shape=arr_size)
+
+    @ti.kernel
+    def step(self, a: ti.f32):
+        self.y[0] = self.x[0] * a
+
+
+def no_args():
+    @ti.kernel
+    def k():
+        pass
+
+    return k, (), {}
+
+
+def scalars():
+    @ti.kernel
+    def k(a0: ti.i32, a1: ti.i32, a2: ti.i32, a3: ti.i32, a4: ti.f32, a5: ti.f32, a6: ti.f32, a7: ti.f32):
+        pass
+
+    return k, (1, 2, 3, 4, 1.0, 2.0, 3.0, 4.0), {}
+
+
+def scalars_kwargs():
+    k, args, _ = scalars()
+    return k, args[: num_args // 2], {f"a{i}": v for i, v in enumerate(args) if i >= num_args // 2}
+
+
+def ndarrays():
+    @ti.kernel
+    def k(
+        a0: ti.types.ndarray(),
+        a1: ti.types.ndarray(),
+        a2: ti.types.ndarray(),
+        a3: ti.types.ndarray(),
+        a4: ti.types.ndarray(),
+        a5: ti.types.ndarray(),
+        a6: ti.types.ndarray(),
+        a7: ti.types.ndarray(),
+    ):
+        a0[0] = a7[0]
+
+    return k, tuple(ti.ndarray(ti.f32, shape=arr_size) for _ in range(num_args)), {}
+
+
+def nested_dataclass():
+    @ti.kernel
+    def k(s: Outer):
+        s.y[0] = s.x[0] + s.inner.a[0] * s.inner.b[0] * s.inner.scale
+
+    arrs = [ti.ndarray(ti.f32, shape=arr_size) for _ in range(4)]
+    return k, (Outer(x=arrs[0], y=arrs[1], inner=Inner(a=arrs[2], b=arrs[3], scale=2.0)),), {}
+
+
+def data_oriented():
+    solver = Solver()
+    return solver.step, (2.0,), {}
+
+
+def numpy_externals():
+    @ti.kernel
+    def k(a0: ti.types.ndarray(), a1: ti.types.ndarray(), a2: ti.types.ndarray(), a3: ti.types.ndarray()):
+        a0[0] = a3[0]
+
+    return k, tuple(np.zeros(arr_size, dtype=np.float32) for _ in range(4)), {}
+
+
+def torch_externals():
+    k, _, _ = numpy_externals()
+    return k, tuple(torch.zeros(arr_size, dtype=torch.float32) for _ in range(4)), {}
+
+
+class LaunchContextRecorder:
+    # Stands in for the program during one launch, to keep the launch context filled by 'Kernel.launch_kernel'
+    def __init__(self, prog):
+        self.prog = prog
+        self.launch_ctx = None
+
+    def __getattr__(self, name):
+        return getattr(self.prog, name)
+
+    def launch_kernel(self, compiled_kernel_data, launch_ctx):
+        self.launch_ctx = launch_ctx
+        self.prog.launch_kernel(compiled_kernel_data, launch_ctx)
+
+
+def launch_overhead_default(arch, repeat, arg_shape, stage, get_metric):
+    kernel, args, kwargs = arg_shape()
+    kernel(*args, **kwargs)  # compile
+
+    primal = kernel._primal
+    primal_args = args
+    if hasattr(kernel, "_kernel_owner"):
+        # kernels of data oriented classes receive their owner as the first argument
+        primal_args = (kernel._kernel_owner, *args)
+    py_args = primal.fuse_args(is_func=False, is_pyfunc=False, py_args=primal_args, kwargs=kwargs, global_context=None)
+    key = primal.ensure_compiled(*py_args)
+    kernel_cpp = primal.materialized_kernels[key]
+    compiled_kernel_data = primal.compiled_kernel_data_by_key[key]
+
+    # Launching on its own needs a filled launch context, which the launch context buffer cache keeps around
+    launch_ctx = kernel_cpp.make_launch_context()
+    args_hash = (id(kernel_cpp), *[id(arg) for arg in py_args])
+    if not primal.launch_context_buffer_cache.populate_launch_ctx_from_cache(args_hash, launch_ctx):
+        # e.g. external arrays, whose pointers are set directly on the launch context, which is not cached. Keep the
+        # context of one launch instead, the arrays stay alive in 'args'
+        runtime = impl.get_runtime()
+        recorder = LaunchContextRecorder(runtime._prog)
+        runtime._prog = recorder
+        try:
+            primal.launch_kernel(key, kernel_cpp, compiled_kernel_data, *py_args)
+        finally:
+            runtime._prog = recorder.prog
+        launch_ctx = recorder.launch_ctx
+    prog = impl.get_runtime().prog
+
+    def run_kernel():
+        kernel(*args, **kwargs)
+
+    def fuse_args():
+        primal.fuse_args(is_func=False, is_pyfunc=False, py_args=primal_args, kwargs=kwargs, global_context=None)
+
+    def lookup():
+        primal.mapper.lookup(primal.raise_on_templated_floats, py_args)
+
+    def launch_kernel():
+        primal.launch_kernel(key, kernel_cpp, compiled_kernel_data, *py_args)
+
+    def launch_only():
+        prog.launch_kernel(compiled_kernel_data, launch_ctx)
+
+    if stage == "set_args":
+        # '_recursive_set_args' (or the launch context cache hit replacing it) is what 'launch_kernel' spends on top
+        # of the launch itself
+        return get_metric(repeat, launch_kernel) - get_metric(repeat, launch_only)
+    stages = {
+        "total": run_kernel,
+        "fuse_args": fuse_args,
+        "lookup": lookup,
+        "launch_kernel": launch_only,
+    }
+    return get_metric(repeat, stages[stage])
+
+
+class ArgShape(BenchmarkItem):
+    name = "arg_shape"
+
+    def __init__(self):
+        self._items = {
+            "no_args": no_args,
+            "scalars": scalars,
+            "scalars_kwargs": scalars_kwargs,
+            "ndarrays": ndarrays,
+            "nested_dataclass": nested_dataclass,
+            "data_oriented": data_oriented,
+            "numpy_externals": numpy_externals,
+            "torch_externals": torch_externals,
+        }
+
+
+class LaunchStage(BenchmarkItem):
+    name = "stage"
+
+    def __init__(self):
+        self._items = {
+            "total": "total",
+            "fuse_args": "fuse_args",
+            "lookup": "lookup",
+            "set_args": "set_args",
+            "launch_kernel": "launch_kernel",
+        }
+
+
+class LaunchOverheadPlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__("launch_overhead", arch, basic_repeat_times=10000)
+        arg_shape = ArgShape()
+        if torch is None:
+            arg_shape.remove(["torch_externals"])
+        metric = MetricType()
+        metric.remove(["kernel_elapsed_time_ms", "end2end_time_ms"])
+        metric.update({"ns_per_launch": ns_per_call_executor})
+        self.create_plan(arg_shape, LaunchStage(), metric)
+        self.add_func(["launch_overhead"], launch_overhead_default)
@@ -0,0 +1,110 @@
+import numpy as np
+
+import gstaichi as ti
+from microbenchmarks._items import BenchmarkItem
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+
+num_items = 64 * 1024
+
+
+def triangle(schedule):
+    # The work of iteration i grows linearly with i
+    out = ti.field(ti.f32, shape=num_items // 16)
+
+    @ti.kernel
+    def k():
+        ti.loop_config(schedule=schedule)
+        for i in out:
+            s = 0.0
+            for j in range(i):
+                s += ti.sin(ti.cast(j, ti.f32))
+            out[i] = s
+
+    return k
+
+
+def clustered_particles(schedule):
+    # Most particles fall into a few bins, each bin loops over its own particles
+    num_bins = 1024
+    rng = np.random.default_rng(0)
+    bins = np.minimum(rng.zipf(1.5, size=num_items) - 1, num_bins - 1).astype(np.int32)
+    order = np.argsort(bins, kind="stable")
+    counts = np.bincount(bins, minlength=num_bins).astype(np.int32)
+    bin_begin = ti.field(ti.i32, shape=num_bins)
+    bin_count = ti.field(ti.i32, shape=num_bins)
+    pos = ti.field(ti.f32, shape=num_items)
+    density = ti.field(ti.f32, shape=num_bins)
+    bin_begin.from_numpy((np.cumsum(counts) - counts).astype(np.int32))
+    bin_count.from_numpy(counts)
+    pos.from_numpy(rng.random(num_items, dtype=np.float32)[order])
+
+    @ti.kernel
+    def k():
+        ti.loop_config(schedule=schedule)
+        for b in range(num_bins):
+            s = 0.0
+            for p in range(bin_begin[b], bin_begin[b] + bin_count[b]):
+                s += ti.exp(-pos[p] * pos[p])
+            density[b] = s
+
+    return k
+
+
+def uneven_sparse_blocks(schedule):
+    # Pointer blocks of 256 cells, whose fill decreases geometrically with the block index
+    x = ti.field(ti.f32)
+    ti.root.pointer(ti.i, num_items // 256).bitmasked(ti.i, 256).place(x)
+
+    @ti.kernel
+    def activate():
+        for i in range(num_items):
+            block = i // 256
+            if i % 256 < 256 >> ti.min(block // 16, 8):
+                x[i] = 1.0
+
+    @ti.kernel
+    def k():
+        ti.loop_config(schedule=schedule)
+        for i in x:
+            s = x[i]
+            for _ in range(32):
+                s = ti.sqrt(s + 1.0)
+            x[i] = s
+
+    activate()
+    return k
+
+
+def loop_schedule_default(arch, repeat, workload, schedule, get_metric):
+    return get_metric(repeat, workload(schedule))
+
+
+class Workload(BenchmarkItem):
+    name = "workload"
+
+    def __init__(self):
+        self._items = {
+            "triangle": triangle,
+            "clustered_particles": clustered_particles,
+            "uneven_sparse_blocks": uneven_sparse_blocks,
+        }
+
+
+class Schedule(BenchmarkItem):
+    name = "schedule"
+
+    def __init__(self):
+        self._items = {s: s for s in ["auto", "static", "dynamic", "guided", "work_stealing"]}
+
+
+class LoopSchedulePlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__("loop_schedule", arch, basic_repeat_times=10)
+        metric = MetricType()
+        metric.remove(["kernel_elapsed_time_ms"])
+        self.create_plan(Workload(), Schedule(), metric)
+        self.add_func(["loop_schedule"], loop_schedule_default)
+        if arch != "x64":
+            # The schedules apply to CPU loops
+            self.plan.clear()
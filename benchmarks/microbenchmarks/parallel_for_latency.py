@@ -0,0 +1,66 @@
+from time import perf_counter
+
+import gstaichi as ti
+from microbenchmarks._items import BenchmarkItem
+from microbenchmarks._plan import BenchmarkPlan
+from microbenchmarks.roofline import CpuThreads
+
+
+def us_per_launch_executor(repeat, func, *args):
+    # warmup, which also compiles the kernel and wakes up the thread pool
+    for i in range(repeat // 10 + 1):
+        func(*args)
+    ti.sync()
+    t0 = perf_counter()
+    for i in range(repeat):
+        func(*args)
+    ti.sync()
+    return (perf_counter() - t0) * 1e6 / repeat  # us
+
+
+def parallel_for_latency_default(arch, repeat, loop_size, cpu_threads, spin_us, get_metric):
+    # 'cpu_threads' and 'spin_us' are applied by 'ParallelForLatencyPlan.init_options'
+    x = ti.field(ti.f32, shape=loop_size)
+
+    @ti.kernel
+    def small_range_for():
+        for i in x:
+            x[i] += 1.0
+
+    return get_metric(repeat, small_range_for)
+
+
+class LoopSize(BenchmarkItem):
+    name = "loop_size"
+
+    def __init__(self):
+        # Small loops, whose launch cost is dominated by waking up the thread pool
+        self._items = {f"n{n}": n for n in [1, 16, 256, 4096, 65536]}
+
+
+class SpinUs(BenchmarkItem):
+    name = "spin_us"
+
+    def __init__(self):
+        self._items = {f"spin{n}us": n for n in [0, 20, 100]}
+
+
+class LatencyMetric(BenchmarkItem):
+    name = "get_metric"
+
+    def __init__(self):
+        self._items = {"us_per_launch": us_per_launch_executor}
+
+
+class ParallelForLatencyPlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__("parallel_for_latency", arch, basic_repeat_times=2000)
+        self.create_plan(LoopSize(), CpuThreads(), SpinUs(), LatencyMetric())
+        self.add_func(["parallel_for_latency"], parallel_for_latency_default)
+        if arch != "x64":
+            # The thread pool only runs CPU kernels
+            self.plan.clear()
+
+    def init_options(self, tag_list):
+        kwargs = self._get_kwargs(tag_list)
+        return {"cpu_max_num_threads": kwargs["cpu_threads"], "cpu_thread_pool_spin_us": kwargs["spin_us"]}
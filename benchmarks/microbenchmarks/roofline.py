@@ -0,0 +1,184 @@
+import os
+from functools import partial
+
+import gstaichi as ti
+from microbenchmarks._items import BenchmarkItem, DataSize
+from microbenchmarks._metric import kernel_executor
+from microbenchmarks._plan import BenchmarkPlan
+from microbenchmarks._utils import get_ti_arch
+from microbenchmarks.atomic_ops import reduction_default
+from microbenchmarks.memcpy import memcpy_default
+from microbenchmarks.saxpy import saxpy_default
+from microbenchmarks.stencil2d import stencil_2d_default
+
+# Measured once per process by 'measure_machine_peaks', see 'RooflinePlan'
+_machine_peaks = {}
+
+
+def _best_kernel_time_s(repeat, func, *args):
+    func(*args)  # compile & warmup
+    best = float("inf")
+    for _ in range(repeat):
+        ti.profiler.clear_kernel_profiler_info()
+        func(*args)
+        best = min(best, ti.profiler.get_kernel_profiler_total_time())
+    return best
+
+
+def measure_machine_peaks(arch: str):
+    """Measures the host memory bandwidth (STREAM triad) and the peak f32 FMA throughput with all CPU threads."""
+    if arch in _machine_peaks:
+        return _machine_peaks[arch]
+    ti.init(kernel_profiler=True, arch=get_ti_arch(arch))
+
+    # STREAM triad, the arrays are much larger than the last level cache
+    num_elements = 16 * 1024 * 1024
+    a = ti.field(ti.f32, shape=num_elements)
+    b = ti.field(ti.f32, shape=num_elements)
+    c = ti.field(ti.f32, shape=num_elements)
+    b.fill(1.0)
+    c.fill(2.0)
+
+    @ti.kernel
+    def stream_triad(scalar: ti.f32):
+        for i in a:
+            a[i] = b[i] + scalar * c[i]
+
+    # STREAM counts the bytes read and written by the kernel, ignoring write-allocate traffic
+    triad_bytes = 3 * 4 * num_elements
+    gb_per_s = triad_bytes / _best_kernel_time_s(10, stream_triad, 3.0) / 1e9
+
+    # Independent FMA chains keep the floating point pipelines busy without touching memory
+    num_chains = 16
+    num_iterations = 4096
+    out = ti.field(ti.f32, shape=64 * 1024)
+
+    @ti.kernel
+    def fma_peak(mul: ti.f32, add: ti.f32):
+        for i in out:
+            x = ti.Vector([ti.cast(i + k, ti.f32) * 1e-6 for k in ti.static(range(num_chains))])
+            for _ in range(num_iterations):
+                x = x * mul + add
+            out[i] = x.sum()
+
+    fma_flops = 2 * num_chains * num_iterations * out.shape[0]
+    gflop_per_s = fma_flops / _best_kernel_time_s(10, fma_peak, 0.999, 1e-3) / 1e9
+    ti.reset()
+
+    _machine_peaks[arch] = {"gb_per_s": gb_per_s, "gflop_per_s": gflop_per_s}
+    print(f"[roofline] {arch} peaks: {gb_per_s:.2f} GB/s, {gflop_per_s:.2f} GFLOP/s")
+    return _machine_peaks[arch]
+
+
+def roofline_executor(metric, arch, bytes_moved, flops, repeat, func, *args):
+    time_s = kernel_executor(repeat, func, *args) / 1000
+    if metric == "gb_per_s":
+        return bytes_moved / time_s / 1e9
+    if metric == "gflop_per_s":
+        return flops / time_s / 1e9
+    # The roofline bounds the kernel time by its memory traffic and by its arithmetic at peak throughput
+    peaks = _machine_peaks[arch]
+    bound_s = max(bytes_moved / (peaks["gb_per_s"] * 1e9), flops / (peaks["gflop_per_s"] * 1e9))
+    return bound_s / time_s
+
+
+# Each workload runs an existing microbenchmark on f32 fields, the bytes and flops are those of a single launch
+def _memcpy(arch, repeat, dsize, get_metric):
+    num_elements = dsize // 4 // 2
+    return memcpy_default(arch, repeat, ti.field, ti.f32, dsize, partial(get_metric, 2 * 4 * num_elements, 0))
+
+
+def _saxpy(arch, repeat, dsize, get_metric):
+    num_elements = dsize // 4 // 3
+    return saxpy_default(
+        arch, repeat, ti.field, ti.f32, dsize, partial(get_metric, 3 * 4 * num_elements, 2 * num_elements)
+    )
+
+
+def _stencil_2d(arch, repeat, dsize, get_metric):
+    # Square 2D arrays, each neighbour read is assumed to hit the cache
+    side = int((dsize // 4 // 2) ** 0.5)
+    dsize_2d = (side * 4, side * 2)
+    num_elements = side * side
+    return stencil_2d_default(
+        arch,
+        repeat,
+        False,
+        False,
+        ti.field,
+        ti.f32,
+        dsize_2d,
+        partial(get_metric, 2 * 4 * num_elements, 3 * num_elements),
+    )
+
+
+def _reduction(arch, repeat, dsize, get_metric):
+    num_elements = dsize // 4
+    return reduction_default(
+        arch, repeat, ti.atomic_add, ti.field, ti.f32, dsize, partial(get_metric, 4 * num_elements, num_elements)
+    )
+
+
+class Workload(BenchmarkItem):
+    name = "workload"
+
+    def __init__(self):
+        self._items = {
+            "memcpy": _memcpy,
+            "saxpy": _saxpy,
+            "stencil_2d": _stencil_2d,
+            "reduction": _reduction,
+        }
+
+
+class CpuThreads(BenchmarkItem):
+    name = "cpu_threads"
+
+    def __init__(self):
+        max_threads = os.cpu_count() or 1
+        counts = sorted({min(2**i, max_threads) for i in range(max_threads.bit_length() + 1)})
+        self._items = {f"threads{n}": n for n in counts}
+
+
+class CpuBlockDim(BenchmarkItem):
+    name = "block_dim"
+
+    def __init__(self):
+        self._items = {f"block{n}": n for n in [16, 32, 64, 128]}
+
+
+class RooflineMetric(BenchmarkItem):
+    name = "get_metric"
+
+    def __init__(self):
+        self._items = {
+            "gb_per_s": partial(roofline_executor, "gb_per_s"),
+            "gflop_per_s": partial(roofline_executor, "gflop_per_s"),
+            "roofline_fraction": partial(roofline_executor, "roofline_fraction"),
+        }
+
+
+def roofline_default(arch, repeat, workload, cpu_threads, block_dim, dsize, get_metric):
+    # 'cpu_threads' and 'block_dim' are applied by 'RooflinePlan.init_options'
+    return workload(arch, repeat, dsize, partial(get_metric, arch))
+
+
+class RooflinePlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__("roofline", arch, basic_repeat_times=10)
+        dsize = DataSize()
+        dsize.remove(["16KB", "256KB", "4MB"])  # the peaks are measured out of cache
+        self.create_plan(Workload(), CpuThreads(), CpuBlockDim(), dsize, RooflineMetric())
+        self.add_func(["roofline"], roofline_default)
+        if arch != "x64":
+            # Thread counts and block dims are CPU settings
+            self.plan.clear()
+
+    def init_options(self, tag_list):
+        kwargs = self._get_kwargs(tag_list)
+        return {"cpu_max_num_threads": kwargs["cpu_threads"], "default_cpu_block_dim": kwargs["block_dim"]}
+
+    def run(self, num_samples=1):
+        if self.plan:
+            measure_machine_peaks(self.arch)
+        return super().run(num_samples)
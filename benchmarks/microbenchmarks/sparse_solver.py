@@ -0,0 +1,111 @@
+import numpy as np
+
+import gstaichi as ti
+from microbenchmarks._items import BenchmarkItem, DataType
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+
+
+def build_laplacian(grid_n, dtype, shift):
+    """Builds `shift * I + L`, where L is the 5-point Laplacian on a grid_n x grid_n grid."""
+    n = grid_n * grid_n
+    builder = ti.linalg.SparseMatrixBuilder(n, n, max_num_triplets=5 * n, dtype=dtype)
+
+    @ti.kernel
+    def fill(A: ti.types.sparse_matrix_builder(), shift: dtype):
+        for i, j in ti.ndrange(grid_n, grid_n):
+            row = i * grid_n + j
+            A[row, row] += 4.0 + shift
+            if i > 0:
+                A[row, row - grid_n] += -1.0
+            if i < grid_n - 1:
+                A[row, row + grid_n] += -1.0
+            if j > 0:
+                A[row, row - 1] += -1.0
+            if j < grid_n - 1:
+                A[row, row + 1] += -1.0
+
+    fill(builder, shift)
+    return builder.build()
+
+
+def sparse_solver_default(arch, repeat, solve_mode, grid_n, num_rhs, dtype, get_metric):
+    # Two matrices with identical sparsity patterns but different values, as produced by an implicit integrator
+    # whose system matrix depends on the current state.
+    matrices = [build_laplacian(grid_n, dtype, shift) for shift in (0.1, 0.2)]
+    np_dtype = ti.lang.util.to_numpy_type(dtype)
+    B = np.random.rand(grid_n * grid_n, num_rhs).astype(np_dtype)
+    solver = ti.linalg.SparseSolver(dtype=dtype, solver_type="LLT")
+    solver.analyze_pattern(matrices[0])
+    solver.factorize(matrices[0])
+    frame = [0]
+
+    def step():
+        A = matrices[frame[0] % 2]
+        frame[0] += 1
+        solve_mode(solver, A, B)
+
+    return get_metric(repeat, step)
+
+
+def analyze_factorize_solve(solver, A, B):
+    solver.analyze_pattern(A)
+    solver.factorize(A)
+    for k in range(B.shape[1]):
+        solver.solve(B[:, k])
+
+
+def refactorize_solve(solver, A, B):
+    solver.refactorize(A)
+    for k in range(B.shape[1]):
+        solver.solve(B[:, k])
+
+
+def refactorize_solve_many(solver, A, B):
+    solver.refactorize(A)
+    solver.solve_many(B)
+
+
+class SolveMode(BenchmarkItem):
+    name = "solve_mode"
+
+    def __init__(self):
+        self._items = {
+            "analyze_factorize_solve": analyze_factorize_solve,
+            "refactorize_solve": refactorize_solve,
+            "refactorize_solve_many": refactorize_solve_many,
+        }
+
+
+class GridN(BenchmarkItem):
+    name = "grid_n"
+
+    def __init__(self):
+        self._items = {
+            "grid64": 64,
+            "grid128": 128,
+        }
+
+
+class NumRHS(BenchmarkItem):
+    name = "num_rhs"
+
+    def __init__(self):
+        self._items = {
+            "rhs1": 1,
+            "rhs8": 8,
+        }
+
+
+class SparseSolverPlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__("sparse_solver", arch, basic_repeat_times=10)
+        dtype = DataType()
+        dtype.remove_integer()
+        metric = MetricType()
+        metric.remove(["kernel_elapsed_time_ms"])  # the solver does not run GsTaichi kernels
+        self.create_plan(SolveMode(), GridN(), NumRHS(), dtype, metric)
+        self.add_func(["sparse_solver"], sparse_solver_default)
+        if arch != "x64":
+            # solve_many() is only implemented by the Eigen (CPU) solvers.
+            self.remove_cases_with_tags([self.name])
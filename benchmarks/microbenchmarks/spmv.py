@@ -0,0 +1,115 @@
+import os
+import tempfile
+
+import numpy as np
+
+import gstaichi as ti
+from gstaichi.lang.util import to_numpy_type
+from microbenchmarks._items import BenchmarkItem, DataType
+from microbenchmarks._metric import MetricType
+from microbenchmarks._plan import BenchmarkPlan
+
+
+def write_fem_matrix(path, grid_n, dtype):
+    """Writes a FEM-like stiffness matrix to a MatrixMarket file with `mmwrite`.
+
+    The matrix couples the 3 degrees of freedom of every node of a grid_n^3 grid with its 6 neighbors through dense
+    3x3 blocks.
+    """
+    num_nodes = grid_n**3
+    n = 3 * num_nodes
+    builder = ti.linalg.SparseMatrixBuilder(n, n, max_num_triplets=7 * 9 * num_nodes, dtype=dtype)
+
+    @ti.kernel
+    def fill(A: ti.types.sparse_matrix_builder()):
+        for i, j, k, r, c in ti.ndrange(grid_n, grid_n, grid_n, 3, 3):
+            node = (i * grid_n + j) * grid_n + k
+            A[3 * node + r, 3 * node + c] += 6.0 + (r == c)
+            for d in ti.static(range(3)):
+                for s in ti.static([-1, 1]):
+                    ni = i + s * (d == 0)
+                    nj = j + s * (d == 1)
+                    nk = k + s * (d == 2)
+                    if 0 <= ni < grid_n and 0 <= nj < grid_n and 0 <= nk < grid_n:
+                        other = (ni * grid_n + nj) * grid_n + nk
+                        A[3 * node + r, 3 * other + c] += -1.0 / (1 + abs(r - c))
+
+    fill(builder)
+    builder.build().mmwrite(path)
+
+
+def load_matrix_market(path, dtype, storage_format):
+    data = np.loadtxt(path, comments="%", dtype=np.float64)
+    n, m, nnz = (int(v) for v in data[0])
+    entries = data[1:]
+    entries[:, :2] -= 1  # MatrixMarket indices are 1-based
+    triplets = ti.Vector.ndarray(n=3, dtype=dtype, shape=nnz)
+    triplets.from_numpy(entries.astype(to_numpy_type(dtype)))
+    A = ti.linalg.SparseMatrix(n=n, m=m, dtype=dtype, storage_format=storage_format)
+    A.build_from_ndarray(triplets)
+    return A
+
+
+def spmv_default(arch, repeat, matrix_format, num_vectors, grid_n, dtype, get_metric):
+    storage_format, block_size = matrix_format
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, f"fem_{grid_n}.mtx")
+        write_fem_matrix(path, grid_n, dtype)
+        A = load_matrix_market(path, dtype, storage_format)
+    if block_size:
+        A.use_block_format(block_size)
+
+    shape = (A.m,) if num_vectors == 1 else (A.m, num_vectors)
+    x = ti.ndarray(dtype, shape)
+    x.fill(1.0)
+    y = ti.ndarray(dtype, (A.n,) + shape[1:])
+
+    def func():
+        A.matmul(x, out=y)
+
+    return get_metric(repeat, func)
+
+
+class MatrixFormat(BenchmarkItem):
+    name = "matrix_format"
+
+    def __init__(self):
+        self._items = {
+            "csc": ("col_major", 0),
+            "csr": ("row_major", 0),
+            "bsr3": ("row_major", 3),
+        }
+
+
+class NumVectors(BenchmarkItem):
+    name = "num_vectors"
+
+    def __init__(self):
+        self._items = {
+            "spmv": 1,
+            "spmm8": 8,
+        }
+
+
+class GridN(BenchmarkItem):
+    name = "grid_n"
+
+    def __init__(self):
+        self._items = {
+            "grid16": 16,
+            "grid32": 32,
+        }
+
+
+class SpMVPlan(BenchmarkPlan):
+    def __init__(self, arch: str):
+        super().__init__("spmv", arch, basic_repeat_times=10)
+        dtype = DataType()
+        dtype.remove_integer()
+        metric = MetricType()
+        metric.remove(["kernel_elapsed_time_ms"])  # the products do not run GsTaichi kernels
+        self.create_plan(MatrixFormat(), NumVectors(), GridN(), dtype, metric)
+        self.add_func(["spmv"], spmv_default)
+        if arch != "x64":
+            # The multithreaded products and the block format are CPU only.
+            self.remove_cases_with_tags([self.name])
@@ -1,3 +1,4 @@
+import argparse
 import os
 
 from suite_microbenchmarks import MicroBenchmark
@@ -18,10 +19,10 @@ class BenchmarkInfo:
 
 
 class BenchmarkSuites:
-    def __init__(self):
+    def __init__(self, num_samples=1):
         self._suites = []
         for suite in benchmark_suites:
-            self._suites.append(suite())
+            self._suites.append(suite(num_samples))
 
     def run(self):
         for suite in self._suites:
@@ -41,12 +42,23 @@ class BenchmarkSuites:
 
 
 def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "-n",
+        "--num_samples",
+        default=1,
+        dest="num_samples",
+        type=int,
+        help="Number of times each case is measured, compare.py needs several samples for confidence intervals. Defaults to 1",
+    )
+    args = parser.parse_args()
+
     benchmark_dir = os.path.join(os.getcwd(), "results")
     os.makedirs(benchmark_dir, exist_ok=True)
 
     # init & run
     info = BenchmarkInfo()
-    suites = BenchmarkSuites()
+    suites = BenchmarkSuites(args.num_samples)
     suites.run()
     # save benchmark results & info
     suites.save(benchmark_dir)
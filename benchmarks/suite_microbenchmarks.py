@@ -7,12 +7,15 @@ from utils import dump2json
 class MicroBenchmark:
     suite_name = "microbenchmarks"
     config = {
+        # The CPU-only plans, e.g. sparse_solver, clear their cases on the other archs
+        "x64": {"enable": True},
         "cuda": {"enable": True},
         "vulkan": {"enable": False},
         "opengl": {"enable": False},
     }
 
-    def __init__(self):
+    def __init__(self, num_samples=1):
+        self._num_samples = num_samples
         self._results = {}
         self._info = {}
 
@@ -32,7 +35,7 @@ class MicroBenchmark:
                 self._info[arch] = {}
                 for plan in benchmark_plan_list:
                     plan_impl = plan(arch)
-                    results = plan_impl.run()
+                    results = plan_impl.run(self._num_samples)
                     self._info[arch][plan_impl.name] = results["info"]
                     arch_results[plan_impl.name] = results["results"]
 
@@ -0,0 +1,199 @@
+#include "gstaichi/ir/ir.h"
+#include "gstaichi/ir/snode.h"
+#include "gstaichi/ir/analysis.h"
+#include "gstaichi/ir/statements.h"
+
+#include <set>
+
+namespace gstaichi::lang {
+
+namespace {
+
+// What an offloaded task reads and writes outside of its own local storage
+struct TaskAccesses {
+  // The task cannot run concurrently with any other task
+  bool barrier{false};
+  std::unordered_set<SNode *> snode_reads, snode_writes;
+  // Global temporaries, by offset
+  std::set<std::size_t> temporary_reads, temporary_writes;
+  // External arrays, by argument id and whether the gradient is accessed
+  std::set<std::pair<std::vector<int>, bool>> array_reads, array_writes;
+
+  void add_snode(SNode *snode, bool write) {
+    // The activation of sparse ancestors is shared between the SNodes below
+    // them, and so are the physical words of bit-level SNodes
+    for (auto *s = snode; s != nullptr; s = s->parent) {
+      if (s == snode || s->need_activation() ||
+          s->type == SNodeType::bit_struct ||
+          s->type == SNodeType::quant_array) {
+        (write ? snode_writes : snode_reads).insert(s);
+      }
+    }
+  }
+
+  void merge(const TaskAccesses &other) {
+    barrier |= other.barrier;
+    snode_reads.insert(other.snode_reads.begin(), other.snode_reads.end());
+    snode_writes.insert(other.snode_writes.begin(), other.snode_writes.end());
+    temporary_reads.insert(other.temporary_reads.begin(),
+                           other.temporary_reads.end());
+    temporary_writes.insert(other.temporary_writes.begin(),
+                            other.temporary_writes.end());
+    array_reads.insert(other.array_reads.begin(), other.array_reads.end());
+    array_writes.insert(other.array_writes.begin(), other.array_writes.end());
+  }
+};
+
+template <typename Set>
+bool intersects(const Set &a, const Set &b) {
+  for (const auto &x : a) {
+    if (b.count(x)) {
+      return true;
+    }
+  }
+  return false;
+}
+
+template <typename Set>
+bool conflict(const Set &reads_a,
+              const Set &writes_a,
+              const Set &reads_b,
+              const Set &writes_b) {
+  return intersects(writes_a, reads_b) || intersects(writes_a, writes_b) ||
+         intersects(reads_a, writes_b);
+}
+
+bool depends(const TaskAccesses &a, const TaskAccesses &b) {
+  return a.barrier || b.barrier ||
+         conflict(a.snode_reads, a.snode_writes, b.snode_reads,
+                  b.snode_writes) ||
+         conflict(a.temporary_reads, a.temporary_writes, b.temporary_reads,
+                  b.temporary_writes) ||
+         conflict(a.array_reads, a.array_writes, b.array_reads, b.array_writes);
+}
+
+TaskAccesses gather_task_accesses(OffloadedStmt *offload) {
+  TaskAccesses accesses;
+  using Type = OffloadedStmt::TaskType;
+  // Lists and garbage collection are shared by all the tasks over an SNode,
+  // and the mesh-fors read the mesh metadata
+  if (offload->task_type != Type::serial &&
+      offload->task_type != Type::range_for &&
+      offload->task_type != Type::struct_for) {
+    accesses.barrier = true;
+    return accesses;
+  }
+  if (offload->task_type == Type::range_for) {
+    if (!offload->const_begin) {
+      accesses.temporary_reads.insert(offload->begin_offset);
+    }
+    if (!offload->const_end) {
+      accesses.temporary_reads.insert(offload->end_offset);
+    }
+  }
+
+  auto [snode_reads, snode_writes] =
+      irpass::analysis::gather_snode_read_writes(offload);
+  for (auto *snode : snode_reads) {
+    accesses.add_snode(snode, /*write=*/false);
+  }
+  for (auto *snode : snode_writes) {
+    accesses.add_snode(snode, /*write=*/true);
+  }
+
+  irpass::analysis::gather_statements(offload, [&](Stmt *stmt) {
+    if (stmt->is<ExternalFuncCallStmt>() || stmt->is<FuncCallStmt>() ||
+        stmt->is<InternalFuncStmt>() || stmt->is<PrintStmt>() ||
+        stmt->is<ReturnStmt>() || stmt->is<ClearListStmt>()) {
+      // Unknown side effects, or effects whose order is observable
+      accesses.barrier = true;
+      return false;
+    }
+    if (auto snode_op = stmt->cast<SNodeOpStmt>()) {
+      accesses.add_snode(snode_op->snode, /*write=*/true);
+      return false;
+    }
+    Stmt *ptr = nullptr;
+    bool read = false, write = false;
+    if (auto global_load = stmt->cast<GlobalLoadStmt>()) {
+      read = true;
+      ptr = global_load->src;
+    } else if (auto global_store = stmt->cast<GlobalStoreStmt>()) {
+      write = true;
+      ptr = global_store->dest;
+    } else if (auto global_atomic = stmt->cast<AtomicOpStmt>()) {
+      read = true;
+      write = true;
+      ptr = global_atomic->dest;
+    }
+    if (auto *matrix_ptr = ptr ? ptr->cast<MatrixPtrStmt>() : nullptr) {
+      ptr = matrix_ptr->origin;
+    }
+    if (ptr == nullptr || ptr->is<GlobalPtrStmt>()) {
+      // SNodes are gathered by gather_snode_read_writes
+      return false;
+    }
+    if (auto temporary = ptr->cast<GlobalTemporaryStmt>()) {
+      if (read)
+        accesses.temporary_reads.insert(temporary->offset);
+      if (write)
+        accesses.temporary_writes.insert(temporary->offset);
+    } else if (auto external_ptr = ptr->cast<ExternalPtrStmt>()) {
+      auto arg = external_ptr->base_ptr->cast<ArgLoadStmt>();
+      if (arg == nullptr) {
+        accesses.barrier = true;
+        return false;
+      }
+      auto key = std::make_pair(arg->arg_id, external_ptr->is_grad);
+      if (read)
+        accesses.array_reads.insert(key);
+      if (write)
+        accesses.array_writes.insert(key);
+    } else {
+      accesses.barrier = true;
+    }
+    return false;
+  });
+  return accesses;
+}
+
+}  // namespace
+
+namespace irpass::analysis {
+
+std::vector<bool> find_concurrent_offloads(Block *root) {
+  std::vector<bool> concurrent;
+  // The accesses of the tasks since the last one not concurrent with its
+  // predecessors
+  TaskAccesses group;
+  group.barrier = true;
+  for (auto &stmt : root->statements) {
+    auto accesses = gather_task_accesses(stmt->as<OffloadedStmt>());
+    if (depends(group, accesses)) {
+      concurrent.push_back(false);
+      group = std::move(accesses);
+    } else {
+      concurrent.push_back(true);
+      group.merge(accesses);
+    }
+  }
+  return concurrent;
+}
+
+bool offload_uses_shared_runtime_state(OffloadedStmt *offload) {
+  using Type = OffloadedStmt::TaskType;
+  if (offload->task_type == Type::struct_for ||
+      offload->task_type == Type::listgen || offload->task_type == Type::gc) {
+    return true;
+  }
+  // The random states are per thread, and the launches running on their
+  // calling thread all use the states of thread 0
+  auto shared_stmts = gather_statements(offload, [](Stmt *stmt) {
+    return stmt->is<ClearListStmt>() || stmt->is<RandStmt>();
+  });
+  return !shared_stmts.empty();
+}
+
+}  // namespace irpass::analysis
+
+}  // namespace gstaichi::lang
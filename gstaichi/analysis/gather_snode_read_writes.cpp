@@ -26,6 +26,9 @@ gather_snode_read_writes(IRNode *root) {
       write = true;
       ptr = global_atomic->dest;
     }
+    if (auto *matrix_ptr = ptr ? ptr->cast<MatrixPtrStmt>() : nullptr) {
+      ptr = matrix_ptr->origin;
+    }
     if (ptr) {
       if (auto *global_ptr = ptr->cast<GlobalPtrStmt>()) {
         if (read)
@@ -47,6 +47,10 @@ static std::vector<std::uint8_t> get_offline_cache_key_of_compile_config(
   serializer(config.advanced_optimization);
   serializer(config.constant_folding);
   serializer(config.kernel_profiler);
+  serializer(config.kernel_profiler_memory_traffic);
+  serializer(config.perf_map);
+  serializer(config.cpu_loop_schedule);
+  serializer(config.cpu_memory_placement);
   serializer(config.fast_math);
   serializer(config.flatten_if);
   serializer(config.make_thread_local);
@@ -57,6 +61,7 @@ static std::vector<std::uint8_t> get_offline_cache_key_of_compile_config(
   if (arch_is_cpu(config.arch)) {
     serializer(config.default_cpu_block_dim);
     serializer(config.cpu_max_num_threads);
+    serializer(config.cpu_vectorize);
   } else if (arch_is_gpu(config.arch)) {
     serializer(config.default_gpu_block_dim);
     serializer(config.gpu_max_reg);
@@ -182,6 +187,8 @@ std::string get_hashed_offline_cache_key(const CompileConfig &config,
   auto device_caps_key = get_offline_cache_key_of_device_caps(caps);
   std::string autodiff_mode =
       std::to_string(static_cast<std::size_t>(kernel->autodiff_mode));
+  // A fused kernel may have the same body as the unfused kernel
+  std::string fuse_loops = kernel->fuse_loops ? "1" : "0";
   picosha2::hash256_one_by_one hasher;
   hasher.process(compile_config_key.begin(), compile_config_key.end());
   hasher.process(device_caps_key.begin(), device_caps_key.end());
@@ -189,6 +196,7 @@ std::string get_hashed_offline_cache_key(const CompileConfig &config,
   hasher.process(kernel_rets_string.begin(), kernel_rets_string.end());
   hasher.process(kernel_body_string.begin(), kernel_body_string.end());
   hasher.process(autodiff_mode.begin(), autodiff_mode.end());
+  hasher.process(fuse_loops.begin(), fuse_loops.end());
   hasher.finish();
 
   auto res = picosha2::get_hash_hex_string(hasher);
@@ -85,6 +85,20 @@ LLVMCompiledKernel KernelCodeGen::compile_kernel_to_module() {
   }
   worker.flush();
 
+  if (arch_is_cpu(compile_config_.arch)) {
+    // Analyzed before the accesses are lowered, each task is compiled into a
+    // single OffloadedTask on CPU
+    auto concurrent = irpass::analysis::find_concurrent_offloads(block);
+    for (int i = 0; i < offloads.size(); i++) {
+      bool shared = irpass::analysis::offload_uses_shared_runtime_state(
+          offloads[i]->as<OffloadedStmt>());
+      for (auto &task : data[i]->tasks) {
+        task.concurrent_with_previous = concurrent[i];
+        task.uses_shared_runtime_state = shared;
+      }
+    }
+  }
+
   auto llvm_compiled_kernel = tlctx_.link_compiled_tasks(std::move(data));
   optimize_module(llvm_compiled_kernel.module.get());
   return llvm_compiled_kernel;
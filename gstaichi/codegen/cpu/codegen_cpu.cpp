@@ -50,9 +50,16 @@ class TaskCodeGenCPU : public TaskCodeGenLLVM {
 
     auto *tls_prologue = create_xlogue(stmt->tls_prologue);
 
+    // Reversed loops are called once per iteration. The body of the loops
+    // split into per-thread blocks runs over the thread indices, and its
+    // inner serial loop over the block of the thread.
+    bool block_body = compile_config.cpu_vectorize && step == 1;
+
     // The loop body
     llvm::Function *body;
-    {
+    if (block_body) {
+      body = create_offload_range_for_block_body(stmt);
+    } else {
       auto guard = get_function_creation_guard(
           {llvm::PointerType::get(get_runtime_type("RuntimeContext"), 0),
            llvm::PointerType::getUnqual(*llvm_context),
@@ -69,11 +76,78 @@ class TaskCodeGenCPU : public TaskCodeGenLLVM {
     llvm::Value *epilogue = create_xlogue(stmt->tls_epilogue);
 
     auto [begin, end] = get_range_for_bounds(stmt);
+    // The runtime runs loops with few iterations on the calling thread, unless
+    // ti.loop_config says how to run them
+    llvm::Value *num_iterations = tlctx->get_constant(-1);
+    if (!stmt->cpu_explicit_loop_config) {
+      num_iterations = builder->CreateSub(end, begin);
+    }
+    if (stmt->cpu_per_thread_blocks) {
+      // The body computes the block of each thread from the loop bounds
+      begin = tlctx->get_constant(0);
+      end = tlctx->get_constant(compile_config.cpu_max_num_threads);
+    }
+
+    if (block_body) {
+      call("cpu_parallel_range_for_blocks", get_arg(0),
+           tlctx->get_constant(stmt->num_cpu_threads), begin, end,
+           num_iterations, tlctx->get_constant(stmt->block_dim), tls_prologue,
+           body, epilogue, tlctx->get_constant(stmt->tls_size),
+           tlctx->get_constant((int)stmt->cpu_schedule));
+    } else {
+      call("cpu_parallel_range_for", get_arg(0),
+           tlctx->get_constant(stmt->num_cpu_threads), begin, end,
+           num_iterations, tlctx->get_constant(step),
+           tlctx->get_constant(stmt->block_dim), tls_prologue, body, epilogue,
+           tlctx->get_constant(stmt->tls_size),
+           tlctx->get_constant((int)stmt->cpu_schedule));
+    }
+  }
+
+  // Emits the body of a range-for as a loop over the iterations [begin, end)
+  // of a block, so that the optimizer sees the whole loop and can vectorize it
+  // instead of a call per iteration
+  llvm::Function *create_offload_range_for_block_body(OffloadedStmt *stmt) {
+    auto guard = get_function_creation_guard(
+        {llvm::PointerType::get(get_runtime_type("RuntimeContext"), 0),
+         llvm::PointerType::getUnqual(*llvm_context),
+         tlctx->get_data_type<int>(), tlctx->get_data_type<int>()});
+
+    auto loop_test = llvm::BasicBlock::Create(*llvm_context, "loop_test", func);
+    auto loop_body = llvm::BasicBlock::Create(*llvm_context, "loop_body", func);
+    auto loop_inc = llvm::BasicBlock::Create(*llvm_context, "loop_inc", func);
+    auto after_loop =
+        llvm::BasicBlock::Create(*llvm_context, "after_loop", func);
+
+    auto loop_var_ty = tlctx->get_data_type(PrimitiveType::i32);
+    auto loop_var = create_entry_block_alloca(PrimitiveType::i32);
+    loop_vars_llvm[stmt].push_back(loop_var);
+    builder->CreateStore(get_arg(2), loop_var);
+    builder->CreateBr(loop_test);
+
+    builder->SetInsertPoint(loop_test);
+    auto cond = builder->CreateICmp(llvm::CmpInst::Predicate::ICMP_SLT,
+                                    builder->CreateLoad(loop_var_ty, loop_var),
+                                    get_arg(3));
+    builder->CreateCondBr(cond, loop_body, after_loop);
+
+    builder->SetInsertPoint(loop_body);
+    // A continue in the body skips to the next iteration of the block
+    offloaded_loop_reentry = loop_inc;
+    stmt->body->accept(this);
+    offloaded_loop_reentry = nullptr;
+    if (!returned) {
+      builder->CreateBr(loop_inc);
+    } else {
+      returned = false;
+    }
+
+    builder->SetInsertPoint(loop_inc);
+    create_increment(loop_var, tlctx->get_constant(1));
+    builder->CreateBr(loop_test);
 
-    call("cpu_parallel_range_for", get_arg(0),
-         tlctx->get_constant(stmt->num_cpu_threads), begin, end,
-         tlctx->get_constant(step), tlctx->get_constant(stmt->block_dim),
-         tls_prologue, body, epilogue, tlctx->get_constant(stmt->tls_size));
+    builder->SetInsertPoint(after_loop);
+    return guard.body;
   }
 
   void create_offload_mesh_for(OffloadedStmt *stmt) override {
@@ -142,9 +216,12 @@ class TaskCodeGenCPU : public TaskCodeGenLLVM {
 
     llvm::Value *epilogue = create_mesh_xlogue(stmt->tls_epilogue);
 
+    int num_iterations =
+        stmt->cpu_explicit_loop_config ? -1 : stmt->mesh->num_patches;
     call("cpu_parallel_mesh_for", get_arg(0),
          tlctx->get_constant(stmt->num_cpu_threads),
          tlctx->get_constant(stmt->mesh->num_patches),
+         tlctx->get_constant(num_iterations),
          tlctx->get_constant(stmt->block_dim), tls_prologue, body, epilogue,
          tlctx->get_constant(stmt->tls_size));
   }
@@ -283,7 +360,11 @@ void KernelCodeGenCPU::optimize_module(llvm::Module *module) {
   llvm::CGSCCAnalysisManager cgam;
   llvm::ModuleAnalysisManager mam;
 
-  llvm::PassBuilder pb(target_machine.get());
+  llvm::PipelineTuningOptions pto;
+  // The loop vectorizer is on by default, the SLP vectorizer packs the
+  // isomorphic scalar operations left in the unrolled or vector-typed bodies
+  pto.SLPVectorization = compile_config.cpu_vectorize;
+  llvm::PassBuilder pb(target_machine.get(), pto);
   pb.registerModuleAnalyses(mam);
   pb.registerCGSCCAnalyses(cgam);
   pb.registerFunctionAnalyses(fam);
@@ -7,8 +7,10 @@
 #include "llvm/IR/Module.h"
 #include "llvm/Linker/Linker.h"
 #include "gstaichi/analysis/offline_cache_util.h"
+#include "gstaichi/ir/analysis.h"
 #include "gstaichi/ir/statements.h"
 #include "gstaichi/ir/transforms.h"
+#include "gstaichi/program/compile_report.h"
 #include "gstaichi/program/extension.h"
 #include "gstaichi/runtime/program_impls/llvm/llvm_program.h"
 #include "gstaichi/codegen/llvm/struct_llvm.h"
@@ -36,6 +38,9 @@ FunctionCreationGuard::FunctionCreationGuard(
   body = llvm::Function::Create(body_function_type,
                                 llvm::Function::InternalLinkage, func_name,
                                 mb->module.get());
+  if (!mb->current_task_source.empty()) {
+    body->addFnAttr("gstaichi-source", mb->current_task_source);
+  }
   old_func = mb->func;
   // emit into loop body function
   mb->func = body;
@@ -1093,7 +1098,11 @@ void TaskCodeGenLLVM::visit(ContinueStmt *stmt) {
     return false;
   };
   if (stmt_in_off_range_for()) {
-    builder->CreateRetVoid();
+    if (offloaded_loop_reentry) {
+      builder->CreateBr(offloaded_loop_reentry);
+    } else {
+      builder->CreateRetVoid();
+    }
   } else {
     TI_ASSERT(current_loop_reentry != nullptr);
     builder->CreateBr(current_loop_reentry);
@@ -1551,6 +1560,7 @@ void TaskCodeGenLLVM::visit(AtomicOpStmt *stmt) {
   if (is_local) {
     TI_ERROR("Local atomics should have been demoted.");
   }
+  count_memory_traffic(kMemoryTrafficAtomicBytes, stmt->dest);
   llvm::Value *old_value;
   if (llvm::Value *result = optimized_reduction(stmt)) {
     old_value = result;
@@ -1573,6 +1583,7 @@ void TaskCodeGenLLVM::visit(GlobalPtrStmt *stmt) {
 void TaskCodeGenLLVM::visit(GlobalStoreStmt *stmt) {
   TI_ASSERT(llvm_val[stmt->val]);
   TI_ASSERT(llvm_val[stmt->dest]);
+  count_memory_traffic(kMemoryTrafficStoreBytes, stmt->dest);
   auto ptr_type = stmt->dest->ret_type->as<PointerType>();
   if (ptr_type->is_bit_pointer()) {
     auto pointee_type = ptr_type->get_pointee_type();
@@ -1604,8 +1615,34 @@ llvm::Value *TaskCodeGenLLVM::create_intrinsic_load(llvm::Value *ptr,
   TI_NOT_IMPLEMENTED;
 }
 
+void TaskCodeGenLLVM::count_memory_traffic(int counter, Stmt *ptr) {
+  if (!compile_config.kernel_profiler_memory_traffic ||
+      !arch_is_cpu(compile_config.arch)) {
+    return;
+  }
+  auto ptr_type = ptr->ret_type->cast<PointerType>();
+  if (ptr_type && ptr_type->is_bit_pointer()) {
+    // Quantized values are accessed through their physical type.
+    count_memory_traffic(
+        counter,
+        data_type_size(ptr->as<GetChStmt>()->input_snode->physical_type));
+  } else {
+    count_memory_traffic(counter, data_type_size(ptr->ret_type.ptr_removed()));
+  }
+}
+
+void TaskCodeGenLLVM::count_memory_traffic(int counter, int64 bytes) {
+  if (!compile_config.kernel_profiler_memory_traffic ||
+      !arch_is_cpu(compile_config.arch)) {
+    return;
+  }
+  call("RuntimeContext_count_memory_traffic", get_context(),
+       tlctx->get_constant(counter), tlctx->get_constant(bytes));
+}
+
 void TaskCodeGenLLVM::create_global_load(GlobalLoadStmt *stmt,
                                          bool should_cache_as_read_only) {
+  count_memory_traffic(kMemoryTrafficLoadBytes, stmt->src);
   auto ptr = llvm_val[stmt->src];
   auto ptr_type = stmt->src->ret_type->as<PointerType>();
   if (ptr_type->is_bit_pointer()) {
@@ -2005,6 +2042,44 @@ void TaskCodeGenLLVM::visit(ExternalTensorBasePtrStmt *stmt) {
   llvm_val[stmt] = get_struct_arg(arg_id, /*create_load=*/true);
 }
 
+// Summarizes the Python source lines of |task| as "file.py:first-last", from
+// the tracebacks attached to its statements
+static std::string get_task_source_lines(OffloadedStmt *task) {
+  std::string path;
+  int first_line = std::numeric_limits<int>::max();
+  int last_line = 0;
+  auto stmts = irpass::analysis::gather_statements(
+      task, [](Stmt *s) { return !s->get_tb().empty(); });
+  for (auto s : stmts) {
+    // Tracebacks start with 'File "<path>", line <n>, in <function>'
+    const auto &tb = s->get_tb();
+    auto path_begin = tb.find("File \"");
+    auto path_end = tb.find("\", line ");
+    if (path_begin == std::string::npos || path_end == std::string::npos) {
+      continue;
+    }
+    path_begin += 6;
+    auto stmt_path = tb.substr(path_begin, path_end - path_begin);
+    if (path.empty()) {
+      path = stmt_path;
+    } else if (stmt_path != path) {
+      // Lines of ti.funcs defined in other files
+      continue;
+    }
+    int line = std::atoi(tb.c_str() + path_end + 8);
+    first_line = std::min(first_line, line);
+    last_line = std::max(last_line, line);
+  }
+  if (path.empty()) {
+    return "";
+  }
+  auto file = std::filesystem::path(path).filename().string();
+  if (first_line == last_line) {
+    return fmt::format("{}:{}", file, first_line);
+  }
+  return fmt::format("{}:{}-{}", file, first_line, last_line);
+}
+
 std::string TaskCodeGenLLVM::init_offloaded_task_function(OffloadedStmt *stmt,
                                                           std::string suffix) {
   current_loop_reentry = nullptr;
@@ -2019,6 +2094,12 @@ std::string TaskCodeGenLLVM::init_offloaded_task_function(OffloadedStmt *stmt,
   func = llvm::Function::Create(task_function_type,
                                 llvm::Function::ExternalLinkage,
                                 task_kernel_name, module.get());
+  if (compile_config.perf_map) {
+    current_task_source = get_task_source_lines(stmt);
+    if (!current_task_source.empty()) {
+      func->addFnAttr("gstaichi-source", current_task_source);
+    }
+  }
 
   current_task = std::make_unique<OffloadedTask>(task_kernel_name);
 
@@ -2308,7 +2389,9 @@ void TaskCodeGenLLVM::create_offload_struct_for(OffloadedStmt *stmt) {
   call(struct_for_func, get_context(), tlctx->get_constant(leaf_block->id),
        tlctx->get_constant(list_element_size), tlctx->get_constant(num_splits),
        body, tlctx->get_constant(stmt->tls_size),
-       tlctx->get_constant(stmt->num_cpu_threads));
+       tlctx->get_constant(stmt->num_cpu_threads),
+       tlctx->get_constant((int)stmt->cpu_schedule),
+       tlctx->get_constant((int)!stmt->cpu_explicit_loop_config));
   // TODO: why do we need num_cpu_threads on GPUs?
 
   current_coordinates = nullptr;
@@ -2381,8 +2464,7 @@ void TaskCodeGenLLVM::visit(BlockCornerIndexStmt *stmt) {
 }
 
 void TaskCodeGenLLVM::visit(GlobalTemporaryStmt *stmt) {
-  auto runtime = get_runtime();
-  auto buffer = call("get_temporary_pointer", runtime,
+  auto buffer = call("get_temporary_pointer", get_context(),
                      tlctx->get_constant((int64)stmt->offset));
 
   auto ptr_type = llvm::PointerType::get(
@@ -2691,7 +2773,35 @@ void TaskCodeGenLLVM::emit_to_module() {
   ir->accept(this);
 }
 
+// Counts the instructions of |func| and of the functions defined in the same
+// module that it references, e.g. the loop bodies passed to the runtime
+static int64 count_llvm_instructions(llvm::Function *func) {
+  int64 count = 0;
+  std::unordered_set<llvm::Function *> visited;
+  std::vector<llvm::Function *> stack{func};
+  while (!stack.empty()) {
+    auto f = stack.back();
+    stack.pop_back();
+    if (f->isDeclaration() || !visited.insert(f).second) {
+      continue;
+    }
+    for (auto &bb : *f) {
+      for (auto &inst : bb) {
+        count++;
+        for (auto &op : inst.operands()) {
+          if (auto callee =
+                  llvm::dyn_cast<llvm::Function>(op->stripPointerCasts())) {
+            stack.push_back(callee);
+          }
+        }
+      }
+    }
+  }
+  return count;
+}
+
 LLVMCompiledTask TaskCodeGenLLVM::run_compilation() {
+  CompileReportRecorder::TaskScope report_task_scope(task_codegen_id);
   // Final lowering
   auto offload_to_executable = [](IRNode *ir, const CompileConfig &config,
                                   const Kernel *kernel) {
@@ -2754,6 +2864,13 @@ LLVMCompiledTask TaskCodeGenLLVM::run_compilation() {
     }
   }
 
+  if (auto report = CompileReportRecorder::current()) {
+    for (const auto &task : offloaded_tasks) {
+      report->record_llvm_task(
+          task.name, count_llvm_instructions(module->getFunction(task.name)));
+    }
+  }
+
   return {std::move(offloaded_tasks), std::move(module),
           std::move(used_tree_ids), std::move(struct_for_tls_sizes)};
 }
@@ -2811,6 +2928,11 @@ void TaskCodeGenLLVM::visit(FuncCallStmt *stmt) {
   llvm::Function *llvm_func = func_map[stmt->func];
   auto *new_ctx = create_entry_block_alloca(get_runtime_type("RuntimeContext"));
   call("RuntimeContext_set_runtime", new_ctx, get_runtime());
+  if (compile_config.kernel_profiler_memory_traffic) {
+    // The callee indexes the per-thread memory traffic counters.
+    call("RuntimeContext_set_cpu_thread_id", new_ctx,
+         call("RuntimeContext_get_cpu_thread_id", get_context()));
+  }
   if (!stmt->func->parameter_list.empty()) {
     auto *buffer =
         create_entry_block_alloca(tlctx->get_data_type(stmt->func->args_type));
@@ -46,6 +46,10 @@ class TaskCodeGenLLVM : public IRVisitor, public LLVMModuleBuilder {
   llvm::GlobalVariable *bls_buffer{nullptr};
   // Mainly for supporting continue stmt
   llvm::BasicBlock *current_loop_reentry;
+  // Increment block of the loop over a block of iterations that the CPU
+  // backend emits in offloaded range-for bodies, nullptr when the body runs a
+  // single iteration
+  llvm::BasicBlock *offloaded_loop_reentry{nullptr};
   // Mainly for supporting break stmt
   llvm::BasicBlock *current_while_after_loop;
   llvm::FunctionType *task_function_type;
@@ -65,6 +69,10 @@ class TaskCodeGenLLVM : public IRVisitor, public LLVMModuleBuilder {
   // The task_codegen_id represents the id of the offloaded task
   int task_codegen_id{0};
 
+  // Source lines of the offloaded task being emitted, attached to its functions
+  // as the "gstaichi-source" attribute when compiling with perf_map
+  std::string current_task_source;
+
   std::unordered_map<const Stmt *, std::vector<llvm::Value *>> loop_vars_llvm;
 
   std::unordered_map<Function *, llvm::Function *> func_map;
@@ -304,6 +312,12 @@ class TaskCodeGenLLVM : public IRVisitor, public LLVMModuleBuilder {
 
   void create_global_load(GlobalLoadStmt *stmt, bool should_cache_as_read_only);
 
+  // Adds the size of the value behind |ptr| to the given MemoryTrafficCounter
+  // when compiling with kernel_profiler_memory_traffic.
+  void count_memory_traffic(int counter, Stmt *ptr);
+
+  void count_memory_traffic(int counter, int64 bytes);
+
   void visit(GlobalLoadStmt *stmt) override;
 
   void visit(GetRootStmt *stmt) override;
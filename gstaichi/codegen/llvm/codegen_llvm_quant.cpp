@@ -145,6 +145,8 @@ llvm::Value *TaskCodeGenLLVM::quant_int_or_quant_fixed_to_bits(
 
 void TaskCodeGenLLVM::visit(BitStructStoreStmt *stmt) {
   auto bit_struct = stmt->get_bit_struct();
+  count_memory_traffic(kMemoryTrafficStoreBytes,
+                       data_type_size(bit_struct->get_physical_type()));
   auto physical_type = tlctx->get_data_type(bit_struct->get_physical_type());
 
   int num_non_exponent_children = 0;
@@ -14,6 +14,12 @@ class OffloadedTask {
   int block_dim{0};
   int grid_dim{0};
   int dynamic_shared_array_bytes{0};
+  // CPU only: the task is independent of the tasks since the last one for
+  // which this is false, see irpass::analysis::find_concurrent_offloads
+  bool concurrent_with_previous{false};
+  // CPU only: the task uses runtime state shared by all the launches, see
+  // irpass::analysis::offload_uses_shared_runtime_state
+  bool uses_shared_runtime_state{false};
 
   explicit OffloadedTask(const std::string &name = "",
                          int block_dim = 0,
@@ -23,7 +29,12 @@ class OffloadedTask {
         block_dim(block_dim),
         grid_dim(grid_dim),
         dynamic_shared_array_bytes(dynamic_shared_array_bytes) {};
-  TI_IO_DEF(name, block_dim, grid_dim, dynamic_shared_array_bytes);
+  TI_IO_DEF(name,
+            block_dim,
+            grid_dim,
+            dynamic_shared_array_bytes,
+            concurrent_with_previous,
+            uses_shared_runtime_state);
 };
 
 struct LLVMCompiledTask {
@@ -94,6 +94,12 @@ class KernelCompilationManager final {
                                             const CompileConfig &compile_config,
                                             const DeviceCapabilityConfig &caps);
 
+  // Compile without looking up or filling any cache
+  std::unique_ptr<CompiledKernelData> compile_kernel(
+      const CompileConfig &compile_config,
+      const DeviceCapabilityConfig &caps,
+      const Kernel &kernel_def) const;
+
  private:
   friend class tests::KernelCompilationManagerTest;
   // naming structure for gtest friend test cases is:
@@ -108,11 +114,6 @@ class KernelCompilationManager final {
 
   std::string make_filename(const std::string &kernel_key) const;
 
-  std::unique_ptr<CompiledKernelData> compile_kernel(
-      const CompileConfig &compile_config,
-      const DeviceCapabilityConfig &caps,
-      const Kernel &kernel_def) const;
-
   std::string make_kernel_key(const CompileConfig &compile_config,
                               const DeviceCapabilityConfig &caps,
                               const Kernel &kernel_def) const;
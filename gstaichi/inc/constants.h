@@ -25,6 +25,21 @@ constexpr std::size_t gstaichi_result_buffer_runtime_query_id = 31;
 
 constexpr int gstaichi_listgen_max_element_size = 1024;
 
+// Counters of the CPU kernel profiler's memory traffic mode, see
+// CompileConfig::kernel_profiler_memory_traffic. The counter buffer is made of
+// blocks of kMemoryTrafficCounterBlockSize int64s (one cache line): block 0
+// holds the SNode allocator counters, which are updated atomically, and block
+// (cpu_thread_id + 1) holds the bytes accessed by that CPU thread.
+enum MemoryTrafficCounter {
+  kMemoryTrafficLoadBytes = 0,
+  kMemoryTrafficStoreBytes = 1,
+  kMemoryTrafficAtomicBytes = 2,
+  kMemoryTrafficNodeAllocations = 3,
+  kMemoryTrafficNodeDeactivations = 4,
+  kNumMemoryTrafficCounters = 5,
+};
+constexpr int kMemoryTrafficCounterBlockSize = 8;
+
 // By default, CUDA could allocate up to 48KB static shared arrays.
 // It requires dynamic shared memory to allocate a larger array.
 // Therefore, when one shared array request for size greater than 48KB,
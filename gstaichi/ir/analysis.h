@@ -102,6 +102,12 @@ std::unordered_set<Stmt *> gather_immutable_local_vars(IRNode *root);
 std::unordered_set<SNode *> gather_deactivations(IRNode *root);
 std::pair<std::unordered_set<SNode *>, std::unordered_set<SNode *>>
 gather_snode_read_writes(IRNode *root);
+// For each offloaded task of |root|, whether it can run concurrently with the
+// tasks since the last one for which this is false
+std::vector<bool> find_concurrent_offloads(Block *root);
+// Whether |offload| uses runtime state that is shared by all the launches on
+// CPU: the SNode lists, the garbage collection or the random states
+bool offload_uses_shared_runtime_state(OffloadedStmt *offload);
 std::vector<Stmt *> gather_statements(IRNode *root,
                                       const std::function<bool(Stmt *)> &test);
 void gather_uniquely_accessed_bit_structs(IRNode *root, AnalysisManager *amgr);
@@ -10,6 +10,7 @@
 #include "gstaichi/rhi/arch.h"
 #include "gstaichi/program/function.h"
 #include "gstaichi/ir/mesh.h"
+#include "gstaichi/system/threading.h"
 #include "gstaichi/ir/type_system.h"
 
 namespace gstaichi::lang {
@@ -23,6 +24,7 @@ struct ForLoopConfig {
   MemoryAccessOptions mem_access_opt;
   int block_dim{0};
   bool uniform{false};
+  LoopSchedule cpu_schedule{LoopSchedule::automatic};
 };
 
 #define TI_DEFINE_CLONE_FOR_FRONTEND_IR                \
@@ -207,6 +209,7 @@ class FrontendForStmt : public Stmt {
   bool strictly_serialized;
   MemoryAccessOptions mem_access_opt;
   int block_dim;
+  LoopSchedule cpu_schedule;
 
   FrontendForStmt(const ExprGroup &loop_vars,
                   SNode *snode,
@@ -952,6 +955,7 @@ class ASTBuilder {
       config.mem_access_opt.clear();
       config.block_dim = 0;
       config.strictly_serialized = false;
+      config.cpu_schedule = LoopSchedule::automatic;
     }
   };
 
@@ -1090,6 +1094,10 @@ class ASTBuilder {
     for_loop_dec_.config.strictly_serialized = true;
   }
 
+  void loop_schedule(const std::string &name) {
+    for_loop_dec_.config.cpu_schedule = loop_schedule_from_name(name);
+  }
+
   void block_dim(int v) {
     if (arch_ == Arch::cuda || arch_ == Arch::vulkan || arch_ == Arch::amdgpu) {
       TI_ASSERT((v % 32 == 0) || bit::is_power_of_two(v));
@@ -244,6 +244,7 @@ std::unique_ptr<Stmt> RangeForStmt::clone() const {
       begin, end, body->clone(), is_bit_vectorized, num_cpu_threads, block_dim,
       strictly_serialized);
   new_stmt->reversed = reversed;
+  new_stmt->cpu_schedule = cpu_schedule;
   return new_stmt;
 }
 
@@ -265,6 +266,7 @@ std::unique_ptr<Stmt> StructForStmt::clone() const {
   auto new_stmt = std::make_unique<StructForStmt>(
       snode, body->clone(), is_bit_vectorized, num_cpu_threads, block_dim);
   new_stmt->mem_access_opt = mem_access_opt;
+  new_stmt->cpu_schedule = cpu_schedule;
   return new_stmt;
 }
 
@@ -400,6 +402,9 @@ std::unique_ptr<Stmt> OffloadedStmt::clone() const {
   new_stmt->reversed = reversed;
   new_stmt->is_bit_vectorized = is_bit_vectorized;
   new_stmt->num_cpu_threads = num_cpu_threads;
+  new_stmt->cpu_schedule = cpu_schedule;
+  new_stmt->cpu_per_thread_blocks = cpu_per_thread_blocks;
+  new_stmt->cpu_explicit_loop_config = cpu_explicit_loop_config;
   new_stmt->index_offsets = index_offsets;
 
   new_stmt->mesh = mesh;
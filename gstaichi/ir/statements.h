@@ -6,6 +6,7 @@
 #include "gstaichi/rhi/arch.h"
 #include "gstaichi/rhi/device.h"
 #include "gstaichi/ir/mesh.h"
+#include "gstaichi/system/threading.h"
 
 #include <optional>
 
@@ -1016,6 +1017,7 @@ class RangeForStmt : public Stmt {
   int block_dim;
   bool strictly_serialized;
   std::string range_hint;
+  LoopSchedule cpu_schedule{LoopSchedule::automatic};
 
   RangeForStmt(Stmt *begin,
                Stmt *end,
@@ -1042,7 +1044,8 @@ class RangeForStmt : public Stmt {
                      is_bit_vectorized,
                      num_cpu_threads,
                      block_dim,
-                     strictly_serialized);
+                     strictly_serialized,
+                     cpu_schedule);
   TI_DEFINE_ACCEPT
 };
 
@@ -1061,6 +1064,7 @@ class StructForStmt : public Stmt {
   int num_cpu_threads;
   int block_dim;
   MemoryAccessOptions mem_access_opt;
+  LoopSchedule cpu_schedule{LoopSchedule::automatic};
 
   StructForStmt(SNode *snode,
                 std::unique_ptr<Block> &&body,
@@ -1079,7 +1083,8 @@ class StructForStmt : public Stmt {
                      is_bit_vectorized,
                      num_cpu_threads,
                      block_dim,
-                     mem_access_opt);
+                     mem_access_opt,
+                     cpu_schedule);
   TI_DEFINE_ACCEPT
 };
 
@@ -1415,6 +1420,14 @@ class OffloadedStmt : public Stmt {
   bool reversed{false};
   bool is_bit_vectorized{false};
   int num_cpu_threads{1};
+  // Resolved from the loop and the CompileConfig when offloading
+  LoopSchedule cpu_schedule{LoopSchedule::automatic};
+  // Set by make_cpu_multithreaded_range_for: the task iterates over the CPU
+  // threads, and its body runs the block of [begin, end) of each thread
+  bool cpu_per_thread_blocks{false};
+  // The threads, block size or schedule were chosen with ti.loop_config, the
+  // loop is then never run serially because of its trip count
+  bool cpu_explicit_loop_config{false};
   Stmt *end_stmt{nullptr};
   std::string range_hint = "";
 
@@ -1480,6 +1493,9 @@ class OffloadedStmt : public Stmt {
                      block_dim,
                      reversed,
                      num_cpu_threads,
+                     cpu_schedule,
+                     cpu_per_thread_blocks,
+                     cpu_explicit_loop_config,
                      index_offsets,
                      mem_access_opt);
   TI_DEFINE_ACCEPT
@@ -117,6 +117,9 @@ bool determine_ad_stack_size(IRNode *root, const CompileConfig &config);
 bool constant_fold(IRNode *root);
 void associate_continue_scope(IRNode *root, const CompileConfig &config);
 void offload(IRNode *root, const CompileConfig &config);
+// Merges consecutive offloaded loops over the same iteration space whose
+// iterations only depend on the same iteration of the other loop
+bool fuse_loops(IRNode *root);
 bool transform_statements(
     IRNode *root,
     std::function<bool(Stmt *)> filter,
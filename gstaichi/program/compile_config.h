@@ -32,7 +32,14 @@ struct CompileConfig {
   bool use_llvm;
   bool verbose_kernel_launches;
   bool kernel_profiler;
+  // CPU only: makes the kernel profiler count the global memory bytes loaded,
+  // stored and atomically updated by every offloaded task, along with SNode
+  // allocations and deactivations. Requires kernel_profiler.
+  bool kernel_profiler_memory_traffic{false};
   bool timeline{false};
+  // CPU only: appends the JIT-compiled functions to /tmp/perf-<pid>.map so that
+  // perf attributes samples to kernel tasks, labelled with their source lines
+  bool perf_map{false};
   bool verbose;
   bool fast_math;
   bool flatten_if;
@@ -60,6 +67,33 @@ struct CompileConfig {
   int saturating_grid_dim;
   int max_block_dim;
   int cpu_max_num_threads;
+  // Microseconds the CPU thread pool spins waiting for the next parallel-for
+  // before parking its threads, lowering the latency of back-to-back launches
+  // at the cost of busy cores between them. 0 parks immediately.
+  int cpu_thread_pool_spin_us{0};
+  // Default schedule of the CPU parallel loops, see LoopSchedule: "auto",
+  // "static", "dynamic", "guided" or "work_stealing". Overridden per loop by
+  // ti.loop_config(schedule=...).
+  std::string cpu_loop_schedule{"auto"};
+  // CPUs the thread pool workers are pinned to, as a list such as
+  // "0-7,16-23" (Linux only). Empty leaves the workers unpinned.
+  std::string cpu_thread_affinity;
+  // NUMA placement of the CPU root buffers and ndarrays, see MemoryPlacement:
+  // "default", "interleave" or "first_touch"
+  std::string cpu_memory_placement{"default"};
+  // CPU parallel loops with fewer iterations than this run serially on the
+  // launching thread, decided at launch time, unless ti.loop_config set how to
+  // run them. -1 measures the threshold at startup from the wake-up cost of
+  // the thread pool and a trivial loop body, 0 disables the fallback.
+  int cpu_serial_loop_threshold{0};
+  // Runs the independent offloaded tasks of a kernel concurrently on CPU, each
+  // on a single thread of the pool. Pays off for kernels made of many small
+  // loops over different fields.
+  bool cpu_concurrent_tasks{false};
+  // Compiles the body of CPU range-fors with a step of 1 as a loop over each
+  // block of iterations, so that LLVM vectorizes it, and enables SLP
+  // vectorization of the CPU kernels
+  bool cpu_vectorize{true};
   int random_seed;
 
   // Debugging options:
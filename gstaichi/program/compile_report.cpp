@@ -0,0 +1,83 @@
+#include "gstaichi/program/compile_report.h"
+
+#include "gstaichi/ir/analysis.h"
+#include "gstaichi/ir/statements.h"
+#include "gstaichi/system/timer.h"
+
+namespace gstaichi::lang {
+
+std::atomic<CompileReportRecorder *> CompileReportRecorder::current_{nullptr};
+thread_local int CompileReportRecorder::current_task_{-1};
+
+CompileReportRecorder::CompileReportRecorder(CompileReport *report)
+    : report_(report) {
+  CompileReportRecorder *expected = nullptr;
+  if (!current_.compare_exchange_strong(expected, this)) {
+    TI_ERROR("Another compile report is already being recorded");
+  }
+}
+
+CompileReportRecorder::~CompileReportRecorder() {
+  current_.store(nullptr, std::memory_order_release);
+}
+
+void CompileReportRecorder::record_pass(const std::string &scope,
+                                        const std::string &name,
+                                        IRNode *ir) {
+  auto t = Time::get_time();
+  int statements = irpass::analysis::count_statements(ir);
+  std::lock_guard<std::mutex> _(mut_);
+  CompileReport::Pass pass{scope,      current_task_, name,
+                           statements, statements,    0};
+  auto it = checkpoints_.find(ir);
+  if (it != checkpoints_.end()) {
+    pass.statements_before = it->second.statements;
+    pass.time_ms = (t - it->second.time) * 1000;
+  }
+  report_->passes.push_back(std::move(pass));
+  // Restart the clock after counting so that the report does not time itself
+  checkpoints_[ir] = {statements, Time::get_time()};
+}
+
+CompileReport::Task &CompileReportRecorder::task_at(int index) {
+  auto &tasks = report_->tasks;
+  if (index >= (int)tasks.size()) {
+    tasks.resize(index + 1);
+  }
+  return tasks[index];
+}
+
+void CompileReportRecorder::record_tasks(IRNode *ir) {
+  auto block = ir->cast<Block>();
+  TI_ASSERT(block);
+  std::lock_guard<std::mutex> _(mut_);
+  int index = std::max(current_task_, 0);
+  for (auto &stmt : block->statements) {
+    auto offload = stmt->cast<OffloadedStmt>();
+    if (!offload) {
+      continue;
+    }
+    auto &task = task_at(index++);
+    task.type = offload->task_name();
+    task.statements = irpass::analysis::count_statements(offload);
+  }
+}
+
+void CompileReportRecorder::record_llvm_task(const std::string &name,
+                                             int64 llvm_instructions) {
+  std::lock_guard<std::mutex> _(mut_);
+  auto &task = task_at(std::max(current_task_, 0));
+  task.name = name;
+  task.llvm_instructions = llvm_instructions;
+}
+
+CompileReportRecorder::TaskScope::TaskScope(int task)
+    : previous_task_(current_task_) {
+  current_task_ = task;
+}
+
+CompileReportRecorder::TaskScope::~TaskScope() {
+  current_task_ = previous_task_;
+}
+
+}  // namespace gstaichi::lang
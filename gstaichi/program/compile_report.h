@@ -0,0 +1,97 @@
+#pragma once
+
+#include <atomic>
+#include <mutex>
+#include <string>
+#include <unordered_map>
+#include <vector>
+
+#include "gstaichi/common/core.h"
+
+namespace gstaichi::lang {
+
+class IRNode;
+
+// Structured statistics about the compilation of one kernel, see
+// Program::compile_report
+struct CompileReport {
+  struct Pass {
+    // Kernel or function being compiled
+    std::string scope;
+    // Offloaded task compiled separately by the LLVM backends, -1 for the whole
+    // kernel
+    int task{-1};
+    std::string name;
+    int statements_before{0};
+    int statements_after{0};
+    // Time since the previous checkpoint of the same IR
+    float64 time_ms{0};
+  };
+
+  struct Task {
+    std::string name;
+    std::string type;
+    // Statements of the offloaded task after offload_to_executable
+    int statements{0};
+    // Instructions of the generated LLVM IR before optimization, including the
+    // loop bodies called by the task; -1 on non-LLVM backends
+    int64 llvm_instructions{-1};
+  };
+
+  std::vector<Pass> passes;
+  std::vector<Task> tasks;
+};
+
+// Fills a CompileReport during its lifetime. While a recorder is active, every
+// pass printer (irpass::make_pass_printer) records a checkpoint into it, even
+// when print_ir is off. The recorder is global to the process, so that the
+// compilation worker threads see it: the caller must not compile other kernels
+// while it is active (the Python frontend holds its compile lock).
+class CompileReportRecorder {
+ public:
+  explicit CompileReportRecorder(CompileReport *report);
+  ~CompileReportRecorder();
+
+  // The active recorder, shared with the compilation worker threads
+  static CompileReportRecorder *current() {
+    return current_.load(std::memory_order_acquire);
+  }
+
+  void record_pass(const std::string &scope,
+                   const std::string &name,
+                   IRNode *ir);
+
+  // Records the offloaded tasks of the final IR of a kernel, or of a single
+  // task compiled under a TaskScope
+  void record_tasks(IRNode *ir);
+
+  void record_llvm_task(const std::string &name, int64 llvm_instructions);
+
+  // Marks the passes and tasks recorded by this thread as belonging to the
+  // offloaded task |task|
+  class TaskScope {
+   public:
+    explicit TaskScope(int task);
+    ~TaskScope();
+
+   private:
+    int previous_task_;
+  };
+
+ private:
+  CompileReport::Task &task_at(int index);
+
+  struct Checkpoint {
+    int statements{0};
+    float64 time{0};
+  };
+
+  static std::atomic<CompileReportRecorder *> current_;
+  static thread_local int current_task_;
+
+  CompileReport *report_;
+  std::mutex mut_;
+  std::unordered_map<IRNode *, Checkpoint> checkpoints_;
+};
+
+}  // namespace gstaichi::lang
@@ -24,6 +24,10 @@ struct RuntimeContext {
   // LLVMRuntime is shared among functions. So we moved the pointer to
   // RuntimeContext which each function have one.
   uint64_t *result_buffer;
+
+  // Global temporaries of this launch, so that concurrent launches of kernels
+  // do not share them. Null uses the buffer of the LLVMRuntime.
+  char *temporaries{nullptr};
 };
 
 #if defined(TI_RUNTIME_HOST)
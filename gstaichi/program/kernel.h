@@ -18,6 +18,10 @@ class TI_DLL_EXPORT Kernel : public Callable {
 
   bool is_accessor{false};
 
+  // Merge consecutive offloaded loops over the same iteration space, see
+  // irpass::fuse_loops. Set on the kernels created by ti.fuse.
+  bool fuse_loops{false};
+
   Kernel(Program &program,
          const std::function<void()> &func,
          const std::string &name = "",
@@ -1,5 +1,6 @@
 #include "kernel_profiler.h"
 
+#include "gstaichi/inc/constants.h"
 #include "gstaichi/system/timer.h"
 #include "gstaichi/rhi/cuda/cuda_driver.h"
 #include "gstaichi/rhi/cuda/cuda_profiler.h"
@@ -86,6 +87,28 @@ void KernelProfilerBase::insert_record(const std::string &kernel_name,
   total_time_ms_ += duration_ms;
 }
 
+int64 *KernelProfilerBase::enable_memory_traffic_counters(int num_threads) {
+  memory_traffic_counters_.assign(
+      (std::size_t)(num_threads + 1) * kMemoryTrafficCounterBlockSize, 0);
+  return memory_traffic_counters_.data();
+}
+
+std::vector<int64> KernelProfilerBase::collect_memory_traffic() {
+  if (memory_traffic_counters_.empty()) {
+    return {};
+  }
+  std::vector<int64> values(kNumMemoryTrafficCounters, 0);
+  // Block 0 holds the allocator counters, the others the per-thread bytes.
+  for (std::size_t i = 0; i < memory_traffic_counters_.size(); i++) {
+    auto counter = i % kMemoryTrafficCounterBlockSize;
+    if (counter < kNumMemoryTrafficCounters) {
+      values[counter] += memory_traffic_counters_[i];
+    }
+    memory_traffic_counters_[i] = 0;
+  }
+  return values;
+}
+
 namespace {
 // A simple profiler that uses Time::get_time()
 class DefaultProfiler : public KernelProfilerBase {
@@ -115,6 +138,7 @@ class DefaultProfiler : public KernelProfilerBase {
     KernelProfileTracedRecord record;
     record.name = event_name_;
     record.kernel_elapsed_time_in_ms = ms;
+    record.memory_traffic = collect_memory_traffic();
     traced_records_.push_back(record);
     // count record
     auto it =
@@ -24,6 +24,9 @@ struct KernelProfileTracedRecord {
   float time_since_base{0.0};        // for Timeline
   std::string name;                  // kernel name
   std::vector<float> metric_values;  // user selected metrics
+  // Values of the MemoryTrafficCounter, empty unless enabled. Kept as integers
+  // since byte counts quickly exceed the precision of a float.
+  std::vector<int64> memory_traffic;
 };
 
 struct KernelProfileStatisticalResult {
@@ -48,6 +51,11 @@ class KernelProfilerBase {
   std::vector<KernelProfileTracedRecord> traced_records_;
   std::vector<KernelProfileStatisticalResult> statistical_results_;
   double total_time_ms_{0};
+  // See MemoryTrafficCounter, empty unless enabled.
+  std::vector<int64> memory_traffic_counters_;
+
+  // Sums up and resets the memory traffic counters.
+  std::vector<int64> collect_memory_traffic();
 
  public:
   // Needed for the CUDA backend since we need to know which task to "stop"
@@ -97,6 +105,11 @@ class KernelProfilerBase {
 
   void insert_record(const std::string &kernel_name, double duration_ms);
 
+  // Allocates the counters that the CPU kernels update when compiled with
+  // kernel_profiler_memory_traffic. Every traced record then carries the
+  // counter values (see MemoryTrafficCounter) as its memory_traffic.
+  int64 *enable_memory_traffic_counters(int num_threads);
+
   virtual std::string get_device_name() {
     std::string str(" ");
     return str;
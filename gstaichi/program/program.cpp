@@ -8,6 +8,7 @@
 #include "gstaichi/struct/struct.h"
 #include "gstaichi/runtime/program_impls/metal/metal_program.h"
 #include "gstaichi/platform/cuda/detect_cuda.h"
+#include "gstaichi/system/memory_placement.h"
 #include "gstaichi/system/timeline.h"
 #include "gstaichi/ir/snode.h"
 #include "gstaichi/ir/frontend_ir.h"
@@ -110,6 +111,27 @@ Program::Program(Arch desired_arch) : snode_rw_accessors_bank_(this) {
     }
   }
 
+  if (config.kernel_profiler_memory_traffic &&
+      !(config.kernel_profiler && arch_is_cpu(config.arch))) {
+    TI_WARN(
+        "kernel_profiler_memory_traffic requires kernel_profiler=True on a CPU "
+        "backend, ignoring it on arch={}",
+        arch_name(config.arch));
+    config.kernel_profiler_memory_traffic = false;
+  }
+
+  if (config.perf_map && !arch_is_cpu(config.arch)) {
+    TI_WARN(
+        "perf_map is only supported on CPU backends, ignoring it on arch={}",
+        arch_name(config.arch));
+    config.perf_map = false;
+  }
+
+  // Reject unknown schedule names before any kernel is compiled
+  loop_schedule_from_name(config.cpu_loop_schedule);
+  parse_cpu_list(config.cpu_thread_affinity);
+  memory_placement_from_name(config.cpu_memory_placement);
+
   Timelines::get_instance().set_enabled(config.timeline);
 
   TI_TRACE("Program ({}) arch={} initialized.", fmt::ptr(this),
@@ -161,6 +183,18 @@ CompileResult Program::compile_kernel(const CompileConfig &compile_config,
   return compile_result;
 }
 
+CompileReport Program::compile_report(const CompileConfig &compile_config,
+                                      const DeviceCapabilityConfig &device_caps,
+                                      const Kernel &kernel_def) {
+  CompileReport report;
+  {
+    CompileReportRecorder recorder(&report);
+    program_impl_->get_kernel_compilation_manager().compile_kernel(
+        compile_config, device_caps, kernel_def);
+  }
+  return report;
+}
+
 void Program::launch_kernel(const CompiledKernelData &compiled_kernel_data,
                             LaunchContextBuilder &ctx) {
   program_impl_->get_kernel_launcher().launch_kernel(compiled_kernel_data, ctx);
@@ -16,6 +16,7 @@
 #include "gstaichi/util/lang_util.h"
 #include "gstaichi/program/program_impl.h"
 #include "gstaichi/program/callable.h"
+#include "gstaichi/program/compile_report.h"
 #include "gstaichi/program/function.h"
 #include "gstaichi/program/kernel.h"
 #include "gstaichi/program/kernel_profiler.h"
@@ -130,6 +131,12 @@ class TI_DLL_EXPORT Program {
                                const DeviceCapabilityConfig &device_caps,
                                const Kernel &kernel_def);
 
+  // Compiles |kernel_def| from scratch, bypassing the kernel caches, and
+  // records the statistics of each pass and offloaded task
+  CompileReport compile_report(const CompileConfig &compile_config,
+                               const DeviceCapabilityConfig &device_caps,
+                               const Kernel &kernel_def);
+
   void launch_kernel(const CompiledKernelData &compiled_kernel_data,
                      LaunchContextBuilder &ctx);
 
@@ -281,6 +288,11 @@ class TI_DLL_EXPORT Program {
       std::function<void(Device *device, CommandList *cmdlist)> op,
       const std::vector<ComputeOpImageRef> &image_refs);
 
+  // The host thread pool of the runtime, or nullptr if there is none.
+  ThreadPool *get_thread_pool() {
+    return program_impl_->get_thread_pool();
+  }
+
   /**
    * TODO(zhanlue): Remove this interface
    *
@@ -7,6 +7,7 @@
 #include "gstaichi/program/kernel_profiler.h"
 #include "gstaichi/program/kernel_launcher.h"
 #include "gstaichi/rhi/device.h"
+#include "gstaichi/system/threading.h"
 #include "gstaichi/codegen/kernel_compiler.h"
 #include "gstaichi/compilation_manager/kernel_compilation_manager.h"
 
@@ -166,6 +167,12 @@ class ProgramImpl {
     return {};
   }
 
+  // The host thread pool used by the runtime, or nullptr if the backend does
+  // not have one.
+  virtual ThreadPool *get_thread_pool() {
+    return nullptr;
+  }
+
  protected:
   virtual std::unique_ptr<KernelCompiler> make_kernel_compiler() = 0;
   virtual std::unique_ptr<KernelLauncher> make_kernel_launcher() {
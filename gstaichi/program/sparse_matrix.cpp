@@ -1,5 +1,7 @@
 #include "gstaichi/program/sparse_matrix.h"
 
+#include <algorithm>
+#include <atomic>
 #include <fstream>
 #include <sstream>
 #include <string>
@@ -28,6 +30,15 @@
   EigenSparseMatrix<Eigen::SparseMatrix<type, Eigen::storage>>::spmv( \
       Program *prog, const Ndarray &x, const Ndarray &y);
 
+#define INSTANTIATE_SPMM(type, storage)                               \
+  template void                                                       \
+  EigenSparseMatrix<Eigen::SparseMatrix<type, Eigen::storage>>::spmm( \
+      Program *prog, const Ndarray &x, const Ndarray &y);
+
+#define INSTANTIATE_SET_BLOCK_SIZE(type, storage)                              \
+  template void EigenSparseMatrix<Eigen::SparseMatrix<type, Eigen::storage>>:: \
+      set_block_size(int block_size);
+
 namespace {
 using Pair = std::pair<std::string, std::string>;
 struct key_hash {
@@ -75,6 +86,119 @@ T2 get_element_from_csr(int row,
   return 0;
 }
 
+// Below this many items the COO conversion stays on the calling thread.
+constexpr int64_t kMinParallelSize = 1 << 14;
+
+// Runs |body(begin, end)| over chunks of [0, n), in parallel on |pool| when
+// it is available and n is large enough.
+template <typename Body>
+void parallel_for_range(gstaichi::ThreadPool *pool,
+                        int64_t n,
+                        const Body &body) {
+  if (pool == nullptr || n < kMinParallelSize) {
+    body(int64_t(0), n);
+    return;
+  }
+  int num_threads = pool->max_num_threads;
+  int num_chunks = (int)std::min<int64_t>(int64_t(num_threads) * 4, n);
+  int64_t chunk_size = (n + num_chunks - 1) / num_chunks;
+  pool->run(num_chunks, num_threads, [&](int thread_id, int chunk_id) {
+    int64_t begin = chunk_id * chunk_size;
+    int64_t end = std::min(n, begin + chunk_size);
+    if (begin < end) {
+      body(begin, end);
+    }
+  });
+}
+
+// Decodes |n| triplets stored as (row, col, value) in an array of G into
+// separate arrays. The value is stored as the bits of T.
+template <typename T, typename G>
+void decode_triplets(gstaichi::ThreadPool *pool,
+                     const G *data,
+                     int64_t n,
+                     std::vector<int> &rows,
+                     std::vector<int> &cols,
+                     std::vector<T> &values) {
+  rows.resize(n);
+  cols.resize(n);
+  values.resize(n);
+  parallel_for_range(pool, n, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      rows[i] = (int)data[i * 3];
+      cols[i] = (int)data[i * 3 + 1];
+      values[i] = gstaichi_union_cast<T>(data[i * 3 + 2]);
+    }
+  });
+}
+
+// Y = A * X for a CSR matrix A and row-major dense X, Y with |k| columns.
+// |row_nnz| is the per-row count of an uncompressed matrix, or nullptr.
+template <typename Scalar, typename Index>
+void csr_spmm(gstaichi::ThreadPool *pool,
+              int rows,
+              const Index *row_ptr,
+              const Index *col_ind,
+              const Index *row_nnz,
+              const Scalar *values,
+              const Scalar *x,
+              Scalar *y,
+              int k) {
+  parallel_for_range(pool, rows, [&](int64_t begin, int64_t end) {
+    for (int64_t i = begin; i < end; i++) {
+      Index p_begin = row_ptr[i];
+      Index p_end = row_nnz ? p_begin + row_nnz[i] : row_ptr[i + 1];
+      if (k == 1) {
+        Scalar sum = 0;
+        for (Index p = p_begin; p < p_end; p++) {
+          sum += values[p] * x[col_ind[p]];
+        }
+        y[i] = sum;
+        continue;
+      }
+      Scalar *yi = y + i * k;
+      std::fill(yi, yi + k, Scalar(0));
+      for (Index p = p_begin; p < p_end; p++) {
+        const Scalar a = values[p];
+        const Scalar *xj = x + (int64_t)col_ind[p] * k;
+        for (int c = 0; c < k; c++) {
+          yi[c] += a * xj[c];
+        }
+      }
+    }
+  });
+}
+
+// Y = A * X for a BSR matrix A and row-major dense X, Y with |k| columns.
+template <typename Scalar>
+void bsr_spmm(gstaichi::ThreadPool *pool,
+              const gstaichi::lang::BsrMatrix<Scalar> &bsr,
+              int rows,
+              const Scalar *x,
+              Scalar *y,
+              int k) {
+  const int bs = bsr.block_size;
+  const int num_block_rows = rows / bs;
+  parallel_for_range(pool, num_block_rows, [&](int64_t begin, int64_t end) {
+    for (int64_t bi = begin; bi < end; bi++) {
+      Scalar *yb = y + bi * bs * k;
+      std::fill(yb, yb + bs * k, Scalar(0));
+      for (int p = bsr.block_row_ptr[bi]; p < bsr.block_row_ptr[bi + 1]; p++) {
+        const Scalar *block = bsr.values.data() + (int64_t)p * bs * bs;
+        const Scalar *xb = x + (int64_t)bsr.block_col_ind[p] * bs * k;
+        for (int r = 0; r < bs; r++) {
+          for (int c = 0; c < bs; c++) {
+            const Scalar a = block[r * bs + c];
+            for (int l = 0; l < k; l++) {
+              yb[r * k + l] += a * xb[c * k + l];
+            }
+          }
+        }
+      }
+    }
+  });
+}
+
 }  // namespace
 
 namespace gstaichi::lang {
@@ -159,32 +283,47 @@ intptr_t SparseMatrixBuilder::get_ndarray_data_ptr() const {
 }
 
 template <typename T, typename G>
-void SparseMatrixBuilder::build_template(std::unique_ptr<SparseMatrix> &m) {
-  using V = Eigen::Triplet<T>;
-  std::vector<V> triplets;
+void SparseMatrixBuilder::build_template(std::unique_ptr<SparseMatrix> &m,
+                                         ThreadPool *pool) {
   auto ptr = get_ndarray_data_ptr();
   G *data = reinterpret_cast<G *>(ptr);
   num_triplets_ = data[0];
   data += 1;
-  for (int i = 0; i < num_triplets_; i++) {
-    triplets.push_back(V(data[i * 3], data[i * 3 + 1],
-                         gstaichi_union_cast<T>(data[i * 3 + 2])));
-  }
-  m->build_triplets(static_cast<void *>(&triplets));
+  std::vector<int> rows, cols;
+  std::vector<T> values;
+  decode_triplets<T, G>(pool, data, num_triplets_, rows, cols, values);
+  m->build_from_coo(pool, rows.data(), cols.data(), values.data(),
+                    num_triplets_);
+  clear();
+}
+
+template <typename T, typename G>
+void SparseMatrixBuilder::update_values_template(SparseMatrix &sm,
+                                                 ThreadPool *pool) {
+  auto ptr = get_ndarray_data_ptr();
+  G *data = reinterpret_cast<G *>(ptr);
+  num_triplets_ = data[0];
+  data += 1;
+  std::vector<int> rows, cols;
+  std::vector<T> values;
+  decode_triplets<T, G>(pool, data, num_triplets_, rows, cols, values);
+  sm.update_values_from_coo(pool, rows.data(), cols.data(), values.data(),
+                            num_triplets_);
   clear();
 }
 
-std::unique_ptr<SparseMatrix> SparseMatrixBuilder::build() {
+std::unique_ptr<SparseMatrix> SparseMatrixBuilder::build(Program *prog) {
   TI_ASSERT(built_ == false);
   built_ = true;
   auto sm = make_sparse_matrix(rows_, cols_, dtype_, storage_format_);
+  auto pool = prog ? prog->get_thread_pool() : nullptr;
   auto element_size = data_type_size(dtype_);
   switch (element_size) {
     case 4:
-      build_template<float32, int32>(sm);
+      build_template<float32, int32>(sm, pool);
       break;
     case 8:
-      build_template<float64, int64>(sm);
+      build_template<float64, int64>(sm, pool);
       break;
     default:
       TI_ERROR("Unsupported sparse matrix data type!");
@@ -193,6 +332,31 @@ std::unique_ptr<SparseMatrix> SparseMatrixBuilder::build() {
   return sm;
 }
 
+void SparseMatrixBuilder::update_values(SparseMatrix &sm, Program *prog) {
+  TI_ASSERT(built_ == false);
+  TI_ERROR_IF(sm.num_rows() != rows_ || sm.num_cols() != cols_,
+              "Dimension mismatch between the builder ({}, {}) and the sparse "
+              "matrix ({}, {})",
+              rows_, cols_, sm.num_rows(), sm.num_cols());
+  TI_ERROR_IF(sm.get_data_type() != dtype_,
+              "Data type mismatch between the builder ({}) and the sparse "
+              "matrix ({})",
+              data_type_name(dtype_), data_type_name(sm.get_data_type()));
+  auto pool = prog ? prog->get_thread_pool() : nullptr;
+  auto element_size = data_type_size(dtype_);
+  switch (element_size) {
+    case 4:
+      update_values_template<float32, int32>(sm, pool);
+      break;
+    case 8:
+      update_values_template<float64, int64>(sm, pool);
+      break;
+    default:
+      TI_ERROR("Unsupported sparse matrix data type!");
+      break;
+  }
+}
+
 std::unique_ptr<SparseMatrix> SparseMatrixBuilder::build_cuda() {
   TI_ASSERT(built_ == false);
   built_ = true;
@@ -291,25 +455,282 @@ void EigenSparseMatrix<EigenMatrix>::build_triplets(void *triplets_adr) {
   } else {
     TI_ERROR("Unsupported sparse matrix data type {}!", sdtype);
   }
+  bsr_stale_ = true;
+}
+
+template <class EigenMatrix>
+void EigenSparseMatrix<EigenMatrix>::build_from_coo(ThreadPool *pool,
+                                                    const int *rows,
+                                                    const int *cols,
+                                                    const void *values,
+                                                    int64 num_triplets) {
+  using Scalar = typename EigenMatrix::Scalar;
+  using StorageIndex = typename EigenMatrix::StorageIndex;
+  const Scalar *vals = static_cast<const Scalar *>(values);
+  // The compressed storage is grouped by the outer index, i.e. rows for CSR
+  // and columns for CSC.
+  const int *outer = EigenMatrix::IsRowMajor ? rows : cols;
+  const int *inner = EigenMatrix::IsRowMajor ? cols : rows;
+  const int inner_size = EigenMatrix::IsRowMajor ? cols_ : rows_;
+  matrix_.resize(rows_, cols_);
+  const int64 n_outer = matrix_.outerSize();
+
+  // Step 1: count the triplets of every outer index.
+  std::unique_ptr<std::atomic<int64>[]> cursor(new std::atomic<int64>[n_outer]);
+  parallel_for_range(pool, n_outer, [&](int64 begin, int64 end) {
+    for (int64 k = begin; k < end; k++) {
+      cursor[k].store(0, std::memory_order_relaxed);
+    }
+  });
+  std::atomic<bool> out_of_range{false};
+  parallel_for_range(pool, num_triplets, [&](int64 begin, int64 end) {
+    for (int64 t = begin; t < end; t++) {
+      if (outer[t] < 0 || outer[t] >= n_outer || inner[t] < 0 ||
+          inner[t] >= inner_size) {
+        out_of_range.store(true, std::memory_order_relaxed);
+        continue;
+      }
+      cursor[outer[t]].fetch_add(1, std::memory_order_relaxed);
+    }
+  });
+  TI_ERROR_IF(out_of_range.load(),
+              "Triplet index out of range for a sparse matrix of shape ({}, "
+              "{})",
+              rows_, cols_);
+
+  // Step 2: the exclusive scan of the counts gives the start of every bucket.
+  std::vector<int64> offsets(n_outer + 1);
+  offsets[0] = 0;
+  for (int64 k = 0; k < n_outer; k++) {
+    offsets[k + 1] = offsets[k] + cursor[k].load(std::memory_order_relaxed);
+    cursor[k].store(offsets[k], std::memory_order_relaxed);
+  }
+
+  // Step 3: bucket the triplet ids by their outer index.
+  std::vector<int64> order(num_triplets);
+  parallel_for_range(pool, num_triplets, [&](int64 begin, int64 end) {
+    for (int64 t = begin; t < end; t++) {
+      order[cursor[outer[t]].fetch_add(1, std::memory_order_relaxed)] = t;
+    }
+  });
+
+  // Step 4: sort every bucket by inner index and count the distinct entries.
+  // Ties are broken by triplet id so that duplicates are summed up in the
+  // order they were inserted, independently of the thread schedule.
+  std::vector<StorageIndex> nnz_per_outer(n_outer);
+  parallel_for_range(pool, n_outer, [&](int64 begin, int64 end) {
+    for (int64 k = begin; k < end; k++) {
+      auto first = order.begin() + offsets[k];
+      auto last = order.begin() + offsets[k + 1];
+      std::sort(first, last, [&](int64 a, int64 b) {
+        return inner[a] < inner[b] || (inner[a] == inner[b] && a < b);
+      });
+      StorageIndex count = 0;
+      for (auto it = first; it != last; ++it) {
+        if (it == first || inner[*it] != inner[*(it - 1)]) {
+          count++;
+        }
+      }
+      nnz_per_outer[k] = count;
+    }
+  });
+
+  // Step 5: the exclusive scan of the distinct counts is the outer index.
+  StorageIndex *outer_index = matrix_.outerIndexPtr();
+  outer_index[0] = 0;
+  for (int64 k = 0; k < n_outer; k++) {
+    outer_index[k + 1] = outer_index[k] + nnz_per_outer[k];
+  }
+  matrix_.resizeNonZeros(outer_index[n_outer]);
+
+  // Step 6: segmented sum of the duplicated entries.
+  StorageIndex *inner_index = matrix_.innerIndexPtr();
+  Scalar *value = matrix_.valuePtr();
+  parallel_for_range(pool, n_outer, [&](int64 begin, int64 end) {
+    for (int64 k = begin; k < end; k++) {
+      int64 dst = (int64)outer_index[k] - 1;
+      for (int64 i = offsets[k]; i < offsets[k + 1]; i++) {
+        int64 t = order[i];
+        if (i == offsets[k] || inner[t] != inner[order[i - 1]]) {
+          dst++;
+          inner_index[dst] = inner[t];
+          value[dst] = vals[t];
+        } else {
+          value[dst] += vals[t];
+        }
+      }
+    }
+  });
+  bsr_stale_ = true;
+}
+
+template <class EigenMatrix>
+void EigenSparseMatrix<EigenMatrix>::update_values_from_coo(
+    ThreadPool *pool,
+    const int *rows,
+    const int *cols,
+    const void *values,
+    int64 num_triplets) {
+  using Scalar = typename EigenMatrix::Scalar;
+  using StorageIndex = typename EigenMatrix::StorageIndex;
+  const Scalar *vals = static_cast<const Scalar *>(values);
+  const int *outer = EigenMatrix::IsRowMajor ? rows : cols;
+  const int *inner = EigenMatrix::IsRowMajor ? cols : rows;
+  matrix_.makeCompressed();
+  const int64 n_outer = matrix_.outerSize();
+  const StorageIndex *outer_index = matrix_.outerIndexPtr();
+  const StorageIndex *inner_index = matrix_.innerIndexPtr();
+  Scalar *value = matrix_.valuePtr();
+
+  // Locate every triplet in the existing pattern.
+  std::vector<int64> position(num_triplets);
+  std::atomic<bool> missing{false};
+  parallel_for_range(pool, num_triplets, [&](int64 begin, int64 end) {
+    for (int64 t = begin; t < end; t++) {
+      position[t] = -1;
+      if (outer[t] < 0 || outer[t] >= n_outer) {
+        missing.store(true, std::memory_order_relaxed);
+        continue;
+      }
+      auto first = inner_index + outer_index[outer[t]];
+      auto last = inner_index + outer_index[outer[t] + 1];
+      auto it = std::lower_bound(first, last, (StorageIndex)inner[t]);
+      if (it == last || *it != inner[t]) {
+        missing.store(true, std::memory_order_relaxed);
+        continue;
+      }
+      position[t] = it - inner_index;
+    }
+  });
+  if (missing.load()) {
+    auto t = std::find(position.begin(), position.end(), -1) - position.begin();
+    TI_ERROR(
+        "Entry ({}, {}) is not in the sparsity pattern of the sparse matrix",
+        rows[t], cols[t]);
+  }
+
+  parallel_for_range(pool, matrix_.nonZeros(), [&](int64 begin, int64 end) {
+    std::fill(value + begin, value + end, Scalar(0));
+  });
+  // Duplicated entries share a slot, so accumulate in insertion order.
+  for (int64 t = 0; t < num_triplets; t++) {
+    value[position[t]] += vals[t];
+  }
+  bsr_stale_ = true;
+}
+
+template <class EigenMatrix>
+void EigenSparseMatrix<EigenMatrix>::set_block_size(int block_size) {
+  TI_ERROR_IF(block_size < 0, "Invalid block size {}", block_size);
+  TI_ERROR_IF(block_size > 0 && (rows_ % block_size || cols_ % block_size),
+              "The shape ({}, {}) of the sparse matrix is not divisible by "
+              "the block size {}",
+              rows_, cols_, block_size);
+  bsr_ = BsrMatrix<typename EigenMatrix::Scalar>();
+  bsr_.block_size = block_size;
+  bsr_stale_ = block_size > 0;
+}
+
+template <class EigenMatrix>
+void EigenSparseMatrix<EigenMatrix>::update_bsr() {
+  using Scalar = typename EigenMatrix::Scalar;
+  const int bs = bsr_.block_size;
+  const int num_block_rows = rows_ / bs;
+  // Walk the matrix row by row, converting it to CSR first if needed.
+  Eigen::SparseMatrix<Scalar, Eigen::RowMajor> csr(matrix_);
+  csr.makeCompressed();
+  bsr_.block_row_ptr.assign(num_block_rows + 1, 0);
+  bsr_.block_col_ind.clear();
+  std::vector<int> block_cols;
+  for (int bi = 0; bi < num_block_rows; bi++) {
+    block_cols.clear();
+    for (int r = bi * bs; r < (bi + 1) * bs; r++) {
+      for (auto p = csr.outerIndexPtr()[r]; p < csr.outerIndexPtr()[r + 1];
+           p++) {
+        block_cols.push_back(csr.innerIndexPtr()[p] / bs);
+      }
+    }
+    std::sort(block_cols.begin(), block_cols.end());
+    block_cols.erase(std::unique(block_cols.begin(), block_cols.end()),
+                     block_cols.end());
+    bsr_.block_col_ind.insert(bsr_.block_col_ind.end(), block_cols.begin(),
+                              block_cols.end());
+    bsr_.block_row_ptr[bi + 1] = bsr_.block_col_ind.size();
+  }
+  bsr_.values.assign(bsr_.block_col_ind.size() * bs * bs, Scalar(0));
+  for (int bi = 0; bi < num_block_rows; bi++) {
+    auto first = bsr_.block_col_ind.begin() + bsr_.block_row_ptr[bi];
+    auto last = bsr_.block_col_ind.begin() + bsr_.block_row_ptr[bi + 1];
+    for (int r = bi * bs; r < (bi + 1) * bs; r++) {
+      for (auto p = csr.outerIndexPtr()[r]; p < csr.outerIndexPtr()[r + 1];
+           p++) {
+        int c = csr.innerIndexPtr()[p];
+        auto block =
+            std::lower_bound(first, last, c / bs) - bsr_.block_col_ind.begin();
+        bsr_.values[(block * bs + r % bs) * bs + c % bs] = csr.valuePtr()[p];
+      }
+    }
+  }
+  bsr_stale_ = false;
 }
 
 template <class EigenMatrix>
 void EigenSparseMatrix<EigenMatrix>::spmv(Program *prog,
                                           const Ndarray &x,
                                           const Ndarray &y) {
-  size_t dX = prog->get_ndarray_data_ptr_as_int(&x);
-  size_t dY = prog->get_ndarray_data_ptr_as_int(&y);
-  std::string sdtype = gstaichi::lang::data_type_name(dtype_);
-  if (sdtype == "f32") {
-    Eigen::Map<Eigen::VectorXf>((float *)dY, rows_) =
-        matrix_.template cast<float>() *
-        Eigen::Map<Eigen::VectorXf>((float *)dX, cols_);
-  } else if (sdtype == "f64") {
-    Eigen::Map<Eigen::VectorXd>((double *)dY, rows_) =
-        matrix_.template cast<double>() *
-        Eigen::Map<Eigen::VectorXd>((double *)dX, cols_);
+  using Scalar = typename EigenMatrix::Scalar;
+  TI_ERROR_IF(x.dtype != dtype_ || y.dtype != dtype_,
+              "The dtype of the vectors does not match the sparse matrix ({})",
+              data_type_name(dtype_));
+  const Scalar *dX = (const Scalar *)prog->get_ndarray_data_ptr_as_int(&x);
+  Scalar *dY = (Scalar *)prog->get_ndarray_data_ptr_as_int(&y);
+  auto pool = prog->get_thread_pool();
+  if (bsr_.block_size > 0) {
+    if (bsr_stale_) {
+      update_bsr();
+    }
+    bsr_spmm(pool, bsr_, rows_, dX, dY, 1);
+  } else if constexpr (EigenMatrix::IsRowMajor) {
+    csr_spmm(pool, rows_, matrix_.outerIndexPtr(), matrix_.innerIndexPtr(),
+             matrix_.innerNonZeroPtr(), matrix_.valuePtr(), dX, dY, 1);
   } else {
-    TI_ERROR("Unsupported sparse matrix data type {}!", sdtype);
+    // CSC has no race-free row partition; use Eigen's serial kernel.
+    using Vector = Eigen::Matrix<Scalar, Eigen::Dynamic, 1>;
+    Eigen::Map<Vector>(dY, rows_) =
+        matrix_ * Eigen::Map<const Vector>(dX, cols_);
+  }
+}
+
+template <class EigenMatrix>
+void EigenSparseMatrix<EigenMatrix>::spmm(Program *prog,
+                                          const Ndarray &x,
+                                          const Ndarray &y) {
+  using Scalar = typename EigenMatrix::Scalar;
+  TI_ERROR_IF(x.dtype != dtype_ || y.dtype != dtype_,
+              "The dtype of the matrices does not match the sparse matrix ({})",
+              data_type_name(dtype_));
+  TI_ERROR_IF(x.shape.size() != 2 || y.shape.size() != 2 ||
+                  x.shape[0] != cols_ || y.shape[0] != rows_ ||
+                  x.shape[1] != y.shape[1],
+              "Dimension mismatch in the sparse matrix-matrix multiplication");
+  const int k = x.shape[1];
+  const Scalar *dX = (const Scalar *)prog->get_ndarray_data_ptr_as_int(&x);
+  Scalar *dY = (Scalar *)prog->get_ndarray_data_ptr_as_int(&y);
+  auto pool = prog->get_thread_pool();
+  if (bsr_.block_size > 0) {
+    if (bsr_stale_) {
+      update_bsr();
+    }
+    bsr_spmm(pool, bsr_, rows_, dX, dY, k);
+  } else if constexpr (EigenMatrix::IsRowMajor) {
+    csr_spmm(pool, rows_, matrix_.outerIndexPtr(), matrix_.innerIndexPtr(),
+             matrix_.innerNonZeroPtr(), matrix_.valuePtr(), dX, dY, k);
+  } else {
+    // Ndarrays are row-major.
+    using Dense =
+        Eigen::Matrix<Scalar, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor>;
+    Eigen::Map<Dense>(dY, rows_, k) =
+        matrix_ * Eigen::Map<const Dense>(dX, cols_, k);
   }
 }
 
@@ -318,6 +739,16 @@ INSTANTIATE_SPMV(float32, RowMajor)
 INSTANTIATE_SPMV(float64, ColMajor)
 INSTANTIATE_SPMV(float64, RowMajor)
 
+INSTANTIATE_SPMM(float32, ColMajor)
+INSTANTIATE_SPMM(float32, RowMajor)
+INSTANTIATE_SPMM(float64, ColMajor)
+INSTANTIATE_SPMM(float64, RowMajor)
+
+INSTANTIATE_SET_BLOCK_SIZE(float32, ColMajor)
+INSTANTIATE_SET_BLOCK_SIZE(float32, RowMajor)
+INSTANTIATE_SET_BLOCK_SIZE(float64, ColMajor)
+INSTANTIATE_SET_BLOCK_SIZE(float64, RowMajor)
+
 std::unique_ptr<SparseMatrix> make_sparse_matrix(
     int rows,
     int cols,
@@ -361,16 +792,15 @@ std::unique_ptr<SparseMatrix> make_cu_sparse_matrix(cusparseSpMatDescr_t mat,
 
 template <typename T>
 void build_ndarray_template(SparseMatrix &sm,
+                            ThreadPool *pool,
                             intptr_t data_ptr,
                             size_t num_triplets) {
-  using V = Eigen::Triplet<T>;
-  std::vector<V> triplets;
-  T *data = reinterpret_cast<T *>(data_ptr);
-  for (int i = 0; i < num_triplets; i++) {
-    triplets.push_back(V(data[i * 3], data[i * 3 + 1],
-                         gstaichi_union_cast<T>(data[i * 3 + 2])));
-  }
-  sm.build_triplets(static_cast<void *>(&triplets));
+  std::vector<int> rows, cols;
+  std::vector<T> values;
+  decode_triplets<T, T>(pool, reinterpret_cast<T *>(data_ptr), num_triplets,
+                        rows, cols, values);
+  sm.build_from_coo(pool, rows.data(), cols.data(), values.data(),
+                    num_triplets);
 }
 
 void make_sparse_matrix_from_ndarray(Program *prog,
@@ -379,10 +809,11 @@ void make_sparse_matrix_from_ndarray(Program *prog,
   std::string sdtype = gstaichi::lang::data_type_name(sm.get_data_type());
   auto data_ptr = prog->get_ndarray_data_ptr_as_int(&ndarray);
   auto num_triplets = ndarray.get_nelement() * ndarray.get_element_size() / 3;
+  auto pool = prog->get_thread_pool();
   if (sdtype == "f32") {
-    build_ndarray_template<float32>(sm, data_ptr, num_triplets);
+    build_ndarray_template<float32>(sm, pool, data_ptr, num_triplets);
   } else if (sdtype == "f64") {
-    build_ndarray_template<float64>(sm, data_ptr, num_triplets);
+    build_ndarray_template<float64>(sm, pool, data_ptr, num_triplets);
   } else {
     TI_ERROR("Unsupported sparse matrix data type {}!", sdtype);
   }
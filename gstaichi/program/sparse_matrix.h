@@ -31,7 +31,11 @@ class SparseMatrixBuilder {
 
   intptr_t get_ndarray_data_ptr() const;
 
-  std::unique_ptr<SparseMatrix> build();
+  std::unique_ptr<SparseMatrix> build(Program *prog = nullptr);
+
+  // Overwrites the values of |sm| with the triplets in the builder, reusing
+  // the sparsity pattern of |sm|.
+  void update_values(SparseMatrix &sm, Program *prog = nullptr);
 
   std::unique_ptr<SparseMatrix> build_cuda();
 
@@ -39,7 +43,10 @@ class SparseMatrixBuilder {
 
  private:
   template <typename T, typename G>
-  void build_template(std::unique_ptr<SparseMatrix> &);
+  void build_template(std::unique_ptr<SparseMatrix> &, ThreadPool *pool);
+
+  template <typename T, typename G>
+  void update_values_template(SparseMatrix &sm, ThreadPool *pool);
 
   template <typename T, typename G>
   void print_triplets_template();
@@ -79,6 +86,27 @@ class SparseMatrix {
                                   int nnz) {
     TI_NOT_IMPLEMENTED;
   }
+
+  // Builds the matrix from host COO arrays, summing up duplicated entries.
+  // The conversion runs on |pool|, or serially if |pool| is nullptr.
+  virtual void build_from_coo(ThreadPool *pool,
+                              const int *rows,
+                              const int *cols,
+                              const void *values,
+                              int64 num_triplets) {
+    TI_NOT_IMPLEMENTED;
+  }
+
+  // Overwrites the values of the matrix from host COO arrays while keeping
+  // its sparsity pattern. Every (row, col) must be in the pattern.
+  virtual void update_values_from_coo(ThreadPool *pool,
+                                      const int *rows,
+                                      const int *cols,
+                                      const void *values,
+                                      int64 num_triplets) {
+    TI_NOT_IMPLEMENTED;
+  }
+
   inline const int num_rows() const {
     return rows_;
   }
@@ -119,6 +147,17 @@ class SparseMatrix {
   DataType dtype_{PrimitiveType::f32};
 };
 
+// Block compressed sparse row (BSR) copy of a sparse matrix made of dense
+// square blocks, e.g. the 3x3 blocks of a FEM stiffness matrix.
+template <typename Scalar>
+struct BsrMatrix {
+  int block_size{0};
+  std::vector<int> block_row_ptr;
+  std::vector<int> block_col_ind;
+  // block_size * block_size row-major values per block.
+  std::vector<Scalar> values;
+};
+
 template <class EigenMatrix>
 class EigenSparseMatrix : public SparseMatrix {
  public:
@@ -140,6 +179,16 @@ class EigenSparseMatrix : public SparseMatrix {
   ~EigenSparseMatrix() override = default;
 
   void build_triplets(void *triplets_adr) override;
+  void build_from_coo(ThreadPool *pool,
+                      const int *rows,
+                      const int *cols,
+                      const void *values,
+                      int64 num_triplets) override;
+  void update_values_from_coo(ThreadPool *pool,
+                              const int *rows,
+                              const int *cols,
+                              const void *values,
+                              int64 num_triplets) override;
   const std::string to_string() const override;
 
   // Write the sparse matrix to a Matrix Market file
@@ -155,6 +204,7 @@ class EigenSparseMatrix : public SparseMatrix {
 
   virtual EigenSparseMatrix &operator+=(const EigenSparseMatrix &other) {
     this->matrix_ += other.matrix_;
+    bsr_stale_ = true;
     return *this;
   };
 
@@ -165,6 +215,7 @@ class EigenSparseMatrix : public SparseMatrix {
 
   virtual EigenSparseMatrix &operator-=(const EigenSparseMatrix &other) {
     this->matrix_ -= other.matrix_;
+    bsr_stale_ = true;
     return *this;
   }
 
@@ -175,6 +226,7 @@ class EigenSparseMatrix : public SparseMatrix {
 
   virtual EigenSparseMatrix &operator*=(float scale) {
     this->matrix_ *= scale;
+    bsr_stale_ = true;
     return *this;
   }
 
@@ -207,6 +259,7 @@ class EigenSparseMatrix : public SparseMatrix {
   template <typename T>
   void set_element(int row, int col, T value) {
     matrix_.coeffRef(row, col) = value;
+    bsr_stale_ = true;
   }
 
   template <class VT>
@@ -216,8 +269,24 @@ class EigenSparseMatrix : public SparseMatrix {
 
   void spmv(Program *prog, const Ndarray &x, const Ndarray &y);
 
+  // Y = A * X, where the 2D ndarray X holds one vector per column.
+  void spmm(Program *prog, const Ndarray &x, const Ndarray &y);
+
+  // Makes spmv() and spmm() use a BSR copy of the matrix with dense
+  // |block_size| x |block_size| blocks. A block size of 0 disables it.
+  void set_block_size(int block_size);
+
+  int get_block_size() const {
+    return bsr_.block_size;
+  }
+
  private:
+  void update_bsr();
+
   EigenMatrix matrix_;
+  BsrMatrix<typename EigenMatrix::Scalar> bsr_;
+  // Whether bsr_ has to be rebuilt from matrix_ before it is used.
+  bool bsr_stale_{false};
 };
 
 class CuSparseMatrix : public SparseMatrix {
@@ -48,6 +48,24 @@ EIGEN_LU_SOLVER_INSTANTIATION(float64, LU, COLAMD);
   EigenSparseSolver<LUS##dt##type##order, Eigen::SparseMatrix<dt>>::solve( \
       const LUT##dt &b);
 
+// Explicit instantiation of the template class EigenSparseSolver::solve_many
+#define EIGEN_LLT_SOLVE_MANY_INSTANTIATION(dt, type, order, df)                \
+  using MT##dt##type##order = Eigen::MatrixX##df;                              \
+  using MS##dt##type##order =                                                  \
+      Eigen::Simplicial##type<Eigen::SparseMatrix<dt>, Eigen::Lower,           \
+                              Eigen::order##Ordering<int>>;                    \
+  template MT##dt##type##order                                                 \
+  EigenSparseSolver<MS##dt##type##order, Eigen::SparseMatrix<dt>>::solve_many( \
+      const MT##dt##type##order &b);
+#define EIGEN_LU_SOLVE_MANY_INSTANTIATION(dt, type, order, df)                 \
+  using MT##dt##type##order = Eigen::MatrixX##df;                              \
+  using MS##dt##type##order =                                                  \
+      Eigen::Sparse##type<Eigen::SparseMatrix<dt>,                             \
+                          Eigen::order##Ordering<int>>;                        \
+  template MT##dt##type##order                                                 \
+  EigenSparseSolver<MS##dt##type##order, Eigen::SparseMatrix<dt>>::solve_many( \
+      const MT##dt##type##order &b);
+
 // Explicit instantiation of the template class EigenSparseSolver::solve_rf
 #define INSTANTIATE_LLT_SOLVE_RF(dt, type, order, df)                     \
   using llt##dt##type##order =                                            \
@@ -69,6 +87,28 @@ EIGEN_LU_SOLVER_INSTANTIATION(float64, LU, COLAMD);
       Program * prog, const SparseMatrix &sm, const Ndarray &b,           \
       const Ndarray &x);
 
+// Explicit instantiation of the template class
+// EigenSparseSolver::solve_many_rf
+#define INSTANTIATE_LLT_SOLVE_MANY_RF(dt, type, order, df)                     \
+  using mllt##dt##type##order =                                                \
+      Eigen::Simplicial##type<Eigen::SparseMatrix<dt>, Eigen::Lower,           \
+                              Eigen::order##Ordering<int>>;                    \
+  template void EigenSparseSolver<mllt##dt##type##order,                       \
+                                  Eigen::SparseMatrix<dt>>::solve_many_rf<df,  \
+                                                                          dt>( \
+      Program * prog, const SparseMatrix &sm, const Ndarray &b,                \
+      const Ndarray &x);
+
+#define INSTANTIATE_LU_SOLVE_MANY_RF(dt, type, order, df)                      \
+  using mlu##dt##type##order =                                                 \
+      Eigen::Sparse##type<Eigen::SparseMatrix<dt>,                             \
+                          Eigen::order##Ordering<int>>;                        \
+  template void EigenSparseSolver<mlu##dt##type##order,                        \
+                                  Eigen::SparseMatrix<dt>>::solve_many_rf<df,  \
+                                                                          dt>( \
+      Program * prog, const SparseMatrix &sm, const Ndarray &b,                \
+      const Ndarray &x);
+
 #define MAKE_EIGEN_SOLVER(dt, type, order) \
   std::make_unique<EigenSparseSolver##dt##type##order>()
 
@@ -94,6 +134,38 @@ namespace gstaichi::lang {
 #define GET_EM(sm) \
   const EigenMatrix *mat = (const EigenMatrix *)(sm.get_matrix());
 
+template <class EigenSolver, class EigenMatrix>
+void EigenSparseSolver<EigenSolver, EigenMatrix>::record_pattern(
+    const EigenMatrix &mat) {
+  if (!mat.isCompressed()) {
+    // Uncompressed matrices have no stable index arrays to compare against.
+    is_analyzed_ = false;
+    return;
+  }
+  auto n_outer = mat.outerSize() + 1;
+  auto nnz = mat.nonZeros();
+  analyzed_outer_.assign(mat.outerIndexPtr(), mat.outerIndexPtr() + n_outer);
+  analyzed_inner_.assign(mat.innerIndexPtr(), mat.innerIndexPtr() + nnz);
+  is_analyzed_ = true;
+}
+
+template <class EigenSolver, class EigenMatrix>
+bool EigenSparseSolver<EigenSolver, EigenMatrix>::has_same_pattern(
+    const EigenMatrix &mat) const {
+  if (!is_analyzed_ || !mat.isCompressed()) {
+    return false;
+  }
+  auto n_outer = (std::size_t)mat.outerSize() + 1;
+  auto nnz = (std::size_t)mat.nonZeros();
+  if (analyzed_outer_.size() != n_outer || analyzed_inner_.size() != nnz) {
+    return false;
+  }
+  return std::equal(analyzed_outer_.begin(), analyzed_outer_.end(),
+                    mat.outerIndexPtr()) &&
+         std::equal(analyzed_inner_.begin(), analyzed_inner_.end(),
+                    mat.innerIndexPtr());
+}
+
 template <class EigenSolver, class EigenMatrix>
 bool EigenSparseSolver<EigenSolver, EigenMatrix>::compute(
     const SparseMatrix &sm) {
@@ -101,7 +173,12 @@ bool EigenSparseSolver<EigenSolver, EigenMatrix>::compute(
     SparseSolver::init_solver(sm.num_rows(), sm.num_cols(), sm.get_data_type());
   }
   GET_EM(sm);
-  solver_.compute(*mat);
+  // Only the numeric phase is needed when the pattern is unchanged.
+  if (!has_same_pattern(*mat)) {
+    solver_.analyzePattern(*mat);
+    record_pattern(*mat);
+  }
+  solver_.factorize(*mat);
   if (solver_.info() != Eigen::Success) {
     return false;
   } else
@@ -115,6 +192,7 @@ void EigenSparseSolver<EigenSolver, EigenMatrix>::analyze_pattern(
   }
   GET_EM(sm);
   solver_.analyzePattern(*mat);
+  record_pattern(*mat);
 }
 
 template <class EigenSolver, class EigenMatrix>
@@ -124,12 +202,33 @@ void EigenSparseSolver<EigenSolver, EigenMatrix>::factorize(
   solver_.factorize(*mat);
 }
 
+template <class EigenSolver, class EigenMatrix>
+void EigenSparseSolver<EigenSolver, EigenMatrix>::refactorize(
+    const SparseMatrix &sm) {
+  GET_EM(sm);
+  if (!has_same_pattern(*mat)) {
+    TI_ERROR(
+        "The sparsity pattern of the matrix differs from the one passed to "
+        "analyze_pattern(). Please call analyze_pattern() or compute() "
+        "instead.");
+  }
+  solver_.factorize(*mat);
+}
+
 template <class EigenSolver, class EigenMatrix>
 template <typename T>
 T EigenSparseSolver<EigenSolver, EigenMatrix>::solve(const T &b) {
   return solver_.solve(b);
 }
 
+template <class EigenSolver, class EigenMatrix>
+template <typename T>
+T EigenSparseSolver<EigenSolver, EigenMatrix>::solve_many(const T &b) {
+  // Each column of b is one right-hand side; all of them share the
+  // factorization and are solved in a single call.
+  return solver_.solve(b);
+}
+
 EIGEN_LLT_SOLVE_INSTANTIATION(float32, LLT, AMD, f);
 EIGEN_LLT_SOLVE_INSTANTIATION(float32, LLT, COLAMD, f);
 EIGEN_LLT_SOLVE_INSTANTIATION(float32, LDLT, AMD, f);
@@ -143,6 +242,19 @@ EIGEN_LLT_SOLVE_INSTANTIATION(float64, LDLT, COLAMD, d);
 EIGEN_LU_SOLVE_INSTANTIATION(float64, LU, AMD, d);
 EIGEN_LU_SOLVE_INSTANTIATION(float64, LU, COLAMD, d);
 
+EIGEN_LLT_SOLVE_MANY_INSTANTIATION(float32, LLT, AMD, f);
+EIGEN_LLT_SOLVE_MANY_INSTANTIATION(float32, LLT, COLAMD, f);
+EIGEN_LLT_SOLVE_MANY_INSTANTIATION(float32, LDLT, AMD, f);
+EIGEN_LLT_SOLVE_MANY_INSTANTIATION(float32, LDLT, COLAMD, f);
+EIGEN_LU_SOLVE_MANY_INSTANTIATION(float32, LU, AMD, f);
+EIGEN_LU_SOLVE_MANY_INSTANTIATION(float32, LU, COLAMD, f);
+EIGEN_LLT_SOLVE_MANY_INSTANTIATION(float64, LLT, AMD, d);
+EIGEN_LLT_SOLVE_MANY_INSTANTIATION(float64, LLT, COLAMD, d);
+EIGEN_LLT_SOLVE_MANY_INSTANTIATION(float64, LDLT, AMD, d);
+EIGEN_LLT_SOLVE_MANY_INSTANTIATION(float64, LDLT, COLAMD, d);
+EIGEN_LU_SOLVE_MANY_INSTANTIATION(float64, LU, AMD, d);
+EIGEN_LU_SOLVE_MANY_INSTANTIATION(float64, LU, COLAMD, d);
+
 template <class EigenSolver, class EigenMatrix>
 bool EigenSparseSolver<EigenSolver, EigenMatrix>::info() {
   return solver_.info() == Eigen::Success;
@@ -173,6 +285,38 @@ INSTANTIATE_LLT_SOLVE_RF(float64, LDLT, AMD, Eigen::VectorXd)
 INSTANTIATE_LU_SOLVE_RF(float64, LU, AMD, Eigen::VectorXd)
 INSTANTIATE_LU_SOLVE_RF(float64, LU, COLAMD, Eigen::VectorXd)
 
+template <class EigenSolver, class EigenMatrix>
+template <typename T, typename V>
+void EigenSparseSolver<EigenSolver, EigenMatrix>::solve_many_rf(
+    Program *prog,
+    const SparseMatrix &sm,
+    const Ndarray &b,
+    const Ndarray &x) {
+  TI_ASSERT(b.shape.size() == 2 && x.shape.size() == 2);
+  TI_ASSERT(b.shape[1] == x.shape[1]);
+  // Ndarrays are row-major with one right-hand side per column.
+  int num_rhs = b.shape[1];
+  size_t db = prog->get_ndarray_data_ptr_as_int(&b);
+  size_t dX = prog->get_ndarray_data_ptr_as_int(&x);
+  // Some Eigen solvers (e.g. SparseLU) only write column-major results.
+  Eigen::Matrix<V, Eigen::Dynamic, Eigen::Dynamic> result =
+      solver_.solve(Eigen::Map<T>((V *)db, cols_, num_rhs));
+  Eigen::Map<T>((V *)dX, rows_, num_rhs) = result;
+}
+
+INSTANTIATE_LLT_SOLVE_MANY_RF(float32, LLT, COLAMD, RowMajorMatrixXf)
+INSTANTIATE_LLT_SOLVE_MANY_RF(float32, LDLT, COLAMD, RowMajorMatrixXf)
+INSTANTIATE_LLT_SOLVE_MANY_RF(float32, LLT, AMD, RowMajorMatrixXf)
+INSTANTIATE_LLT_SOLVE_MANY_RF(float32, LDLT, AMD, RowMajorMatrixXf)
+INSTANTIATE_LU_SOLVE_MANY_RF(float32, LU, AMD, RowMajorMatrixXf)
+INSTANTIATE_LU_SOLVE_MANY_RF(float32, LU, COLAMD, RowMajorMatrixXf)
+INSTANTIATE_LLT_SOLVE_MANY_RF(float64, LLT, COLAMD, RowMajorMatrixXd)
+INSTANTIATE_LLT_SOLVE_MANY_RF(float64, LDLT, COLAMD, RowMajorMatrixXd)
+INSTANTIATE_LLT_SOLVE_MANY_RF(float64, LLT, AMD, RowMajorMatrixXd)
+INSTANTIATE_LLT_SOLVE_MANY_RF(float64, LDLT, AMD, RowMajorMatrixXd)
+INSTANTIATE_LU_SOLVE_MANY_RF(float64, LU, AMD, RowMajorMatrixXd)
+INSTANTIATE_LU_SOLVE_MANY_RF(float64, LU, COLAMD, RowMajorMatrixXd)
+
 CuSparseSolver::CuSparseSolver() {
   init_solver();
 }
@@ -227,6 +371,8 @@ void CuSparseSolver::reorder(const CuSparseMatrix &A) {
       h_csr_col_ind_B_, d_csrColIndA, sizeof(int) * nnzA);
   CUDADriver::get_instance().memcpy_device_to_host(h_csrValA, d_csrValA,
                                                    sizeof(float) * nnzA);
+  analyzed_row_ptr_.assign(h_csr_row_ptr_B_, h_csr_row_ptr_B_ + rowsA + 1);
+  analyzed_col_ind_.assign(h_csr_col_ind_B_, h_csr_col_ind_B_ + nnzA);
 
   // compoute h_Q_
   CUSOLVERDriver::get_instance().csSpXcsrsymamdHost(
@@ -269,6 +415,26 @@ void CuSparseSolver::reorder(const CuSparseMatrix &A) {
 #endif
 }
 
+bool CuSparseSolver::has_same_pattern(const CuSparseMatrix &A) const {
+#if defined(TI_WITH_CUDA)
+  size_t rowsA = A.num_rows();
+  size_t nnzA = A.get_nnz();
+  if (analyzed_row_ptr_.size() != rowsA + 1 ||
+      analyzed_col_ind_.size() != nnzA) {
+    return false;
+  }
+  std::vector<int> row_ptr(rowsA + 1);
+  std::vector<int> col_ind(nnzA);
+  CUDADriver::get_instance().memcpy_device_to_host(
+      row_ptr.data(), A.get_row_ptr(), sizeof(int) * (rowsA + 1));
+  CUDADriver::get_instance().memcpy_device_to_host(
+      col_ind.data(), A.get_col_ind(), sizeof(int) * nnzA);
+  return row_ptr == analyzed_row_ptr_ && col_ind == analyzed_col_ind_;
+#else
+  TI_NOT_IMPLEMENTED
+#endif
+}
+
 // Reference:
 // https://github.com/NVIDIA/cuda-samples/blob/master/Samples/4_CUDA_Libraries/cuSolverSp_LowlevelCholesky/cuSolverSp_LowlevelCholesky.cpp
 void CuSparseSolver::analyze_pattern(const SparseMatrix &sm) {
@@ -342,6 +508,36 @@ void CuSparseSolver::factorize(const SparseMatrix &sm) {
       TI_NOT_IMPLEMENTED
   }
 }
+void CuSparseSolver::refactorize(const SparseMatrix &sm) {
+#if defined(TI_WITH_CUDA)
+  if (!is_analyzed_) {
+    TI_ERROR("Please call analyze_pattern() before calling refactorize().");
+  }
+  // Reuse the reordering computed by analyze_pattern(): only gather the new
+  // values of A into B = A(Q, Q) and redo the numeric factorization.
+  SparseMatrix *sm_no_cv = const_cast<SparseMatrix *>(&sm);
+  CuSparseMatrix *A = static_cast<CuSparseMatrix *>(sm_no_cv);
+  if (!has_same_pattern(*A)) {
+    TI_ERROR(
+        "The sparsity pattern of the matrix differs from the one passed to "
+        "analyze_pattern(). Please call analyze_pattern() instead.");
+  }
+  size_t nnzA = A->get_nnz();
+  float *h_csrValA = (float *)malloc(sizeof(float) * nnzA);
+  assert(nullptr != h_csrValA);
+  CUDADriver::get_instance().memcpy_device_to_host(h_csrValA, A->get_val_ptr(),
+                                                   sizeof(float) * nnzA);
+  for (int j = 0; j < nnzA; j++) {
+    h_csr_val_B_[j] = h_csrValA[h_map_B_from_A_[j]];
+  }
+  CUDADriver::get_instance().memcpy_host_to_device(
+      (void *)d_csr_val_B_, (void *)h_csr_val_B_, sizeof(float) * nnzA);
+  free(h_csrValA);
+  factorize(sm);
+#else
+  TI_NOT_IMPLEMENTED
+#endif
+}
 void CuSparseSolver::factorize_cholesky(const SparseMatrix &sm) {
 #if defined(TI_WITH_CUDA)
   // Retrive the info of the sparse matrix
@@ -357,6 +553,10 @@ void CuSparseSolver::factorize_cholesky(const SparseMatrix &sm) {
       cusolver_handle_, rowsA, nnzA, descr_, d_csr_val_B_, d_csr_row_ptr_B_,
       d_csr_col_ind_B_, info_, &size_internal, &size_chol);
 
+  if (gpu_buffer_ != nullptr) {
+    CUDADriver::get_instance().mem_free(gpu_buffer_);
+    gpu_buffer_ = nullptr;
+  }
   if (size_chol > 0)
     CUDADriver::get_instance().malloc(&gpu_buffer_, sizeof(char) * size_chol);
 
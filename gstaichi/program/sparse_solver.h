@@ -21,6 +21,12 @@
 
 namespace gstaichi::lang {
 
+// Layout of 2D ndarrays holding one right-hand side per column.
+using RowMajorMatrixXf =
+    Eigen::Matrix<float32, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor>;
+using RowMajorMatrixXd =
+    Eigen::Matrix<float64, Eigen::Dynamic, Eigen::Dynamic, Eigen::RowMajor>;
+
 class SparseSolver {
  protected:
   int rows_{0};
@@ -38,6 +44,7 @@ class SparseSolver {
   virtual bool compute(const SparseMatrix &sm) = 0;
   virtual void analyze_pattern(const SparseMatrix &sm) = 0;
   virtual void factorize(const SparseMatrix &sm) = 0;
+  virtual void refactorize(const SparseMatrix &sm) = 0;
   virtual bool info() = 0;
 };
 
@@ -45,20 +52,39 @@ template <class EigenSolver, class EigenMatrix>
 class EigenSparseSolver : public SparseSolver {
  private:
   EigenSolver solver_;
+  // Sparsity pattern (CSC outer/inner indices) seen by the last
+  // analyze_pattern(). Used to skip the symbolic phase when a matrix with the
+  // same pattern is factorized again.
+  std::vector<typename EigenMatrix::StorageIndex> analyzed_outer_;
+  std::vector<typename EigenMatrix::StorageIndex> analyzed_inner_;
+  bool is_analyzed_{false};
+
+  void record_pattern(const EigenMatrix &mat);
+  bool has_same_pattern(const EigenMatrix &mat) const;
 
  public:
   ~EigenSparseSolver() override = default;
   bool compute(const SparseMatrix &sm) override;
   void analyze_pattern(const SparseMatrix &sm) override;
   void factorize(const SparseMatrix &sm) override;
+  void refactorize(const SparseMatrix &sm) override;
   template <typename T>
   T solve(const T &b);
 
+  template <typename T>
+  T solve_many(const T &b);
+
   template <typename T, typename V>
   void solve_rf(Program *prog,
                 const SparseMatrix &sm,
                 const Ndarray &b,
                 const Ndarray &x);
+
+  template <typename T, typename V>
+  void solve_many_rf(Program *prog,
+                     const SparseMatrix &sm,
+                     const Ndarray &b,
+                     const Ndarray &x);
   bool info() override;
 };
 
@@ -90,6 +116,10 @@ class CuSparseSolver : public SparseSolver {
   void *cpu_buffer_{nullptr};
   bool is_analyzed_{false};
   bool is_factorized_{false};
+  // Sparsity pattern (CSR row pointers/column indices of A) seen by the last
+  // analyze_pattern(). refactorize() reuses the reordering computed for it.
+  std::vector<int> analyzed_row_ptr_;
+  std::vector<int> analyzed_col_ind_;
 
   // NOLINTBEGIN
   int *h_Q_{
@@ -115,6 +145,7 @@ class CuSparseSolver : public SparseSolver {
   void analyze_pattern(const SparseMatrix &sm) override;
 
   void factorize(const SparseMatrix &sm) override;
+  void refactorize(const SparseMatrix &sm) override;
   void solve_rf(Program *prog,
                 const SparseMatrix &sm,
                 const Ndarray &b,
@@ -127,6 +158,7 @@ class CuSparseSolver : public SparseSolver {
  private:
   void init_solver();
   void reorder(const CuSparseMatrix &sm);
+  bool has_same_pattern(const CuSparseMatrix &sm) const;
   void analyze_pattern_cholesky(const SparseMatrix &sm);
   void analyze_pattern_lu(const SparseMatrix &sm);
   void factorize_cholesky(const SparseMatrix &sm);
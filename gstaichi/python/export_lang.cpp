@@ -23,6 +23,7 @@
 #include "gstaichi/python/export.h"
 #include "gstaichi/math/svd.h"
 #include "gstaichi/system/timeline.h"
+#include "gstaichi/system/threading.h"
 #include "gstaichi/python/snode_registry.h"
 #include "gstaichi/program/sparse_matrix.h"
 #include "gstaichi/program/sparse_solver.h"
@@ -204,6 +205,17 @@ void export_lang(py::module &m) {
       .def_readwrite("saturating_grid_dim", &CompileConfig::saturating_grid_dim)
       .def_readwrite("max_block_dim", &CompileConfig::max_block_dim)
       .def_readwrite("cpu_max_num_threads", &CompileConfig::cpu_max_num_threads)
+      .def_readwrite("cpu_thread_pool_spin_us",
+                     &CompileConfig::cpu_thread_pool_spin_us)
+      .def_readwrite("cpu_loop_schedule", &CompileConfig::cpu_loop_schedule)
+      .def_readwrite("cpu_thread_affinity", &CompileConfig::cpu_thread_affinity)
+      .def_readwrite("cpu_memory_placement",
+                     &CompileConfig::cpu_memory_placement)
+      .def_readwrite("cpu_serial_loop_threshold",
+                     &CompileConfig::cpu_serial_loop_threshold)
+      .def_readwrite("cpu_concurrent_tasks",
+                     &CompileConfig::cpu_concurrent_tasks)
+      .def_readwrite("cpu_vectorize", &CompileConfig::cpu_vectorize)
       .def_readwrite("random_seed", &CompileConfig::random_seed)
       .def_readwrite("verbose_kernel_launches",
                      &CompileConfig::verbose_kernel_launches)
@@ -211,7 +223,10 @@ void export_lang(py::module &m) {
       .def_readwrite("demote_dense_struct_fors",
                      &CompileConfig::demote_dense_struct_fors)
       .def_readwrite("kernel_profiler", &CompileConfig::kernel_profiler)
+      .def_readwrite("kernel_profiler_memory_traffic",
+                     &CompileConfig::kernel_profiler_memory_traffic)
       .def_readwrite("timeline", &CompileConfig::timeline)
+      .def_readwrite("perf_map", &CompileConfig::perf_map)
       .def_readwrite("default_fp", &CompileConfig::default_fp)
       .def_readwrite("default_ip", &CompileConfig::default_ip)
       .def_readwrite("default_up", &CompileConfig::default_up)
@@ -296,8 +311,9 @@ void export_lang(py::module &m) {
                      &KernelProfileTracedRecord::kernel_elapsed_time_in_ms)
       .def_readwrite("base_time", &KernelProfileTracedRecord::time_since_base)
       .def_readwrite("name", &KernelProfileTracedRecord::name)
-      .def_readwrite("metric_values",
-                     &KernelProfileTracedRecord::metric_values);
+      .def_readwrite("metric_values", &KernelProfileTracedRecord::metric_values)
+      .def_readwrite("memory_traffic",
+                     &KernelProfileTracedRecord::memory_traffic);
 
   py::enum_<SNodeAccessFlag>(m, "SNodeAccessFlag", py::arithmetic())
       .value("block_local", SNodeAccessFlag::block_local)
@@ -355,6 +371,7 @@ void export_lang(py::module &m) {
       .def("bit_vectorize", &ASTBuilder::bit_vectorize)
       .def("parallelize", &ASTBuilder::parallelize)
       .def("strictly_serialize", &ASTBuilder::strictly_serialize)
+      .def("loop_schedule", &ASTBuilder::loop_schedule)
       .def("block_dim", &ASTBuilder::block_dim)
       .def("insert_snode_access_flag", &ASTBuilder::insert_snode_access_flag)
       .def("reset_snode_access_flag", &ASTBuilder::reset_snode_access_flag);
@@ -395,6 +412,25 @@ void export_lang(py::module &m) {
            [](Program *program) {
              return program->profiler->get_traced_records();
            })
+      .def("get_cpu_loop_counters",
+           [](Program *program) {
+             py::dict result;
+             auto *pool = program->get_thread_pool();
+             if (pool == nullptr) {
+               return result;
+             }
+             auto counters = pool->get_loop_counters();
+             result["serial_loops"] = counters.serial_loops;
+             result["parallel_loops"] = counters.parallel_loops;
+             result["serial_loop_threshold"] = pool->serial_loop_threshold;
+             return result;
+           })
+      .def("clear_cpu_loop_counters",
+           [](Program *program) {
+             if (auto *pool = program->get_thread_pool()) {
+               pool->reset_loop_counters();
+             }
+           })
       .def(
           "get_kernel_profiler_device_name",
           [](Program *program) { return program->profiler->get_device_name(); })
@@ -414,6 +450,15 @@ void export_lang(py::module &m) {
            [](Program *, const std::string &fn) {
              Timelines::get_instance().save(fn);
            })
+      .def("timeline_insert_event",
+           [](Program *, const std::string &name, bool begin,
+              const std::string &args) {
+             Timeline::insert_this_thread_event(name, begin, args);
+           })
+      .def("timeline_set_thread_name",
+           [](Program *, const std::string &name) {
+             Timeline::get_this_thread_instance().set_name(name);
+           })
       .def("print_memory_profiler_info", &Program::print_memory_profiler_info)
       .def("finalize", &Program::finalize)
       .def("get_total_compilation_time", &Program::get_total_compilation_time)
@@ -494,7 +539,20 @@ void export_lang(py::module &m) {
            [](Program *program) { return program->get_graphics_device(); })
       .def("compile_kernel", &Program::compile_kernel,
            py::return_value_policy::reference)
-      .def("launch_kernel", &Program::launch_kernel)
+      .def("compile_report", &Program::compile_report)
+      .def("launch_kernel",
+           [](Program *program, const CompiledKernelData &compiled_kernel_data,
+              LaunchContextBuilder &ctx) {
+             // The CPU launcher is reentrant: let kernels launched from
+             // other Python threads run meanwhile. Other backends keep the
+             // GIL, which serializes their launches.
+             if (arch_is_cpu(program->compile_config().arch)) {
+               py::gil_scoped_release release;
+               program->launch_kernel(compiled_kernel_data, ctx);
+             } else {
+               program->launch_kernel(compiled_kernel_data, ctx);
+             }
+           })
       .def("get_device_caps", &Program::get_device_caps);
 
   py::class_<CompileResult>(m, "CompileResult")
@@ -506,6 +564,24 @@ void export_lang(py::module &m) {
       .def_readonly("cache_hit", &CompileResult::cache_hit)
       .def_readonly("cache_key", &CompileResult::cache_key);
 
+  py::class_<CompileReport::Pass>(m, "CompileReportPass")
+      .def_readonly("scope", &CompileReport::Pass::scope)
+      .def_readonly("task", &CompileReport::Pass::task)
+      .def_readonly("name", &CompileReport::Pass::name)
+      .def_readonly("statements_before",
+                    &CompileReport::Pass::statements_before)
+      .def_readonly("statements_after", &CompileReport::Pass::statements_after)
+      .def_readonly("time_ms", &CompileReport::Pass::time_ms);
+  py::class_<CompileReport::Task>(m, "CompileReportTask")
+      .def_readonly("name", &CompileReport::Task::name)
+      .def_readonly("type", &CompileReport::Task::type)
+      .def_readonly("statements", &CompileReport::Task::statements)
+      .def_readonly("llvm_instructions",
+                    &CompileReport::Task::llvm_instructions);
+  py::class_<CompileReport>(m, "CompileReport")
+      .def_readonly("passes", &CompileReport::passes)
+      .def_readonly("tasks", &CompileReport::tasks);
+
   py::class_<Axis>(m, "Axis").def(py::init<int>());
   py::class_<SNode>(m, "SNodeCxx")
       .def(py::init<>())
@@ -627,6 +703,7 @@ void export_lang(py::module &m) {
       .def("insert_ndarray_param", &Kernel::insert_ndarray_param)
       .def("insert_pointer_param", &Kernel::insert_pointer_param)
       .def("insert_ret", &Kernel::insert_ret)
+      .def_readwrite("fuse_loops", &Kernel::fuse_loops)
       .def("finalize_rets", &Kernel::finalize_rets)
       .def("finalize_params", &Kernel::finalize_params)
       .def("make_launch_context", &Kernel::make_launch_context)
@@ -1169,7 +1246,12 @@ void export_lang(py::module &m) {
              return builder->delete_ndarray(prog);
            })
       .def("get_ndarray_data_ptr", &SparseMatrixBuilder::get_ndarray_data_ptr)
-      .def("build", &SparseMatrixBuilder::build)
+      .def("build", [](SparseMatrixBuilder *builder,
+                       Program *prog) { return builder->build(prog); })
+      .def("update_values",
+           [](SparseMatrixBuilder *builder, SparseMatrix &sm, Program *prog) {
+             builder->update_values(sm, prog);
+           })
       .def("build_cuda", &SparseMatrixBuilder::build_cuda)
       .def("get_addr", [](SparseMatrixBuilder *mat) { return uint64(mat); });
 
@@ -1204,6 +1286,11 @@ void export_lang(py::module &m) {
       .def(py::self *py::self)                                               \
       .def("matmul", &EigenSparseMatrix<STORAGE##TYPE##EigenMatrix>::matmul) \
       .def("spmv", &EigenSparseMatrix<STORAGE##TYPE##EigenMatrix>::spmv)     \
+      .def("spmm", &EigenSparseMatrix<STORAGE##TYPE##EigenMatrix>::spmm)     \
+      .def("set_block_size",                                                 \
+           &EigenSparseMatrix<STORAGE##TYPE##EigenMatrix>::set_block_size)   \
+      .def("get_block_size",                                                 \
+           &EigenSparseMatrix<STORAGE##TYPE##EigenMatrix>::get_block_size)   \
       .def("transpose",                                                      \
            &EigenSparseMatrix<STORAGE##TYPE##EigenMatrix>::transpose)        \
       .def("get_element",                                                    \
@@ -1238,20 +1325,28 @@ void export_lang(py::module &m) {
       .def("compute", &SparseSolver::compute)
       .def("analyze_pattern", &SparseSolver::analyze_pattern)
       .def("factorize", &SparseSolver::factorize)
+      .def("refactorize", &SparseSolver::refactorize)
       .def("info", &SparseSolver::info);
 
-#define REGISTER_EIGEN_SOLVER(dt, type, order, fd)                           \
-  py::class_<EigenSparseSolver##dt##type##order, SparseSolver>(              \
-      m, "EigenSparseSolver" #dt #type #order)                               \
-      .def("compute", &EigenSparseSolver##dt##type##order::compute)          \
-      .def("analyze_pattern",                                                \
-           &EigenSparseSolver##dt##type##order::analyze_pattern)             \
-      .def("factorize", &EigenSparseSolver##dt##type##order::factorize)      \
-      .def("solve",                                                          \
-           &EigenSparseSolver##dt##type##order::solve<Eigen::VectorX##fd>)   \
-      .def("solve_rf",                                                       \
-           &EigenSparseSolver##dt##type##order::solve_rf<Eigen::VectorX##fd, \
-                                                         dt>)                \
+#define REGISTER_EIGEN_SOLVER(dt, type, order, fd)                             \
+  py::class_<EigenSparseSolver##dt##type##order, SparseSolver>(                \
+      m, "EigenSparseSolver" #dt #type #order)                                 \
+      .def("compute", &EigenSparseSolver##dt##type##order::compute)            \
+      .def("analyze_pattern",                                                  \
+           &EigenSparseSolver##dt##type##order::analyze_pattern)               \
+      .def("factorize", &EigenSparseSolver##dt##type##order::factorize)        \
+      .def("refactorize", &EigenSparseSolver##dt##type##order::refactorize)    \
+      .def("solve",                                                            \
+           &EigenSparseSolver##dt##type##order::solve<Eigen::VectorX##fd>)     \
+      .def(                                                                    \
+          "solve_many",                                                        \
+          &EigenSparseSolver##dt##type##order::solve_many<Eigen::MatrixX##fd>) \
+      .def("solve_rf",                                                         \
+           &EigenSparseSolver##dt##type##order::solve_rf<Eigen::VectorX##fd,   \
+                                                         dt>)                  \
+      .def("solve_many_rf",                                                    \
+           &EigenSparseSolver##dt##type##order::solve_many_rf<                 \
+               RowMajorMatrixX##fd, dt>)                                       \
       .def("info", &EigenSparseSolver##dt##type##order::info);
 
   REGISTER_EIGEN_SOLVER(float32, LLT, AMD, f)
@@ -1271,6 +1366,7 @@ void export_lang(py::module &m) {
       .def("compute", &CuSparseSolver::compute)
       .def("analyze_pattern", &CuSparseSolver::analyze_pattern)
       .def("factorize", &CuSparseSolver::factorize)
+      .def("refactorize", &CuSparseSolver::refactorize)
       .def("solve_rf", &CuSparseSolver::solve_rf)
       .def("info", &CuSparseSolver::info);
 
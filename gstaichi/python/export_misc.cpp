@@ -114,6 +114,8 @@ void export_misc(py::module &m) {
   });
   m.def("print_profile_info",
         [&]() { Profiling::get_instance().print_profile_info(); });
+  m.def("get_profile_info",
+        [&]() { return Profiling::get_instance().get_profile_info(); });
   m.def("clear_profile_info",
         [&]() { Profiling::get_instance().clear_profile_info(); });
   m.def("start_memory_monitoring", start_memory_monitoring);
@@ -10,7 +10,7 @@ namespace cpu {
 
 CpuDevice::AllocInfo CpuDevice::get_alloc_info(const DeviceAllocation handle) {
   validate_device_alloc(handle);
-  return allocations_[handle.alloc_id];
+  return allocation(handle.alloc_id);
 }
 
 CpuDevice::CpuDevice() {
@@ -33,11 +33,9 @@ RhiResult CpuDevice::allocate_memory(const AllocParams &params,
     }
   }
   *out_devalloc = DeviceAllocation{};
-  out_devalloc->alloc_id = allocations_.size();
+  out_devalloc->alloc_id = add_allocation(info);
   out_devalloc->device = this;
 
-  allocations_.push_back(info);
-
   return RhiResult::success;
 }
 
@@ -60,7 +58,7 @@ uint64_t *CpuDevice::allocate_llvm_runtime_memory_jit(
 
 void CpuDevice::dealloc_memory(DeviceAllocation handle) {
   validate_device_alloc(handle);
-  AllocInfo &info = allocations_[handle.alloc_id];
+  AllocInfo &info = allocation(handle.alloc_id);
   if (info.size == 0) {
     return;
   }
@@ -86,7 +84,7 @@ RhiResult CpuDevice::upload_data(DevicePtr *device_ptr,
       return RhiResult::invalid_usage;
     }
 
-    AllocInfo &info = allocations_[device_ptr[i].alloc_id];
+    AllocInfo &info = allocation(device_ptr[i].alloc_id);
     memcpy((uint8_t *)info.ptr + device_ptr[i].offset, data[i], size[i]);
   }
 
@@ -108,7 +106,7 @@ RhiResult CpuDevice::readback_data(
       return RhiResult::invalid_usage;
     }
 
-    AllocInfo &info = allocations_[device_ptr[i].alloc_id];
+    AllocInfo &info = allocation(device_ptr[i].alloc_id);
     memcpy(data[i], (uint8_t *)info.ptr + device_ptr[i].offset, size[i]);
   }
 
@@ -118,7 +116,7 @@ RhiResult CpuDevice::readback_data(
 RhiResult CpuDevice::map_range(DevicePtr ptr,
                                uint64_t size,
                                void **mapped_ptr) {
-  AllocInfo &info = allocations_[ptr.alloc_id];
+  AllocInfo &info = allocation(ptr.alloc_id);
   if (info.ptr == nullptr) {
     return RhiResult::error;
   }
@@ -127,7 +125,7 @@ RhiResult CpuDevice::map_range(DevicePtr ptr,
 }
 
 RhiResult CpuDevice::map(DeviceAllocation alloc, void **mapped_ptr) {
-  AllocInfo &info = allocations_[alloc.alloc_id];
+  AllocInfo &info = allocation(alloc.alloc_id);
   if (info.ptr == nullptr) {
     return RhiResult::error;
   }
@@ -141,9 +139,9 @@ void CpuDevice::unmap(DeviceAllocation alloc) {
 
 void CpuDevice::memcpy_internal(DevicePtr dst, DevicePtr src, uint64_t size) {
   void *dst_ptr =
-      static_cast<char *>(allocations_[dst.alloc_id].ptr) + dst.offset;
+      static_cast<char *>(allocation(dst.alloc_id).ptr) + dst.offset;
   void *src_ptr =
-      static_cast<char *>(allocations_[src.alloc_id].ptr) + src.offset;
+      static_cast<char *>(allocation(src.alloc_id).ptr) + src.offset;
   std::memcpy(dst_ptr, src_ptr, size);
 }
 
@@ -153,10 +151,8 @@ DeviceAllocation CpuDevice::import_memory(void *ptr, size_t size) {
   info.size = size;
 
   DeviceAllocation alloc;
-  alloc.alloc_id = allocations_.size();
+  alloc.alloc_id = add_allocation(info);
   alloc.device = this;
-
-  allocations_.push_back(info);
   return alloc;
 }
 
@@ -1,5 +1,7 @@
 #pragma once
 
+#include <deque>
+#include <mutex>
 #include <set>
 #include <unordered_map>
 #include <vector>
@@ -132,9 +134,25 @@ class CpuDevice : public LlvmDevice {
   void wait_idle() override { TI_NOT_IMPLEMENTED };
 
  private:
-  std::vector<AllocInfo> allocations_;
+  // Kernels launched from several threads look up allocations while others
+  // are being created. The deque keeps the references stable, the mutex
+  // guards its growth.
+  std::deque<AllocInfo> allocations_;
+  std::mutex allocations_mutex_;
+
+  AllocInfo &allocation(DeviceAllocationId alloc_id) {
+    std::lock_guard<std::mutex> _(allocations_mutex_);
+    return allocations_[alloc_id];
+  }
+
+  DeviceAllocationId add_allocation(const AllocInfo &info) {
+    std::lock_guard<std::mutex> _(allocations_mutex_);
+    allocations_.push_back(info);
+    return allocations_.size() - 1;
+  }
 
   void validate_device_alloc(const DeviceAllocation alloc) {
+    std::lock_guard<std::mutex> _(allocations_mutex_);
     if (allocations_.size() <= alloc.alloc_id) {
       TI_ERROR("invalid DeviceAllocation");
     }
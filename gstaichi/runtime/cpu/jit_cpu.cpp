@@ -6,6 +6,7 @@
 #include "llvm/Analysis/TargetTransformInfo.h"
 #include "llvm/ADT/StringRef.h"
 #include "llvm/ExecutionEngine/ExecutionEngine.h"
+#include "llvm/ExecutionEngine/JITEventListener.h"
 #include "llvm/ExecutionEngine/JITSymbol.h"
 #include "llvm/ExecutionEngine/Orc/Core.h"
 #include "llvm/ExecutionEngine/Orc/CompileOnDemandLayer.h"
@@ -38,6 +39,7 @@
 #include "llvm/Transforms/IPO.h"
 
 #include "llvm/MC/TargetRegistry.h"
+#include "llvm/Object/SymbolSize.h"
 #include "llvm/TargetParser/Host.h"
 
 #endif
@@ -49,6 +51,10 @@
 #include "gstaichi/util/file_sequence_writer.h"
 #include "gstaichi/runtime/llvm/llvm_context.h"
 
+#if defined(__linux__)
+#include <unistd.h>
+#endif
+
 namespace gstaichi::lang {
 
 #ifdef TI_WITH_LLVM
@@ -61,6 +67,81 @@ typedef orc::RTDyldObjectLinkingLayer ObjLayerT;
 #endif
 #endif
 
+#if defined(__linux__)
+// Appends the address range and name of every JIT-compiled function to
+// /tmp/perf-<pid>.map, which perf reads to symbolize JIT code. Kernel tasks
+// compiled with perf_map are labelled with their Python source lines.
+class PerfMapListener : public JITEventListener {
+ public:
+  PerfMapListener() {
+    auto path = fmt::format("/tmp/perf-{}.map", getpid());
+    file_ = std::fopen(path.c_str(), "a");
+    if (!file_) {
+      TI_WARN("Failed to open {}, no perf map will be written", path);
+    }
+  }
+
+  ~PerfMapListener() override {
+    if (file_) {
+      std::fclose(file_);
+    }
+  }
+
+  void add_module_sources(const llvm::Module &module) {
+    std::lock_guard<std::mutex> _(mut_);
+    for (const auto &func : module) {
+      auto attr = func.getFnAttribute("gstaichi-source");
+      if (attr.isStringAttribute()) {
+        sources_[func.getName().str()] = attr.getValueAsString().str();
+      }
+    }
+  }
+
+  void notifyObjectLoaded(ObjectKey key,
+                          const object::ObjectFile &obj,
+                          const RuntimeDyld::LoadedObjectInfo &info) override {
+    if (!file_) {
+      return;
+    }
+    // Symbol addresses of the debug object are the final load addresses
+    auto debug_obj_owner = info.getObjectForDebug(obj);
+    const auto *debug_obj = debug_obj_owner.getBinary();
+    if (!debug_obj) {
+      return;
+    }
+    std::lock_guard<std::mutex> _(mut_);
+    for (const auto &[sym, size] : object::computeSymbolSizes(*debug_obj)) {
+      auto type = sym.getType();
+      if (!type) {
+        consumeError(type.takeError());
+        continue;
+      }
+      if (*type != object::SymbolRef::ST_Function || size == 0) {
+        continue;
+      }
+      auto name = sym.getName();
+      auto address = sym.getAddress();
+      if (!name || !address) {
+        consumeError(name.takeError());
+        consumeError(address.takeError());
+        continue;
+      }
+      auto label = name->str();
+      if (auto it = sources_.find(label); it != sources_.end()) {
+        label += fmt::format(" [{}]", it->second);
+      }
+      fmt::print(file_, "{:x} {:x} {}\n", *address, size, label);
+    }
+    std::fflush(file_);
+  }
+
+ private:
+  std::FILE *file_{nullptr};
+  std::mutex mut_;
+  std::unordered_map<std::string, std::string> sources_;
+};
+#endif
+
 std::pair<JITTargetMachineBuilder, llvm::DataLayout> get_host_target_info() {
   auto expected_jtmb = JITTargetMachineBuilder::detectHost();
   if (!expected_jtmb)
@@ -95,6 +176,10 @@ class JITModuleCPU : public JITModule {
 
 class JITSessionCPU : public JITSession {
  private:
+#if defined(__linux__)
+  // Declared first so that it outlives the object layer it listens to
+  std::unique_ptr<PerfMapListener> perf_map_listener_;
+#endif
   ExecutionSession es_;
   ObjLayerT object_layer_;
   IRCompileLayer compile_layer_;
@@ -144,6 +229,12 @@ class JITSessionCPU : public JITSession {
       object_layer_.setOverrideObjectFlagsWithResponsibilityFlags(true);
       object_layer_.setAutoClaimResponsibilityForObjectSymbols(true);
     }
+#endif
+#if defined(__linux__)
+    if (config.perf_map) {
+      perf_map_listener_ = std::make_unique<PerfMapListener>();
+      object_layer_.registerJITEventListener(*perf_map_listener_);
+    }
 #endif
   }
 
@@ -169,6 +260,11 @@ class JITSessionCPU : public JITSession {
     dylib.addGenerator(
         cantFail(llvm::orc::DynamicLibrarySearchGenerator::GetForCurrentProcess(
             dl_.getGlobalPrefix())));
+#if defined(__linux__)
+    if (perf_map_listener_) {
+      perf_map_listener_->add_module_sources(*M);
+    }
+#endif
     auto *thread_safe_context =
         this->tlctx_->get_this_thread_thread_safe_context();
     cantFail(compile_layer_.add(
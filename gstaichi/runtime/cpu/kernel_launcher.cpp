@@ -1,16 +1,107 @@
 #include "gstaichi/runtime/cpu/kernel_launcher.h"
+
+#include <algorithm>
+
 #include "gstaichi/rhi/arch.h"
+#include "gstaichi/system/threading.h"
+#include "gstaichi/system/timeline.h"
 
 namespace gstaichi::lang {
 namespace cpu {
 
+std::unique_ptr<char[]> KernelLauncher::acquire_temporaries() {
+  std::lock_guard<std::mutex> _(temporaries_mutex_);
+  if (free_temporaries_.empty()) {
+    return std::make_unique<char[]>(gstaichi_global_tmp_buffer_size);
+  }
+  auto temporaries = std::move(free_temporaries_.back());
+  free_temporaries_.pop_back();
+  return temporaries;
+}
+
+void KernelLauncher::release_temporaries(std::unique_ptr<char[]> temporaries) {
+  std::lock_guard<std::mutex> _(temporaries_mutex_);
+  free_temporaries_.push_back(std::move(temporaries));
+}
+
+namespace {
+
+// The dependencies between tasks are analyzed per array argument, which does
+// not hold if the same array is passed twice
+bool arrays_alias(
+    const std::vector<std::pair<int, Callable::Parameter>> &parameters,
+    LaunchContextBuilder &ctx) {
+  std::vector<void *> ptrs;
+  for (const auto &[arg_id, parameter] : parameters) {
+    if (!parameter.is_array) {
+      continue;
+    }
+    for (int pos : {TypeFactory::DATA_PTR_POS_IN_NDARRAY,
+                    TypeFactory::GRAD_PTR_POS_IN_NDARRAY}) {
+      void *ptr = ctx.array_ptrs[{arg_id, pos}];
+      if (ptr == nullptr) {
+        continue;
+      }
+      if (std::find(ptrs.begin(), ptrs.end(), ptr) != ptrs.end()) {
+        return true;
+      }
+      ptrs.push_back(ptr);
+    }
+  }
+  return false;
+}
+
+}  // namespace
+
+void KernelLauncher::launch_task_groups(const Context &launcher_ctx,
+                                        LaunchContextBuilder &ctx) {
+  auto *thread_pool = get_runtime_executor()->get_thread_pool();
+  for (auto [begin, end] : launcher_ctx.task_groups) {
+    if (end - begin == 1) {
+      launcher_ctx.task_funcs[begin](&ctx.get_context());
+      continue;
+    }
+    // The loops of the tasks find the pool busy and run on the thread of
+    // their task, which also indexes the random states and counters
+    thread_pool->run(
+        end - begin, end - begin,
+        [&](int thread_id, int i) {
+          RuntimeContext task_context = ctx.get_context();
+          task_context.cpu_thread_id = thread_id;
+          launcher_ctx.task_funcs[begin + i](&task_context);
+        },
+        LoopSchedule::dynamic);
+  }
+}
+
 void KernelLauncher::launch_llvm_kernel(Handle handle,
                                         LaunchContextBuilder &ctx) {
-  TI_ASSERT(handle.get_launch_id() < contexts_.size());
-  auto launcher_ctx = contexts_[handle.get_launch_id()];
+  const Context *context;
+  {
+    std::lock_guard<std::mutex> _(contexts_mutex_);
+    TI_ASSERT(handle.get_launch_id() < contexts_.size());
+    context = &contexts_[handle.get_launch_id()];
+  }
+  const auto &launcher_ctx = *context;
   auto *executor = get_runtime_executor();
+  std::unique_lock<std::mutex> exclusive_lock(exclusive_launch_mutex_,
+                                              std::defer_lock);
+  if (launcher_ctx.exclusive || executor->get_config().kernel_profiler) {
+    exclusive_lock.lock();
+  }
 
   ctx.get_context().runtime = executor->get_llvm_runtime();
+  // Only one launch at a time uses the global temporaries of the runtime
+  std::unique_ptr<char[]> temporaries;
+  bool uses_runtime_temporaries =
+      !runtime_temporaries_busy_.exchange(true, std::memory_order_acquire);
+  if (!uses_runtime_temporaries) {
+    temporaries = acquire_temporaries();
+  }
+  ctx.get_context().temporaries = temporaries.get();
+  // Serial tasks run on the launching thread, give them a valid thread id for
+  // the per-thread counters of the kernel profiler.
+  ctx.get_context().cpu_thread_id = 0;
   // For gstaichi ndarrays, context.array_ptrs saves pointer to its
   // |DeviceAllocation|, CPU backend actually want to use the raw ptr here.
   const auto &parameters = *launcher_ctx.parameters;
@@ -41,8 +132,31 @@ void KernelLauncher::launch_llvm_kernel(Handle handle,
       }
     }
   }
-  for (auto task : launcher_ctx.task_funcs) {
-    task(&ctx.get_context());
+  if (Timelines::get_instance().get_enabled()) {
+    // Label every offloaded task, and the thread pool spans it spawns, so
+    // that the trace shows where the kernel's time goes.
+    auto *thread_pool = executor->get_thread_pool();
+    for (int i = 0; i < (int)launcher_ctx.task_funcs.size(); i++) {
+      TI_TIMELINE(launcher_ctx.task_names[i]);
+      thread_pool->timeline_label = launcher_ctx.task_names[i].c_str();
+      launcher_ctx.task_funcs[i](&ctx.get_context());
+    }
+    thread_pool->timeline_label = "parallel_for";
+  } else if (executor->get_config().cpu_concurrent_tasks &&
+             !executor->get_config().kernel_profiler &&
+             launcher_ctx.task_groups.size() < launcher_ctx.task_funcs.size() &&
+             !arrays_alias(parameters, ctx)) {
+    launch_task_groups(launcher_ctx, ctx);
+  } else {
+    for (auto task : launcher_ctx.task_funcs) {
+      task(&ctx.get_context());
+    }
+  }
+  ctx.get_context().temporaries = nullptr;
+  if (uses_runtime_temporaries) {
+    runtime_temporaries_busy_.store(false, std::memory_order_release);
+  } else {
+    release_temporaries(std::move(temporaries));
   }
 }
 
@@ -50,6 +164,7 @@ KernelLauncher::Handle KernelLauncher::register_llvm_kernel(
     const LLVM::CompiledKernelData &compiled) {
   TI_ASSERT(arch_is_cpu(compiled.arch()));
 
+  std::lock_guard<std::mutex> _(contexts_mutex_);
   if (!compiled.get_handle()) {
     auto handle = make_handle();
     auto index = handle.get_launch_id();
@@ -64,17 +179,30 @@ KernelLauncher::Handle KernelLauncher::register_llvm_kernel(
     // Construct task_funcs
     using TaskFunc = int32 (*)(void *);
     std::vector<TaskFunc> task_funcs;
+    std::vector<std::string> task_names;
+    std::vector<std::pair<int, int>> task_groups;
     task_funcs.reserve(data.tasks.size());
+    task_names.reserve(data.tasks.size());
     for (auto &task : data.tasks) {
+      if (task.concurrent_with_previous && !task_groups.empty()) {
+        task_groups.back().second++;
+      } else {
+        int index = task_funcs.size();
+        task_groups.emplace_back(index, index + 1);
+      }
       auto *func_ptr = jit_module->lookup_function(task.name);
       TI_ASSERT_INFO(func_ptr, "Offloaded datum function {} not found",
                      task.name);
       task_funcs.push_back((TaskFunc)(func_ptr));
+      task_names.push_back(task.name);
+      ctx.exclusive |= task.uses_shared_runtime_state;
     }
 
     // Populate ctx
     ctx.parameters = &compiled.get_internal_data().args;
     ctx.task_funcs = std::move(task_funcs);
+    ctx.task_names = std::move(task_names);
+    ctx.task_groups = std::move(task_groups);
 
     compiled.set_handle(handle);
   }
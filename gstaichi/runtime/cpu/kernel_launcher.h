@@ -1,5 +1,10 @@
 #pragma once
 
+#include <atomic>
+#include <deque>
+#include <memory>
+#include <mutex>
+
 #include "gstaichi/codegen/llvm/compiled_kernel_data.h"
 #include "gstaichi/runtime/llvm/kernel_launcher.h"
 
@@ -12,6 +17,11 @@ class KernelLauncher : public LLVM::KernelLauncher {
   struct Context {
     using TaskFunc = int32 (*)(void *);
     std::vector<TaskFunc> task_funcs;
+    std::vector<std::string> task_names;
+    // Ranges of consecutive tasks independent of each other
+    std::vector<std::pair<int, int>> task_groups;
+    // Launched one at a time, see OffloadedTask::uses_shared_runtime_state
+    bool exclusive{false};
     const std::vector<std::pair<int, Callable::Parameter>> *parameters;
   };
 
@@ -23,7 +33,30 @@ class KernelLauncher : public LLVM::KernelLauncher {
       const LLVM::CompiledKernelData &compiled) override;
 
  private:
-  std::vector<Context> contexts_;
+  // Kernels may be launched from several threads at once, with the GIL
+  // released. The deque keeps the contexts in place while others are
+  // registered, the mutex guards its growth.
+  std::deque<Context> contexts_;
+  std::mutex contexts_mutex_;
+
+  // Launches concurrent with the one using the runtime's global temporaries
+  // take a private buffer from this pool
+  std::atomic<bool> runtime_temporaries_busy_{false};
+  std::vector<std::unique_ptr<char[]>> free_temporaries_;
+  std::mutex temporaries_mutex_;
+
+  // Held by the launches of exclusive kernels, and by every launch while the
+  // kernel profiler, whose records and counters are shared, is enabled. Only
+  // the kernels made of range-for loops and serial code overlap other launches.
+  std::mutex exclusive_launch_mutex_;
+
+  // Runs the tasks of each group concurrently on the thread pool, each on a
+  // single thread
+  void launch_task_groups(const Context &launcher_ctx,
+                          LaunchContextBuilder &ctx);
+
+  std::unique_ptr<char[]> acquire_temporaries();
+  void release_temporaries(std::unique_ptr<char[]> temporaries);
 };
 
 }  // namespace cpu
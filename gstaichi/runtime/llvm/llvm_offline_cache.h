@@ -77,8 +77,10 @@ struct LlvmOfflineCache {
     int root_id{0};
     size_t root_size{0};
     std::vector<SNodeCacheData> snode_metas;
+    // Offsets of the root's children in the root buffer, i.e. of its arrays
+    std::vector<size_t> root_child_offsets;
 
-    TI_IO_DEF(tree_id, root_id, root_size, snode_metas);
+    TI_IO_DEF(tree_id, root_id, root_size, snode_metas, root_child_offsets);
 
     // TODO(zhanlue): refactor llvm::Modules
     //
@@ -8,6 +8,7 @@
 #include "gstaichi/rhi/cuda/cuda_driver.h"
 #include "gstaichi/rhi/llvm/device_memory_pool.h"
 #include "gstaichi/program/program_impl.h"
+#include "gstaichi/system/memory_placement.h"
 
 #if defined(TI_WITH_CUDA)
 #include "gstaichi/rhi/cuda/cuda_context.h"
@@ -80,12 +81,20 @@ LlvmRuntimeExecutor::LlvmRuntimeExecutor(CompileConfig &config,
   }
 
   snode_tree_buffer_manager_ = std::make_unique<SNodeTreeBufferManager>(this);
-  thread_pool_ = std::make_unique<ThreadPool>(config.cpu_max_num_threads);
+  thread_pool_ = std::make_unique<ThreadPool>(
+      config.cpu_max_num_threads, config.cpu_thread_pool_spin_us,
+      parse_cpu_list(config.cpu_thread_affinity));
 
   llvm_runtime_ = nullptr;
 
   if (arch_is_cpu(config.arch)) {
     config.max_block_dim = 1024;
+    if (config.cpu_serial_loop_threshold < 0) {
+      thread_pool_->serial_loop_threshold =
+          thread_pool_->calibrate_serial_loop_threshold();
+    } else {
+      thread_pool_->serial_loop_threshold = config.cpu_serial_loop_threshold;
+    }
     device_ = std::make_shared<cpu::CpuDevice>();
 
   }
@@ -427,7 +436,10 @@ void LlvmRuntimeExecutor::initialize_llvm_runtime_snodes(
     TI_NOT_IMPLEMENTED;
 #endif
   } else {
-    std::memset(root_buffer, 0, rounded_size);
+    // The root buffer pages are fresh, zeroing them decides their NUMA node
+    zero_placed(root_buffer, rounded_size, field_cache_data.root_child_offsets,
+                memory_placement_from_name(config_.cpu_memory_placement),
+                thread_pool_.get());
   }
 
   DeviceAllocation alloc =
@@ -514,6 +526,16 @@ void LlvmRuntimeExecutor::fill_ndarray(const DeviceAllocation &alloc,
   }
 }
 
+void LlvmRuntimeExecutor::place_memory_on_device(const DeviceAllocation &alloc,
+                                                 std::size_t size) {
+  auto placement = memory_placement_from_name(config_.cpu_memory_placement);
+  if (!arch_is_cpu(config_.arch) || placement == MemoryPlacement::os_default) {
+    return;
+  }
+  zero_placed(get_device_alloc_info_ptr(alloc), size, {}, placement,
+              thread_pool_.get());
+}
+
 uint64_t *LlvmRuntimeExecutor::get_device_alloc_info_ptr(
     const DeviceAllocation &alloc) {
   if (config_.arch == Arch::cuda) {
@@ -748,6 +770,12 @@ void LlvmRuntimeExecutor::materialize_runtime(KernelProfilerBase *profiler,
     runtime_jit->call<void *, void *>(
         "LLVMRuntime_set_profiler_stop", llvm_runtime_,
         (void *)&KernelProfilerBase::profiler_stop);
+    if (config_.kernel_profiler_memory_traffic) {
+      runtime_jit->call<void *, void *>(
+          "LLVMRuntime_set_memory_traffic_counters", llvm_runtime_,
+          profiler->enable_memory_traffic_counters(
+              config_.cpu_max_num_threads));
+    }
   }
 }
 
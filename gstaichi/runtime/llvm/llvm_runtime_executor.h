@@ -83,6 +83,10 @@ class LlvmRuntimeExecutor {
     return use_device_memory_pool_;
   }
 
+  ThreadPool *get_thread_pool() {
+    return thread_pool_.get();
+  }
+
  private:
   /* ----------------------- */
   /* ------ Allocation ----- */
@@ -104,6 +108,10 @@ class LlvmRuntimeExecutor {
                     std::size_t size,
                     uint32_t data);
 
+  // Zeroes a fresh CPU allocation so that its pages follow
+  // CompileConfig::cpu_memory_placement, a no-op with the default placement
+  void place_memory_on_device(const DeviceAllocation &alloc, std::size_t size);
+
   void *preallocate_memory(std::size_t prealloc_size,
                            DeviceAllocationUnique &devalloc);
   void preallocate_runtime_memory();
@@ -17,7 +17,10 @@ void Bitmasked_activate(Ptr meta, Ptr node, int i) {
   auto num_elements = Bitmasked_get_num_elements(meta, node);
   auto data_section_size = element_size * num_elements;
   auto mask_begin = (u32 *)(node + data_section_size);
-  atomic_or_u32(&mask_begin[i / 32], 1UL << (i % 32));
+  u32 bit = 1UL << (i % 32);
+  if (!(atomic_or_u32(&mask_begin[i / 32], bit) & bit)) {
+    mark_structure_changed(smeta->context->runtime, smeta->snode_id);
+  }
 }
 
 void Bitmasked_deactivate(Ptr meta, Ptr node, int i) {
@@ -26,7 +29,10 @@ void Bitmasked_deactivate(Ptr meta, Ptr node, int i) {
   auto num_elements = Bitmasked_get_num_elements(meta, node);
   auto data_section_size = element_size * num_elements;
   auto mask_begin = (u32 *)(node + data_section_size);
-  atomic_and_u32(&mask_begin[i / 32], ~(1UL << (i % 32)));
+  u32 bit = 1UL << (i % 32);
+  if (atomic_and_u32(&mask_begin[i / 32], ~bit) & bit) {
+    mark_structure_changed(smeta->context->runtime, smeta->snode_id);
+  }
 }
 
 u1 Bitmasked_is_active(Ptr meta, Ptr node, int i) {
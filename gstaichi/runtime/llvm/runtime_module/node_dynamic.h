@@ -18,7 +18,9 @@ void Dynamic_activate(Ptr meta_, Ptr node_, int i) {
   auto node = (DynamicNode *)(node_);
   // We need to not only update node->n, but also make sure the chunk containing
   // element i is allocated.
-  atomic_max_i32(&node->n, i + 1);
+  if (atomic_max_i32(&node->n, i + 1) < i + 1) {
+    mark_structure_changed(meta->context->runtime, meta->snode_id);
+  }
   int chunk_start = 0;
   auto p_chunk_ptr = &node->ptr;
   auto chunk_size = meta->chunk_size;
@@ -54,6 +56,7 @@ void Dynamic_deactivate(Ptr meta_, Ptr node_) {
         p_chunk_ptr = (Ptr *)*p_chunk_ptr;
       }
       node->ptr = nullptr;
+      mark_structure_changed(rt, meta->snode_id);
     });
   }
 }
@@ -64,6 +67,7 @@ Ptr Dynamic_allocate(Ptr meta_, Ptr node_, i32 *len) {
   auto chunk_size = meta->chunk_size;
   auto i = atomic_add_i32(&node->n, 1);
   *len = i;
+  mark_structure_changed(meta->context->runtime, meta->snode_id);
   int chunk_start = 0;
   auto p_chunk_ptr = &node->ptr;
   while (true) {
@@ -57,6 +57,7 @@ void Pointer_activate(Ptr meta_, Ptr node, int i) {
             // TODO: Not sure if we really need atomic_exchange here,
             // just to be safe.
             atomic_exchange_u64((u64 *)data_ptr, allocated);
+            mark_structure_changed(rt, meta->snode_id);
           },
           [&]() { return *data_ptr == nullptr; });
     }
@@ -76,6 +77,7 @@ void Pointer_deactivate(Ptr meta, Ptr node, int i) {
         auto alloc = rt->node_allocators[smeta->snode_id];
         alloc->recycle(data_ptr);
         data_ptr = nullptr;
+        mark_structure_changed(rt, smeta->snode_id);
       }
     });
   }
@@ -41,10 +41,17 @@ using host_vsnprintf_type = int (*)(char *,
                                     std::va_list);
 using host_allocator_type = void *(*)(void *, std::size_t, std::size_t);
 using RangeForTaskFunc = void(RuntimeContext *, const char *tls, int i);
+// Runs the iterations [begin, end) of a range-for
+using RangeForBlockTaskFunc = void(RuntimeContext *,
+                                   const char *tls,
+                                   int begin,
+                                   int end);
 using MeshForTaskFunc = void(RuntimeContext *, const char *tls, uint32_t i);
 using parallel_for_type = void (*)(void *thread_pool,
                                    int splits,
                                    int num_desired_threads,
+                                   int schedule,
+                                   int64_t num_iterations,
                                    void *context,
                                    void (*func)(void *, int thread_id, int i));
 
@@ -364,6 +371,7 @@ STRUCT_FIELD_ARRAY(PhysicalCoordinates, val);
 #include "gstaichi/program/context.h"
 
 STRUCT_FIELD(RuntimeContext, runtime);
+STRUCT_FIELD(RuntimeContext, cpu_thread_id);
 STRUCT_FIELD(RuntimeContext, result_buffer)
 
 #include "gstaichi/runtime/llvm/runtime_module/atomic.h"
@@ -639,6 +647,16 @@ struct LLVMRuntime {
   ListManager *element_lists[gstaichi_max_num_snodes];
   NodeManager *node_allocators[gstaichi_max_num_snodes];
   Ptr ambient_elements[gstaichi_max_num_snodes];
+  // Set when cells of the SNode are activated or deactivated, see
+  // mark_structure_changed. clear_list folds it into the structure version.
+  i32 structure_changed[gstaichi_max_num_snodes];
+  i64 structure_versions[gstaichi_max_num_snodes];
+  // The stamp of the structure the element list was built from, see
+  // element_list_stamp. 0 if it was never built.
+  i64 element_list_stamps[gstaichi_max_num_snodes];
+  // Whether the pending listgen must rebuild the element list, decided by
+  // clear_list
+  i32 element_list_outdated[gstaichi_max_num_snodes];
   Ptr temporaries;
   RandState *rand_states;
 
@@ -655,6 +673,9 @@ struct LLVMRuntime {
   Ptr profiler;
   void (*profiler_start)(Ptr, Ptr);
   void (*profiler_stop)(Ptr);
+  // See MemoryTrafficCounter. nullptr unless the memory traffic mode of the
+  // CPU kernel profiler is on.
+  i64 *memory_traffic_counters;
 
   char error_message_template[gstaichi_error_message_max_length];
   uint64 error_message_arguments[gstaichi_error_message_max_num_arguments];
@@ -696,6 +717,7 @@ STRUCT_FIELD(LLVMRuntime, host_vsnprintf);
 STRUCT_FIELD(LLVMRuntime, profiler);
 STRUCT_FIELD(LLVMRuntime, profiler_start);
 STRUCT_FIELD(LLVMRuntime, profiler_stop);
+STRUCT_FIELD(LLVMRuntime, memory_traffic_counters);
 
 // NodeManager of node S (hash, pointer) managers the memory allocation of S_ch
 // It makes use of three ListManagers.
@@ -736,6 +758,10 @@ struct NodeManager {
   }
 
   Ptr allocate() {
+    if (runtime->memory_traffic_counters) {
+      atomic_add_i64(
+          &runtime->memory_traffic_counters[kMemoryTrafficNodeAllocations], 1);
+    }
     int old_cursor = atomic_add_i32(&free_list_used, 1);
     i32 l;
     if (old_cursor >= free_list->size()) {
@@ -753,6 +779,11 @@ struct NodeManager {
   }
 
   void recycle(Ptr ptr) {
+    if (runtime->memory_traffic_counters) {
+      atomic_add_i64(
+          &runtime->memory_traffic_counters[kMemoryTrafficNodeDeactivations],
+          1);
+    }
     auto index = locate(ptr);
     recycled_list->append(&index);
   }
@@ -792,8 +823,19 @@ void LLVMRuntime_profiler_stop(LLVMRuntime *runtime) {
   runtime->profiler_stop(runtime->profiler);
 }
 
-Ptr get_temporary_pointer(LLVMRuntime *runtime, u64 offset) {
-  return runtime->temporaries + offset;
+void RuntimeContext_count_memory_traffic(RuntimeContext *context,
+                                         i32 counter,
+                                         i64 bytes) {
+  auto block = context->runtime->memory_traffic_counters +
+               (context->cpu_thread_id + 1) * kMemoryTrafficCounterBlockSize;
+  block[counter] += bytes;
+}
+
+Ptr get_temporary_pointer(RuntimeContext *context, u64 offset) {
+  if (context->temporaries) {
+    return (Ptr)context->temporaries + offset;
+  }
+  return context->runtime->temporaries + offset;
 }
 
 void runtime_retrieve_and_reset_error_code(LLVMRuntime *runtime) {
@@ -1020,6 +1062,13 @@ void runtime_initialize(
   runtime->memory_pool = memory_pool;
 
   runtime->total_requested_memory = 0;
+  runtime->memory_traffic_counters = nullptr;
+  for (int i = 0; i < gstaichi_max_num_snodes; i++) {
+    runtime->structure_changed[i] = 0;
+    runtime->structure_versions[i] = 0;
+    runtime->element_list_stamps[i] = 0;
+    runtime->element_list_outdated[i] = 0;
+  }
 
   runtime->temporaries = (Ptr)runtime->allocate_aligned(
       runtime->runtime_objects_chunk, gstaichi_global_tmp_buffer_size,
@@ -1076,6 +1125,7 @@ void runtime_initialize_snodes(LLVMRuntime *runtime,
     // TODO: some SNodes do not actually need an element list.
     runtime->element_lists[i] =
         runtime->create<ListManager>(runtime, sizeof(Element), 1024 * 64);
+    runtime->element_list_stamps[i] = 0;
   }
   Element elem;
   elem.loop_bounds[0] = 0;
@@ -1361,9 +1411,43 @@ DEFINE_REDUCTION(xor, i32);
 
 // "Element", "component" are different concepts
 
+// Bumps the structure version of |snode_id| if its cells changed since the
+// last time. The flag is reset first, so that a change made meanwhile is left
+// for the next call.
+void update_structure_version(LLVMRuntime *runtime, int snode_id) {
+  if (runtime->structure_changed[snode_id]) {
+    atomic_exchange_i32(&runtime->structure_changed[snode_id], 0);
+    runtime->structure_versions[snode_id]++;
+  }
+}
+
+// The element list of a SNode only depends on the parent list and on which
+// cells of the parent and of the SNode itself are active. Its stamp grows
+// whenever the stamp of the parent list or the structure version of the parent
+// or of the SNode grows, and is never 0.
+i64 element_list_stamp(LLVMRuntime *runtime,
+                       StructMeta *parent,
+                       StructMeta *child) {
+  update_structure_version(runtime, parent->snode_id);
+  update_structure_version(runtime, child->snode_id);
+  return runtime->element_list_stamps[parent->snode_id] +
+         runtime->structure_versions[parent->snode_id] +
+         runtime->structure_versions[child->snode_id] + 1;
+}
+
+// Runs serially right before the listgen of |child|. The list is kept, and the
+// listgen skipped, when no cell was activated or deactivated on the path to
+// |child| since the list was built.
 void clear_list(LLVMRuntime *runtime, StructMeta *parent, StructMeta *child) {
+  auto stamp = element_list_stamp(runtime, parent, child);
+  if (runtime->element_list_stamps[child->snode_id] == stamp) {
+    runtime->element_list_outdated[child->snode_id] = 0;
+    return;
+  }
   auto child_list = runtime->element_lists[child->snode_id];
   child_list->clear();
+  runtime->element_list_stamps[child->snode_id] = stamp;
+  runtime->element_list_outdated[child->snode_id] = 1;
 }
 
 /*
@@ -1376,6 +1460,9 @@ void clear_list(LLVMRuntime *runtime, StructMeta *parent, StructMeta *child) {
 void element_listgen_root(LLVMRuntime *runtime,
                           StructMeta *parent,
                           StructMeta *child) {
+  if (!runtime->element_list_outdated[child->snode_id]) {
+    return;
+  }
   // If there's just one element in the parent list, we need to use the blocks
   // (instead of threads) to split the parent container
   auto parent_list = runtime->element_lists[parent->snode_id];
@@ -1422,9 +1509,139 @@ void element_listgen_root(LLVMRuntime *runtime,
   }
 }
 
+#if !(ARCH_cuda || ARCH_amdgpu)
+// On CPU, the parent elements are split into contiguous parts processed by the
+// thread pool. A first pass counts the child elements of each part, and a
+// second pass writes them at the offsets given by the prefix sum of the
+// counts. The child list has the same order as with a serial listgen.
+constexpr int cpu_listgen_max_parts = 256;
+
+struct cpu_listgen_context {
+  StructMeta *parent;
+  StructMeta *child;
+  ListManager *parent_list;
+  ListManager *child_list;
+  int num_parent_elements;
+  int num_parts;
+  // Child elements of each part, then the index of their first element
+  i32 offsets[cpu_listgen_max_parts];
+};
+
+// Writes the child elements of parent elements [begin, end) to |child_list|
+// from index |offset| on, or only counts them when |fill| is false. Returns the
+// number of child elements.
+i32 cpu_listgen_part(cpu_listgen_context *ctx,
+                     int begin,
+                     int end,
+                     i32 offset,
+                     bool fill) {
+  auto parent = ctx->parent;
+  auto child = ctx->child;
+  // Cache the func pointers here for better compiler optimization
+  auto parent_refine_coordinates = parent->refine_coordinates;
+  auto parent_is_active = parent->is_active;
+  auto parent_lookup_element = parent->lookup_element;
+  auto child_get_num_elements = child->get_num_elements;
+  auto child_from_parent_element = child->from_parent_element;
+  i32 count = 0;
+  for (int i = begin; i < end; i++) {
+    auto element = ctx->parent_list->get<Element>(i);
+    for (int j = element.loop_bounds[0]; j < element.loop_bounds[1]; j++) {
+      if (!parent_is_active((Ptr)parent, element.element, j)) {
+        continue;
+      }
+      auto ch_element = parent_lookup_element((Ptr)parent, element.element, j);
+      ch_element = child_from_parent_element((Ptr)ch_element);
+      auto ch_num_elements = child_get_num_elements((Ptr)child, ch_element);
+      auto ch_element_size =
+          std::min(ch_num_elements, gstaichi_listgen_max_element_size);
+      if (!fill) {
+        count += (ch_num_elements + ch_element_size - 1) / ch_element_size;
+        continue;
+      }
+      PhysicalCoordinates refined_coord;
+      parent_refine_coordinates(&element.pcoord, &refined_coord, j);
+      for (int ch_lower = 0; ch_lower < ch_num_elements;
+           ch_lower += ch_element_size) {
+        auto &elem = ctx->child_list->get<Element>(offset + count);
+        elem.element = ch_element;
+        elem.loop_bounds[0] = ch_lower;
+        elem.loop_bounds[1] =
+            std::min(ch_lower + ch_element_size, ch_num_elements);
+        elem.pcoord = refined_coord;
+        count++;
+      }
+    }
+  }
+  return count;
+}
+
+void cpu_listgen_count_task(void *ctx_, int thread_id, int part) {
+  auto ctx = (cpu_listgen_context *)ctx_;
+  int n = ctx->num_parent_elements;
+  ctx->offsets[part] =
+      cpu_listgen_part(ctx, (i64)n * part / ctx->num_parts,
+                       (i64)n * (part + 1) / ctx->num_parts, 0, false);
+}
+
+void cpu_listgen_fill_task(void *ctx_, int thread_id, int part) {
+  auto ctx = (cpu_listgen_context *)ctx_;
+  int n = ctx->num_parent_elements;
+  cpu_listgen_part(ctx, (i64)n * part / ctx->num_parts,
+                   (i64)n * (part + 1) / ctx->num_parts, ctx->offsets[part],
+                   true);
+}
+
+void cpu_element_listgen_nonroot(LLVMRuntime *runtime,
+                                 StructMeta *parent,
+                                 StructMeta *child) {
+  cpu_listgen_context ctx;
+  ctx.parent = parent;
+  ctx.child = child;
+  ctx.parent_list = runtime->element_lists[parent->snode_id];
+  ctx.child_list = runtime->element_lists[child->snode_id];
+  ctx.num_parent_elements = ctx.parent_list->size();
+  ctx.num_parts = std::min(ctx.num_parent_elements, cpu_listgen_max_parts);
+  if (ctx.num_parts == 0) {
+    return;
+  }
+  // Each parent element spans at most gstaichi_listgen_max_element_size cells
+  i64 num_iterations =
+      (i64)ctx.num_parent_elements * gstaichi_listgen_max_element_size;
+  runtime->parallel_for(runtime->thread_pool, ctx.num_parts, ctx.num_parts,
+                        /*schedule=automatic*/ 0, num_iterations, &ctx,
+                        cpu_listgen_count_task);
+  i32 offset = ctx.child_list->size();
+  for (int part = 0; part < ctx.num_parts; part++) {
+    auto count = ctx.offsets[part];
+    ctx.offsets[part] = offset;
+    offset += count;
+  }
+  if (offset == ctx.child_list->size()) {
+    return;
+  }
+  // Allocate the chunks up front, the parts then write without locking
+  auto log2chunk = ctx.child_list->log2chunk_num_elements;
+  for (int chunk = ctx.child_list->size() >> log2chunk;
+       chunk <= ((offset - 1) >> log2chunk); chunk++) {
+    ctx.child_list->touch_chunk(chunk);
+  }
+  runtime->parallel_for(runtime->thread_pool, ctx.num_parts, ctx.num_parts,
+                        /*schedule=automatic*/ 0, num_iterations, &ctx,
+                        cpu_listgen_fill_task);
+  ctx.child_list->resize(offset);
+}
+#endif
+
 void element_listgen_nonroot(LLVMRuntime *runtime,
                              StructMeta *parent,
                              StructMeta *child) {
+  if (!runtime->element_list_outdated[child->snode_id]) {
+    return;
+  }
+#if !(ARCH_cuda || ARCH_amdgpu)
+  cpu_element_listgen_nonroot(runtime, parent, child);
+#else
   auto parent_list = runtime->element_lists[parent->snode_id];
   int num_parent_elements = parent_list->size();
   auto child_list = runtime->element_lists[child->snode_id];
@@ -1434,19 +1651,12 @@ void element_listgen_nonroot(LLVMRuntime *runtime,
   auto parent_lookup_element = parent->lookup_element;
   auto child_get_num_elements = child->get_num_elements;
   auto child_from_parent_element = child->from_parent_element;
-#if ARCH_cuda || ARCH_amdgpu
   // Each block processes a slice of a parent container
   int i_start = block_idx();
   int i_step = grid_dim();
   // Each thread processes an element of the parent container
   int j_start = thread_idx();
   int j_step = block_dim();
-#else
-  int i_start = 0;
-  int i_step = 1;
-  int j_start = 0;
-  int j_step = 1;
-#endif
   for (int i = i_start; i < num_parent_elements; i += i_step) {
     auto element = parent_list->get<Element>(i);
     int j_lower = element.loop_bounds[0] + j_start;
@@ -1474,6 +1684,7 @@ void element_listgen_nonroot(LLVMRuntime *runtime,
       }
     }
   }
+#endif
 }
 
 using BlockTask = void(RuntimeContext *, char *, Element *, int, int);
@@ -1522,7 +1733,9 @@ void parallel_struct_for(RuntimeContext *context,
                          int element_split,
                          BlockTask *task,
                          std::size_t tls_buffer_size,
-                         int num_threads) {
+                         int num_threads,
+                         int schedule,
+                         int serial_fallback) {
   auto list = (context->runtime)->element_lists[snode_id];
   auto list_tail = list->size();
 #if ARCH_cuda || ARCH_amdgpu
@@ -1555,8 +1768,11 @@ void parallel_struct_for(RuntimeContext *context,
   ctx.element_split = element_split;
   ctx.tls_buffer_size = tls_buffer_size;
   auto runtime = context->runtime;
+  // The number of listed elements stands for the trip count
+  i64 num_iterations = serial_fallback ? (i64)list_tail * element_size : -1;
   runtime->parallel_for(runtime->thread_pool, list_tail * element_split,
-                        num_threads, &ctx, cpu_struct_for_block_helper);
+                        num_threads, schedule, num_iterations, &ctx,
+                        cpu_struct_for_block_helper);
 #endif
 }
 
@@ -1569,6 +1785,8 @@ struct range_task_helper_context {
   RuntimeContext *context;
   range_for_xlogue prologue{nullptr};
   RangeForTaskFunc *body{nullptr};
+  // Replaces |body| when the loop over a block is compiled with the body
+  RangeForBlockTaskFunc *block_body{nullptr};
   range_for_xlogue epilogue{nullptr};
   std::size_t tls_size{1};
   int begin;
@@ -1591,7 +1809,11 @@ void cpu_parallel_range_for_task(void *range_context,
 
   RuntimeContext this_thread_context = *ctx.context;
   this_thread_context.cpu_thread_id = thread_id;
-  if (ctx.step == 1) {
+  if (ctx.block_body) {
+    int block_start = ctx.begin + task_id * ctx.block_size;
+    int block_end = std::min(block_start + ctx.block_size, ctx.end);
+    ctx.block_body(&this_thread_context, tls_ptr, block_start, block_end);
+  } else if (ctx.step == 1) {
     int block_start = ctx.begin + task_id * ctx.block_size;
     int block_end = std::min(block_start + ctx.block_size, ctx.end);
     for (int i = block_start; i < block_end; i++) {
@@ -1612,12 +1834,14 @@ void cpu_parallel_range_for(RuntimeContext *context,
                             int num_threads,
                             int begin,
                             int end,
+                            int num_iterations,
                             int step,
                             int block_dim,
                             range_for_xlogue prologue,
                             RangeForTaskFunc *body,
                             range_for_xlogue epilogue,
-                            std::size_t tls_size) {
+                            std::size_t tls_size,
+                            int schedule) {
   range_task_helper_context ctx;
   ctx.context = context;
   ctx.prologue = prologue;
@@ -1633,9 +1857,38 @@ void cpu_parallel_range_for(RuntimeContext *context,
   }
   ctx.block_size = block_dim;
   auto runtime = context->runtime;
-  runtime->parallel_for(runtime->thread_pool,
-                        (end - begin + block_dim - 1) / block_dim, num_threads,
-                        &ctx, cpu_parallel_range_for_task);
+  runtime->parallel_for(
+      runtime->thread_pool, (end - begin + block_dim - 1) / block_dim,
+      num_threads, schedule, num_iterations, &ctx, cpu_parallel_range_for_task);
+}
+
+// cpu_parallel_range_for with a step of 1, for a body compiled with the loop
+// over each block of iterations
+void cpu_parallel_range_for_blocks(RuntimeContext *context,
+                                   int num_threads,
+                                   int begin,
+                                   int end,
+                                   int num_iterations,
+                                   int block_dim,
+                                   range_for_xlogue prologue,
+                                   RangeForBlockTaskFunc *block_body,
+                                   range_for_xlogue epilogue,
+                                   std::size_t tls_size,
+                                   int schedule) {
+  range_task_helper_context ctx;
+  ctx.context = context;
+  ctx.prologue = prologue;
+  ctx.tls_size = tls_size;
+  ctx.block_body = block_body;
+  ctx.epilogue = epilogue;
+  ctx.begin = begin;
+  ctx.end = end;
+  ctx.step = 1;
+  ctx.block_size = block_dim;
+  auto runtime = context->runtime;
+  runtime->parallel_for(
+      runtime->thread_pool, (end - begin + block_dim - 1) / block_dim,
+      num_threads, schedule, num_iterations, &ctx, cpu_parallel_range_for_task);
 }
 
 void gpu_parallel_range_for(RuntimeContext *context,
@@ -1705,6 +1958,7 @@ void cpu_parallel_mesh_for_task(void *range_context,
 void cpu_parallel_mesh_for(RuntimeContext *context,
                            int num_threads,
                            int num_patches,
+                           int num_iterations,
                            int block_dim,
                            mesh_for_xlogue prologue,
                            RangeForTaskFunc *body,
@@ -1727,7 +1981,8 @@ void cpu_parallel_mesh_for(RuntimeContext *context,
   auto runtime = context->runtime;
   runtime->parallel_for(runtime->thread_pool,
                         (num_patches + block_dim - 1) / block_dim, num_threads,
-                        &ctx, cpu_parallel_mesh_for_task);
+                        /*schedule=*/0, num_iterations, &ctx,
+                        cpu_parallel_mesh_for_task);
 }
 
 void gpu_parallel_mesh_for(RuntimeContext *context,
@@ -1764,6 +2019,15 @@ i32 linear_thread_idx(RuntimeContext *context) {
 #endif
 }
 
+// Invalidates the element lists built from the cells of |snode_id|. Reading
+// the flag first keeps activation storms and appends from all writing the
+// same cache line.
+void mark_structure_changed(LLVMRuntime *runtime, int snode_id) {
+  if (!runtime->structure_changed[snode_id]) {
+    runtime->structure_changed[snode_id] = 1;
+  }
+}
+
 #include "node_dense.h"
 #include "node_dynamic.h"
 #include "node_pointer.h"
@@ -1799,6 +2063,7 @@ Ptr ListManager::allocate() {
 
 void node_gc(LLVMRuntime *runtime, int snode_id) {
   runtime->node_allocators[snode_id]->gc_serial();
+  mark_structure_changed(runtime, snode_id);
 }
 
 void gc_parallel_impl_0(RuntimeContext *context, NodeManager *allocator) {
@@ -1891,6 +2156,9 @@ void gc_parallel_impl_2(NodeManager *allocator) {
 void gc_parallel_2(RuntimeContext *context, int snode_id) {
   LLVMRuntime *runtime = context->runtime;
   gc_parallel_impl_2(runtime->node_allocators[snode_id]);
+  if (linear_thread_idx(context) == 0) {
+    mark_structure_changed(runtime, snode_id);
+  }
 }
 }
 
@@ -90,6 +90,9 @@ void LlvmProgramImpl::cache_field(int snode_tree_id,
     snode_cache_data.chunk_size = snodes[i]->chunk_size;
 
     ret.snode_metas.emplace_back(std::move(snode_cache_data));
+    if (snodes[i]->parent != nullptr && snodes[i]->parent->id == root_id) {
+      ret.root_child_offsets.push_back(snodes[i]->offset_bytes_in_parent_cell);
+    }
   }
 
   cache_data_->fields[snode_tree_id] = std::move(ret);
@@ -120,7 +120,10 @@ class LlvmProgramImpl : public ProgramImpl {
 
   DeviceAllocation allocate_memory_on_device(std::size_t alloc_size,
                                              uint64 *result_buffer) override {
-    return runtime_exec_->allocate_memory_on_device(alloc_size, result_buffer);
+    auto alloc =
+        runtime_exec_->allocate_memory_on_device(alloc_size, result_buffer);
+    runtime_exec_->place_memory_on_device(alloc, alloc_size);
+    return alloc;
   }
 
   Device *get_compute_device() override {
@@ -207,6 +210,10 @@ class LlvmProgramImpl : public ProgramImpl {
     return runtime_exec_.get();
   }
 
+  ThreadPool *get_thread_pool() override {
+    return runtime_exec_->get_thread_pool();
+  }
+
   std::string get_kernel_return_data_layout() override {
     return get_llvm_context()->get_data_layout_string();
   };
@@ -0,0 +1,120 @@
+#include "gstaichi/system/memory_placement.h"
+
+#include <algorithm>
+#include <cstring>
+#include <fstream>
+#include <vector>
+
+#include "gstaichi/system/threading.h"
+
+#if defined(__linux__)
+#include <linux/mempolicy.h>
+#include <sys/syscall.h>
+#include <unistd.h>
+#endif
+
+namespace gstaichi {
+
+namespace {
+
+// Restricts the policy of the untouched pages in [ptr, ptr + size) to
+// round-robin over the online NUMA nodes. Calls mbind directly, so that the
+// runtime does not depend on libnuma.
+void interleave_pages(void *ptr, std::size_t size) {
+#if defined(__linux__)
+  std::ifstream online("/sys/devices/system/node/online");
+  std::string node_list;
+  if (!(online >> node_list)) {
+    // No NUMA support in the kernel, there is a single node
+    return;
+  }
+  auto nodes = parse_cpu_list(node_list);
+  if (nodes.size() <= 1) {
+    return;
+  }
+  constexpr int kBitsPerWord = 8 * sizeof(unsigned long);
+  int max_node = *std::max_element(nodes.begin(), nodes.end());
+  std::vector<unsigned long> node_mask(max_node / kBitsPerWord + 1, 0);
+  for (int node : nodes) {
+    node_mask[node / kBitsPerWord] |= 1UL << (node % kBitsPerWord);
+  }
+  // mbind only takes whole pages
+  std::size_t page_size = sysconf(_SC_PAGESIZE);
+  auto begin = ((std::size_t)ptr + page_size - 1) / page_size * page_size;
+  auto end = ((std::size_t)ptr + size) / page_size * page_size;
+  if (end <= begin) {
+    return;
+  }
+  // The kernel ignores the last bit of the mask: pass one more than the
+  // number of node bits
+  if (syscall(SYS_mbind, begin, end - begin, MPOL_INTERLEAVE, node_mask.data(),
+              node_mask.size() * kBitsPerWord + 1, 0) != 0) {
+    TI_WARN("Failed to interleave {} MB of host memory over NUMA nodes {}",
+            size / 1024 / 1024, node_list);
+  }
+#else
+  TI_WARN(
+      "Interleaved memory placement is only supported on Linux, ignoring it");
+#endif
+}
+
+}  // namespace
+
+MemoryPlacement memory_placement_from_name(const std::string &name) {
+  if (name == "default") {
+    return MemoryPlacement::os_default;
+  } else if (name == "interleave") {
+    return MemoryPlacement::interleave;
+  } else if (name == "first_touch") {
+    return MemoryPlacement::first_touch;
+  }
+  TI_ERROR(
+      "Unknown memory placement \"{}\", expected one of default, interleave "
+      "and first_touch",
+      name);
+}
+
+void zero_placed(void *ptr,
+                 std::size_t size,
+                 const std::vector<std::size_t> &array_offsets,
+                 MemoryPlacement placement,
+                 ThreadPool *pool) {
+  if (placement == MemoryPlacement::interleave) {
+    interleave_pages(ptr, size);
+  }
+  if (placement != MemoryPlacement::first_touch || pool == nullptr ||
+      pool->max_num_threads <= 1) {
+    std::memset(ptr, 0, size);
+    return;
+  }
+  std::vector<std::size_t> offsets = array_offsets;
+  if (offsets.empty() || offsets[0] != 0) {
+    offsets.insert(offsets.begin(), 0);
+  }
+  std::sort(offsets.begin(), offsets.end());
+  offsets.push_back(size);
+  // Same blocks as make_cpu_multithreaded_range_for over each array: thread i
+  // zeroes the i-th of num_threads equal contiguous blocks of every array, and
+  // touches its pages first
+  int num_threads = pool->max_num_threads;
+  auto bytes = (char *)ptr;
+  pool->run(
+      num_threads, num_threads,
+      [&](int thread_id, int task_id) {
+        for (std::size_t i = 0; i + 1 < offsets.size(); i++) {
+          auto array_begin = std::min(offsets[i], size);
+          auto array_end = std::min(offsets[i + 1], size);
+          if (array_end <= array_begin) {
+            continue;
+          }
+          auto block =
+              (array_end - array_begin + num_threads - 1) / num_threads;
+          auto begin = std::min(array_begin + block * task_id, array_end);
+          auto end = std::min(begin + block, array_end);
+          std::memset(bytes + begin, 0, end - begin);
+        }
+      },
+      LoopSchedule::static_chunks);
+}
+
+}  // namespace gstaichi
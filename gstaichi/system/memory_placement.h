@@ -0,0 +1,46 @@
+/*******************************************************************************
+    Copyright (c) The GsTaichi Authors (2016- ). All Rights Reserved.
+    The use of this software is governed by the LICENSE file.
+*******************************************************************************/
+
+#pragma once
+
+#include "gstaichi/common/core.h"
+
+#include <string>
+#include <vector>
+
+namespace gstaichi {
+
+class ThreadPool;
+
+// Where the pages of large host buffers, such as the CPU root buffers and
+// ndarrays, end up on NUMA machines. Placement only affects pages that have
+// not been touched yet, so it is applied once, right after the allocation.
+enum class MemoryPlacement {
+  // The OS places each page on the node of the thread touching it first,
+  // which for a serial fill is the node of the calling thread
+  os_default,
+  // Pages are spread round-robin over all the NUMA nodes (Linux only)
+  interleave,
+  // The thread pool zeroes each array of the buffer with the static
+  // partitioning of a CPU range-for over it, so each page lands on the node
+  // of the thread that will access it in a dense loop
+  first_touch,
+};
+
+// "default", "interleave" or "first_touch"
+MemoryPlacement memory_placement_from_name(const std::string &name);
+
+// Zeroes the |size| bytes of a freshly allocated buffer at |ptr|, placing its
+// pages according to |placement|. The buffer holds one array per offset of
+// |array_offsets|, each extending to the next offset or to the end of the
+// buffer; an empty list is a single array. With first_touch, every array is
+// split into its own blocks, one per thread of |pool|.
+void zero_placed(void *ptr,
+                 std::size_t size,
+                 const std::vector<std::size_t> &array_offsets,
+                 MemoryPlacement placement,
+                 ThreadPool *pool);
+
+}  // namespace gstaichi
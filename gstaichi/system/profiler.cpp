@@ -1,6 +1,9 @@
 #include "gstaichi/system/profiler.h"
 #include "spdlog/fmt/bundled/color.h"
 
+#include <algorithm>
+#include <functional>
+
 namespace gstaichi {
 
 // A profiler's records form a tree structure
@@ -271,6 +274,31 @@ void Profiling::print_profile_info() {
   }
 }
 
+std::map<std::string, std::pair<float64, int64>> Profiling::get_profile_info() {
+  std::lock_guard<std::mutex> _(mut_);
+  std::map<std::string, std::pair<float64, int64>> info;
+  std::vector<std::string> path;
+  std::function<void(ProfilerRecordNode *)> visit =
+      [&](ProfilerRecordNode *node) {
+        for (auto &ch : node->childs) {
+          bool counted =
+              std::find(path.begin(), path.end(), ch->name) != path.end();
+          if (!counted) {
+            auto &record = info[ch->name];
+            record.first += ch->total_time;
+            record.second += ch->num_samples;
+          }
+          path.push_back(ch->name);
+          visit(ch.get());
+          path.pop_back();
+        }
+      };
+  for (auto p : profilers_) {
+    visit(p.second->root.get());
+  }
+  return info;
+}
+
 void Profiling::clear_profile_info() {
   std::lock_guard<std::mutex> _(mut_);
   for (auto p : profilers_) {
@@ -44,6 +44,9 @@ class Profiling {
  public:
   void print_profile_info();
   void clear_profile_info();
+  // Total time and number of samples of each scope name, summed over all
+  // threads. Scopes nested in a scope of the same name are not counted twice.
+  std::map<std::string, std::pair<float64, int64>> get_profile_info();
   ProfilerRecords *get_this_thread_profiler();
   static Profiling &get_instance();
 
@@ -4,12 +4,25 @@
 *******************************************************************************/
 
 #include "gstaichi/system/threading.h"
+#include "gstaichi/system/timeline.h"
 
 #include <algorithm>
+#include <chrono>
 #include <condition_variable>
+#include <cstdio>
+#include <limits>
 #include <thread>
 #include <vector>
 
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__)
+#include <immintrin.h>
+#endif
+
+#if defined(__linux__)
+#include <pthread.h>
+#include <sched.h>
+#endif
+
 namespace gstaichi {
 
 bool test_threading() {
@@ -26,113 +39,449 @@ bool test_threading() {
   return true;
 }
 
-ThreadPool::ThreadPool(int max_num_threads) : max_num_threads(max_num_threads) {
-  exiting = false;
-  started = false;
-  running_threads = 0;
-  timestamp = 1;
-  last_finished = 0;
-  task_head = 0;
-  task_tail = 0;
-  thread_counter = 0;
-  threads.resize((std::size_t)max_num_threads);
-  for (int i = 0; i < max_num_threads; i++) {
-    threads[i] = std::thread([this] { this->target(); });
+namespace {
+
+// The pool of the worker running on this thread, if any, and its thread id.
+// Parallel-fors started by a split running on a worker, which find the pool
+// busy, run on that worker under its thread id.
+thread_local const ThreadPool *this_thread_pool = nullptr;
+thread_local int this_thread_id = 0;
+
+inline void cpu_relax() {
+#if defined(__x86_64__) || defined(_M_X64) || defined(__i386__)
+  _mm_pause();
+#elif defined(__aarch64__)
+  asm volatile("yield");
+#endif
+}
+
+// Spins until |done()| holds or |spin_us| microseconds have passed, returns
+// the last value of |done()|
+template <typename Pred>
+bool spin_until(int spin_us, const Pred &done) {
+  if (spin_us <= 0) {
+    return done();
+  }
+  auto deadline =
+      std::chrono::steady_clock::now() + std::chrono::microseconds(spin_us);
+  while (true) {
+    // Reading the clock costs more than polling an atomic
+    for (int i = 0; i < 64; i++) {
+      if (done()) {
+        return true;
+      }
+      cpu_relax();
+    }
+    if (std::chrono::steady_clock::now() >= deadline) {
+      return done();
+    }
+    // Let the thread we are waiting for run when the cores are oversubscribed
+    std::this_thread::yield();
+  }
+}
+
+uint64 pack_range(uint64 begin, uint64 end) {
+  return (begin << 32) | end;
+}
+
+}  // namespace
+
+std::string loop_schedule_name(LoopSchedule schedule) {
+  switch (schedule) {
+    case LoopSchedule::automatic:
+      return "auto";
+    case LoopSchedule::static_chunks:
+      return "static";
+    case LoopSchedule::dynamic:
+      return "dynamic";
+    case LoopSchedule::guided:
+      return "guided";
+    case LoopSchedule::work_stealing:
+      return "work_stealing";
+  }
+  TI_NOT_IMPLEMENTED;
+}
+
+LoopSchedule loop_schedule_from_name(const std::string &name) {
+  for (auto schedule : {LoopSchedule::automatic, LoopSchedule::static_chunks,
+                        LoopSchedule::dynamic, LoopSchedule::guided,
+                        LoopSchedule::work_stealing}) {
+    if (loop_schedule_name(schedule) == name) {
+      return schedule;
+    }
+  }
+  TI_ERROR(
+      "Unknown loop schedule \"{}\", expected one of auto, static, dynamic, "
+      "guided and work_stealing",
+      name);
+}
+
+std::vector<int> parse_cpu_list(const std::string &cpu_list) {
+  std::vector<int> cpus;
+  std::size_t pos = 0;
+  while (pos < cpu_list.size()) {
+    auto comma = cpu_list.find(',', pos);
+    if (comma == std::string::npos) {
+      comma = cpu_list.size();
+    }
+    auto item = cpu_list.substr(pos, comma - pos);
+    pos = comma + 1;
+    int first = 0, last = 0;
+    char tail = 0;
+    // A trailing character makes sscanf match one more conversion
+    bool is_range =
+        std::sscanf(item.c_str(), "%d-%d%c", &first, &last, &tail) == 2;
+    if (!is_range && std::sscanf(item.c_str(), "%d%c", &first, &tail) == 1) {
+      last = first;
+    } else if (!is_range) {
+      TI_ERROR("Invalid CPU list \"{}\", expected e.g. \"0-7,16-23\"",
+               cpu_list);
+    }
+    if (first < 0 || last < first) {
+      TI_ERROR("Invalid CPU range \"{}\" in CPU list \"{}\"", item, cpu_list);
+    }
+    for (int cpu = first; cpu <= last; cpu++) {
+      cpus.push_back(cpu);
+    }
+  }
+  return cpus;
+}
+
+ThreadPool::ThreadPool(int max_num_threads,
+                       int spin_us,
+                       std::vector<int> cpu_affinity)
+    : max_num_threads(max_num_threads),
+      spin_us(spin_us),
+      cpu_affinity_(std::move(cpu_affinity)) {
+  TI_ASSERT(max_num_threads < (1 << kJobWorkerBits));
+#if !defined(__linux__)
+  if (!cpu_affinity_.empty()) {
+    TI_WARN("CPU thread affinity is only supported on Linux, ignoring it");
+    cpu_affinity_.clear();
+  }
+#endif
+  steal_ranges_ = std::make_unique<StealRange[]>(std::max(max_num_threads, 1));
+  // The thread calling run() is thread 0
+  for (int i = 1; i < max_num_threads; i++) {
+    threads_.emplace_back([this, i] { this->target(i); });
   }
 }
 
 void ThreadPool::run(int splits,
                      int desired_num_threads,
                      void *range_for_task_context,
-                     RangeForTaskFunc *func) {
-  {
-    std::lock_guard _(mutex);
-    this->range_for_task_context = range_for_task_context;
-    this->func = func;
-    this->desired_num_threads = std::min(desired_num_threads, max_num_threads);
-    TI_ASSERT(this->desired_num_threads > 0);
-    // TI_P(this->desired_num_threads);
-    started = false;
-    task_head = 0;
-    task_tail = splits;
-    timestamp++;
-    TI_ASSERT(timestamp < (1LL << 62));  // avoid overflowing here
-  }
-
-  // wake up all slaves
-  slave_cv.notify_all();
-  {
-    std::unique_lock<std::mutex> lock(mutex);
-    // TODO: the workers may have finished before master waiting on master_cv
-    master_cv.wait(lock, [this] { return started && running_threads == 0; });
-  }
-  TI_ASSERT(task_head >= task_tail);
-}
-
-void ThreadPool::target() {
-  uint64 last_timestamp = 0;
-  int thread_id;
-  {
-    std::lock_guard<std::mutex> lock(mutex);
-    thread_id = thread_counter++;
+                     RangeForTaskFunc *func,
+                     LoopSchedule schedule,
+                     int64 num_iterations) {
+  desired_num_threads = std::min(desired_num_threads, max_num_threads);
+  TI_ASSERT(desired_num_threads > 0);
+  if (splits <= 0) {
+    return;
+  }
+  if (num_iterations >= 0 && num_iterations < serial_loop_threshold) {
+    desired_num_threads = 1;
+  }
+  // The workers serve one parallel-for at a time. Loops launched meanwhile
+  // from other threads run on their own thread, so that concurrent launches
+  // still overlap instead of queuing behind each other.
+  if (std::min(desired_num_threads, splits) == 1 ||
+      leased_.exchange(true, std::memory_order_acquire)) {
+    run_on_caller(splits, range_for_task_context, func);
+    return;
+  }
+  parallel_loops_.fetch_add(1, std::memory_order_relaxed);
+  run_leased(splits, desired_num_threads, range_for_task_context, func,
+             schedule);
+  leased_.store(false, std::memory_order_release);
+}
+
+void ThreadPool::run_on_caller(int splits,
+                               void *range_for_task_context,
+                               RangeForTaskFunc *func) {
+  serial_loops_.fetch_add(1, std::memory_order_relaxed);
+  int thread_id = this_thread_pool == this ? this_thread_id : 0;
+  bool on_timeline = Timelines::get_instance().get_enabled();
+  const char *label = timeline_label.load(std::memory_order_relaxed);
+  if (on_timeline) {
+    Timeline::insert_this_thread_event(label, true);
+  }
+  for (int task_id = 0; task_id < splits; task_id++) {
+    func(range_for_task_context, thread_id, task_id);
+  }
+  if (on_timeline) {
+    Timeline::insert_this_thread_event(label, false);
+  }
+}
+
+int64 ThreadPool::calibrate_serial_loop_threshold() {
+  if (max_num_threads <= 1) {
+    return 0;
   }
+  constexpr int kRepeats = 32;
+  constexpr int kIterations = 1024;
+  auto best_ns = [](const auto &f) {
+    double best = std::numeric_limits<double>::max();
+    for (int i = 0; i < kRepeats; i++) {
+      auto start = std::chrono::steady_clock::now();
+      f();
+      std::chrono::duration<double, std::nano> elapsed =
+          std::chrono::steady_clock::now() - start;
+      best = std::min(best, elapsed.count());
+    }
+    return best;
+  };
+  auto counters = get_loop_counters();
+  // An empty loop with one split per thread, so that every worker wakes up
+  double dispatch_ns = best_ns([this] {
+    run(max_num_threads, max_num_threads, nullptr, [](void *, int, int) {});
+  });
+  serial_loops_.store(counters.serial_loops, std::memory_order_relaxed);
+  parallel_loops_.store(counters.parallel_loops, std::memory_order_relaxed);
+
+  // The runtime calls the body of a range-for once per iteration
+  std::vector<int> sink(kIterations);
+  RangeForTaskFunc *volatile body = [](void *context, int, int i) {
+    static_cast<int *>(context)[i] += i;
+  };
+  double loop_ns = best_ns([&] {
+    for (int i = 0; i < kIterations; i++) {
+      body(sink.data(), 0, i);
+    }
+  });
+  double iteration_ns = loop_ns / kIterations;
+  // Bounded in case the machine was busy during the measurement
+  constexpr int64 kMaxThreshold = 1 << 16;
+  return std::min((int64)(dispatch_ns / std::max(iteration_ns, 0.1)),
+                  kMaxThreshold);
+}
+
+void ThreadPool::run_leased(int splits,
+                            int desired_num_threads,
+                            void *range_for_task_context,
+                            RangeForTaskFunc *func,
+                            LoopSchedule schedule) {
+  bool on_timeline = Timelines::get_instance().get_enabled();
+  // Waking up more workers than there are splits only adds latency
+  int num_workers = std::min(desired_num_threads, splits) - 1;
+
+  range_for_task_context_ = range_for_task_context;
+  func_ = func;
+  job_label_ = timeline_label.load(std::memory_order_relaxed);
+  task_head_.store(0, std::memory_order_relaxed);
+  task_tail_ = splits;
+  schedule_ = schedule;
+  num_participants_ = num_workers + 1;
+  if (schedule == LoopSchedule::work_stealing) {
+    for (int i = 0; i < num_participants_; i++) {
+      uint64 begin = (int64)splits * i / num_participants_;
+      uint64 end = (int64)splits * (i + 1) / num_participants_;
+      steal_ranges_[i].range.store(pack_range(begin, end),
+                                   std::memory_order_relaxed);
+    }
+  }
+  pending_workers_.store(num_workers, std::memory_order_relaxed);
+  uint64 generation = (job_.load(std::memory_order_relaxed) >> kJobWorkerBits);
+  TI_ASSERT(generation + 1 < (1ULL << (64 - kJobWorkerBits)));
+  job_.store(((generation + 1) << kJobWorkerBits) | (uint64)num_workers);
+  // Pairs with the increment in wait_for_job: either the parked worker sees
+  // the new job before sleeping, or we see it parked and wake it up
+  if (parked_workers_.load() > 0) {
+    mutex_.lock();
+    mutex_.unlock();
+    worker_cv_.notify_all();
+  }
+
+  // The caller runs the splits of thread 0, e.g. the first block of a static
+  // loop, so it is pinned like a worker while it does. It gets its own mask
+  // back right after, the threads it spawns must not inherit ours.
+#if defined(__linux__)
+  cpu_set_t caller_cpus;
+  bool pin_caller = !cpu_affinity_.empty() &&
+                    pthread_getaffinity_np(pthread_self(), sizeof(caller_cpus),
+                                           &caller_cpus) == 0;
+  if (pin_caller) {
+    pin_this_thread(0);
+  }
+#endif
+  run_splits(0, on_timeline);
+#if defined(__linux__)
+  if (pin_caller) {
+    pthread_setaffinity_np(pthread_self(), sizeof(caller_cpus), &caller_cpus);
+  }
+#endif
+
+  auto workers_done = [this] { return pending_workers_.load() == 0; };
+  if (!spin_until(spin_us, workers_done)) {
+    std::unique_lock<std::mutex> lock(mutex_);
+    caller_parked_.store(true);
+    caller_cv_.wait(lock, workers_done);
+    caller_parked_.store(false, std::memory_order_relaxed);
+  }
+}
+
+void ThreadPool::run_splits(int thread_id, bool on_timeline) {
+  if (on_timeline) {
+    Timeline::insert_this_thread_event(job_label_, true);
+  }
+  switch (schedule_) {
+    case LoopSchedule::static_chunks:
+      run_static(thread_id);
+      break;
+    case LoopSchedule::guided:
+      run_guided(thread_id);
+      break;
+    case LoopSchedule::work_stealing:
+      run_work_stealing(thread_id);
+      break;
+    default:
+      run_dynamic(thread_id);
+      break;
+  }
+  if (on_timeline) {
+    Timeline::insert_this_thread_event(job_label_, false);
+  }
+}
+
+void ThreadPool::run_static(int thread_id) {
+  int begin = (int64)task_tail_ * thread_id / num_participants_;
+  int end = (int64)task_tail_ * (thread_id + 1) / num_participants_;
+  for (int task_id = begin; task_id < end; task_id++) {
+    run_split(thread_id, task_id);
+  }
+}
+
+void ThreadPool::run_dynamic(int thread_id) {
   while (true) {
-    {
-      std::unique_lock<std::mutex> lock(mutex);
-      slave_cv.wait(lock, [this, last_timestamp, thread_id] {
-        return (timestamp > last_timestamp &&
-                thread_id < desired_num_threads) ||
-               this->exiting;
-      });
-      last_timestamp = timestamp;
-      if (exiting) {
-        break;
-      } else {
-        if (last_finished >= last_timestamp) {
-          continue;
-          // This could happen when part of the desired threads wake up and
-          // finish all the task, and then this thread wake up finding nothing
-          // to do. Should skip this task directly.
-        } else {
-          started = true;
-          running_threads++;
-        }
+    int task_id = task_head_.fetch_add(1, std::memory_order_relaxed);
+    if (task_id >= task_tail_) {
+      break;
+    }
+    run_split(thread_id, task_id);
+  }
+}
+
+void ThreadPool::run_guided(int thread_id) {
+  int head = task_head_.load(std::memory_order_relaxed);
+  while (head < task_tail_) {
+    int chunk = std::max(1, (task_tail_ - head) / (2 * num_participants_));
+    // On failure |head| is reloaded and the chunk recomputed
+    if (task_head_.compare_exchange_weak(head, head + chunk,
+                                         std::memory_order_relaxed)) {
+      for (int task_id = head; task_id < head + chunk; task_id++) {
+        run_split(thread_id, task_id);
       }
+      head = task_head_.load(std::memory_order_relaxed);
     }
+  }
+}
 
-    while (true) {
-      // For a single parallel task
-      int task_id;
-      {
-        task_id = task_head.fetch_add(1, std::memory_order_relaxed);
-        if (task_id >= task_tail)
+void ThreadPool::run_work_stealing(int thread_id) {
+  auto &own = steal_ranges_[thread_id].range;
+  while (true) {
+    // Pop splits from the front of our own range
+    uint64 range = own.load(std::memory_order_relaxed);
+    uint64 begin = range >> 32, end = range & 0xFFFFFFFFu;
+    if (begin < end) {
+      if (own.compare_exchange_weak(range, pack_range(begin + 1, end),
+                                    std::memory_order_relaxed)) {
+        run_split(thread_id, (int)begin);
+      }
+      continue;
+    }
+    // Steal the back half of the first non-empty range after ours. A range
+    // that was empty when we looked may have been refilled by a thief since,
+    // its splits then run on that thief.
+    bool stolen = false;
+    for (int i = 1; i < num_participants_ && !stolen; i++) {
+      auto &victim = steal_ranges_[(thread_id + i) % num_participants_].range;
+      uint64 victim_range = victim.load(std::memory_order_relaxed);
+      while (true) {
+        uint64 victim_begin = victim_range >> 32;
+        uint64 victim_end = victim_range & 0xFFFFFFFFu;
+        if (victim_begin >= victim_end) {
+          break;
+        }
+        uint64 mid = victim_end - (victim_end - victim_begin + 1) / 2;
+        if (victim.compare_exchange_weak(victim_range,
+                                         pack_range(victim_begin, mid),
+                                         std::memory_order_relaxed)) {
+          // Splits are only ever removed from a range, so no other thread can
+          // hold the value of our empty range and succeed in modifying it
+          own.store(pack_range(mid, victim_end), std::memory_order_relaxed);
+          stolen = true;
           break;
+        }
       }
-
-      func(this->range_for_task_context, thread_id, task_id);
     }
+    if (!stolen) {
+      break;
+    }
+  }
+}
 
-    bool all_finished = false;
-    {
-      std::lock_guard<std::mutex> lock(mutex);
-      running_threads--;
-      if (running_threads == 0) {
-        all_finished = true;
-        last_finished = last_timestamp;
-      }
+uint64 ThreadPool::wait_for_job(uint64 last_job) {
+  auto has_job = [this, last_job] {
+    return job_.load() != last_job || exiting_.load();
+  };
+  if (!spin_until(spin_us, has_job)) {
+    std::unique_lock<std::mutex> lock(mutex_);
+    parked_workers_.fetch_add(1);
+    worker_cv_.wait(lock, has_job);
+    parked_workers_.fetch_sub(1, std::memory_order_relaxed);
+  }
+  return job_.load();
+}
+
+void ThreadPool::pin_this_thread(int thread_id) {
+#if defined(__linux__)
+  if (cpu_affinity_.empty()) {
+    return;
+  }
+  int cpu = cpu_affinity_[thread_id % cpu_affinity_.size()];
+  cpu_set_t cpu_set;
+  CPU_ZERO(&cpu_set);
+  CPU_SET(cpu, &cpu_set);
+  if (pthread_setaffinity_np(pthread_self(), sizeof(cpu_set), &cpu_set)) {
+    TI_WARN("Failed to pin CPU thread {} to CPU {}", thread_id, cpu);
+  }
+#endif
+}
+
+void ThreadPool::target(int thread_id) {
+  this_thread_pool = this;
+  this_thread_id = thread_id;
+  Timeline::get_this_thread_instance().set_name(
+      fmt::format("cpu_worker_{:03d}", thread_id));
+  pin_this_thread(thread_id);
+  uint64 last_job = 0;
+  while (true) {
+    uint64 job = wait_for_job(last_job);
+    if (exiting_.load()) {
+      break;
+    }
+    last_job = job;
+    // Workers 1..num_workers take part in the job. The job cannot be replaced
+    // before they are all done, so its fields are stable until then.
+    int num_workers = int(job & ((1ULL << kJobWorkerBits) - 1));
+    if (thread_id > num_workers) {
+      continue;
+    }
+    run_splits(thread_id, Timelines::get_instance().get_enabled());
+    // Pairs with the wait in run(), like parked_workers_ with the job word
+    if (pending_workers_.fetch_sub(1) == 1 && caller_parked_.load()) {
+      mutex_.lock();
+      mutex_.unlock();
+      caller_cv_.notify_one();
     }
-    if (all_finished)
-      master_cv.notify_one();
   }
 }
 
 ThreadPool::~ThreadPool() {
-  {
-    std::lock_guard<std::mutex> lg(mutex);
-    exiting = true;
-  }
-  slave_cv.notify_all();
-  for (auto &th : threads)
+  exiting_.store(true);
+  mutex_.lock();
+  mutex_.unlock();
+  worker_cv_.notify_all();
+  for (auto &th : threads_)
     th.join();
 }
 
@@ -10,53 +10,200 @@
 #include <atomic>
 #include <condition_variable>
 #include <functional>
+#include <memory>
+#include <mutex>
 #include <thread>
+#include <vector>
 
 namespace gstaichi {
 
 using RangeForTaskFunc = void(void *, int thread_id, int i);
 using ParallelFor = void(int n, int num_threads, void *, RangeForTaskFunc func);
 
+// How ThreadPool::run distributes the splits of a parallel-for among its
+// threads. The values are passed as integers by the LLVM runtime.
+enum class LoopSchedule : int {
+  // Decided by the compiler: CPU range-fors are split evenly among the threads
+  // at compile time, and the splits of other loops are scheduled dynamically
+  automatic = 0,
+  // Each thread runs a contiguous, equally sized range of splits
+  static_chunks = 1,
+  // Threads take the next split from a shared counter
+  dynamic = 2,
+  // Threads take chunks of the remaining splits from a shared counter, the
+  // chunks shrinking as the loop progresses
+  guided = 3,
+  // Each thread starts on its static range and steals half of the remaining
+  // splits of another thread once it is done
+  work_stealing = 4,
+};
+
+// "auto", "static", "dynamic", "guided" or "work_stealing"
+std::string loop_schedule_name(LoopSchedule schedule);
+LoopSchedule loop_schedule_from_name(const std::string &name);
+
+// Parses a Linux-style CPU list such as "0-7,16-23" into the listed CPU
+// indices, in order. An empty string gives an empty list.
+std::vector<int> parse_cpu_list(const std::string &cpu_list);
+
+// Runs parallel-for tasks on |max_num_threads| threads: the thread calling
+// run() and max_num_threads - 1 workers.
+//
+// A launch publishes the task on an atomic job word, and the calling thread
+// immediately starts taking splits. Workers that are awake pick the job up
+// without any locking; workers spin for |spin_us| microseconds after each job
+// before parking on a condition variable. The mutex is only taken to wake up
+// parked threads, so with spinning enabled back-to-back launches of small
+// loops never block.
+//
+// run() may be called from several threads at once: the workers serve one
+// caller at a time, and the loops of the others run serially on their calling
+// thread. The pool is neither partitioned between the callers nor do idle
+// workers steal splits from them, so a parallel-for that misses the workers
+// uses a single core.
+//
+// When |cpu_affinity| is not empty, thread i is pinned to the CPU
+// cpu_affinity[i % cpu_affinity.size()] (Linux only). A thread calling run()
+// is pinned as thread 0 while it runs its share of a parallel-for with the
+// workers, and then gets its own mask back.
 class ThreadPool {
  public:
-  std::vector<std::thread> threads;
-  std::condition_variable slave_cv;
-  std::condition_variable master_cv;
-  std::mutex mutex;
-  std::atomic<int> task_head;
-  int task_tail;
-  int running_threads;
   int max_num_threads;
-  int desired_num_threads;
-  uint64 timestamp;
-  uint64 last_finished;
-  bool started;
-  bool exiting;
-  RangeForTaskFunc *func;
-  void *range_for_task_context;  // Note: this is a pointer to a
-                                 // range_task_helper_context defined in the
-                                 // LLVM runtime, which is different from
-                                 // gstaichi::lang::Context.
-  int thread_counter;
-
-  explicit ThreadPool(int max_num_threads);
+  // Microseconds a worker spins after a job before parking, and the caller
+  // before parking while waiting for the workers. 0 parks immediately.
+  int spin_us;
+  // Name of the worker spans recorded on the timeline, usually the offloaded
+  // task being run. Only read when the timeline is enabled. The string must
+  // outlive the parallel-fors started while it is set.
+  std::atomic<const char *> timeline_label{"parallel_for"};
+  // Parallel-fors with fewer iterations run on the calling thread, waking up
+  // the workers would take longer than the loop itself. 0 disables it.
+  int64 serial_loop_threshold{0};
+
+  // How many parallel-fors ran on the calling thread only, and how many were
+  // spread over the workers
+  struct LoopCounters {
+    int64 serial_loops{0};
+    int64 parallel_loops{0};
+  };
 
+  explicit ThreadPool(int max_num_threads,
+                      int spin_us = 0,
+                      std::vector<int> cpu_affinity = {});
+
+  // |num_iterations| is the trip count of the loop, compared with
+  // serial_loop_threshold. -1 when unknown.
   void run(int splits,
            int desired_num_threads,
            void *range_for_task_context,
-           RangeForTaskFunc *func);
+           RangeForTaskFunc *func,
+           LoopSchedule schedule = LoopSchedule::automatic,
+           int64 num_iterations = -1);
+
+  // Runs |body(thread_id, task_id)| for every task_id in [0, splits).
+  template <typename Body>
+  void run(int splits,
+           int desired_num_threads,
+           const Body &body,
+           LoopSchedule schedule = LoopSchedule::automatic) {
+    run(
+        splits, desired_num_threads, (void *)&body,
+        [](void *context, int thread_id, int task_id) {
+          (*static_cast<const Body *>(context))(thread_id, task_id);
+        },
+        schedule);
+  }
 
   static void static_run(ThreadPool *pool,
                          int splits,
                          int desired_num_threads,
+                         int schedule,
+                         int64 num_iterations,
                          void *range_for_task_context,
                          RangeForTaskFunc *func) {
-    return pool->run(splits, desired_num_threads, range_for_task_context, func);
+    return pool->run(splits, desired_num_threads, range_for_task_context, func,
+                     LoopSchedule(schedule), num_iterations);
   }
 
-  void target();
+  // Times waking up the workers for an empty loop against one iteration of a
+  // minimal loop body, and returns the number of iterations below which
+  // running a loop on the calling thread is faster
+  int64 calibrate_serial_loop_threshold();
+
+  LoopCounters get_loop_counters() const {
+    return {serial_loops_.load(std::memory_order_relaxed),
+            parallel_loops_.load(std::memory_order_relaxed)};
+  }
+
+  void reset_loop_counters() {
+    serial_loops_.store(0, std::memory_order_relaxed);
+    parallel_loops_.store(0, std::memory_order_relaxed);
+  }
 
   ~ThreadPool();
+
+ private:
+  // The job word packs a generation counter with the number of workers taking
+  // part in the job, so that a worker reading it knows atomically whether it
+  // is expected to run the job or not.
+  static constexpr int kJobWorkerBits = 16;
+
+  void run_on_caller(int splits,
+                     void *range_for_task_context,
+                     RangeForTaskFunc *func);
+  void run_leased(int splits,
+                  int desired_num_threads,
+                  void *range_for_task_context,
+                  RangeForTaskFunc *func,
+                  LoopSchedule schedule);
+  void target(int thread_id);
+  void pin_this_thread(int thread_id);
+  uint64 wait_for_job(uint64 last_job);
+  void run_splits(int thread_id, bool on_timeline);
+  void run_split(int thread_id, int task_id) {
+    func_(range_for_task_context_, thread_id, task_id);
+  }
+  void run_static(int thread_id);
+  void run_dynamic(int thread_id);
+  void run_guided(int thread_id);
+  void run_work_stealing(int thread_id);
+
+  std::vector<int> cpu_affinity_;
+  std::vector<std::thread> threads_;
+  // Held by the thread whose parallel-for the workers are serving
+  std::atomic<bool> leased_{false};
+  std::atomic<int64> serial_loops_{0};
+  std::atomic<int64> parallel_loops_{0};
+  std::atomic<uint64> job_{0};
+  std::atomic<bool> exiting_{false};
+  // Workers of the current job that have not finished yet
+  std::atomic<int> pending_workers_{0};
+  std::atomic<int> parked_workers_{0};
+  std::atomic<bool> caller_parked_{false};
+  std::mutex mutex_;
+  std::condition_variable worker_cv_;
+  std::condition_variable caller_cv_;
+
+  // The current job, written by run() before publishing the job word and
+  // stable until all of its workers are done
+  std::atomic<int> task_head_{0};
+  int task_tail_{0};
+  LoopSchedule schedule_{LoopSchedule::automatic};
+  // Threads taking part in the job, including the caller
+  int num_participants_{1};
+  // Remaining [begin, end) splits of each thread under work stealing, packed
+  // as begin << 32 | end
+  struct alignas(64) StealRange {
+    std::atomic<uint64> range{0};
+  };
+  std::unique_ptr<StealRange[]> steal_ranges_;
+  const char *job_label_{nullptr};
+  RangeForTaskFunc *func_{nullptr};
+  void *range_for_task_context_{nullptr};  // Note: this is a pointer to a
+                                           // range_task_helper_context defined
+                                           // in the LLVM runtime, which is
+                                           // different from
+                                           // gstaichi::lang::Context.
 };
 
 }  // namespace gstaichi
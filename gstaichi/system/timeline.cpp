@@ -1,15 +1,20 @@
 #include "gstaichi/system/timeline.h"
 
+#include <map>
+
 namespace gstaichi {
 
-std::string TimelineEvent::to_json() {
+std::string TimelineEvent::to_json(int tid_index) const {
   std::string json{"{"};
   json += fmt::format("\"cat\":\"gstaichi\",");
   json += fmt::format("\"pid\":0,");
-  json += fmt::format("\"tid\":\"{}\",", tid);
+  json += fmt::format("\"tid\":{},", tid_index);
   json += fmt::format("\"ph\":\"{}\",", begin ? "B" : "E");
   json += fmt::format("\"name\":\"{}\",", name);
-  json += fmt::format("\"ts\":\"{}\"", uint64(time * 1000000));
+  if (!args.empty()) {
+    json += fmt::format("\"args\":{},", args);
+  }
+  json += fmt::format("\"ts\":{:.3f}", time * 1000000);
   json += "}";
   return json;
 }
@@ -46,9 +51,10 @@ std::vector<TimelineEvent> Timeline::fetch_events() {
   return fetched;
 }
 
-Timeline::Guard::Guard(const std::string &name) : name_(name) {
+Timeline::Guard::Guard(const std::string &name, const std::string &args)
+    : name_(name) {
   auto &timeline = Timeline::get_this_thread_instance();
-  timeline.insert_event({name, true, Time::get_time(), timeline.tid_});
+  timeline.insert_event({name, true, Time::get_time(), timeline.tid_, args});
 }
 
 Timeline::Guard::~Guard() {
@@ -56,6 +62,15 @@ Timeline::Guard::~Guard() {
   timeline.insert_event({name_, false, Time::get_time(), timeline.tid_});
 }
 
+void Timeline::insert_this_thread_event(const std::string &name,
+                                        bool begin,
+                                        const std::string &args) {
+  if (!Timelines::get_instance().get_enabled())
+    return;
+  auto &timeline = Timeline::get_this_thread_instance();
+  timeline.insert_event({name, begin, Time::get_time(), timeline.tid_, args});
+}
+
 void Timelines::insert_events(const std::vector<TimelineEvent> &events) {
   std::lock_guard<std::mutex> _(mut_);
   insert_events_without_locking(events);
@@ -90,16 +105,38 @@ void Timelines::save(const std::string &filename) {
   if (!ends_with(filename, ".json")) {
     TI_WARN("Timeline filename {} should end with '.json'.", filename);
   }
+  // Chrome trace and Perfetto both expect integer thread ids, so every thread
+  // name gets an index and a "thread_name" metadata event.
+  std::map<std::string, int> tid_indices;
+  for (auto &e : events_) {
+    tid_indices.emplace(e.tid, 0);
+  }
+  int num_tids = 0;
+  for (auto &kv : tid_indices) {
+    kv.second = num_tids++;
+  }
   std::ofstream fout(filename);
   fout << "[";
   bool first = true;
+  for (auto &kv : tid_indices) {
+    if (first) {
+      first = false;
+    } else {
+      fout << ",";
+    }
+    fout << fmt::format(
+                "{{\"ph\":\"M\",\"pid\":0,\"tid\":{},\"name\":\"thread_name\","
+                "\"args\":{{\"name\":\"{}\"}}}}",
+                kv.second, kv.first)
+         << std::endl;
+  }
   for (auto &e : events_) {
     if (first) {
       first = false;
     } else {
       fout << ",";
     }
-    fout << e.to_json() << std::endl;
+    fout << e.to_json(tid_indices[e.tid]) << std::endl;
   }
   fout << "]";
 }
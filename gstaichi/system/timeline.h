@@ -13,8 +13,11 @@ struct TimelineEvent {
   bool begin;
   float64 time;
   std::string tid;
+  // A serialized JSON object attached to the event, e.g. the kernel name and
+  // instance key of a launch. Left empty when there is nothing to attach.
+  std::string args{};
 
-  std::string to_json();
+  std::string to_json(int tid_index) const;
 };
 
 class Timeline {
@@ -41,7 +44,7 @@ class Timeline {
 
   class Guard {
    public:
-    explicit Guard(const std::string &name);
+    explicit Guard(const std::string &name, const std::string &args = "");
 
     ~Guard();
 
@@ -49,6 +52,12 @@ class Timeline {
     std::string name_;
   };
 
+  // Records a single begin or end event on the calling thread's timeline.
+  // Used by the Python frontend, whose spans do not map onto C++ scopes.
+  static void insert_this_thread_event(const std::string &name,
+                                       bool begin,
+                                       const std::string &args = "");
+
  private:
   std::string tid_;
   std::mutex mut_;
@@ -1874,6 +1874,13 @@ class MakeDual : public ADTransform {
   Block *alloca_block;
   std::map<Stmt *, Stmt *> dual_stmt;
 
+  static bool is_ndarray_ptr(Stmt *ptr) {
+    if (ptr->is<MatrixPtrStmt>()) {
+      ptr = ptr->as<MatrixPtrStmt>()->origin;
+    }
+    return ptr->is<ExternalPtrStmt>();
+  }
+
   explicit MakeDual(Block *block) {
     current_stmt = nullptr;
     alloca_block = block;
@@ -2107,6 +2114,10 @@ class MakeDual : public ADTransform {
   }
 
   void visit(GlobalLoadStmt *stmt) override {
+    if (is_ndarray_ptr(stmt->src)) {
+      // Ndarrays have no dual buffer, their values are constants
+      return;
+    }
     // issue global store to dual
     GlobalPtrStmt *src = nullptr;
     bool is_ptr_offset = false;
@@ -2137,6 +2148,10 @@ class MakeDual : public ADTransform {
   }
 
   void visit(GlobalStoreStmt *stmt) override {
+    if (is_ndarray_ptr(stmt->dest)) {
+      // no dual buffer to accumulate into
+      return;
+    }
     GlobalPtrStmt *dest = nullptr;
     bool is_ptr_offset = false;
     if (stmt->dest->is<MatrixPtrStmt>()) {
@@ -2162,6 +2177,10 @@ class MakeDual : public ADTransform {
   }
 
   void visit(AtomicOpStmt *stmt) override {
+    if (is_ndarray_ptr(stmt->dest)) {
+      // no dual buffer to accumulate into
+      return;
+    }
     GlobalPtrStmt *dest = nullptr;
     bool is_ptr_offset = false;
     if (stmt->dest->is<MatrixPtrStmt>()) {
@@ -4,6 +4,7 @@
 #include "gstaichi/ir/pass.h"
 #include "gstaichi/ir/visitors.h"
 #include "gstaichi/program/compile_config.h"
+#include "gstaichi/program/compile_report.h"
 #include "gstaichi/program/extension.h"
 #include "gstaichi/program/function.h"
 #include "gstaichi/program/kernel.h"
@@ -65,6 +66,7 @@ void compile_to_offloads(IRNode *ir,
   if (start_from_ast) {
     irpass::frontend_type_check(ir);
     irpass::lower_ast(ir);
+    print("Lowered");
   }
 
   dump_ir("gstaichi1");
@@ -74,10 +76,13 @@ void compile_to_offloads(IRNode *ir,
   irpass::compile_gstaichi_functions(ir, config,
                                      Function::IRStage::OptimizedIR);
   irpass::analysis::gather_func_store_dests(ir);
+  print("Functions compiled");
 
   irpass::eliminate_immutable_local_vars(ir);
+  print("Immutable local vars eliminated");
 
   irpass::type_check(ir, config);
+  print("Typechecked");
   irpass::analysis::verify(ir);
 
   // TODO: strictly enforce bit vectorization for x86 cpu and CUDA now
@@ -86,15 +91,18 @@ void compile_to_offloads(IRNode *ir,
       config.arch == Arch::amdgpu) {
     irpass::bit_loop_vectorize(ir);
     irpass::type_check(ir, config);
+    print("Bit loop vectorized");
     irpass::analysis::verify(ir);
   }
 
   // Removes MatrixOfMatrixPtrStmt & MatrixOfGlobalPtrStmt
   irpass::lower_matrix_ptr(ir, config.force_scalarize_matrix);
+  print("Matrix ptr lowered");
 
   if (config.force_scalarize_matrix) {
     irpass::scalarize(ir, false /*half2_optimization_enabled*/);
     irpass::die(ir);
+    print("Scalarized");
   }
 
   dump_ir("before_simplify_I");
@@ -102,10 +110,12 @@ void compile_to_offloads(IRNode *ir,
       ir, config,
       {false, /*autodiff_enabled*/ autodiff_mode != AutodiffMode::kNone,
        kernel->get_name(), verbose, "simplify_I"});
+  print("Simplified I");
   irpass::analysis::verify(ir);
   dump_ir("after_simplify_I");
 
   irpass::handle_external_ptr_boundary(ir, config);
+  print("External ptr boundary processed");
 
   if (is_extension_supported(config.arch, Extension::mesh)) {
     irpass::analysis::gather_meshfor_relation_types(ir);
@@ -118,6 +128,7 @@ void compile_to_offloads(IRNode *ir,
     // == AutodiffMode::kCheckAutodiffValid
     irpass::demote_atomics(ir, config);
     irpass::differentiation_validation_check(ir, config, kernel->get_name());
+    print("Autodiff validation checked");
     irpass::analysis::verify(ir);
   }
 
@@ -129,38 +140,53 @@ void compile_to_offloads(IRNode *ir,
     irpass::full_simplify(ir, config,
                           {false, /*autodiff_enabled*/ true, kernel->get_name(),
                            verbose, "pre_autodiff"});
+    print("Simplified before autodiff");
     irpass::auto_diff(ir, config, autodiff_mode, ad_use_stack);
+    print("Gradient");
     // TODO: Be carefull with the full_simplify when do high-order autodiff
     irpass::full_simplify(ir, config,
                           {false, /*autodiff_enabled*/ false,
                            kernel->get_name(), verbose, "post_autodiff"});
+    print("Simplified after autodiff");
     irpass::analysis::verify(ir);
   }
 
   if (config.check_out_of_bound) {
     irpass::check_out_of_bound(ir, config, {kernel->get_name()});
+    print("Bound checked");
     irpass::analysis::verify(ir);
   }
 
   irpass::flag_access(ir);
+  print("Access flagged I");
   irpass::analysis::verify(ir);
 
   irpass::full_simplify(ir, config,
                         {false, /*autodiff_enabled*/ false, kernel->get_name(),
                          verbose, "simplify_II"});
+  print("Simplified II");
   irpass::analysis::verify(ir);
 
   irpass::offload(ir, config);
+  print("Offloaded");
   irpass::analysis::verify(ir);
 
   dump_ir("after_offload");
   // NOTE: There was an additional CFG pass here, removed in
   // https://github.com/taichi-dev/gstaichi/pull/8691
   irpass::flag_access(ir);
+  print("Access flagged II");
+
+  if (kernel->fuse_loops) {
+    irpass::fuse_loops(ir);
+    print("Loops fused");
+    irpass::analysis::verify(ir);
+  }
 
   irpass::full_simplify(ir, config,
                         {false, /*autodiff_enabled*/ false, kernel->get_name(),
                          verbose, "simplify_III"});
+  print("Simplified III");
   irpass::analysis::verify(ir);
 
   dump_ir("after_simplify_III");
@@ -324,6 +350,10 @@ void offload_to_executable(IRNode *ir,
   // Final field registration correctness & type checking
   irpass::type_check(ir, config);
   irpass::analysis::verify(ir);
+
+  if (auto report = CompileReportRecorder::current()) {
+    report->record_tasks(ir);
+  }
 }
 
 void compile_to_executable(IRNode *ir,
@@ -0,0 +1,216 @@
+#include "gstaichi/ir/ir.h"
+#include "gstaichi/ir/analysis.h"
+#include "gstaichi/ir/statements.h"
+#include "gstaichi/ir/transforms.h"
+
+#include <optional>
+
+namespace gstaichi::lang {
+
+namespace {
+
+using TaskType = OffloadedStmt::TaskType;
+
+// Whether two dense struct-fors visit the same indices in the same order
+bool same_dense_iteration_space(SNode *a, SNode *b) {
+  while (a != b) {
+    if (a == nullptr || b == nullptr || a->type != b->type ||
+        (a->type != SNodeType::dense && a->type != SNodeType::root) ||
+        a->num_cells_per_container != b->num_cells_per_container ||
+        a->num_active_indices != b->num_active_indices ||
+        a->index_offsets != b->index_offsets) {
+      return false;
+    }
+    for (int i = 0; i < a->num_active_indices; i++) {
+      if (a->physical_index_position[i] != b->physical_index_position[i]) {
+        return false;
+      }
+    }
+    for (int i = 0; i < gstaichi_max_num_indices; i++) {
+      if (a->extractors[i].active != b->extractors[i].active ||
+          a->extractors[i].shape != b->extractors[i].shape) {
+        return false;
+      }
+    }
+    a = a->parent;
+    b = b->parent;
+  }
+  return true;
+}
+
+bool same_iteration_space(OffloadedStmt *a, OffloadedStmt *b) {
+  if (a->task_type != b->task_type || a->reversed != b->reversed ||
+      a->is_bit_vectorized || b->is_bit_vectorized) {
+    return false;
+  }
+  if (a->task_type == TaskType::range_for) {
+    return a->const_begin && a->const_end && b->const_begin && b->const_end &&
+           a->begin_value == b->begin_value && a->end_value == b->end_value &&
+           a->end_stmt == nullptr && b->end_stmt == nullptr;
+  }
+  if (a->task_type == TaskType::struct_for) {
+    return a->snode->is_path_all_dense && b->snode->is_path_all_dense &&
+           same_dense_iteration_space(a->snode, b->snode);
+  }
+  return false;
+}
+
+// How a loop accesses one field, or the external arrays as a whole
+struct GlobalAccess {
+  bool read{false};
+  bool write{false};
+  // The loop indices that select the accessed cells, when all the accesses
+  // select them the same way; nullopt when some cells are accessed by several
+  // iterations
+  std::optional<std::vector<int>> owner;
+};
+
+class LoopAccesses {
+ public:
+  // The loop cannot be merged with another one
+  bool barrier{false};
+  // External arrays are keyed by nullptr, as they may alias each other
+  std::unordered_map<SNode *, GlobalAccess> accesses;
+
+  explicit LoopAccesses(OffloadedStmt *loop) : loop_(loop) {
+    num_indices_ = loop->task_type == TaskType::range_for
+                       ? 1
+                       : loop->snode->num_active_indices;
+    irpass::analysis::gather_statements(loop->body.get(), [&](Stmt *stmt) {
+      visit(stmt);
+      return false;
+    });
+  }
+
+ private:
+  OffloadedStmt *loop_;
+  int num_indices_;
+
+  // The loop indices selecting a cell, if the leading |indices| are exactly
+  // distinct indices of the loop
+  std::optional<std::vector<int>> owner_of(const std::vector<Stmt *> &indices) {
+    if ((int)indices.size() < num_indices_) {
+      return std::nullopt;
+    }
+    std::vector<int> owner;
+    for (int i = 0; i < num_indices_; i++) {
+      auto loop_index = indices[i]->cast<LoopIndexStmt>();
+      if (loop_index == nullptr || loop_index->loop != loop_ ||
+          std::find(owner.begin(), owner.end(), loop_index->index) !=
+              owner.end()) {
+        return std::nullopt;
+      }
+      owner.push_back(loop_index->index);
+    }
+    return owner;
+  }
+
+  void add(SNode *key,
+           bool read,
+           bool write,
+           const std::optional<std::vector<int>> &owner) {
+    auto [it, inserted] = accesses.try_emplace(key);
+    auto &access = it->second;
+    access.read |= read;
+    access.write |= write;
+    if (inserted) {
+      access.owner = owner;
+    } else if (access.owner != owner) {
+      access.owner = std::nullopt;
+    }
+  }
+
+  void visit(Stmt *stmt) {
+    if (stmt->is<PrintStmt>() || stmt->is<ExternalFuncCallStmt>() ||
+        stmt->is<FuncCallStmt>() || stmt->is<InternalFuncStmt>() ||
+        stmt->is<SNodeOpStmt>() || stmt->is<ContinueStmt>() ||
+        stmt->is<ReturnStmt>() || stmt->is<ClearListStmt>() ||
+        stmt->is<BitStructStoreStmt>()) {
+      // Effects whose order is observable, that skip the rest of the body,
+      // or that are not tracked below
+      barrier = true;
+      return;
+    }
+    Stmt *ptr = nullptr;
+    bool read = false, write = false;
+    if (auto global_load = stmt->cast<GlobalLoadStmt>()) {
+      read = true;
+      ptr = global_load->src;
+    } else if (auto global_store = stmt->cast<GlobalStoreStmt>()) {
+      write = true;
+      ptr = global_store->dest;
+    } else if (auto global_atomic = stmt->cast<AtomicOpStmt>()) {
+      read = true;
+      write = true;
+      ptr = global_atomic->dest;
+    }
+    if (ptr == nullptr) {
+      return;
+    }
+    if (auto matrix_ptr = ptr->cast<MatrixPtrStmt>()) {
+      ptr = matrix_ptr->origin;
+    }
+    if (auto global_ptr = ptr->cast<GlobalPtrStmt>()) {
+      add(global_ptr->snode, read, write, owner_of(global_ptr->indices));
+    } else if (auto external_ptr = ptr->cast<ExternalPtrStmt>()) {
+      add(nullptr, read, write, owner_of(external_ptr->indices));
+    } else if (!ptr->is<GlobalTemporaryStmt>() || write) {
+      // Global temporaries are only written by serial tasks
+      barrier = true;
+    }
+  }
+};
+
+// Running the body of |b| right after the body of |a| in each iteration is
+// equivalent to running |b| after |a| if every cell written by one loop and
+// accessed by the other is accessed by the same iteration in both
+bool can_fuse(const LoopAccesses &a, const LoopAccesses &b) {
+  if (a.barrier || b.barrier) {
+    return false;
+  }
+  for (auto &[key, access_a] : a.accesses) {
+    auto it = b.accesses.find(key);
+    if (it == b.accesses.end()) {
+      continue;
+    }
+    auto &access_b = it->second;
+    if (!access_a.write && !access_b.write) {
+      continue;
+    }
+    if (!access_a.owner || access_a.owner != access_b.owner) {
+      return false;
+    }
+  }
+  return true;
+}
+
+}  // namespace
+
+namespace irpass {
+
+bool fuse_loops(IRNode *root) {
+  auto block = root->as<Block>();
+  bool modified = false;
+  int i = 0;
+  while (i + 1 < (int)block->statements.size()) {
+    auto a = block->statements[i]->cast<OffloadedStmt>();
+    auto b = block->statements[i + 1]->cast<OffloadedStmt>();
+    if (a == nullptr || b == nullptr || !same_iteration_space(a, b) ||
+        !can_fuse(LoopAccesses(a), LoopAccesses(b))) {
+      i++;
+      continue;
+    }
+    // The loop indices of |b| become those of |a|
+    replace_all_usages_with(b->body.get(), b, a);
+    for (auto &stmt : b->body->statements) {
+      a->body->insert(std::move(stmt));
+    }
+    block->erase(i + 1);
+    modified = true;
+  }
+  return modified;
+}
+
+}  // namespace irpass
+
+}  // namespace gstaichi::lang
@@ -6,6 +6,7 @@
 #include "gstaichi/ir/transforms.h"
 #include "gstaichi/ir/visitors.h"
 #include "gstaichi/ir/frontend_ir.h"
+#include "gstaichi/program/compile_report.h"
 #include "gstaichi/util/str.h"
 
 namespace gstaichi::lang {
@@ -34,6 +35,13 @@ std::string block_dim_info(int block_dim) {
          (block_dim == 0 ? "adaptive" : std::to_string(block_dim)) + " ";
 }
 
+std::string schedule_info(LoopSchedule schedule) {
+  if (schedule == LoopSchedule::automatic) {
+    return "";
+  }
+  return "schedule=" + loop_schedule_name(schedule) + " ";
+}
+
 class IRPrinter : public IRVisitor {
  private:
   ExpressionPrinter *expr_printer_{nullptr};
@@ -425,22 +433,24 @@ class IRPrinter : public IRVisitor {
   }
 
   void visit(RangeForStmt *for_stmt) override {
-    print("{} : {}for in range({}, {}) {}{}{{", for_stmt->name(),
+    print("{} : {}for in range({}, {}) {}{}{}{{", for_stmt->name(),
           for_stmt->reversed ? "reversed " : "", for_stmt->begin->name(),
           for_stmt->end->name(),
           for_stmt->is_bit_vectorized ? "(bit_vectorized) " : "",
-          block_dim_info(for_stmt->block_dim));
+          block_dim_info(for_stmt->block_dim),
+          schedule_info(for_stmt->cpu_schedule));
     for_stmt->body->accept(this);
     print("}}");
     dbg_info_printer_(for_stmt);
   }
 
   void visit(StructForStmt *for_stmt) override {
-    print("{} : struct for in {} {}{}{}{{", for_stmt->name(),
+    print("{} : struct for in {} {}{}{}{}{{", for_stmt->name(),
           for_stmt->snode->get_node_type_name_hinted(),
           for_stmt->is_bit_vectorized ? "(bit_vectorized) " : "",
           scratch_pad_info(for_stmt->mem_access_opt),
-          block_dim_info(for_stmt->block_dim));
+          block_dim_info(for_stmt->block_dim),
+          schedule_info(for_stmt->cpu_schedule));
     for_stmt->body->accept(this);
     print("}}");
     dbg_info_printer_(for_stmt);
@@ -701,6 +711,12 @@ class IRPrinter : public IRVisitor {
           stmt->mesh->num_patches, stmt->grid_dim, stmt->block_dim,
           scratch_pad_info(stmt->mem_access_opt));
     }
+    if (stmt->cpu_schedule != LoopSchedule::automatic) {
+      details += " schedule=" + loop_schedule_name(stmt->cpu_schedule);
+    }
+    if (stmt->cpu_per_thread_blocks) {
+      details += " per_thread_blocks";
+    }
     if (stmt->task_type == OffloadedTaskType::listgen) {
       print("{} = offloaded listgen {}->{}", stmt->name(),
             stmt->snode->parent->get_node_type_name_hinted(),
@@ -976,10 +992,18 @@ std::function<void(const std::string &)> make_pass_printer(
     bool print_ir_dbg_info,
     const std::string &kernel_name,
     IRNode *ir) {
-  if (!verbose) {
+  auto report = CompileReportRecorder::current();
+  if (!verbose && !report) {
     return [](const std::string &) {};
   }
-  return [ir, kernel_name, print_ir_dbg_info](const std::string &pass) {
+  return [ir, kernel_name, print_ir_dbg_info, verbose,
+          report](const std::string &pass) {
+    if (report) {
+      report->record_pass(kernel_name, pass, ir);
+    }
+    if (!verbose) {
+      return;
+    }
     TI_INFO("[{}] {}:", kernel_name, pass);
     std::cout << std::flush;
     irpass::re_id(ir);
@@ -37,8 +37,10 @@ using TaskType = OffloadedStmt::TaskType;
  * where 8 is the number of threads available on the CPU.
  *
  * This pass is only applied to range-for loops that are offloaded to
- * CPUs. The number of threads is determined by the config option
- * "cpu_max_num_threads".
+ * CPUs, with the "auto" or "static" schedule. The number of threads is
+ * determined by the config option "cpu_max_num_threads". Under the
+ * "first_touch" memory placement, the blocks are scheduled statically so that
+ * thread i always runs block i, like zero_placed.
  *
  * The effect is that more invarants in the inner most can be identified and
  * moved outside, so that LLVM has more chance to vectorize the innermost
@@ -62,6 +64,11 @@ class MakeCPUMultithreadedRangeFor : public BasicStmtVisitor {
     if (offloaded->task_type != TaskType::range_for) {
       return;
     }
+    if (offloaded->cpu_schedule != LoopSchedule::automatic &&
+        offloaded->cpu_schedule != LoopSchedule::static_chunks) {
+      // Loops balanced at run time keep their block_dim chunks
+      return;
+    }
 
     auto offloaded_body = std::make_unique<Block>();
     auto one = offloaded_body->insert(
@@ -133,15 +140,17 @@ class MakeCPUMultithreadedRangeFor : public BasicStmtVisitor {
     irpass::replace_all_usages_with(inner_loop, offloaded, inner_loop);
 
     // Update the offloaded stmt.
-    // The statement now iterates over max CPU thread numbers.
-    // Therefore it has constant begin and end values.
-    offloaded->const_begin = true;
-    offloaded->const_end = true;
-    offloaded->begin_value = 0;
-    offloaded->end_value = config_.cpu_max_num_threads;
+    // The statement now iterates over max CPU thread numbers. It keeps the
+    // bounds of the original loop, so that the runtime still knows its trip
+    // count.
+    offloaded->cpu_per_thread_blocks = true;
     offloaded->body = std::move(offloaded_body);
     offloaded->body->set_parent_stmt(offloaded);
     offloaded->block_dim = 1;
+    if (config_.cpu_memory_placement == "first_touch") {
+      // Run block i on thread i, which touched the matching pages first
+      offloaded->cpu_schedule = LoopSchedule::static_chunks;
+    }
     modified_ = true;
   }
 
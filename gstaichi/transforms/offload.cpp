@@ -6,6 +6,7 @@
 #include "gstaichi/program/program.h"
 
 #include <set>
+#include <thread>
 #include <unordered_map>
 #include <utility>
 
@@ -31,6 +32,24 @@ bool demotable_axis_load(Stmt *stmt) {
   }
   return true;
 }
+
+// The schedule set with ti.loop_config takes precedence over the default one
+LoopSchedule resolve_cpu_schedule(LoopSchedule loop_schedule,
+                                  const CompileConfig &config) {
+  if (loop_schedule != LoopSchedule::automatic) {
+    return loop_schedule;
+  }
+  return loop_schedule_from_name(config.cpu_loop_schedule);
+}
+
+// Whether ti.loop_config set the threads, block size or schedule of a loop.
+// Without parallelize, the loop gets one thread per core.
+bool has_explicit_loop_config(int num_cpu_threads,
+                              int block_dim,
+                              LoopSchedule loop_schedule) {
+  return num_cpu_threads != (int)std::thread::hardware_concurrency() ||
+         block_dim != 0 || loop_schedule != LoopSchedule::automatic;
+}
 class SquashPtrOffset : public IRVisitor {
  public:
   SquashPtrOffset() {
@@ -129,6 +148,9 @@ class Offloader {
 
         offloaded->num_cpu_threads =
             std::min(s->num_cpu_threads, config.cpu_max_num_threads);
+        offloaded->cpu_schedule = resolve_cpu_schedule(s->cpu_schedule, config);
+        offloaded->cpu_explicit_loop_config = has_explicit_loop_config(
+            s->num_cpu_threads, s->block_dim, s->cpu_schedule);
         replace_all_usages_with(s, s, offloaded.get());
         for (int j = 0; j < (int)s->body->statements.size(); j++) {
           offloaded->body->insert(std::move(s->body->statements[j]));
@@ -150,6 +172,8 @@ class Offloader {
         }
         offloaded->num_cpu_threads =
             std::min(st->num_cpu_threads, config.cpu_max_num_threads);
+        offloaded->cpu_explicit_loop_config = has_explicit_loop_config(
+            st->num_cpu_threads, st->block_dim, LoopSchedule::automatic);
         replace_all_usages_with(st, st, offloaded.get());
         for (int j = 0; j < (int)st->body->statements.size(); j++) {
           offloaded->body->insert(std::move(st->body->statements[j]));
@@ -256,6 +280,10 @@ class Offloader {
     offloaded_struct_for->is_bit_vectorized = for_stmt->is_bit_vectorized;
     offloaded_struct_for->num_cpu_threads =
         std::min(for_stmt->num_cpu_threads, config.cpu_max_num_threads);
+    offloaded_struct_for->cpu_schedule =
+        resolve_cpu_schedule(for_stmt->cpu_schedule, config);
+    offloaded_struct_for->cpu_explicit_loop_config = has_explicit_loop_config(
+        for_stmt->num_cpu_threads, for_stmt->block_dim, for_stmt->cpu_schedule);
     offloaded_struct_for->mem_access_opt = mem_access_opt;
 
     root_block->insert(std::move(offloaded_struct_for));
@@ -128,6 +128,21 @@ def get_all_fields():
     return fields
 
 
+def get_all_dual_fields():
+    def visit(node, fields):
+        for _i in range(node.ptr.get_num_ch()):
+            ch = node.ptr.get_ch(_i)
+            if not ch.is_place():
+                visit(SNode(ch), fields)
+            elif ch.get_snode_grad_type() == SNodeGradType.DUAL:
+                fields.append(ScalarField(Expr(ch.get_expr())))
+
+    fields = []
+    for root_fb in _snode.FieldsBuilder._finalized_roots():
+        visit(root_fb, fields)
+    return fields
+
+
 def save_all_fields(all_fields):
     return [x.to_numpy() for x in all_fields]
 
@@ -139,7 +154,7 @@ def restore_all_fields(all_fields, backups):
 
 
 class Tape:
-    def __init__(self, loss=None, clear_gradients=True, validation=False, grad_check=None):
+    def __init__(self, loss=None, clear_gradients=True, validation=False, grad_check=None, checkpoint_every=None):
         """A context manager for reverse mode autodiff :class:`~gstaichi.ad.Tape`. The
         context manager would catching all of the callings of functions that
         decorated by :func:`~gstaichi.lang.kernel_impl.kernel` or
@@ -156,6 +171,11 @@ class Tape:
             clear_gradients(Bool): Before `with` body start, clear all gradients or not.
             validation(Bool): Check whether the code inside the context manager is autodiff valid, e.g., agree with the global data access rule.
             grad_check(List[Field]): List of fields that need to check gradients.
+            checkpoint_every(int): Snapshot the primal fields and the ndarrays passed to recorded calls once every
+                `checkpoint_every` recorded calls, and recompute each segment of forward calls from its snapshot when
+                evaluating gradients. This allows buffers to be reused across calls instead of keeping every
+                intermediate state alive, at the cost of running the forward calls once more. Snapshots are kept on the
+                host. The primal state at the end of the `with` body is restored after the gradients are evaluated.
 
         Example::
 
@@ -172,6 +192,12 @@ class Tape:
         self.entered = False
         self.gradient_evaluated = False
         self.clear_gradients = clear_gradients
+        if checkpoint_every is not None and checkpoint_every < 1:
+            raise ValueError(f"checkpoint_every should be a positive integer, got {checkpoint_every}")
+        self.checkpoint_every = checkpoint_every
+        self.checkpoints = []
+        self.checkpointed_arrays = []
+        self._checkpointed_ndarray_ids = set()
         self.validation = validation
         self.runtime = impl.get_runtime()
         if not self.runtime.prog.config().debug and self.validation:
@@ -225,6 +251,10 @@ class Tape:
             with torch.no_grad():
                 self.loss.fill_(0.0)
 
+        if self.checkpoint_every:
+            impl.get_runtime().materialize()
+            self.checkpointed_arrays = get_all_fields()
+
         # Attach the context manager to runtime
         self.runtime.target_tape = self
         return self
@@ -246,8 +276,28 @@ class Tape:
         self.modes.append(func.autodiff_mode)
         if self.validation:
             func.autodiff_mode = AutodiffMode.VALIDATION
+        if self.checkpoint_every:
+            self._checkpoint(args)
         self.calls.append((func, args))
 
+    def _checkpoint(self, args):
+        # Calls are inserted right before they run, so the snapshots hold the state the call reads. The snapshots
+        # launch copy kernels, which must not be recorded on the tape.
+        target_tape, self.runtime.target_tape = self.runtime.target_tape, None
+        try:
+            if len(self.calls) % self.checkpoint_every == 0:
+                self.checkpoints.append(save_all_fields(self.checkpointed_arrays))
+            for arg in args:
+                if isinstance(arg, Ndarray) and id(arg) not in self._checkpointed_ndarray_ids:
+                    # An ndarray first seen in the middle of a segment still has the value it had when the segment
+                    # started, so it is appended to the latest snapshot. Earlier snapshots restore a prefix of the
+                    # checkpointed arrays only.
+                    self._checkpointed_ndarray_ids.add(id(arg))
+                    self.checkpointed_arrays.append(arg)
+                    self.checkpoints[-1].append(arg.to_numpy())
+        finally:
+            self.runtime.target_tape = target_tape
+
     def grad(self):
         assert self.entered, "Before evaluating gradients tape must be entered."
         assert not self.gradient_evaluated, "Gradients of grad can be evaluated only once."
@@ -264,18 +314,45 @@ class Tape:
                 with torch.no_grad():
                     self.loss.grad.fill_(1.0)
 
-        for func, args in reversed(self.calls):
-            # we need to check whether "func" has "grad" attribute
-            # since we insert write_int and write_float kernels to self.calls
-            # e.g. x[None] = 0.0, this func has no grad attribute
-            if hasattr(func, "grad"):
-                func.grad(*args)
+        if self.checkpoint_every:
+            self._grad_from_checkpoints()
+        else:
+            for func, args in reversed(self.calls):
+                # we need to check whether "func" has "grad" attribute
+                # since we insert write_int and write_float kernels to self.calls
+                # e.g. x[None] = 0.0, this func has no grad attribute
+                if hasattr(func, "grad"):
+                    func.grad(*args)
 
         self.gradient_evaluated = True
         if self.grad_checker:
             self.grad_checker.add_calls(self.calls)
             self.grad_checker.check_grad()
 
+    def _grad_from_checkpoints(self):
+        arrays = self.checkpointed_arrays
+        final_state = save_all_fields(arrays)
+        # Recomputed calls must not be recorded again if the gradients are evaluated inside the `with` body.
+        target_tape, self.runtime.target_tape = self.runtime.target_tape, None
+        try:
+            for i in reversed(range(len(self.checkpoints))):
+                segment = self.calls[i * self.checkpoint_every : (i + 1) * self.checkpoint_every]
+                backups = self.checkpoints[i]
+                restore_all_fields(arrays[: len(backups)], backups)
+                # Recompute the segment, keeping the state each call reads until its gradient has been evaluated.
+                states = []
+                for j, (func, args) in enumerate(segment):
+                    states.append(save_all_fields(arrays))
+                    if j + 1 < len(segment):
+                        func(*args)
+                for (func, args), state in zip(reversed(segment), reversed(states)):
+                    if hasattr(func, "grad"):
+                        restore_all_fields(arrays, state)
+                        func.grad(*args)
+            restore_all_fields(arrays, final_state)
+        finally:
+            self.runtime.target_tape = target_tape
+
 
 def clear_all_gradients(gradient_type=SNodeGradType.ADJOINT):
     """Sets the gradients of all fields to zero."""
@@ -419,6 +496,22 @@ def no_grad(func):
 
 class FwdMode:
     def __init__(self, loss, param, seed=None, clear_gradients=True):
+        """A context manager for forward mode autodiff. The kernels called under the `with` statement compute the
+        derivatives of `loss` along the direction `seed` of `param`, which are stored in `loss.dual`.
+
+        Args:
+            loss(Union[ScalarField, List[ScalarField]]): The fields whose derivatives are computed.
+            param(ScalarField): The parameters the derivatives respect to.
+            seed(List): The tangent direction, one value per element of `param`. A list of K such directions computes
+                K Jacobian-vector products without writing the `with` body K times: on exit, the recorded kernel calls
+                are replayed once per direction after the first one, from the fields, ndarrays and duals the body
+                started from. The replay runs every recorded kernel again per direction, it is not faster than K
+                separate `with` blocks. The products are stored in :attr:`duals`, one array of shape
+                `(K, *loss.shape)` per loss, and `loss.dual` holds the product along the first direction. Fields and
+                ndarrays must only be modified by kernels inside the body when multiple directions are given.
+            clear_gradients(Bool): Before `with` body start, clear all dual gradients or not. When it is not cleared,
+                every direction starts from the dual values the body started from.
+        """
         self.calls = []
         self.modes = []
         self.entered = False
@@ -427,7 +520,15 @@ class FwdMode:
         self.loss = loss
         self.param = param
         self.seed = seed
+        self.seeds = None
+        self.duals = None
         self.clear_gradients = clear_gradients
+        self.primal_fields = None
+        self.primal_backups = None
+        self.dual_fields = None
+        self.dual_backups = None
+        self.ndarrays = []
+        self.ndarray_backups = []
 
     def __enter__(self):
         assert not self.entered, "Forward mode manager can be entered only once."
@@ -455,6 +556,17 @@ class FwdMode:
         else:
             parameters_shape_flatten = 1
 
+        if isinstance(self.seed, np.ndarray):
+            self.seed = self.seed.tolist()
+        if self.seed and isinstance(self.seed[0], (list, tuple, np.ndarray)):
+            self.seeds = [list(seed) for seed in self.seed]
+            for seed in self.seeds:
+                assert parameters_shape_flatten == len(seed)
+            self.seed = self.seeds[0]
+            # The extra directions are evaluated by replaying the recorded calls from the current primal state
+            self.primal_fields = get_all_fields()
+            self.primal_backups = save_all_fields(self.primal_fields)
+
         if not self.seed:
             if parameters_shape_flatten == 1:
                 # Compute the derivative respect to the first variable by default
@@ -473,40 +585,84 @@ class FwdMode:
         # Clear gradients
         if self.clear_gradients:
             clear_all_gradients(gradient_type=SNodeGradType.DUAL)
+        elif self.seeds is not None:
+            self.dual_fields = get_all_dual_fields()
+            self.dual_backups = save_all_fields(self.dual_fields)
 
-        # Set seed for each variable
-        if len(self.seed) == 1:
-            if len(self.param.shape) == 0:
-                # e.g., x= ti.field(float, shape = ())
-                self.param.dual[None] = 1.0 * self.seed[0]
-            else:
-                # e.g., ti.root.dense(ti.i, 1).place(x.dual)
-                self.param.dual[0] = 1.0 * self.seed[0]
-        else:
-            self.param.dual.from_numpy(np.array(self.seed, dtype=np.float32))
+        self.set_seed()
 
         # Attach the context manager to the runtime
         self.runtime.fwd_mode_manager = self
+        return self
 
     def __exit__(self, _type, value, tb):
         self.runtime.fwd_mode_manager = None
+        if self.seeds is not None and _type is None:
+            self.replay_seeds()
         self.clear_seed()
         self.recover_kernels()
 
-    def insert(self, func):
+    def insert(self, func, args=()):
         assert (
             func.autodiff_mode == AutodiffMode.NONE or func.autodiff_mode == AutodiffMode.FORWARD
         ), "Inserted funcs should be forward or grad kernels (forward mode)."
         self.modes.append(func.autodiff_mode)
         func.autodiff_mode = AutodiffMode.FORWARD
-        self.calls.append((func))
+        if self.seeds is not None:
+            self._save_ndarrays(args)
+        self.calls.append((func, args))
+
+    def _save_ndarrays(self, args):
+        # Calls are inserted right before they run, so an ndarray first seen here still holds its value from before
+        # the body. The copy kernels must not be recorded.
+        self.runtime.fwd_mode_manager = None
+        try:
+            for arg in args:
+                if isinstance(arg, Ndarray) and all(arg is not x for x in self.ndarrays):
+                    self.ndarrays.append(arg)
+                    self.ndarray_backups.append(arg.to_numpy())
+        finally:
+            self.runtime.fwd_mode_manager = self
 
     def recover_kernels(self):
         assert self.entered, "Before recover the kernels, fwd mode manager must be entered."
-        for calls, mode in zip(self.calls, self.modes):
-            calls.autodiff_mode = mode
+        for (func, _), mode in zip(self.calls, self.modes):
+            func.autodiff_mode = mode
         self.kernels_recovered = True
 
+    def set_seed(self):
+        # Set seed for each variable
+        if len(self.seed) == 1:
+            if len(self.param.shape) == 0:
+                # e.g., x= ti.field(float, shape = ())
+                self.param.dual[None] = 1.0 * self.seed[0]
+            else:
+                # e.g., ti.root.dense(ti.i, 1).place(x.dual)
+                self.param.dual[0] = 1.0 * self.seed[0]
+        else:
+            self.param.dual.from_numpy(np.array(self.seed, dtype=np.float32).reshape(self.param.shape))
+
+    def replay_seeds(self):
+        duals = [[ls.dual.to_numpy()] for ls in self.loss]
+        # The kernels are still in forward mode, replay them for the remaining directions
+        for seed in self.seeds[1:]:
+            restore_all_fields(self.primal_fields, self.primal_backups)
+            restore_all_fields(self.ndarrays, self.ndarray_backups)
+            if self.clear_gradients:
+                clear_all_gradients(gradient_type=SNodeGradType.DUAL)
+            else:
+                restore_all_fields(self.dual_fields, self.dual_backups)
+            self.seed = seed
+            self.set_seed()
+            for func, args in self.calls:
+                func(*args)
+            for dual, ls in zip(duals, self.loss):
+                dual.append(ls.dual.to_numpy())
+        self.duals = [np.stack(dual) for dual in duals]
+        for dual, ls in zip(self.duals, self.loss):
+            ls.dual.from_numpy(dual[0])
+        self.seed = self.seeds[0]
+
     def clear_seed(self):
         # clear seed values
         if len(self.seed) == 1:
@@ -95,6 +95,10 @@ class GsTaichiCallable:
     def __call__(self, *args, **kwargs):
         return self.wrapper.__call__(*args, **kwargs)
 
+    def compile_report(self, *args, **kwargs):
+        assert self._primal is not None
+        return self._primal.compile_report(*args, **kwargs)
+
     def __get__(self, instance, owner):
         if instance is None:
             return self
@@ -121,6 +125,10 @@ class BoundGsTaichiCallable:
         else:
             setattr(self.gstaichi_callable, k, v)
 
+    def compile_report(self, *args, **kwargs):
+        assert self.gstaichi_callable._primal is not None
+        return self.gstaichi_callable._primal.compile_report(self.instance, *args, **kwargs)
+
     def grad(self, *args, **kwargs) -> "Kernel":
         assert self.gstaichi_callable._adjoint is not None
         return self.gstaichi_callable._adjoint(self.instance, *args, **kwargs)
@@ -1,4 +1,4 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from enum import IntEnum
 from typing import Callable, TypeAlias
 
@@ -31,6 +31,64 @@ class LaunchObservations:
     found_kernel_in_materialize_cache: bool = False
 
 
+@dataclass
+class LaunchCounters:
+    """Always-on counters of a kernel, accumulated over its lifetime (including across `ti.reset()`)."""
+
+    launches: int = 0
+    # Host-side time of the launches that did not compile, and a histogram of it with one bucket per power of two
+    # nanoseconds: bucket i counts the launches that took (2 ** (i - 1), 2 ** i] ns
+    launch_ns: int = 0
+    launch_ns_histogram: list[int] = field(default_factory=lambda: [0] * 64)
+    # Python AST transform and backend compilation
+    compiles: int = 0
+    compile_ns: int = 0
+    src_ll_cache_hits: int = 0
+    fe_ll_cache_hits: int = 0
+    materialize_cache_hits: int = 0
+
+
+@dataclass
+class CompilePassReport:
+    """A checkpoint of the compiler pipeline, taken after one pass or a group of passes."""
+
+    # Kernel or real function being compiled
+    scope: str
+    # Offloaded task compiled on its own by the LLVM backends, -1 for the whole kernel
+    task: int
+    name: str
+    statements_before: int
+    statements_after: int
+    # Time since the previous checkpoint of the same IR
+    time_ms: float
+
+
+@dataclass
+class CompileTaskReport:
+    name: str
+    type: str
+    statements: int
+    # Instructions of the generated LLVM IR before optimization, -1 on non-LLVM backends
+    llvm_instructions: int
+
+
+@dataclass
+class CompileReport:
+    """Statistics of one compilation of a kernel, see `Kernel.compile_report`."""
+
+    kernel: str
+    passes: list[CompilePassReport]
+    tasks: list[CompileTaskReport]
+
+    @property
+    def num_offloads(self) -> int:
+        return len(self.tasks)
+
+    @property
+    def total_time_ms(self) -> float:
+        return sum(p.time_ms for p in self.passes)
+
+
 @dataclass
 class LaunchStats:
     kernel_args_count_by_type: dict[KernelBatchedArgType, int]
@@ -0,0 +1,141 @@
+"""
+Recording of kernel launches into a binary trace (``ti.profiler.start_launch_trace``).
+
+A trace starts with ``MAGIC`` and a header, followed by one record per launch. Headers and records are a
+little-endian u32 length followed by a JSON object. A record describes the kernel and the metadata of its
+arguments; when array data is captured, the raw bytes of each captured array follow the record, in argument order.
+Kernels are described once, by their module and qualified name, and referenced by id in the following records.
+"""
+
+import json
+import struct
+import sys
+import threading
+from typing import Any
+
+import numpy as np
+
+from gstaichi._lib import core as _ti_core
+from gstaichi.lang import impl
+from gstaichi.lang._ndarray import Ndarray
+from gstaichi.types import template
+
+MAGIC = b"GSTILT01"
+_LENGTH = struct.Struct("<I")
+
+# The active recorder, checked by 'Kernel.__call__' around every launch
+recorder: "LaunchTraceRecorder | None" = None
+
+
+def write_chunk(f, obj: dict[str, Any]) -> None:
+    data = json.dumps(obj, separators=(",", ":")).encode()
+    f.write(_LENGTH.pack(len(data)))
+    f.write(data)
+
+
+def read_chunk(f) -> dict[str, Any] | None:
+    length = f.read(_LENGTH.size)
+    if len(length) < _LENGTH.size:
+        return None
+    (length,) = _LENGTH.unpack(length)
+    return json.loads(f.read(length))
+
+
+def _find_module_global(module_name: str, value: Any) -> str | None:
+    module = sys.modules.get(module_name)
+    if module is None:
+        return None
+    for name, module_value in vars(module).items():
+        if module_value is value:
+            return name
+    return None
+
+
+class LaunchTraceRecorder:
+    def __init__(self, path: str, capture_data: bool) -> None:
+        self.path = path
+        self.capture_data = capture_data
+        self.num_launches = 0
+        self._kernel_ids: dict[tuple, int] = {}
+        self._lock = threading.Lock()
+        # Set while a thread copies the arguments of a launch, whose copies launch kernels that are not traced
+        self._local = threading.local()
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        write_chunk(
+            self._file,
+            {
+                "arch": _ti_core.arch_name(impl.current_cfg().arch),
+                "capture_data": capture_data,
+            },
+        )
+
+    def close(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def _describe_arg(self, kernel, annotation, value, arrays: list[np.ndarray]) -> dict[str, Any]:
+        if annotation is template or type(annotation) is template:
+            if value is None or isinstance(value, (bool, int, float, str)):
+                return {"kind": "template", "value": value}
+            # Fields and other objects can only be replayed when the kernel module holds them as globals
+            global_name = _find_module_global(kernel.func.__module__, value)
+            if global_name is not None:
+                return {"kind": "global", "name": global_name}
+            return {"kind": "opaque", "type": type(value).__name__}
+        if isinstance(value, Ndarray):
+            desc = {
+                "kind": "ndarray",
+                "dtype": value.dtype.to_string(),
+                "shape": list(value.shape),
+                "element_shape": list(value.element_shape),
+            }
+            if self.capture_data:
+                arrays.append(value.to_numpy())
+            return desc
+        if isinstance(value, np.ndarray):
+            if self.capture_data:
+                arrays.append(value.copy())
+            return {"kind": "numpy", "dtype": value.dtype.str, "shape": list(value.shape)}
+        if isinstance(value, (bool, int, float, np.number)):
+            return {"kind": "scalar", "value": value.item() if isinstance(value, np.number) else value}
+        return {"kind": "opaque", "type": type(value).__name__}
+
+    def snapshot(self, kernel, py_args: tuple[Any, ...]) -> tuple[list, list[np.ndarray]] | None:
+        """Describes the arguments of a launch before it runs, None for the launches made by the recorder itself."""
+        if getattr(self._local, "busy", False):
+            return None
+        self._local.busy = True
+        try:
+            arrays: list[np.ndarray] = []
+            args = [
+                self._describe_arg(kernel, meta.annotation, value, arrays)
+                for meta, value in zip(kernel.arg_metas, py_args)
+            ]
+        finally:
+            self._local.busy = False
+        return args, arrays
+
+    def record(self, kernel, key, snapshot: tuple[list, list[np.ndarray]], host_ns: int, compiled: bool) -> None:
+        args, arrays = snapshot
+        kernel_key = (kernel.func.__module__, kernel.func.__qualname__, kernel.autodiff_mode)
+        with self._lock:
+            kernel_id = self._kernel_ids.get(kernel_key)
+            if kernel_id is None:
+                kernel_id = self._kernel_ids[kernel_key] = len(self._kernel_ids)
+                write_chunk(
+                    self._file,
+                    {
+                        "def": kernel_id,
+                        "module": kernel_key[0],
+                        "qualname": kernel_key[1],
+                        "autodiff_mode": kernel.autodiff_mode.name,
+                    },
+                )
+            write_chunk(
+                self._file,
+                {"kernel": kernel_id, "instance": key[1], "host_ns": host_ns, "compiled": compiled, "args": args},
+            )
+            for arr in arrays:
+                self._file.write(np.ascontiguousarray(arr).tobytes())
+            self.num_launches += 1
@@ -0,0 +1,41 @@
+"""
+Python-side spans for the timeline (``ti.init(timeline=True)``).
+
+The spans are recorded into the same C++ timeline as the compiler and the CPU thread pool, so that
+``ti.timeline_save`` writes a single Chrome trace / Perfetto file in which Python launches, compilation
+and kernel execution share one clock.
+"""
+
+import json
+import threading
+from contextlib import contextmanager
+from typing import Any
+
+from gstaichi.lang import impl
+
+_thread_local = threading.local()
+
+
+def _prog():
+    prog = impl.get_runtime().prog
+    if not getattr(_thread_local, "named", False):
+        prog.timeline_set_thread_name(f"python_{threading.current_thread().name}")
+        _thread_local.named = True
+    return prog
+
+
+def begin(name: str, args: dict[str, Any] | None = None) -> None:
+    _prog().timeline_insert_event(name, True, json.dumps(args) if args else "")
+
+
+def end(name: str, args: dict[str, Any] | None = None) -> None:
+    _prog().timeline_insert_event(name, False, json.dumps(args) if args else "")
+
+
+@contextmanager
+def span(name: str, args: dict[str, Any] | None = None):
+    begin(name, args)
+    try:
+        yield
+    finally:
+        end(name)
@@ -365,6 +365,8 @@ class PyGsTaichi:
         self.short_circuit_operators: bool = False
         self.unrolling_limit: int = 0
         self.src_ll_cache: bool = True
+        # Mirrors 'ti.cfg.timeline' so that the kernel launch path can check it without a binding call
+        self.timeline: bool = False
 
     @property
     def compiling_callable(self) -> KernelCxx | Kernel | Function:
@@ -426,6 +428,7 @@ class PyGsTaichi:
     def create_program(self):
         if self._prog is None:
             self._prog = _ti_core.Program()
+            self.timeline = self._prog.config().timeline
 
     @staticmethod
     def materialize_root_fb(is_first_call):
@@ -2,15 +2,19 @@ import ast
 import json
 import os
 import pathlib
+import threading
 import time
 from collections import defaultdict
 
 # Must import 'partial' directly instead of the entire module to avoid attribute lookup overhead.
 from functools import partial
+
+# Must import 'perf_counter_ns' directly instead of the entire module to avoid attribute lookup overhead.
+from time import perf_counter_ns
 from typing import Any, Callable
 
 # Must import 'ReferenceType' directly instead of the entire module to avoid attribute lookup overhead.
-from weakref import ReferenceType
+from weakref import ReferenceType, WeakKeyDictionary
 
 from gstaichi import _logging
 from gstaichi._lib.core.gstaichi_python import (
@@ -20,7 +24,13 @@ from gstaichi._lib.core.gstaichi_python import (
     KernelCxx,
     KernelLaunchContext,
 )
-from gstaichi.lang import _kernel_impl_dataclass, impl, runtime_ops
+from gstaichi.lang import (
+    _kernel_impl_dataclass,
+    _launch_trace,
+    _timeline,
+    impl,
+    runtime_ops,
+)
 from gstaichi.lang._fast_caching import src_hasher
 from gstaichi.lang._wrap_inspect import FunctionSourceInfo, get_source_info_and_src
 from gstaichi.lang.ast import (
@@ -32,6 +42,7 @@ from gstaichi.lang.ast.ast_transformer_utils import (
     ReturnStatus,
 )
 from gstaichi.lang.exception import (
+    GsTaichiRuntimeError,
     GsTaichiRuntimeTypeError,
     GsTaichiSyntaxError,
     handle_exception_from_cpp,
@@ -52,8 +63,12 @@ from ._gstaichi_callable import GsTaichiCallable
 from ._kernel_types import (
     ArgsHash,
     CompiledKernelKeyType,
+    CompilePassReport,
+    CompileReport,
+    CompileTaskReport,
     FeLlCacheObservations,
     KernelBatchedArgType,
+    LaunchCounters,
     LaunchObservations,
     LaunchStats,
     SrcLlCacheObservations,
@@ -64,6 +79,10 @@ from ._pruning import Pruning
 _NONE, _VALIDATION = AutodiffMode.NONE, AutodiffMode.VALIDATION
 _FLOAT, _INT, _UINT, _TI_ARRAY, _TI_ARRAY_WITH_GRAD = KernelBatchedArgType
 
+# Serializes the compilation of kernels launched from several Python threads, re-entrant for kernels compiled while
+# compiling another one
+_compile_lock = threading.RLock()
+
 
 class LaunchContextBufferCache:
     # Here, we are tracking whether a launch context buffer can be cached.
@@ -256,6 +275,9 @@ class ASTGenerator:
 
 class Kernel(FuncBase):
     counter = 0
+    # The name and autodiff mode of every live kernel, whose counters are read by 'gstaichi.profiler.launch_counters'.
+    # The kernels are weakly referenced so that registering them does not keep them alive.
+    launch_counters_registry: "WeakKeyDictionary[Kernel, tuple[str, AutodiffMode]]" = WeakKeyDictionary()
 
     def __init__(self, _func: Callable, autodiff_mode: AutodiffMode, _is_classkernel=False) -> None:
         super().__init__(
@@ -284,6 +306,8 @@ class Kernel(FuncBase):
         # and front-end IR, but not necessarily any further.
         self.materialized_kernels: dict[CompiledKernelKeyType, KernelCxx] = {}
         self.has_print = False
+        # Set by 'ti.fuse', merges the consecutive loops of the kernel
+        self.fuse_loops = False
         self.gstaichi_callable: GsTaichiCallable | None = None
         self.visited_functions: set[FunctionSourceInfo] = set()
         self.kernel_function_info: FunctionSourceInfo | None = None
@@ -300,6 +324,8 @@ class Kernel(FuncBase):
         self.src_ll_cache_observations: SrcLlCacheObservations = SrcLlCacheObservations()
         self.fe_ll_cache_observations: FeLlCacheObservations = FeLlCacheObservations()
         self.launch_observations = LaunchObservations()
+        self.launch_counters = LaunchCounters()
+        Kernel.launch_counters_registry[self] = (self.func.__name__, autodiff_mode)
 
         self.launch_context_buffer_cache = LaunchContextBufferCache()
 
@@ -311,6 +337,8 @@ class Kernel(FuncBase):
         self.runtime = impl.get_runtime()
         self.materialized_kernels = {}
         self.compiled_kernel_data_by_key = {}
+        # Kernels restored from the fast cache, whose body was not transformed into IR
+        self.fast_cache_materialized_keys: set[CompiledKernelKeyType] = set()
         self._last_compiled_kernel_data = None
         self.src_ll_cache_observations = SrcLlCacheObservations()
         self.fe_ll_cache_observations = FeLlCacheObservations()
@@ -330,14 +358,16 @@ class Kernel(FuncBase):
                 self.src_ll_cache_observations.cache_validated = True
                 prog = impl.get_runtime().prog
                 assert self.fast_checksum is not None
-                self.compiled_kernel_data_by_key[key] = prog.load_fast_cache(
-                    frontend_cache_key,
-                    self.func.__name__,
-                    prog.config(),
-                    prog.get_device_caps(),
-                )
+                with _timeline.span("load_fast_cache", {"kernel": self.func.__name__, "instance": key[1]}):
+                    self.compiled_kernel_data_by_key[key] = prog.load_fast_cache(
+                        frontend_cache_key,
+                        self.func.__name__,
+                        prog.config(),
+                        prog.get_device_caps(),
+                    )
                 if self.compiled_kernel_data_by_key[key]:
                     self.src_ll_cache_observations.cache_loaded = True
+                    self.launch_counters.src_ll_cache_hits += 1
                     self.used_py_dataclass_parameters_by_key_enforcing[key] = used_py_dataclass_parameters
                     return used_py_dataclass_parameters
 
@@ -357,6 +387,17 @@ class Kernel(FuncBase):
         if key in self.materialized_kernels:
             return
 
+        with _compile_lock:
+            # Another thread may have materialized the same instance while we waited
+            if key in self.materialized_kernels:
+                return
+            start_ns = perf_counter_ns()
+            with _timeline.span("materialize", {"kernel": self.func.__name__, "instance": key[1]}):
+                self._materialize(key, py_args, arg_features)
+            self.launch_counters.compiles += 1
+            self.launch_counters.compile_ns += perf_counter_ns() - start_ns
+
+    def _materialize(self, key: "CompiledKernelKeyType", py_args: tuple[Any, ...], arg_features) -> None:
         self.runtime.materialize()
         used_py_dataclass_parameters = self._try_load_fastcache(py_args, key)
         kernel_name = f"{self.func.__name__}_c{self.kernel_counter}_{key[1]}"
@@ -365,6 +406,8 @@ class Kernel(FuncBase):
         pruning = Pruning(kernel_used_parameters=used_py_dataclass_parameters)
         range_begin = 0 if used_py_dataclass_parameters is None else 1
         runtime = impl.get_runtime()
+        if self.compiled_kernel_data_by_key.get(key) is not None:
+            self.fast_cache_materialized_keys.add(key)
         for _pass in range(range_begin, 2):
             if _pass >= 1:
                 pruning.enforce()
@@ -393,6 +436,7 @@ class Kernel(FuncBase):
             gstaichi_kernel = impl.get_runtime().prog.create_kernel(
                 gstaichi_ast_generator, kernel_name, self.autodiff_mode
             )
+            gstaichi_kernel.fuse_loops = self.fuse_loops
             if _pass == 1:
                 assert key not in self.materialized_kernels
                 self.materialized_kernels[key] = gstaichi_kernel
@@ -475,24 +519,16 @@ class Kernel(FuncBase):
         try:
             prog = impl.get_runtime().prog
             if not compiled_kernel_data:
-                # Store Taichi program config and device cap for efficiency because they are used at multiple places
-                prog_config = prog.config()
-                prog_device_cap = prog.get_device_caps()
-
-                compile_result: CompileResult = prog.compile_kernel(prog_config, prog_device_cap, t_kernel)
-                compiled_kernel_data = compile_result.compiled_kernel_data
-                if compile_result.cache_hit:
-                    self.fe_ll_cache_observations.cache_hit = True
-                if self.fast_checksum:
-                    src_hasher.store(
-                        compile_result.cache_key,
-                        self.fast_checksum,
-                        self.visited_functions,
-                        self.used_py_dataclass_parameters_by_key_enforcing[key],
-                    )
-                    self.src_ll_cache_observations.cache_stored = True
+                with _compile_lock:
+                    compiled_kernel_data = self.compiled_kernel_data_by_key.get(key)
+                    if compiled_kernel_data is None:
+                        compiled_kernel_data = self._compile(prog, key, t_kernel)
             self._last_compiled_kernel_data = compiled_kernel_data
-            prog.launch_kernel(compiled_kernel_data, launch_ctx)
+            if self.runtime.timeline:
+                with _timeline.span("launch_kernel", {"kernel": self.func.__name__, "instance": key[1]}):
+                    prog.launch_kernel(compiled_kernel_data, launch_ctx)
+            else:
+                prog.launch_kernel(compiled_kernel_data, launch_ctx)
         except Exception as e:
             e = handle_exception_from_cpp(e)
             if impl.get_runtime().print_full_traceback:
@@ -512,6 +548,31 @@ class Kernel(FuncBase):
             return self.construct_kernel_ret(launch_ctx, return_type[0], (0,))
         return tuple([self.construct_kernel_ret(launch_ctx, ret_type, (i,)) for i, ret_type in enumerate(return_type)])
 
+    def _compile(self, prog: Program, key, t_kernel: KernelCxx) -> CompiledKernelData:
+        # Store Taichi program config and device cap for efficiency because they are used at multiple places
+        prog_config = prog.config()
+        prog_device_cap = prog.get_device_caps()
+
+        start_ns = perf_counter_ns()
+        with _timeline.span("compile_kernel", {"kernel": self.func.__name__, "instance": key[1]}):
+            compile_result: CompileResult = prog.compile_kernel(prog_config, prog_device_cap, t_kernel)
+        self.launch_counters.compile_ns += perf_counter_ns() - start_ns
+        compiled_kernel_data = compile_result.compiled_kernel_data
+        if compile_result.cache_hit:
+            self.fe_ll_cache_observations.cache_hit = True
+            self.launch_counters.fe_ll_cache_hits += 1
+        if self.fast_checksum:
+            src_hasher.store(
+                compile_result.cache_key,
+                self.fast_checksum,
+                self.visited_functions,
+                self.used_py_dataclass_parameters_by_key_enforcing[key],
+            )
+            self.src_ll_cache_observations.cache_stored = True
+        # Cached before the launch, so that other threads launching the same instance reuse it
+        self.compiled_kernel_data_by_key[key] = compiled_kernel_data
+        return compiled_kernel_data
+
     def construct_kernel_ret(self, launch_ctx: KernelLaunchContext, ret_type: Any, indices: tuple[int, ...]):
         if isinstance(ret_type, CompoundType):
             return ret_type.from_kernel_struct_ret(launch_ctx, indices)
@@ -532,39 +593,103 @@ class Kernel(FuncBase):
         self.materialize(key=key, py_args=py_args, arg_features=arg_features)
         return key
 
+    def compile_report(self, *py_args, **kwargs) -> CompileReport:
+        """
+        Compiles the kernel for the given arguments from scratch, bypassing the kernel caches, without launching it.
+
+        Returns the statement count and time of each compiler pass, and the offloaded tasks of the final IR with
+        their LLVM instruction counts.
+        """
+        self.raise_on_templated_floats = impl.current_cfg().raise_on_templated_floats
+        py_args = self.fuse_args(is_func=False, is_pyfunc=False, py_args=py_args, kwargs=kwargs, global_context=None)
+        key = self.ensure_compiled(*py_args)
+        if key in self.fast_cache_materialized_keys:
+            raise GsTaichiRuntimeError(
+                f"Kernel {self.func.__name__} was loaded from the fast cache, disable it to get a compile report"
+            )
+        prog = impl.get_runtime().prog
+        # The recorder is global to the process, every compilation running meanwhile would record into it
+        with _compile_lock:
+            try:
+                report = prog.compile_report(prog.config(), prog.get_device_caps(), self.materialized_kernels[key])
+            except Exception as e:
+                raise handle_exception_from_cpp(e) from None
+            return CompileReport(
+                kernel=self.func.__name__,
+                passes=[
+                    CompilePassReport(p.scope, p.task, p.name, p.statements_before, p.statements_after, p.time_ms)
+                    for p in report.passes
+                ],
+                tasks=[CompileTaskReport(t.name, t.type, t.statements, t.llvm_instructions) for t in report.tasks],
+            )
+
     # For small kernels (< 3us), the performance can be pretty sensitive to overhead in __call__
     # Thus this part needs to be fast. (i.e. < 3us on a 4 GHz x64 CPU)
     @_shell_pop_print
     def __call__(self, *py_args, **kwargs) -> Any:
-        self.raise_on_templated_floats = impl.current_cfg().raise_on_templated_floats
-        py_args = self.fuse_args(is_func=False, is_pyfunc=False, py_args=py_args, kwargs=kwargs, global_context=None)
+        start_ns = perf_counter_ns()
+        counters = self.launch_counters
+        num_compiles = counters.compiles
+        timeline = self.runtime.timeline
+        if timeline:
+            _timeline.begin(self.func.__name__, {"autodiff_mode": self.autodiff_mode.name})
+        try:
+            self.raise_on_templated_floats = impl.current_cfg().raise_on_templated_floats
+            py_args = self.fuse_args(
+                is_func=False, is_pyfunc=False, py_args=py_args, kwargs=kwargs, global_context=None
+            )
 
-        # Transform the primal kernel to forward mode grad kernel
-        # then recover to primal when exiting the forward mode manager
-        if self.runtime.fwd_mode_manager and not self.runtime.grad_replaced:
-            # TODO: if we would like to compute 2nd-order derivatives by forward-on-reverse in a nested context manager
-            # fashion, i.e., a `Tape` nested in the `FwdMode`, we can transform the kernels with
-            # `mode_original == AutodiffMode.REVERSE` only, to avoid duplicate computation for 1st-order derivatives.
-            self.runtime.fwd_mode_manager.insert(self)
-
-        # Both the class kernels and the plain-function kernels are unified now.
-        # In both cases, |self.grad| is another Kernel instance that computes the
-        # gradient. For class kernels, args[0] is always the kernel owner.
-
-        # No need to capture grad kernels because they are already bound with their primal kernels
-        if self.autodiff_mode in (_NONE, _VALIDATION) and self.runtime.target_tape and not self.runtime.grad_replaced:
-            self.runtime.target_tape.insert(self, py_args)
-
-        if self.autodiff_mode != _NONE and impl.current_cfg().opt_level == 0:
-            _logging.warn("""opt_level = 1 is enforced to enable gradient computation.""")
-            impl.current_cfg().opt_level = 1
-        key = self.ensure_compiled(*py_args)
-        self._last_launch_key = key
-        kernel_cpp = self.materialized_kernels[key]
-        compiled_kernel_data = self.compiled_kernel_data_by_key.get(key, None)
-        self.launch_observations.found_kernel_in_materialize_cache = compiled_kernel_data is not None
-        ret = self.launch_kernel(key, kernel_cpp, compiled_kernel_data, *py_args)
-        if compiled_kernel_data is None:
-            assert self._last_compiled_kernel_data is not None
-            self.compiled_kernel_data_by_key[key] = self._last_compiled_kernel_data
-        return ret
+            # The arguments are recorded before the kernel modifies them
+            recorder = _launch_trace.recorder
+            trace_snapshot = None
+            if recorder is not None:
+                snapshot_start_ns = perf_counter_ns()
+                trace_snapshot = recorder.snapshot(self, py_args)
+                # Copying the arguments is not part of the launch time
+                start_ns += perf_counter_ns() - snapshot_start_ns
+
+            # Transform the primal kernel to forward mode grad kernel
+            # then recover to primal when exiting the forward mode manager
+            if self.runtime.fwd_mode_manager and not self.runtime.grad_replaced:
+                # TODO: if we would like to compute 2nd-order derivatives by forward-on-reverse in a nested context
+                # manager fashion, i.e., a `Tape` nested in the `FwdMode`, we can transform the kernels with
+                # `mode_original == AutodiffMode.REVERSE` only, to avoid duplicate computation for 1st-order
+                # derivatives.
+                self.runtime.fwd_mode_manager.insert(self, py_args)
+
+            # Both the class kernels and the plain-function kernels are unified now.
+            # In both cases, |self.grad| is another Kernel instance that computes the
+            # gradient. For class kernels, args[0] is always the kernel owner.
+
+            # No need to capture grad kernels because they are already bound with their primal kernels
+            if (
+                self.autodiff_mode in (_NONE, _VALIDATION)
+                and self.runtime.target_tape
+                and not self.runtime.grad_replaced
+            ):
+                self.runtime.target_tape.insert(self, py_args)
+
+            if self.autodiff_mode != _NONE and impl.current_cfg().opt_level == 0:
+                _logging.warn("""opt_level = 1 is enforced to enable gradient computation.""")
+                impl.current_cfg().opt_level = 1
+            key = self.ensure_compiled(*py_args)
+            self._last_launch_key = key
+            kernel_cpp = self.materialized_kernels[key]
+            compiled_kernel_data = self.compiled_kernel_data_by_key.get(key, None)
+            self.launch_observations.found_kernel_in_materialize_cache = compiled_kernel_data is not None
+            ret = self.launch_kernel(key, kernel_cpp, compiled_kernel_data, *py_args)
+            if compiled_kernel_data is not None:
+                counters.materialize_cache_hits += 1
+
+            counters.launches += 1
+            elapsed_ns = perf_counter_ns() - start_ns
+            if counters.compiles == num_compiles:
+                counters.launch_ns += elapsed_ns
+                # A launch that took exactly 2 ** i ns belongs to bucket i, as the Prometheus 'le' bounds expect
+                counters.launch_ns_histogram[(elapsed_ns - 1).bit_length() if elapsed_ns else 0] += 1
+            if trace_snapshot is not None:
+                recorder.record(self, key, trace_snapshot, elapsed_ns, counters.compiles != num_compiles)
+            return ret
+        finally:
+            if timeline:
+                _timeline.end(self.func.__name__)
@@ -1,4 +1,6 @@
 import inspect
+import itertools
+import linecache
 import re
 import sys
 import typing
@@ -231,6 +233,90 @@ def kernel(_fn: Callable[..., typing.Any] | None = None, *, pure: bool | None =
     return decorator(_fn, has_kernel_params=False)
 
 
+_fused_kernel_ids = itertools.count()
+
+
+def fuse(*kernels: GsTaichiCallable | BoundGsTaichiCallable) -> GsTaichiCallable:
+    """Fuses consecutive kernel launches into a single kernel.
+
+    The fused kernel takes the arguments of all the kernels, in order, and runs their bodies one after another in a
+    single launch. Consecutive top-level loops over the same iteration space, i.e. range-fors with the same constant
+    bounds or struct-fors over dense fields of the same shape, are merged into one loop when each iteration only
+    reads what the same iteration of the previous loops wrote. This saves one pass over memory per merged loop, as
+    the data written by a loop is consumed while it is still in registers or in the cache. Loops that cannot be
+    merged run one after the other, as they would in separate launches.
+
+    The kernels must not return values.
+
+    Args:
+        *kernels: The kernels to fuse, in launch order. Kernels of data-oriented classes must be bound to their
+            instance.
+
+    Returns:
+        Callable: The fused kernel.
+
+    Example::
+
+        >>> @ti.kernel
+        >>> def scale(a: ti.f32):
+        >>>     for i in x:
+        >>>         y[i] = a * x[i]
+        >>>
+        >>> @ti.kernel
+        >>> def shift(b: ti.f32):
+        >>>     for i in x:
+        >>>         z[i] = y[i] + b
+        >>>
+        >>> scale_shift = ti.fuse(scale, shift)
+        >>> scale_shift(2.0, 1.0)  # same as scale(2.0); shift(1.0), with a single loop
+    """
+    if not kernels:
+        raise GsTaichiSyntaxError("ti.fuse requires at least one kernel")
+    params = []
+    calls = []
+    fused_globals: dict[str, Any] = {"__name__": __name__}
+    for i, kernel in enumerate(kernels):
+        if not isinstance(kernel, (GsTaichiCallable, BoundGsTaichiCallable)) or not kernel._is_wrapped_kernel:
+            raise GsTaichiSyntaxError(f"ti.fuse only accepts kernels, got {kernel}")
+        primal = kernel._primal
+        assert primal is not None
+        if primal.return_type is not None:
+            raise GsTaichiSyntaxError(f"Kernel {primal.func.__name__} returns a value and cannot be fused")
+        # The body of each kernel is inlined into the fused kernel as a ti.func
+        body = GsTaichiCallable(primal.func, Func(primal.func, _classfunc=primal.is_classkernel))
+        body._is_gstaichi_function = True
+        fused_globals[f"_f{i}"] = body
+        args = []
+        arg_metas = primal.arg_metas
+        if primal.is_classkernel:
+            if not isinstance(kernel, BoundGsTaichiCallable):
+                raise GsTaichiSyntaxError(
+                    f"Kernel {primal.func.__name__} of a data-oriented class must be bound to an instance to be fused"
+                )
+            fused_globals[f"_owner{i}"] = kernel.instance
+            args.append(f"_owner{i}")
+            arg_metas = arg_metas[1:]
+        for j, arg_meta in enumerate(arg_metas):
+            fused_globals[f"_a{i}_{j}"] = arg_meta.annotation
+            params.append(f"k{i}_{arg_meta.name}: _a{i}_{j}")
+            args.append(f"k{i}_{arg_meta.name}")
+        calls.append(f"    _f{i}({', '.join(args)})\n")
+
+    name = "fused_" + "_".join(kernel.__name__ for kernel in kernels)
+    src = [f"def {name}({', '.join(params)}):\n"] + calls
+    # The source of kernels is parsed again at compile time, register it as inspect would find it for a file
+    filename = f"<gstaichi fused kernel {next(_fused_kernel_ids)}>"
+    linecache.cache[filename] = (sum(map(len, src)), None, src, filename)
+    exec(compile("".join(src), filename, "exec"), fused_globals)
+
+    # Level 1 is this function, which is never a class definition
+    wrapped = _kernel_impl(fused_globals[name], level_of_class_stackframe=1)
+    assert wrapped._primal is not None and wrapped._adjoint is not None
+    wrapped._primal.fuse_loops = True
+    wrapped._adjoint.fuse_loops = True
+    return wrapped
+
+
 class _BoundedDifferentiableMethod:
     def __init__(self, kernel_owner: Any, wrapped_kernel_func: GsTaichiCallable | BoundGsTaichiCallable):
         clsobj = type(kernel_owner)
@@ -250,6 +336,10 @@ class _BoundedDifferentiableMethod:
                 raise e
             raise type(e)("\n" + str(e)) from None
 
+    def compile_report(self, *args, **kwargs):
+        assert self._primal is not None
+        return self._primal.compile_report(self._kernel_owner, *args, **kwargs)
+
     def grad(self, *args, **kwargs) -> "Kernel":
         assert self._adjoint is not None
         return self._adjoint(self._kernel_owner, *args, **kwargs)
@@ -317,4 +407,4 @@ def data_oriented(cls):
     return cls
 
 
-__all__ = ["data_oriented", "func", "kernel", "pyfunc", "real_func"]
+__all__ = ["data_oriented", "func", "fuse", "kernel", "pyfunc", "real_func"]
@@ -156,6 +156,16 @@ def timeline_clear():
 
 
 def timeline_save(fn):
+    """Writes the events recorded since `ti.init(timeline=True)` to `fn` as a Chrome trace JSON file.
+
+    The file can be opened with chrome://tracing or https://ui.perfetto.dev. Each kernel call shows up as a span
+    named after the kernel on the calling Python thread, with nested `materialize`, `load_fast_cache`,
+    `compile_kernel` and `launch_kernel` spans tagged with the kernel name and instance key. On the CPU backend,
+    every offloaded task and the thread pool worker spans it spawns are recorded as well.
+
+    Args:
+        fn (str): Path of the output file, which should end with '.json'.
+    """
     return impl.get_runtime().prog.timeline_save(fn)
 
 
@@ -330,6 +340,26 @@ def init(
             https://github.com/taichi-dev/gstaichi/blob/master/gstaichi/program/compile_config.h.
 
             * ``cpu_max_num_threads`` (int): Sets the number of threads used by the CPU thread pool.
+            * ``cpu_thread_pool_spin_us`` (int): Microseconds the CPU thread pool spins between parallel loops
+              before its threads go to sleep. Lowers the latency of many small kernels. Default to 0.
+            * ``cpu_loop_schedule`` (str): Default schedule of the parallel loops on CPU, see ``ti.loop_config``.
+            * ``cpu_thread_affinity`` (str): CPUs the thread pool workers are pinned to, e.g. ``"0-7,16-23"``
+              (Linux only). Worker i takes the i-th CPU of the list, and the thread launching the kernels runs on the
+              first one during its parallel loops only, keeping its own mask otherwise. Default to ``""``, leaving the
+              threads unpinned.
+            * ``cpu_memory_placement`` (str): NUMA placement of the CPU fields and ndarrays. ``"default"`` lets the
+              OS place pages near the thread allocating them, ``"interleave"`` spreads them over all NUMA nodes, and
+              ``"first_touch"`` initializes them in parallel so that each thread's block of a dense range-for is in
+              its local memory. Combine with ``cpu_thread_affinity`` to keep the threads near their memory.
+            * ``cpu_serial_loop_threshold`` (int): Parallel loops with fewer iterations run serially on the launching
+              thread on CPU, except the loops configured with ``ti.loop_config``. -1 measures the break-even point of
+              an empty loop body at startup, which suits cheap bodies only. Default to 0, always using the thread pool.
+              See ``ti.profiler.get_cpu_loop_counters``.
+            * ``cpu_concurrent_tasks`` (bool): Runs the top-level loops of a kernel that access different fields and
+              arrays concurrently on CPU, each loop on a single thread. Speeds up kernels made of many small loops,
+              but slows down kernels whose independent loops are large. Default to False.
+            * ``cpu_vectorize`` (bool): Compiles the body of the range-fors on CPU as a loop over each block of
+              iterations so that LLVM can vectorize it with SIMD instructions. Default to True.
             * ``debug`` (bool): Enables the debug mode, under which GsTaichi does a few more things like boundary checks.
             * ``print_ir`` (bool): Prints the CHI IR of the GsTaichi kernels.
             *``offline_cache`` (bool): Enables offline cache of the compiled kernels. Default to True. When this is enabled GsTaichi will cache compiled kernel on your local disk to accelerate future calls.
@@ -598,6 +628,11 @@ def _bit_vectorize():
     get_runtime().compiling_callable.ast_builder().bit_vectorize()
 
 
+def _loop_schedule(schedule):
+    """Set how the iterations of the next loop are distributed among CPU threads."""
+    get_runtime().compiling_callable.ast_builder().loop_schedule(schedule)
+
+
 def loop_config(
     *,
     block_dim=None,
@@ -605,6 +640,7 @@ def loop_config(
     parallelize=None,
     block_dim_adaptive=True,
     bit_vectorize=False,
+    schedule=None,
 ):
     """Sets directives for the next loop
 
@@ -614,6 +650,12 @@ def loop_config(
         parallelize (int): The number of threads to use on CPU
         block_dim_adaptive (bool): Whether to allow backends set block_dim adaptively, enabled by default
         bit_vectorize (bool): Whether to enable bit vectorization of struct fors on quant_arrays.
+        schedule (str): How the iterations are distributed among threads on CPU, overriding the
+            ``cpu_loop_schedule`` option of ``ti.init``. One of ``"static"`` (equal contiguous ranges per thread),
+            ``"dynamic"`` (threads take the next ``block_dim`` chunk from a shared counter), ``"guided"``
+            (like dynamic, with chunks shrinking as the loop progresses) and ``"work_stealing"`` (static ranges,
+            idle threads steal half of the remaining range of another thread). The default, ``"auto"``, splits
+            range-fors statically and schedules struct-fors dynamically.
 
     Examples::
 
@@ -666,6 +708,9 @@ def loop_config(
     if bit_vectorize:
         _bit_vectorize()
 
+    if schedule is not None:
+        _loop_schedule(schedule)
+
 
 def global_thread_idx():
     """Returns the global thread id of this running thread,
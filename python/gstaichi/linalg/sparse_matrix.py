@@ -150,17 +150,59 @@ class SparseMatrix:
             ), f"Dimension mismatch between sparse matrix ({self.n}, {self.m}) and vector ({other.shape})"
             return self.matrix.mat_vec_mul(other)
         if isinstance(other, Ndarray):
-            if self.m != other.shape[0]:
-                raise GsTaichiRuntimeError(
-                    f"Dimension mismatch between sparse matrix ({self.n}, {self.m}) and vector ({other.shape})"
-                )
-            res = ScalarNdarray(dtype=other.dtype, arr_shape=(self.n,))
-            self.matrix.spmv(get_runtime().prog, other.arr, res.arr)
-            return res
+            return self.matmul(other)
         raise GsTaichiRuntimeError(
             f"Sparse matrix-matrix/vector multiplication does not support {type(other)} for now. Supported types are SparseMatrix, ti.field, and numpy ndarray."
         )
 
+    def matmul(self, other, out=None):
+        """Multiply the sparse matrix with a vector or a dense matrix stored in an ndarray.
+
+        The operands are used in place, without conversion. On CPU the product runs on the runtime's thread pool
+        for `row_major` matrices and for matrices using the block format (see `use_block_format`).
+
+        Args:
+            other (Ndarray): A vector of shape `(m,)`, or a dense matrix of shape `(m, k)`.
+            out (Ndarray, optional): A preallocated ndarray of shape `(n,)` or `(n, k)` receiving the result.
+                A new ndarray is allocated if it is not given.
+
+        Returns:
+            Ndarray: The result of the multiplication (`out` if it is given).
+        """
+        if not isinstance(other, Ndarray):
+            raise GsTaichiRuntimeError(f"Expected an Ndarray, but got {type(other)}.")
+        if len(other.shape) not in (1, 2) or self.m != other.shape[0]:
+            raise GsTaichiRuntimeError(
+                f"Dimension mismatch between sparse matrix ({self.n}, {self.m}) and ndarray ({other.shape})"
+            )
+        res_shape = (self.n,) + tuple(other.shape[1:])
+        if out is None:
+            out = ScalarNdarray(dtype=other.dtype, arr_shape=res_shape)
+        elif tuple(out.shape) != res_shape:
+            raise GsTaichiRuntimeError(f"The output ndarray should have shape {res_shape}, but got {out.shape}.")
+        if len(other.shape) == 1:
+            self.matrix.spmv(get_runtime().prog, other.arr, out.arr)
+        else:
+            if get_runtime().prog.config().arch == _ti_core.Arch.cuda:
+                raise GsTaichiRuntimeError(
+                    "Sparse matrix-dense matrix multiplication is only supported on CPU for now."
+                )
+            self.matrix.spmm(get_runtime().prog, other.arr, out.arr)
+        return out
+
+    def use_block_format(self, block_size=3):
+        """Store a block CSR (BSR) copy of the matrix with dense `block_size` x `block_size` blocks.
+
+        Matrices assembled from small dense blocks (e.g. the 3x3 blocks of a FEM stiffness matrix) multiply
+        faster in this format. The copy is used by `matmul` and is rebuilt after the matrix changes.
+
+        Args:
+            block_size (int): The size of the blocks. 0 disables the block format.
+        """
+        if get_runtime().prog.config().arch == _ti_core.Arch.cuda:
+            raise GsTaichiRuntimeError("The block format is only supported on CPU for now.")
+        self.matrix.set_block_size(block_size)
+
     def __getitem__(self, indices):
         return self.matrix.get_element(indices[0], indices[1])
 
@@ -286,7 +328,7 @@ class SparseMatrixBuilder:
         """Create a sparse matrix using the triplets"""
         gstaichi_arch = get_runtime().prog.config().arch
         if gstaichi_arch in [_ti_core.Arch.x64, _ti_core.Arch.arm64]:
-            sm = self.ptr.build()
+            sm = self.ptr.build(get_runtime().prog)
             return SparseMatrix(sm=sm, dtype=self.dtype)
         if gstaichi_arch == _ti_core.Arch.cuda:
             if self.dtype != f32:
@@ -295,6 +337,27 @@ class SparseMatrixBuilder:
             return SparseMatrix(sm=sm, dtype=self.dtype)
         raise GsTaichiRuntimeError("Sparse matrix only supports CPU and CUDA backends.")
 
+    def update_values(self, sparse_matrix):
+        """Overwrite the values of an existing sparse matrix with the triplets in the builder.
+
+        The sparsity pattern of `sparse_matrix` is reused, so this is cheaper than `build` when only the values
+        change between two assemblies. Entries of the pattern without any triplet are set to zero.
+
+        Args:
+            sparse_matrix (SparseMatrix): A matrix previously built with the same shape and dtype. Every triplet
+                in the builder must fall into its sparsity pattern.
+
+        Returns:
+            SparseMatrix: `sparse_matrix`, with its values updated.
+        """
+        gstaichi_arch = get_runtime().prog.config().arch
+        if gstaichi_arch not in [_ti_core.Arch.x64, _ti_core.Arch.arm64]:
+            raise GsTaichiRuntimeError("Updating the values of a sparse matrix is only supported on CPU for now.")
+        if not isinstance(sparse_matrix, SparseMatrix):
+            raise GsTaichiRuntimeError(f"Expected a SparseMatrix, but got {type(sparse_matrix)}.")
+        self.ptr.update_values(sparse_matrix.matrix, get_runtime().prog)
+        return sparse_matrix
+
     def __del__(self):
         if get_runtime() is not None and get_runtime().prog is not None:
             self.ptr.delete_ndarray(get_runtime().prog)
@@ -94,6 +94,25 @@ class SparseSolver:
         else:
             self._type_assert(sparse_matrix)
 
+    def refactorize(self, sparse_matrix):
+        """Redo only the numeric factorization for a matrix whose sparsity pattern is unchanged.
+
+        This is the fast path for matrices whose values change every frame while the pattern stays the same
+        (e.g. implicit integration): the symbolic analysis from the last `analyze_pattern` (or `compute`) call
+        is reused.
+
+        Args:
+            sparse_matrix (SparseMatrix): The sparse matrix to be factorized. It must have the same sparsity pattern
+                as the matrix passed to `analyze_pattern`.
+        """
+        if isinstance(sparse_matrix, SparseMatrix):
+            if self.matrix is None:
+                raise GsTaichiRuntimeError("Please call analyze_pattern() before calling refactorize().")
+            self.matrix = sparse_matrix
+            self.solver.refactorize(sparse_matrix.matrix)
+        else:
+            self._type_assert(sparse_matrix)
+
     def solve(self, b):  # pylint: disable=R1710
         """Computes the solution of the linear systems.
         Args:
@@ -114,6 +133,42 @@ class SparseSolver:
             return x
         raise GsTaichiRuntimeError(f"The parameter type: {type(b)} is not supported in linear solvers for now.")
 
+    def solve_many(self, B):  # pylint: disable=R1710
+        """Computes the solutions of the linear systems for several right-hand sides at once.
+
+        All right-hand sides share the factorization and are solved in one call, which amortizes the
+        per-call overhead of `solve`.
+
+        Args:
+            B (numpy.array or Ndarray): The right-hand sides of the linear systems, with shape `(n, k)`.
+                Each column is one right-hand side.
+
+        Returns:
+            numpy.array or Ndarray: The solutions of the linear systems, with shape `(n, k)`. An Ndarray is returned
+            if `B` is an Ndarray.
+        """
+        if self.matrix is None:
+            raise GsTaichiRuntimeError("Please call compute() before calling solve_many().")
+        if len(B.shape) != 2 or B.shape[0] != self.matrix.n:
+            raise GsTaichiRuntimeError(
+                f"The right-hand sides should have shape ({self.matrix.n}, k), but got {tuple(B.shape)}."
+            )
+        gstaichi_arch = get_runtime().prog.config().arch
+        if gstaichi_arch == _ti_core.Arch.cuda:
+            raise GsTaichiRuntimeError("solve_many() is only supported on CPU for now.")
+        if isinstance(B, np.ndarray):
+            np_dtype = gstaichi.lang.util.to_numpy_type(self.dtype)
+            return self.solver.solve_many(np.asarray(B, dtype=np_dtype))
+        if isinstance(B, Ndarray):
+            if B.dtype != self.dtype:
+                raise GsTaichiRuntimeError(
+                    f"The SparseSolver's dtype {self.dtype} is not consistent with the right-hand sides' dtype {B.dtype}."
+                )
+            X = ScalarNdarray(B.dtype, [self.matrix.m, B.shape[1]])
+            self.solver.solve_many_rf(get_runtime().prog, self.matrix.matrix, B.arr, X.arr)
+            return X
+        raise GsTaichiRuntimeError(f"The parameter type: {type(B)} is not supported in linear solvers for now.")
+
     def info(self):
         """Check if the linear systems are solved successfully.
 
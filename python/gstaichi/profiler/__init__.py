@@ -2,5 +2,7 @@
 
 from gstaichi.profiler.kernel_metrics import *
 from gstaichi.profiler.kernel_profiler import *
+from gstaichi.profiler.launch_counters import *
+from gstaichi.profiler.launch_trace import *
 from gstaichi.profiler.memory_profiler import *
 from gstaichi.profiler.scoped_profiler import *
@@ -251,6 +251,17 @@ def get_predefined_cupti_metrics(name=""):
     return predefined_cupti_metrics[name]
 
 
+# Columns of the CPU memory traffic counters, collected with
+# ``ti.init(arch=ti.cpu, kernel_profiler=True, kernel_profiler_memory_traffic=True)`` instead of CUPTI.
+# The order matches the values reported by the backend.
+memory_traffic_metrics = [
+    CuptiMetric(name="load_bytes", header=" global.load ", val_format="{:9.3f} MB ", scale=1.0 / 1024 / 1024),
+    CuptiMetric(name="store_bytes", header=" global.store", val_format="{:9.3f} MB ", scale=1.0 / 1024 / 1024),
+    CuptiMetric(name="atomic_bytes", header=" global.atom ", val_format="{:9.3f} MB ", scale=1.0 / 1024 / 1024),
+    CuptiMetric(name="node_allocations", header=" node.alloc ", val_format=" {:10.0f} "),
+    CuptiMetric(name="node_deactivations", header=" node.deact ", val_format=" {:10.0f} "),
+]
+
 # Default metrics list
 default_cupti_metrics = [dram_bytes_sum]
 """The metrics list, each is an instance of the :class:`~gstaichi.profiler.CuptiMetric`.
@@ -4,7 +4,10 @@ from contextlib import contextmanager
 
 from gstaichi._lib import core as _ti_core
 from gstaichi.lang import impl
-from gstaichi.profiler.kernel_metrics import default_cupti_metrics
+from gstaichi.profiler.kernel_metrics import (
+    default_cupti_metrics,
+    memory_traffic_metrics,
+)
 
 
 class StatisticalResult:
@@ -122,6 +125,34 @@ class KernelProfiler:
         # TODO : query self.StatisticalResult in python scope
         return impl.get_runtime().prog.query_kernel_profile_info(name)
 
+    def query_memory_traffic(self):
+        """For docstring of this function, see :func:`~gstaichi.profiler.get_kernel_memory_traffic`."""
+        if self._check_not_turned_on_with_warning_message():
+            return {}
+        if not impl.current_cfg().kernel_profiler_memory_traffic:
+            _ti_core.warn("use 'ti.init(kernel_profiler_memory_traffic=True)' to count the memory traffic.")
+            return {}
+        self._update_records()
+        results = {}
+        for record in self._traced_records:
+            result = results.setdefault(
+                record.name, {"counter": 0, "time_ms": 0.0, **{metric.name: 0 for metric in memory_traffic_metrics}}
+            )
+            result["counter"] += 1
+            result["time_ms"] += record.kernel_time
+            for metric, value in zip(memory_traffic_metrics, record.memory_traffic):
+                result[metric.name] += value
+        for result in results.values():
+            total_bytes = result["load_bytes"] + result["store_bytes"] + result["atomic_bytes"]
+            result["bandwidth_gb_per_s"] = total_bytes / result["time_ms"] / 1e6 if result["time_ms"] > 0 else 0.0
+        return dict(
+            sorted(
+                results.items(),
+                key=lambda item: item[1]["load_bytes"] + item[1]["store_bytes"] + item[1]["atomic_bytes"],
+                reverse=True,
+            )
+        )
+
     def set_metrics(self, metric_list=default_cupti_metrics):
         """For docstring of this function, see :func:`~gstaichi.profiler.set_kernel_profiler_metrics`."""
         if self._check_not_turned_on_with_warning_message():
@@ -277,7 +308,11 @@ class KernelProfiler:
     def _print_kernel_info(self):
         """Print a list of launched kernels during the profiling period."""
         metric_list = self._metric_list
-        values_num = len(self._traced_records[0].metric_values)
+        values_attr = "metric_values"
+        if impl.current_cfg().kernel_profiler_memory_traffic:
+            metric_list = memory_traffic_metrics
+            values_attr = "memory_traffic"
+        values_num = len(getattr(self._traced_records[0], values_attr))
 
         # We currently get kernel attributes through CUDA Driver API,
         # there is no corresponding implementation in other backends yet.
@@ -316,7 +351,7 @@ class KernelProfiler:
                 ]
             for idx in range(values_num):
                 formatted_str += metric_list[idx].val_format + "|"
-                values += [record.metric_values[idx] * metric_list[idx].scale]
+                values += [getattr(record, values_attr)[idx] * metric_list[idx].scale]
             formatted_str = formatted_str + "] " + record.name
             string_list.append(formatted_str.replace("|]", "]"))
             values_list.append(values)
@@ -525,6 +560,37 @@ def set_kernel_profiler_metrics(metric_list=default_cupti_metrics):
     get_default_kernel_profiler().set_metrics(metric_list)
 
 
+def get_kernel_memory_traffic():
+    """Get the global memory traffic and the SNode allocator activity of every offloaded task.
+
+    Only available on CPU backends, with ``ti.init(kernel_profiler=True, kernel_profiler_memory_traffic=True)``.
+    In this mode, the kernels count the bytes of every global load, store and atomic operation, which slows them
+    down. The counters are also shown as columns by ``ti.profiler.print_kernel_profiler_info('trace')``.
+
+    Returns:
+        dict: maps every offloaded task name to a dict with its number of launches (``counter``), total time
+        (``time_ms``), ``load_bytes``, ``store_bytes``, ``atomic_bytes``, ``node_allocations``,
+        ``node_deactivations`` and the resulting ``bandwidth_gb_per_s``. Sorted by decreasing traffic.
+
+    Example::
+
+        >>> import gstaichi as ti
+
+        >>> ti.init(ti.cpu, kernel_profiler=True, kernel_profiler_memory_traffic=True)
+        >>> x = ti.field(ti.f32, shape=1024 * 1024)
+
+        >>> @ti.kernel
+        >>> def scale():
+        >>>     for i in x:
+        >>>         x[i] *= 2.0
+
+        >>> scale()
+        >>> for name, traffic in ti.profiler.get_kernel_memory_traffic().items():
+        >>>     print(name, traffic["load_bytes"], traffic["store_bytes"], traffic["bandwidth_gb_per_s"])
+    """
+    return get_default_kernel_profiler().query_memory_traffic()
+
+
 @contextmanager
 def collect_kernel_profiler_metrics(metric_list=default_cupti_metrics):
     """Set temporary metrics that will be collected by the CUPTI toolkit within this context.
@@ -578,6 +644,7 @@ def collect_kernel_profiler_metrics(metric_list=default_cupti_metrics):
 __all__ = [
     "clear_kernel_profiler_info",
     "collect_kernel_profiler_metrics",
+    "get_kernel_memory_traffic",
     "get_kernel_profiler_total_time",
     "print_kernel_profiler_info",
     "query_kernel_profiler_info",
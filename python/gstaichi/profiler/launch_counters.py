@@ -0,0 +1,139 @@
+# type: ignore
+
+from gstaichi.lang import impl
+from gstaichi.lang.kernel import Kernel
+from gstaichi.types.enums import AutodiffMode
+
+_counter_names = [
+    "launches",
+    "launch_ns",
+    "compiles",
+    "compile_ns",
+    "src_ll_cache_hits",
+    "fe_ll_cache_hits",
+    "materialize_cache_hits",
+]
+
+
+def _kernel_label(name, autodiff_mode):
+    if autodiff_mode in (AutodiffMode.NONE, AutodiffMode.VALIDATION):
+        return name
+    return f"{name}.{'grad' if autodiff_mode == AutodiffMode.REVERSE else 'fwd'}"
+
+
+def get_kernel_launch_counters():
+    """Get the launch counters of every kernel launched so far.
+
+    The counters are always on and do not require `ti.init(kernel_profiler=True)`. They only measure the host side of
+    the launches and never synchronize with the device. The counters of kernels sharing a name are summed, and the
+    gradient kernels are reported with a `.grad` (reverse mode) or `.fwd` (forward mode) suffix.
+
+    Returns:
+        Dict[str, Dict]: For each kernel name, the number of `launches`, the host-side time of the launches that did
+        not compile in `launch_ns` with its `launch_ns_histogram` (bucket i counts the launches that took
+        (2 ** (i - 1), 2 ** i] ns), the number of `compiles` and their time in `compile_ns`, and the hits of the
+        source (`src_ll_cache_hits`), offline (`fe_ll_cache_hits`) and in-memory (`materialize_cache_hits`) caches.
+
+    Example::
+
+        >>> for _ in range(100):
+        >>>     compute()
+        >>> counters = ti.profiler.get_kernel_launch_counters()
+        >>> print(counters["compute"]["launch_ns"] / counters["compute"]["launches"])
+    """
+    result = {}
+    for kernel, (name, autodiff_mode) in list(Kernel.launch_counters_registry.items()):
+        counters = kernel.launch_counters
+        if counters.launches == 0:
+            continue
+        label = _kernel_label(name, autodiff_mode)
+        entry = result.setdefault(label, {**{key: 0 for key in _counter_names}, "launch_ns_histogram": [0] * 64})
+        for key in _counter_names:
+            entry[key] += getattr(counters, key)
+        for i, count in enumerate(counters.launch_ns_histogram):
+            entry["launch_ns_histogram"][i] += count
+    return result
+
+
+def _escape_label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def get_kernel_launch_counters_prometheus():
+    """Get the launch counters of :func:`get_kernel_launch_counters` in the Prometheus text exposition format.
+
+    Times are exported in seconds. The launch time histogram uses the power of two nanoseconds buckets up to the
+    largest non-empty one.
+
+    Returns:
+        str: The metrics, ready to be served to a Prometheus scraper.
+    """
+    counters = get_kernel_launch_counters()
+    lines = []
+
+    def add_counter(metric, help_text, key, scale=1):
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} counter")
+        for name, entry in counters.items():
+            lines.append(f'{metric}{{kernel="{_escape_label(name)}"}} {entry[key] * scale}')
+
+    add_counter("gstaichi_kernel_launches_total", "Number of kernel launches.", "launches")
+    add_counter("gstaichi_kernel_compiles_total", "Number of kernel materializations.", "compiles")
+    add_counter("gstaichi_kernel_compile_seconds_total", "Time spent compiling kernels.", "compile_ns", 1e-9)
+    add_counter("gstaichi_kernel_src_ll_cache_hits_total", "Kernels loaded from the source cache.", "src_ll_cache_hits")
+    add_counter("gstaichi_kernel_fe_ll_cache_hits_total", "Kernels loaded from the offline cache.", "fe_ll_cache_hits")
+    add_counter(
+        "gstaichi_kernel_materialize_cache_hits_total",
+        "Launches reusing an already compiled kernel.",
+        "materialize_cache_hits",
+    )
+
+    metric = "gstaichi_kernel_launch_duration_seconds"
+    lines.append(f"# HELP {metric} Host-side time of the kernel launches that did not compile.")
+    lines.append(f"# TYPE {metric} histogram")
+    for name, entry in counters.items():
+        label = _escape_label(name)
+        histogram = entry["launch_ns_histogram"]
+        num_buckets = max((i + 1 for i, count in enumerate(histogram) if count), default=0)
+        cumulative = 0
+        for i in range(num_buckets):
+            cumulative += histogram[i]
+            lines.append(f'{metric}_bucket{{kernel="{label}",le="{2**i * 1e-9:.9g}"}} {cumulative}')
+        lines.append(f'{metric}_bucket{{kernel="{label}",le="+Inf"}} {cumulative}')
+        lines.append(f'{metric}_sum{{kernel="{label}"}} {entry["launch_ns"] * 1e-9:.9g}')
+        lines.append(f'{metric}_count{{kernel="{label}"}} {cumulative}')
+    return "\n".join(lines) + "\n"
+
+
+def clear_kernel_launch_counters():
+    """Reset the launch counters of all kernels to zero."""
+    for kernel in list(Kernel.launch_counters_registry):
+        kernel.launch_counters.__init__()
+
+
+def get_cpu_loop_counters():
+    """Get how often the parallel loops on CPU ran serially or on the thread pool.
+
+    Loops with fewer iterations than the `cpu_serial_loop_threshold` option of `ti.init` run on the thread that
+    launched the kernel, the element count of a struct-for being its number of iterations. Loops launched while the
+    thread pool serves another Python thread are counted as serial as well.
+
+    Returns:
+        Dict[str, int]: The number of `serial_loops` and `parallel_loops` since the last clear, and the
+        `serial_loop_threshold` in use. Empty on backends without a CPU thread pool.
+    """
+    return impl.get_runtime().prog.get_cpu_loop_counters()
+
+
+def clear_cpu_loop_counters():
+    """Reset the counters of :func:`get_cpu_loop_counters` to zero."""
+    impl.get_runtime().prog.clear_cpu_loop_counters()
+
+
+__all__ = [
+    "get_kernel_launch_counters",
+    "get_kernel_launch_counters_prometheus",
+    "clear_kernel_launch_counters",
+    "get_cpu_loop_counters",
+    "clear_cpu_loop_counters",
+]
@@ -0,0 +1,217 @@
+# type: ignore
+
+import argparse
+import importlib
+from dataclasses import dataclass, field
+from time import perf_counter_ns
+
+import numpy as np
+
+import gstaichi as ti
+from gstaichi.lang import _launch_trace
+from gstaichi.lang.exception import GsTaichiRuntimeError
+from gstaichi.lang.util import to_numpy_type
+
+
+def start_launch_trace(path, capture_data=False):
+    """Start recording every kernel launch into a binary trace file.
+
+    Each launch is recorded with the kernel's module and qualified name, its template instance and the metadata of
+    its arguments: scalar values, template values, and the dtype and shape of ndarrays and numpy arrays. Templates
+    that refer to globals of the kernel's module, such as fields, are recorded by name.
+
+    Args:
+        path (str): The trace file to write, overwritten if it exists.
+        capture_data (bool): Also store the content of the array arguments at launch time. This synchronizes with
+            the device and copies every array on every launch.
+
+    Example::
+
+        >>> ti.profiler.start_launch_trace("step.tilt")
+        >>> for _ in range(10):
+        >>>     step(particles, dt)
+        >>> ti.profiler.stop_launch_trace()
+        >>> # later, possibly with another version of GsTaichi:
+        >>> # python -m gstaichi.profiler.launch_trace step.tilt --repeat 5
+    """
+    stop_launch_trace()
+    _launch_trace.recorder = _launch_trace.LaunchTraceRecorder(path, capture_data)
+
+
+def stop_launch_trace():
+    """Stop recording kernel launches and close the trace file.
+
+    Returns:
+        int: The number of launches recorded, or 0 if no trace was being recorded.
+    """
+    recorder = _launch_trace.recorder
+    if recorder is None:
+        return 0
+    _launch_trace.recorder = None
+    recorder.close()
+    return recorder.num_launches
+
+
+@dataclass
+class LaunchReplay:
+    kernel: str
+    instance: int
+    recorded_ns: int
+    # Best time of the repeated launches, including a device synchronization
+    replay_ns: int = 0
+    # Why the launch could not be replayed, empty when it was
+    skipped: str = ""
+
+
+@dataclass
+class _Record:
+    kernel: dict
+    instance: int
+    host_ns: int
+    compiled: bool
+    args: list
+    arrays: list = field(default_factory=list)
+
+
+def _read_trace(path):
+    with open(path, "rb") as f:
+        if f.read(len(_launch_trace.MAGIC)) != _launch_trace.MAGIC:
+            raise GsTaichiRuntimeError(f"{path} is not a kernel launch trace")
+        header = _launch_trace.read_chunk(f)
+        kernels = {}
+        records = []
+        while (chunk := _launch_trace.read_chunk(f)) is not None:
+            if "def" in chunk:
+                kernels[chunk["def"]] = chunk
+                continue
+            record = _Record(
+                kernels[chunk["kernel"]], chunk["instance"], chunk["host_ns"], chunk["compiled"], chunk["args"]
+            )
+            if header["capture_data"]:
+                for arg in record.args:
+                    if arg["kind"] == "ndarray":
+                        dtype = np.dtype(to_numpy_type(getattr(ti, arg["dtype"])))
+                        shape = arg["shape"] + arg["element_shape"]
+                    elif arg["kind"] == "numpy":
+                        dtype, shape = np.dtype(arg["dtype"]), arg["shape"]
+                    else:
+                        continue
+                    size = dtype.itemsize * int(np.prod(shape))
+                    record.arrays.append(np.frombuffer(f.read(size), dtype=dtype).reshape(shape))
+            records.append(record)
+    return header, records
+
+
+def _resolve(obj, qualname):
+    for name in qualname.split("."):
+        obj = getattr(obj, name)
+    return obj
+
+
+def _make_args(record, module):
+    args = []
+    arrays = iter(record.arrays)
+    for arg in record.args:
+        kind = arg["kind"]
+        if kind in ("scalar", "template"):
+            args.append(arg["value"])
+        elif kind == "global":
+            args.append(getattr(module, arg["name"]))
+        elif kind == "ndarray":
+            dtype = getattr(ti, arg["dtype"])
+            element_shape = arg["element_shape"]
+            if len(element_shape) == 1:
+                dtype = ti.types.vector(element_shape[0], dtype)
+            elif len(element_shape) == 2:
+                dtype = ti.types.matrix(element_shape[0], element_shape[1], dtype)
+            arr = ti.ndarray(dtype, tuple(arg["shape"]))
+            if record.arrays:
+                arr.from_numpy(next(arrays))
+            args.append(arr)
+        elif kind == "numpy":
+            if record.arrays:
+                args.append(next(arrays).copy())
+            else:
+                args.append(np.zeros(arg["shape"], dtype=np.dtype(arg["dtype"])))
+        else:
+            return None, f"argument of type {arg['type']} cannot be reconstructed"
+    return args, ""
+
+
+def replay_launch_trace(path, arch=None, repeat=1):
+    """Replay a trace recorded by :func:`start_launch_trace` and time each launch.
+
+    `ti.init` is called with the recorded arch unless `arch` is given. The kernel modules are then imported and each
+    launch is executed `repeat` times on freshly allocated arrays, filled with the recorded data when it was
+    captured. Kernels that are not reachable from their module, or that received arguments which cannot be
+    reconstructed (e.g. data-oriented objects or fields that are not module globals), are skipped.
+
+    Args:
+        path (str): The trace file.
+        arch: The arch to replay on, defaults to the recorded one.
+        repeat (int): The number of times each launch is executed, the best time is reported.
+
+    Returns:
+        List[LaunchReplay]: One entry per recorded launch, in order.
+    """
+    header, records = _read_trace(path)
+    ti.init(arch=arch if arch is not None else getattr(ti, header["arch"]))
+    results = []
+    for record in records:
+        kernel_def = record.kernel
+        result = LaunchReplay(kernel_def["qualname"], record.instance, record.host_ns)
+        results.append(result)
+        try:
+            module = importlib.import_module(kernel_def["module"])
+            kernel = _resolve(module, kernel_def["qualname"])
+        except (ImportError, AttributeError) as e:
+            result.skipped = f"kernel not found: {e}"
+            continue
+        if kernel_def["autodiff_mode"] == "REVERSE":
+            kernel = kernel.grad
+        args, result.skipped = _make_args(record, module)
+        if args is None:
+            continue
+        # Compile outside of the timed launches
+        kernel(*args)
+        ti.sync()
+        best_ns = None
+        for _ in range(repeat):
+            start_ns = perf_counter_ns()
+            kernel(*args)
+            ti.sync()
+            elapsed_ns = perf_counter_ns() - start_ns
+            best_ns = elapsed_ns if best_ns is None else min(best_ns, elapsed_ns)
+        result.replay_ns = best_ns
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Replay a GsTaichi kernel launch trace and time each kernel.")
+    parser.add_argument("trace", help="trace file recorded with ti.profiler.start_launch_trace")
+    parser.add_argument("--arch", default=None, help="arch to replay on, defaults to the recorded one")
+    parser.add_argument("--repeat", type=int, default=1, help="executions of each launch, the best time is kept")
+    args = parser.parse_args(argv)
+
+    results = replay_launch_trace(args.trace, getattr(ti, args.arch) if args.arch else None, args.repeat)
+    totals = {}
+    for result in results:
+        entry = totals.setdefault(result.kernel, [0, 0, 0, 0])
+        if result.skipped:
+            entry[3] += 1
+            continue
+        entry[0] += 1
+        entry[1] += result.recorded_ns
+        entry[2] += result.replay_ns
+    print(f"{'kernel':<40} {'launches':>10} {'recorded_ms':>12} {'replay_ms':>12} {'skipped':>8}")
+    for name, (launches, recorded_ns, replay_ns, skipped) in totals.items():
+        print(f"{name:<40} {launches:>10} {recorded_ns / 1e6:>12.3f} {replay_ns / 1e6:>12.3f} {skipped:>8}")
+    for result in results:
+        if result.skipped:
+            print(f"skipped {result.kernel}: {result.skipped}")
+
+
+__all__ = ["start_launch_trace", "stop_launch_trace", "replay_launch_trace", "LaunchReplay"]
+
+if __name__ == "__main__":
+    main()
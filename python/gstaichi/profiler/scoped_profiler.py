@@ -25,6 +25,27 @@ def print_scoped_profiler_info():
     _ti_core.print_profile_info()
 
 
+def get_scoped_profiler_info():
+    """Get time elapsed on the host tasks, summed over all threads for each scope name.
+
+    Call function imports from C++ : _ti_core.get_profile_info()
+
+    Returns:
+        Dict[str, Dict[str, float]]: The total time in seconds (`total_time`) and the number of samples (`num_samples`)
+        of each scope, e.g. the compilation passes named after the C++ functions running them.
+
+    Example::
+
+            >>> compute()
+            >>> info = ti.profiler.get_scoped_profiler_info()
+            >>> print(info["compile_to_offloads"]["total_time"])
+    """
+    return {
+        name: {"total_time": total_time, "num_samples": num_samples}
+        for name, (total_time, num_samples) in _ti_core.get_profile_info().items()
+    }
+
+
 def clear_scoped_profiler_info():
     """Clear profiler's records about time elapsed on the host tasks.
 
@@ -33,4 +54,4 @@ def clear_scoped_profiler_info():
     _ti_core.clear_profile_info()
 
 
-__all__ = ["print_scoped_profiler_info", "clear_scoped_profiler_info"]
+__all__ = ["print_scoped_profiler_info", "get_scoped_profiler_info", "clear_scoped_profiler_info"]
@@ -1,3 +1,5 @@
+import numpy as np
+
 import gstaichi as ti
 
 from tests import test_utils
@@ -124,3 +126,84 @@ def test_clear_all_dual_field():
         with ti.ad.FwdMode(loss=loss, param=x):
             clear_dual_test()
         assert y.dual[None] == 4.0
+
+
+@test_utils.test()
+def test_multiple_seeds():
+    N = 3
+    x = ti.field(float, shape=N, needs_dual=True)
+    y = ti.field(float, shape=N, needs_dual=True)
+    loss = ti.field(float, shape=N, needs_dual=True)
+
+    @ti.kernel
+    def square():
+        for i in range(N):
+            y[i] = x[i] * x[i]
+
+    @ti.kernel
+    def compute_loss():
+        for i in range(N):
+            loss[i] += y[i] * x[(i + 1) % N]
+
+    for i in range(N):
+        x[i] = i + 1.0
+
+    seeds = [[1, 0, 0], [0, 1, 0], [0, 0, 1], [1, 1, 1]]
+    with ti.ad.FwdMode(loss=loss, param=x, seed=seeds) as fwd:
+        square()
+        compute_loss()
+
+    # loss[i] = x[i] ** 2 * x[(i + 1) % N]
+    x_np = x.to_numpy()
+    jacobian = np.zeros((N, N))
+    for i in range(N):
+        jacobian[i, i] += 2 * x_np[i] * x_np[(i + 1) % N]
+        jacobian[i, (i + 1) % N] += x_np[i] ** 2
+    assert fwd.duals[0].shape == (len(seeds), N)
+    np.testing.assert_allclose(fwd.duals[0], np.array(seeds) @ jacobian.T, rtol=1e-5)
+    np.testing.assert_allclose(loss.dual.to_numpy(), jacobian[:, 0], rtol=1e-5)
+    np.testing.assert_allclose(loss.to_numpy(), x_np**2 * np.roll(x_np, -1), rtol=1e-5)
+
+
+@test_utils.test()
+def test_multiple_seeds_keep_gradients():
+    N = 3
+    x = ti.field(float, shape=N, needs_dual=True)
+    loss = ti.field(float, shape=N, needs_dual=True)
+
+    @ti.kernel
+    def compute_loss():
+        for i in range(N):
+            loss[i] += 2 * x[i]
+
+    loss.dual.fill(10.0)
+    seeds = [[1, 0, 0], [0, 0, 1]]
+    with ti.ad.FwdMode(loss=loss, param=x, seed=seeds, clear_gradients=False) as fwd:
+        compute_loss()
+
+    # Every direction starts from the duals the body started from
+    np.testing.assert_allclose(fwd.duals[0], 10.0 + 2.0 * np.array(seeds), rtol=1e-5)
+
+
+@test_utils.test()
+def test_multiple_seeds_restore_ndarrays():
+    N = 3
+    x = ti.field(float, shape=N, needs_dual=True)
+    loss = ti.field(float, shape=N, needs_dual=True)
+    y = ti.ndarray(float, shape=N)
+    y_np = np.array([1.0, 2.0, 3.0])
+    y.from_numpy(y_np)
+
+    @ti.kernel
+    def compute_loss(y: ti.types.ndarray()):
+        for i in range(N):
+            y[i] += 1.0
+            loss[i] += y[i] * x[i]
+
+    seeds = [[1, 0, 0], [0, 0, 1]]
+    with ti.ad.FwdMode(loss=loss, param=x, seed=seeds) as fwd:
+        compute_loss(y)
+
+    # Every direction reads the ndarray from before the body, not the previous direction's output
+    np.testing.assert_allclose(fwd.duals[0], (y_np + 1.0) * np.array(seeds), rtol=1e-5)
+    np.testing.assert_allclose(y.to_numpy(), y_np + 1.0, rtol=1e-5)
@@ -0,0 +1,164 @@
+import numpy as np
+import pytest
+
+import gstaichi as ti
+
+from tests import test_utils
+
+archs_support_ndarray_ad = [ti.cpu, ti.cuda]
+
+
+def _expected_grad(x0, steps):
+    # x[t + 1] = x[t] + sin(x[t]) ** 2, so dx[t + 1] / dx[t] = 1 + sin(2 * x[t])
+    x = np.array(x0, dtype=np.float64)
+    grad = np.ones_like(x)
+    for _ in range(steps):
+        grad *= 1 + np.sin(2 * x)
+        x = x + np.sin(x) ** 2
+    return x.sum(), grad
+
+
+@pytest.mark.parametrize("checkpoint_every", [1, 2, 3, 7, 100])
+@test_utils.test(arch=archs_support_ndarray_ad, default_fp=ti.f64)
+def test_tape_checkpoint_reused_field(checkpoint_every):
+    n = 4
+    steps = 6
+    x = ti.field(float, shape=(steps + 1, n), needs_grad=True)
+    # A scratch buffer reused by every step, which the plain tape cannot differentiate through.
+    tmp = ti.field(float, shape=n, needs_grad=True)
+    loss = ti.field(float, shape=(), needs_grad=True)
+
+    @ti.kernel
+    def compute_tmp(t: ti.i32):
+        for i in range(n):
+            tmp[i] = ti.sin(x[t, i])
+
+    @ti.kernel
+    def advance(t: ti.i32):
+        for i in range(n):
+            x[t + 1, i] = x[t, i] + tmp[i] * tmp[i]
+
+    @ti.kernel
+    def compute_loss():
+        for i in range(n):
+            loss[None] += x[steps, i]
+
+    @ti.ad.grad_replaced
+    def reset_tmp():
+        pass
+
+    @ti.ad.grad_for(reset_tmp)
+    def reset_tmp_grad():
+        tmp.grad.fill(0)
+
+    x0 = np.linspace(0.1, 1.0, n)
+    for i in range(n):
+        x[0, i] = x0[i]
+
+    with ti.ad.Tape(loss=loss, checkpoint_every=checkpoint_every):
+        for t in range(steps):
+            reset_tmp()
+            compute_tmp(t)
+            advance(t)
+        compute_loss()
+
+    expected_loss, expected_grad = _expected_grad(x0, steps)
+    assert loss[None] == pytest.approx(expected_loss)
+    for i in range(n):
+        assert x.grad[0, i] == pytest.approx(expected_grad[i])
+        assert tmp[i] == pytest.approx(np.sin(x[steps - 1, i]))
+
+
+@pytest.mark.parametrize("checkpoint_every", [1, 4])
+@test_utils.test(arch=archs_support_ndarray_ad, default_fp=ti.f64)
+def test_tape_checkpoint_reused_ndarray(checkpoint_every):
+    n = 4
+    steps = 5
+
+    @ti.kernel
+    def compute_tmp(x: ti.types.ndarray(), tmp: ti.types.ndarray(), t: ti.i32):
+        for i in range(n):
+            tmp[i] = ti.sin(x[t, i])
+
+    @ti.kernel
+    def advance(x: ti.types.ndarray(), tmp: ti.types.ndarray(), t: ti.i32):
+        for i in range(n):
+            x[t + 1, i] = x[t, i] + tmp[i] * tmp[i]
+
+    @ti.kernel
+    def compute_loss(x: ti.types.ndarray(), loss: ti.types.ndarray()):
+        for i in range(n):
+            loss[None] += x[steps, i]
+
+    x = ti.ndarray(ti.f64, shape=(steps + 1, n), needs_grad=True)
+    tmp = ti.ndarray(ti.f64, shape=n, needs_grad=True)
+    loss = ti.ndarray(ti.f64, shape=(), needs_grad=True)
+
+    @ti.ad.grad_replaced
+    def reset_tmp():
+        pass
+
+    @ti.ad.grad_for(reset_tmp)
+    def reset_tmp_grad():
+        tmp.grad.fill(0)
+
+    x0 = np.linspace(0.1, 1.0, n)
+    for i in range(n):
+        x[0, i] = x0[i]
+
+    with ti.ad.Tape(loss=loss, checkpoint_every=checkpoint_every):
+        for t in range(steps):
+            reset_tmp()
+            compute_tmp(x, tmp, t)
+            advance(x, tmp, t)
+        compute_loss(x, loss)
+
+    expected_loss, expected_grad = _expected_grad(x0, steps)
+    assert loss[None] == pytest.approx(expected_loss)
+    for i in range(n):
+        assert x.grad[0, i] == pytest.approx(expected_grad[i])
+
+
+@pytest.mark.parametrize("checkpoint_every", [1, 2])
+@test_utils.test(arch=archs_support_ndarray_ad, default_fp=ti.f64)
+def test_tape_checkpoint_plain_kernels(checkpoint_every):
+    n = 4
+    steps = 5
+    x = ti.field(float, shape=(steps + 1, n), needs_grad=True)
+    y = ti.ndarray(ti.f64, shape=n, needs_grad=True)
+    loss = ti.field(float, shape=(), needs_grad=True)
+
+    @ti.kernel
+    def advance(t: ti.i32, y: ti.types.ndarray()):
+        for i in range(n):
+            x[t + 1, i] = x[t, i] + ti.sin(x[t, i]) ** 2 + y[i]
+
+    @ti.kernel
+    def compute_loss():
+        for i in range(n):
+            loss[None] += x[steps, i]
+
+    def run(checkpoint_every):
+        for i in range(n):
+            x[0, i] = 0.1 * (i + 1)
+            y[i] = 0.01 * i
+        y.grad.fill(0)
+        # Every taped call, the first one included, is a plain kernel
+        with ti.ad.Tape(loss=loss, checkpoint_every=checkpoint_every):
+            for t in range(steps):
+                advance(t, y)
+            compute_loss()
+        return loss[None], x.grad.to_numpy()[0], y.grad.to_numpy()
+
+    expected_loss, expected_x_grad, expected_y_grad = run(None)
+    actual_loss, actual_x_grad, actual_y_grad = run(checkpoint_every)
+    assert actual_loss == pytest.approx(expected_loss)
+    np.testing.assert_allclose(actual_x_grad, expected_x_grad)
+    np.testing.assert_allclose(actual_y_grad, expected_y_grad)
+
+
+@test_utils.test()
+def test_tape_checkpoint_every_invalid():
+    loss = ti.field(float, shape=(), needs_grad=True)
+    with pytest.raises(ValueError, match="checkpoint_every should be a positive integer"):
+        ti.ad.Tape(loss=loss, checkpoint_every=0)
@@ -137,6 +137,7 @@ user_api[ti] = [
     "floor",
     "frexp",
     "func",
+    "fuse",
     "get_addr",
     "global_thread_idx",
     "gpu",
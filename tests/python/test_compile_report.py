@@ -0,0 +1,69 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import gstaichi as ti
+
+from tests import test_utils
+
+
+@test_utils.test(arch=ti.cpu)
+def test_compile_report():
+    x = ti.field(ti.f32, shape=128)
+    y = ti.field(ti.f32, shape=128)
+
+    @ti.kernel
+    def two_loops(n: ti.template()):
+        for i in range(128):
+            for j in ti.static(range(n)):
+                x[i] += j
+        for i in range(128):
+            y[i] = x[i] * 2.0
+
+    small = two_loops.compile_report(1)
+    large = two_loops.compile_report(16)
+
+    assert small.kernel == "two_loops"
+    assert small.num_offloads == 2
+    assert [t.type for t in small.tasks] == ["range_for", "range_for"]
+    assert all(t.llvm_instructions > 0 for t in small.tasks)
+    # ti.static unrolling grows the first task only
+    assert large.tasks[0].statements > small.tasks[0].statements
+    assert large.tasks[0].llvm_instructions > small.tasks[0].llvm_instructions
+    assert large.tasks[1].statements == small.tasks[1].statements
+
+    names = [p.name for p in small.passes if p.task == -1]
+    assert names.index("Lowered") < names.index("Offloaded")
+    offloaded = next(p for p in small.passes if p.name == "Offloaded")
+    assert offloaded.statements_after > 0
+    assert {p.task for p in small.passes if p.name == "Access lowered"} == {0, 1}
+    assert small.total_time_ms > 0
+
+    # The report does not launch the kernel
+    assert x[0] == 0
+
+
+@test_utils.test(arch=ti.cpu)
+def test_compile_report_concurrent_compiles():
+    x = ti.field(ti.f32, shape=128)
+
+    @ti.kernel
+    def reported():
+        for i in range(128):
+            x[i] += 1.0
+
+    @ti.kernel
+    def other(n: ti.template()):
+        for i in range(128):
+            x[i] += n
+
+    def compile_others():
+        for n in range(20):
+            other(n)
+
+    # Kernels compiled by another thread meanwhile are not recorded in the report
+    with ThreadPoolExecutor(1) as executor:
+        future = executor.submit(compile_others)
+        reports = [reported.compile_report() for _ in range(5)]
+        future.result()
+    for report in reports:
+        assert all("reported" in p.scope for p in report.passes)
+        assert report.num_offloads == 1
@@ -0,0 +1,105 @@
+import numpy as np
+import pytest
+
+import gstaichi as ti
+
+from tests import test_utils
+
+
+@test_utils.test()
+def test_fuse_elementwise():
+    n = 128
+    x = ti.field(ti.f32, shape=n)
+    y = ti.field(ti.f32, shape=n)
+    z = ti.field(ti.f32, shape=n)
+
+    @ti.kernel
+    def scale(a: ti.f32):
+        for i in x:
+            y[i] = a * x[i]
+
+    @ti.kernel
+    def shift(b: ti.f32):
+        for i in x:
+            z[i] = y[i] + b
+
+    x.from_numpy(np.arange(n, dtype=np.float32))
+    scale_shift = ti.fuse(scale, shift)
+    scale_shift(2.0, 1.0)
+    np.testing.assert_allclose(y.to_numpy(), 2.0 * np.arange(n))
+    np.testing.assert_allclose(z.to_numpy(), 2.0 * np.arange(n) + 1.0)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_fuse_merges_loops():
+    n = 128
+    x = ti.field(ti.i32, shape=n)
+    y = ti.field(ti.i32, shape=n)
+
+    @ti.kernel
+    def inc(a: ti.types.ndarray()):
+        for i in range(n):
+            a[i] += 1
+            x[i] = a[i]
+
+    @ti.kernel
+    def square(a: ti.types.ndarray()):
+        for i in range(n):
+            y[i] = x[i] * a[i]
+
+    @ti.kernel
+    def shift_left():
+        for i in range(n):
+            x[i] = y[(i + 1) % n]
+
+    a = ti.ndarray(ti.i32, shape=n)
+    a.from_numpy(np.arange(n, dtype=np.int32))
+    fused = ti.fuse(inc, square)
+    assert fused.compile_report(a, a).num_offloads == 1
+    fused(a, a)
+    expected = (np.arange(n) + 1) ** 2
+    np.testing.assert_array_equal(y.to_numpy(), expected)
+
+    # Iteration i reads what iteration i + 1 of the previous loop wrote
+    fused = ti.fuse(square, shift_left)
+    assert fused.compile_report(a).num_offloads == 2
+    fused(a)
+    np.testing.assert_array_equal(x.to_numpy(), np.roll(expected, -1))
+
+
+@test_utils.test(arch=ti.cpu)
+def test_fuse_data_oriented():
+    @ti.data_oriented
+    class Particles:
+        def __init__(self, n):
+            self.pos = ti.Vector.field(2, ti.f32, shape=n)
+            self.vel = ti.Vector.field(2, ti.f32, shape=n)
+
+        @ti.kernel
+        def accelerate(self, g: ti.f32):
+            for i in self.vel:
+                self.vel[i].y -= g
+
+        @ti.kernel
+        def advance(self, dt: ti.f32):
+            for i in self.pos:
+                self.pos[i] += self.vel[i] * dt
+
+    particles = Particles(64)
+    step = ti.fuse(particles.accelerate, particles.advance)
+    assert step.compile_report(10.0, 0.5).num_offloads == 1
+    step(10.0, 0.5)
+    np.testing.assert_allclose(particles.pos.to_numpy()[:, 1], -5.0)
+
+    with pytest.raises(ti.GsTaichiSyntaxError, match="bound to an instance"):
+        ti.fuse(Particles.advance)
+
+
+@test_utils.test()
+def test_fuse_rejects_return():
+    @ti.kernel
+    def total() -> ti.i32:
+        return 1
+
+    with pytest.raises(ti.GsTaichiSyntaxError, match="returns a value"):
+        ti.fuse(total)
@@ -0,0 +1,58 @@
+import gstaichi as ti
+
+from tests import test_utils
+
+
+@test_utils.test(arch=ti.cpu, kernel_profiler=True, kernel_profiler_memory_traffic=True)
+def test_kernel_memory_traffic():
+    n = 1024
+    x = ti.field(ti.f32, shape=n)
+    y = ti.field(ti.f32, shape=n)
+    histogram = ti.field(ti.f64, shape=16)
+    sparse = ti.field(ti.i32)
+    ti.root.pointer(ti.i, n // 8).dense(ti.i, 8).place(sparse)
+
+    @ti.kernel
+    def scale_and_count():
+        for i in x:
+            y[i] = x[i] * 2.0
+            histogram[i % 16] += 1.0
+
+    @ti.kernel
+    def activate():
+        for i in range(n):
+            sparse[i] = 1
+
+    ti.profiler.clear_kernel_profiler_info()
+    scale_and_count()
+    activate()
+    traffic = ti.profiler.get_kernel_memory_traffic()
+
+    scale_task = next(v for k, v in traffic.items() if k.startswith("scale_and_count"))
+    assert scale_task["counter"] == 1
+    assert scale_task["load_bytes"] == 4 * n
+    assert scale_task["store_bytes"] == 4 * n
+    assert scale_task["atomic_bytes"] == 8 * n
+
+    activate_task = next(v for k, v in traffic.items() if k.startswith("activate"))
+    assert activate_task["store_bytes"] == 4 * n
+    assert activate_task["node_allocations"] == n // 8
+
+
+@test_utils.test(arch=ti.cpu, kernel_profiler=True, kernel_profiler_memory_traffic=True)
+def test_kernel_memory_traffic_exact_above_float_precision():
+    # 4 * n bytes is not representable as a float32
+    n = 2**24 + 1
+    x = ti.field(ti.f32, shape=n)
+
+    @ti.kernel
+    def increment():
+        for i in x:
+            x[i] = x[i] + 1.0
+
+    ti.profiler.clear_kernel_profiler_info()
+    increment()
+    traffic = ti.profiler.get_kernel_memory_traffic()
+    task = next(v for k, v in traffic.items() if k.startswith("increment"))
+    assert task["load_bytes"] == 4 * n
+    assert task["store_bytes"] == 4 * n
@@ -0,0 +1,38 @@
+import gstaichi as ti
+
+from tests import test_utils
+
+
+@test_utils.test(arch=ti.cpu)
+def test_launch_counters():
+    x = ti.field(ti.f32, shape=8, needs_grad=True)
+    loss = ti.field(ti.f32, shape=(), needs_grad=True)
+
+    @ti.kernel
+    def counted_kernel():
+        for i in x:
+            loss[None] += x[i] * x[i]
+
+    ti.profiler.clear_kernel_launch_counters()
+    for _ in range(5):
+        counted_kernel()
+    counted_kernel.grad()
+
+    counters = ti.profiler.get_kernel_launch_counters()
+    primal = counters["counted_kernel"]
+    assert primal["launches"] == 5
+    assert primal["compiles"] == 1
+    assert primal["compile_ns"] > 0
+    assert primal["materialize_cache_hits"] == 4
+    # The first launch compiles and is not part of the launch time
+    assert sum(primal["launch_ns_histogram"]) == 4
+    assert primal["launch_ns"] > 0
+    assert counters["counted_kernel.grad"]["launches"] == 1
+
+    text = ti.profiler.get_kernel_launch_counters_prometheus()
+    assert 'gstaichi_kernel_launches_total{kernel="counted_kernel"} 5' in text
+    assert 'gstaichi_kernel_launch_duration_seconds_bucket{kernel="counted_kernel",le="+Inf"} 4' in text
+    assert 'gstaichi_kernel_launch_duration_seconds_count{kernel="counted_kernel"} 4' in text
+
+    ti.profiler.clear_kernel_launch_counters()
+    assert "counted_kernel" not in ti.profiler.get_kernel_launch_counters()
@@ -0,0 +1,80 @@
+import numpy as np
+
+import gstaichi as ti
+from gstaichi.profiler import launch_trace
+
+from tests import test_utils
+
+
+@ti.kernel
+def traced_axpy(x: ti.types.ndarray(dtype=ti.f32, ndim=1), y: ti.types.ndarray(dtype=ti.f32, ndim=1), a: ti.f32):
+    for i in x:
+        y[i] += a * x[i]
+
+
+@ti.kernel
+def traced_scale(v: ti.types.ndarray(dtype=ti.math.vec2, ndim=1), factor: ti.template()):
+    for i in v:
+        v[i] *= factor
+
+
+@test_utils.test(arch=ti.cpu)
+def test_launch_trace(tmp_path):
+    path = str(tmp_path / "launches.tilt")
+    x = ti.ndarray(ti.f32, shape=16)
+    y = ti.ndarray(ti.f32, shape=16)
+    v = ti.ndarray(ti.math.vec2, shape=4)
+    x.fill(1.0)
+
+    ti.profiler.start_launch_trace(path, capture_data=True)
+    for _ in range(3):
+        traced_axpy(x, y, 2.0)
+    traced_scale(v, 3)
+    assert ti.profiler.stop_launch_trace() == 4
+    # Launches after the trace is stopped are not recorded
+    traced_axpy(x, y, 2.0)
+
+    results = ti.profiler.replay_launch_trace(path, repeat=2)
+    assert [r.kernel for r in results] == ["traced_axpy"] * 3 + ["traced_scale"]
+    assert [r.instance for r in results[:3]] == [results[0].instance] * 3
+    for result in results:
+        assert result.skipped == ""
+        assert result.recorded_ns > 0
+        assert result.replay_ns > 0
+
+
+@test_utils.test(arch=ti.cpu)
+def test_launch_trace_skips_local_kernels(tmp_path):
+    path = str(tmp_path / "launches.tilt")
+
+    @ti.kernel
+    def local_kernel(a: ti.types.ndarray(dtype=ti.f32, ndim=1)):
+        for i in a:
+            a[i] = i
+
+    a = np.zeros(8, dtype=np.float32)
+    ti.profiler.start_launch_trace(path)
+    local_kernel(a)
+    ti.profiler.stop_launch_trace()
+
+    (result,) = ti.profiler.replay_launch_trace(path)
+    assert result.skipped.startswith("kernel not found")
+
+
+@test_utils.test(arch=ti.cpu)
+def test_launch_trace_captures_inputs(tmp_path):
+    path = str(tmp_path / "launches.tilt")
+    x = ti.ndarray(ti.f32, shape=16)
+    y = ti.ndarray(ti.f32, shape=16)
+    x.fill(1.0)
+
+    ti.profiler.start_launch_trace(path, capture_data=True)
+    traced_axpy(x, y, 2.0)
+    traced_axpy(x, y, 2.0)
+    # The copies of the arguments made by the recorder are not traced
+    assert ti.profiler.stop_launch_trace() == 2
+
+    _, records = launch_trace._read_trace(path)
+    # The data is captured before each launch updates y
+    np.testing.assert_array_equal(records[0].arrays[1], np.zeros(16))
+    np.testing.assert_array_equal(records[1].arrays[1], np.full(16, 2.0))
@@ -56,3 +56,90 @@ def test_nested_3d():
     for _ in range(1000):
         i, j, k = randrange(n), randrange(n), randrange(n)
         assert x[i, j, k] == (i * n + j) * n + k
+
+
+@test_utils.test(require=ti.extension.sparse)
+def test_listgen_sparse_order():
+    x = ti.field(ti.i32)
+    order = ti.field(ti.i32, shape=4096)
+    num_visited = ti.field(ti.i32, shape=())
+    n = 64 * 64 * 4
+
+    ti.root.pointer(ti.i, 64).pointer(ti.i, 64).dense(ti.i, 4).place(x)
+
+    @ti.kernel
+    def activate():
+        for i in range(n):
+            if i % 7 == 0:
+                x[i] = 1
+
+    @ti.kernel
+    def visit():
+        # The list built by listgen is walked in order by a serialized struct-for
+        ti.loop_config(serialize=True)
+        for i in x:
+            if x[i] == 1:
+                order[num_visited[None]] = i
+                num_visited[None] += 1
+
+    activate()
+    visit()
+    expected = list(range(0, n, 7))
+    assert num_visited[None] == len(expected)
+    assert order.to_numpy()[: len(expected)].tolist() == expected
+
+
+@test_utils.test(require=ti.extension.sparse)
+def test_listgen_reuse_after_structure_change():
+    x = ti.field(ti.i32)
+    y = ti.field(ti.i32)
+    block = ti.root.pointer(ti.i, 16)
+    block.bitmasked(ti.i, 8).place(x)
+    ti.root.dynamic(ti.i, 1024, chunk_size=32).place(y)
+
+    @ti.kernel
+    def count_x() -> ti.i32:
+        n = 0
+        for i in x:
+            n += 1
+        return n
+
+    @ti.kernel
+    def sum_y() -> ti.i32:
+        s = 0
+        for i in y:
+            s += y[i]
+        return s
+
+    @ti.kernel
+    def deactivate_x(i: ti.i32):
+        ti.deactivate(x.parent(), [i])
+
+    @ti.kernel
+    def deactivate_block(b: ti.i32):
+        ti.deactivate(block, [b])
+
+    @ti.kernel
+    def append_y(n: ti.i32):
+        for i in range(n):
+            ti.append(y.parent(), [], i)
+
+    # Kernels without structural changes in between reuse the element lists
+    assert count_x() == 0
+    x[3] = 1
+    assert count_x() == 1
+    assert count_x() == 1
+    x[4] = 1
+    x[100] = 1
+    assert count_x() == 3
+    deactivate_x(4)
+    assert count_x() == 2
+    deactivate_block(12)
+    assert count_x() == 1
+
+    assert sum_y() == 0
+    append_y(40)
+    assert sum_y() == sum(range(40))
+    assert sum_y() == sum(range(40))
+    y.parent().deactivate_all()
+    assert sum_y() == 0
@@ -0,0 +1,79 @@
+import numpy as np
+import pytest
+
+import gstaichi as ti
+
+from tests import test_utils
+
+schedules = ["auto", "static", "dynamic", "guided", "work_stealing"]
+
+
+@pytest.mark.parametrize("schedule", schedules)
+@test_utils.test(arch=ti.cpu)
+def test_loop_schedule_range_for(schedule):
+    n = 1000
+    x = ti.field(ti.i64, shape=n)
+
+    @ti.kernel
+    def triangle():
+        ti.loop_config(schedule=schedule)
+        for i in range(n):
+            # The work grows with i, so that static ranges are unbalanced
+            s = 0
+            for j in range(i):
+                s += j
+            x[i] = s
+
+    triangle()
+    i = np.arange(n, dtype=np.int64)
+    np.testing.assert_array_equal(x.to_numpy(), i * (i - 1) // 2)
+
+
+@pytest.mark.parametrize("schedule", schedules)
+@test_utils.test(arch=ti.cpu)
+def test_loop_schedule_struct_for(schedule):
+    x = ti.field(ti.i32)
+    block = ti.root.pointer(ti.i, 64)
+    block.dense(ti.i, 16).place(x)
+
+    @ti.kernel
+    def activate():
+        for i in range(64 * 16):
+            if (i // 16) % 3 == 0:
+                x[i] = 1
+
+    @ti.kernel
+    def count() -> ti.i32:
+        ti.loop_config(schedule=schedule)
+        total = 0
+        for i in x:
+            total += x[i]
+        return total
+
+    activate()
+    assert count() == 22 * 16
+
+
+@test_utils.test(arch=ti.cpu, cpu_loop_schedule="work_stealing")
+def test_loop_schedule_default_from_config():
+    x = ti.field(ti.i32, shape=4096)
+
+    @ti.kernel
+    def fill():
+        for i in x:
+            x[i] = i
+
+    fill()
+    np.testing.assert_array_equal(x.to_numpy(), np.arange(4096))
+
+
+@test_utils.test(arch=ti.cpu)
+def test_loop_schedule_unknown():
+    @ti.kernel
+    def k():
+        ti.loop_config(schedule="round_robin")
+        for i in range(4):
+            pass
+
+    with pytest.raises(ti.GsTaichiCompilationError, match="Unknown loop schedule"):
+        k()
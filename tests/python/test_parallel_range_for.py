@@ -1,3 +1,5 @@
+import numpy as np
+
 import gstaichi as ti
 
 from tests import test_utils
@@ -87,3 +89,44 @@ def test_loop_config_block_dim_adaptive():
     val_np = val.to_numpy()
     for i in range(n):
         assert val_np[i] == i
+
+
+def _run_saxpy_with_continue(schedule):
+    n = 1000
+    x = ti.field(ti.f32, shape=n)
+    y = ti.ndarray(ti.f32, shape=n)
+
+    @ti.kernel
+    def saxpy(a: ti.f32, y: ti.types.ndarray()):
+        # Iterations 3 to n - 1, in blocks that do not divide the range
+        ti.loop_config(block_dim=7, schedule=schedule)
+        for i in range(3, n):
+            if i % 5 == 0:
+                continue
+            y[i] = a * x[i] + y[i]
+
+    x.from_numpy(np.arange(n, dtype=np.float32))
+    y.from_numpy(np.ones(n, dtype=np.float32))
+    saxpy(2.0, y)
+    expected = 2.0 * np.arange(n) + 1.0
+    expected[:3] = 1.0
+    expected[::5] = 1.0
+    np.testing.assert_allclose(y.to_numpy(), expected)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_range_for_block_body():
+    # Split into per-thread blocks, the continue is in the inner serial loop
+    _run_saxpy_with_continue(None)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_range_for_block_body_dynamic():
+    # Dynamic loops keep their block_dim chunks, the continue jumps to the next
+    # iteration of the block body
+    _run_saxpy_with_continue("dynamic")
+
+
+@test_utils.test(arch=ti.cpu, make_cpu_multithreading_loop=False)
+def test_range_for_block_body_without_thread_blocks():
+    _run_saxpy_with_continue(None)
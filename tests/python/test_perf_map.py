@@ -0,0 +1,27 @@
+import os
+import sys
+
+import pytest
+
+import gstaichi as ti
+
+from tests import test_utils
+
+
+@pytest.mark.skipif(sys.platform != "linux", reason="perf maps are only written on Linux")
+@test_utils.test(arch=ti.cpu, perf_map=True, offline_cache=False)
+def test_perf_map():
+    x = ti.field(ti.f32, shape=64)
+
+    @ti.kernel
+    def perf_map_kernel():
+        for i in x:
+            x[i] = i * 2.0
+
+    perf_map_kernel()
+
+    with open(f"/tmp/perf-{os.getpid()}.map") as f:
+        entries = [line.split(" ", 2) for line in f.read().splitlines()]
+    labels = [label for _, size, label in entries if int(size, 16) > 0]
+    task = next(label for label in labels if label.startswith("perf_map_kernel_c"))
+    assert task.endswith("]") and "test_perf_map.py:" in task
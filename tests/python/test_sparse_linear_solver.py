@@ -84,6 +84,103 @@ def test_sparse_solver_ndarray_vector(dtype, solver_type, ordering):
         assert x[i] == test_utils.approx(res[i], rel=1.0)
 
 
+@pytest.mark.parametrize("dtype", [ti.f32, ti.f64])
+@pytest.mark.parametrize("solver_type", ["LLT", "LDLT", "LU"])
+@test_utils.test(arch=ti.cpu)
+def test_sparse_solver_solve_many(dtype, solver_type):
+    np_dtype = ti.lang.util.to_numpy_type(dtype)
+    n = 10
+    k = 4
+    A = np.random.rand(n, n)
+    A_psd = (np.dot(A, A.transpose()) + np.eye(n)).astype(np_dtype)
+    B_np = np.random.rand(n, k).astype(np_dtype)
+    Abuilder = ti.linalg.SparseMatrixBuilder(n, n, max_num_triplets=100, dtype=dtype)
+
+    @ti.kernel
+    def fill(Abuilder: ti.types.sparse_matrix_builder(), InputArray: ti.types.ndarray()):
+        for i, j in ti.ndrange(n, n):
+            Abuilder[i, j] += InputArray[i, j]
+
+    fill(Abuilder, A_psd)
+    A = Abuilder.build()
+    solver = ti.linalg.SparseSolver(dtype=dtype, solver_type=solver_type)
+    solver.compute(A)
+    res = np.linalg.solve(A_psd, B_np)
+
+    X = solver.solve_many(B_np)
+    assert X.shape == (n, k)
+    assert np.allclose(X, res, rtol=1e-3)
+
+    B = ti.ndarray(dtype, shape=(n, k))
+    B.from_numpy(B_np)
+    X = solver.solve_many(B)
+    assert X.shape == (n, k)
+    assert np.allclose(X.to_numpy(), res, rtol=1e-3)
+
+
+@pytest.mark.parametrize("solver_type", ["LLT", "LDLT", "LU"])
+@test_utils.test(arch=ti.cpu)
+def test_sparse_solver_refactorize(solver_type):
+    n = 10
+    A = np.random.rand(n, n)
+    A_psd = (np.dot(A, A.transpose()) + np.eye(n)).astype(np.float32)
+    b = np.arange(1, n + 1).astype(np.float32)
+
+    @ti.kernel
+    def fill(Abuilder: ti.types.sparse_matrix_builder(), InputArray: ti.types.ndarray(), scale: ti.f32):
+        for i, j in ti.ndrange(n, n):
+            Abuilder[i, j] += scale * InputArray[i, j]
+
+    solver = ti.linalg.SparseSolver(solver_type=solver_type)
+    for frame in range(3):
+        scale = 1.0 + frame
+        Abuilder = ti.linalg.SparseMatrixBuilder(n, n, max_num_triplets=100)
+        fill(Abuilder, A_psd, scale)
+        A = Abuilder.build()
+        if frame == 0:
+            solver.analyze_pattern(A)
+            solver.factorize(A)
+        else:
+            solver.refactorize(A)
+        assert solver.info()
+        x = solver.solve(b)
+        assert np.allclose(x, np.linalg.solve(scale * A_psd, b), rtol=1e-3)
+
+
+@test_utils.test(arch=[ti.cpu, ti.cuda])
+def test_sparse_solver_refactorize_pattern_mismatch():
+    n = 4
+
+    @ti.kernel
+    def fill_diag(Abuilder: ti.types.sparse_matrix_builder()):
+        for i in range(n):
+            Abuilder[i, i] += 2.0
+
+    @ti.kernel
+    def fill_tridiag(Abuilder: ti.types.sparse_matrix_builder()):
+        for i in range(n):
+            Abuilder[i, i] += 2.0
+            if i > 0:
+                Abuilder[i, i - 1] += -1.0
+                Abuilder[i - 1, i] += -1.0
+
+    solver = ti.linalg.SparseSolver(solver_type="LU")
+    Abuilder = ti.linalg.SparseMatrixBuilder(n, n, max_num_triplets=100)
+    fill_diag(Abuilder)
+    A = Abuilder.build()
+    if ti.lang.impl.current_cfg().arch == ti.cuda:
+        # The cuSOLVER solver has no compute()
+        solver.analyze_pattern(A)
+        solver.factorize(A)
+    else:
+        solver.compute(A)
+
+    Abuilder = ti.linalg.SparseMatrixBuilder(n, n, max_num_triplets=100)
+    fill_tridiag(Abuilder)
+    with pytest.raises(RuntimeError, match="sparsity pattern"):
+        solver.refactorize(Abuilder.build())
+
+
 @test_utils.test(arch=ti.cuda)
 def test_gpu_sparse_solver():
     from scipy.sparse import coo_matrix
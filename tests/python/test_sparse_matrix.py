@@ -57,6 +57,73 @@ def test_sparse_matrix_builder(dtype, storage_format):
             assert A[i, j] == i + j
 
 
+@pytest.mark.parametrize("storage_format", ["col_major", "row_major"])
+@test_utils.test(arch=ti.cpu)
+def test_sparse_matrix_builder_sum_duplicates(storage_format):
+    # Enough triplets to take the multithreaded conversion path.
+    n = 64
+    num_repeats = 16
+    Abuilder = ti.linalg.SparseMatrixBuilder(
+        n, n, max_num_triplets=n * n * num_repeats, dtype=ti.f64, storage_format=storage_format
+    )
+
+    @ti.kernel
+    def fill(Abuilder: ti.types.sparse_matrix_builder()):
+        for i, j, k in ti.ndrange(n, n, num_repeats):
+            if (i + j) % 3 != 0:
+                Abuilder[i, j] += i * 0.5 + j + k
+
+    fill(Abuilder)
+    A = Abuilder.build()
+    for i in range(n):
+        for j in range(n):
+            expected = 0.0 if (i + j) % 3 == 0 else num_repeats * (i * 0.5 + j) + sum(range(num_repeats))
+            assert A[i, j] == test_utils.approx(expected)
+
+
+@pytest.mark.parametrize("storage_format", ["col_major", "row_major"])
+@test_utils.test(arch=ti.cpu)
+def test_sparse_matrix_builder_update_values(storage_format):
+    n = 8
+    Abuilder = ti.linalg.SparseMatrixBuilder(n, n, max_num_triplets=100, storage_format=storage_format)
+
+    @ti.kernel
+    def fill(Abuilder: ti.types.sparse_matrix_builder(), scale: ti.f32, skip_diagonal: ti.i32):
+        for i in range(n):
+            if i != 0 or skip_diagonal == 0:
+                Abuilder[i, i] += scale * 2.0
+            if i > 0:
+                Abuilder[i, i - 1] += -scale
+                Abuilder[i, i - 1] += -scale
+
+    fill(Abuilder, 1.0, 0)
+    A = Abuilder.build()
+    fill(Abuilder, 3.0, 1)
+    B = Abuilder.update_values(A)
+    assert B is A
+    for i in range(n):
+        assert A[i, i] == (0.0 if i == 0 else 6.0)
+        if i > 0:
+            assert A[i, i - 1] == -6.0
+
+
+@test_utils.test(arch=ti.cpu)
+def test_sparse_matrix_builder_update_values_out_of_pattern():
+    n = 4
+    Abuilder = ti.linalg.SparseMatrixBuilder(n, n, max_num_triplets=100)
+
+    @ti.kernel
+    def fill(Abuilder: ti.types.sparse_matrix_builder(), col_offset: ti.i32):
+        for i in range(n):
+            Abuilder[i, (i + col_offset) % n] += 1.0
+
+    fill(Abuilder, 0)
+    A = Abuilder.build()
+    fill(Abuilder, 1)
+    with pytest.raises(RuntimeError, match="sparsity pattern"):
+        Abuilder.update_values(A)
+
+
 @pytest.mark.parametrize(
     "dtype, storage_format",
     [
@@ -101,3 +101,70 @@ def test_sparse_matrix_vector_multiplication3(dtype, storage_format):
     res = np.array([28, 36, 44, 52, 60, 68, 76, 84])
     for i in range(n):
         assert x[i] == res[i]
+
+
+def _build_block_tridiagonal(num_blocks, block_size, dtype, storage_format):
+    n = num_blocks * block_size
+    Abuilder = ti.linalg.SparseMatrixBuilder(
+        n, n, max_num_triplets=3 * n * block_size, dtype=dtype, storage_format=storage_format
+    )
+
+    @ti.kernel
+    def fill(Abuilder: ti.types.sparse_matrix_builder()):
+        for bi, r, c in ti.ndrange(num_blocks, block_size, block_size):
+            i = bi * block_size + r
+            Abuilder[i, bi * block_size + c] += 4.0 + r - c
+            if bi > 0:
+                Abuilder[i, (bi - 1) * block_size + c] += -1.0 - r
+            if bi < num_blocks - 1:
+                Abuilder[i, (bi + 1) * block_size + c] += 0.5 * c
+
+    fill(Abuilder)
+    return Abuilder.build()
+
+
+@pytest.mark.parametrize("storage_format", ["col_major", "row_major"])
+@pytest.mark.parametrize("use_block_format", [False, True])
+@test_utils.test(arch=ti.cpu)
+def test_sparse_matrix_ndarray_spmv_spmm(storage_format, use_block_format):
+    import numpy as np
+
+    num_blocks = 8000  # large enough to run on the thread pool
+    n = num_blocks * 3
+    k = 4
+    A = _build_block_tridiagonal(num_blocks, 3, ti.f64, storage_format)
+    if use_block_format:
+        A.use_block_format(3)
+
+    x_np = np.random.rand(n)
+    X_np = np.random.rand(n, k)
+    x = ti.ndarray(ti.f64, n)
+    x.from_numpy(x_np)
+    X = ti.ndarray(ti.f64, (n, k))
+    X.from_numpy(X_np)
+
+    y = A @ x
+    Y = ti.ndarray(ti.f64, (n, k))
+    assert A.matmul(X, out=Y) is Y
+
+    for trial in range(2):
+        y_ref = np.zeros(n)
+        Y_ref = np.zeros((n, k))
+        for i in range(0, n, 97):
+            row = np.array([A[i, j] for j in range(max(0, i - 5), min(n, i + 6))])
+            cols = slice(max(0, i - 5), min(n, i + 6))
+            y_ref[i] = row @ x_np[cols]
+            Y_ref[i] = row @ X_np[cols]
+        assert np.allclose(y.to_numpy()[::97], y_ref[::97])
+        assert np.allclose(Y.to_numpy()[::97], Y_ref[::97])
+        # The block copy must follow changes of the matrix.
+        A[0, 0] = 100.0
+        A.matmul(x, out=y)
+        A.matmul(X, out=Y)
+
+
+@test_utils.test(arch=ti.cpu)
+def test_sparse_matrix_block_format_shape_mismatch():
+    A = _build_block_tridiagonal(4, 2, ti.f32, "row_major")
+    with pytest.raises(RuntimeError, match="not divisible"):
+        A.use_block_format(3)
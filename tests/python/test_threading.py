@@ -1,3 +1,9 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pytest
+
 import gstaichi as ti
 from gstaichi.lang.misc import get_host_arch_list
 
@@ -7,3 +13,262 @@ from tests import test_utils
 @test_utils.test(arch=get_host_arch_list())
 def test_while():
     assert ti._lib.core.test_threading()
+
+
+def _run_small_loops():
+    x = ti.field(ti.i32, shape=64)
+
+    @ti.kernel
+    def add(n: ti.i32):
+        for i in range(n):
+            x[i] += 1
+
+    # Loops with fewer iterations than threads leave some workers out of the launch
+    sizes = [1, 2, 3, 5, 64]
+    for _ in range(20):
+        for n in sizes:
+            add(n)
+    assert x.to_numpy().tolist() == [20 * sum(i < n for n in sizes) for i in range(64)]
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4)
+def test_thread_pool_small_loops():
+    _run_small_loops()
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4, cpu_thread_pool_spin_us=100)
+def test_thread_pool_small_loops_spinning():
+    _run_small_loops()
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4, cpu_thread_affinity="0")
+def test_thread_pool_affinity():
+    _run_small_loops()
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_getaffinity"), reason="Linux only")
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4, cpu_thread_affinity="0")
+def test_thread_pool_affinity_keeps_caller_mask():
+    caller_cpus = os.sched_getaffinity(0)
+    _run_small_loops()
+    assert os.sched_getaffinity(0) == caller_cpus
+
+
+def _run_zero_initialized():
+    n = 100000
+    x = ti.field(ti.f32, shape=n)
+    # A smaller field in the same root buffer, zeroed in its own blocks
+    z = ti.field(ti.i32, shape=(37, 3))
+    y = ti.ndarray(ti.f32, shape=n)
+
+    @ti.kernel
+    def accumulate(y: ti.types.ndarray()):
+        for i in x:
+            x[i] += i
+            y[i] += 2 * i
+
+    # Root buffers and ndarrays start zeroed whichever threads touch them first
+    accumulate(y)
+    assert (x.to_numpy() == np.arange(n, dtype=np.float32)).all()
+    assert (y.to_numpy() == 2 * np.arange(n, dtype=np.float32)).all()
+    assert (z.to_numpy() == 0).all()
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4, cpu_memory_placement="interleave")
+def test_memory_placement_interleave():
+    _run_zero_initialized()
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4, cpu_memory_placement="first_touch")
+def test_memory_placement_first_touch():
+    _run_zero_initialized()
+
+
+@test_utils.test(arch=ti.cpu)
+def test_memory_placement_unknown():
+    with pytest.raises(RuntimeError, match="Unknown memory placement"):
+        ti.init(arch=ti.cpu, cpu_memory_placement="local")
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4)
+def test_concurrent_launches():
+    num_envs = 4
+    n = 1000
+    states = [ti.ndarray(ti.i32, shape=n) for _ in range(num_envs)]
+
+    @ti.kernel
+    def step(x: ti.types.ndarray(), m: ti.i32):
+        # The loop bound is a runtime value, passed to the loop through the global temporaries
+        for i in range(m):
+            x[i] += i
+
+    def run(env):
+        for _ in range(100):
+            step(states[env], n - env)
+
+    step(states[0], 0)  # compile
+    with ThreadPoolExecutor(num_envs) as executor:
+        list(executor.map(run, range(num_envs)))
+    for env in range(num_envs):
+        expected = np.where(np.arange(n) < n - env, 100 * np.arange(n), 0)
+        assert (states[env].to_numpy() == expected).all()
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4)
+def test_concurrent_launches_overlap():
+    flags = ti.ndarray(ti.i32, shape=2)
+    met = ti.ndarray(ti.i32, shape=2)
+
+    @ti.kernel
+    def meet(flags: ti.types.ndarray(), met: ti.types.ndarray(), me: ti.i32, other: ti.i32):
+        # Each launch waits for the other one to start, which only happens if they run at the same time
+        ti.atomic_add(flags[me], 1)
+        seen = 0
+        tries = 0
+        while seen == 0 and tries < 100000000:
+            seen = ti.atomic_add(flags[other], 0)
+            tries += 1
+        met[me] = seen
+
+    meet(flags, met, 0, 0)  # compile
+    flags.fill(0)
+    met.fill(0)
+    with ThreadPoolExecutor(2) as executor:
+        list(executor.map(lambda me: meet(flags, met, me, 1 - me), range(2)))
+    assert met.to_numpy().tolist() == [1, 1]
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4)
+def test_concurrent_launches_struct_for():
+    num_envs = 4
+    fields = []
+    for _ in range(num_envs):
+        x = ti.field(ti.i32)
+        ti.root.pointer(ti.i, 64).dense(ti.i, 16).place(x)
+        fields.append(x)
+
+    @ti.kernel
+    def activate(x: ti.template(), env: ti.i32):
+        for i in range(env * 16, 512):
+            x[i] = 0
+
+    @ti.kernel
+    def step(x: ti.template()):
+        # The lists of active cells are shared by all the launches
+        for i in x:
+            x[i] += i
+
+    for env in range(num_envs):
+        activate(fields[env], env)
+        step(fields[env])  # compile
+
+    def run(env):
+        for _ in range(100):
+            step(fields[env])
+
+    with ThreadPoolExecutor(num_envs) as executor:
+        list(executor.map(run, range(num_envs)))
+    for env in range(num_envs):
+        expected = np.where((np.arange(1024) >= env * 16) & (np.arange(1024) < 512), 101 * np.arange(1024), 0)
+        assert (fields[env].to_numpy() == expected).all()
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4, cpu_serial_loop_threshold=1000)
+def test_serial_loop_fallback():
+    x = ti.field(ti.i32, shape=100000)
+    s = ti.field(ti.i32)
+    ti.root.pointer(ti.i, 1000).dense(ti.i, 16).place(s)
+
+    @ti.kernel
+    def add(m: ti.i32):
+        for i in range(m):
+            x[i] += 1
+
+    @ti.kernel
+    def add_sparse():
+        for i in s:
+            s[i] += 1
+
+    s[5] = 0
+    ti.profiler.clear_cpu_loop_counters()
+    add(10)
+    add_sparse()  # a single active block of 16 elements
+    assert ti.profiler.get_cpu_loop_counters() == {
+        "serial_loops": 2,
+        "parallel_loops": 0,
+        "serial_loop_threshold": 1000,
+    }
+    add(x.shape[0])
+    assert ti.profiler.get_cpu_loop_counters()["parallel_loops"] == 1
+    assert x[5] == 2 and x[50] == 1
+    assert s.to_numpy()[:16].tolist() == [1] * 16
+
+    @ti.kernel
+    def add_configured(m: ti.i32):
+        # An explicit loop_config is never overridden by the fallback
+        ti.loop_config(block_dim=4)
+        for i in range(m):
+            x[i] += 1
+
+    add_configured(10)
+    assert ti.profiler.get_cpu_loop_counters()["parallel_loops"] == 2
+    assert x[5] == 3
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4)
+def test_serial_loop_fallback_disabled_by_default():
+    x = ti.field(ti.i32, shape=10)
+
+    @ti.kernel
+    def add():
+        for i in x:
+            x[i] += 1
+
+    ti.profiler.clear_cpu_loop_counters()
+    add()
+    assert ti.profiler.get_cpu_loop_counters() == {
+        "serial_loops": 0,
+        "parallel_loops": 1,
+        "serial_loop_threshold": 0,
+    }
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4, cpu_concurrent_tasks=True, cpu_serial_loop_threshold=0)
+def test_concurrent_tasks():
+    n = 1000
+    fields = [ti.field(ti.i32, shape=n) for _ in range(4)]
+    total = ti.field(ti.i32, shape=n)
+
+    @ti.kernel
+    def step():
+        for k in ti.static(range(4)):
+            for i in fields[k]:
+                fields[k][i] += i * k
+        # Depends on all the loops above
+        for i in total:
+            total[i] = fields[0][i] + fields[1][i] + fields[2][i] + fields[3][i]
+
+    step()
+    ti.profiler.clear_cpu_loop_counters()
+    step()
+    # The four independent loops run as one parallel-for, each on its own thread
+    counters = ti.profiler.get_cpu_loop_counters()
+    assert counters["serial_loops"] == 4 and counters["parallel_loops"] == 2
+    assert (total.to_numpy() == 12 * np.arange(n)).all()
+
+
+@test_utils.test(arch=ti.cpu, cpu_max_num_threads=4, cpu_concurrent_tasks=True)
+def test_concurrent_tasks_aliased_arrays():
+    n = 1000
+    x = ti.ndarray(ti.i32, shape=n)
+
+    @ti.kernel
+    def init_and_double(a: ti.types.ndarray(), b: ti.types.ndarray()):
+        for i in range(n):
+            a[i] = i
+        for i in range(n):
+            b[i] *= 2
+
+    # Independent for distinct arrays, but not when the same one is passed twice
+    init_and_double(x, x)
+    assert (x.to_numpy() == 2 * np.arange(n)).all()
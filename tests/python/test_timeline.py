@@ -0,0 +1,40 @@
+import json
+
+import gstaichi as ti
+
+from tests import test_utils
+
+
+@test_utils.test(arch=ti.cpu, timeline=True, cpu_max_num_threads=2)
+def test_timeline_trace(tmp_path):
+    x = ti.field(ti.f32, shape=1024)
+
+    @ti.kernel
+    def traced_kernel():
+        for i in x:
+            x[i] += 1.0
+
+    ti.timeline_clear()
+    traced_kernel()
+    traced_kernel()
+    trace_path = str(tmp_path / "trace.json")
+    ti.timeline_save(trace_path)
+
+    with open(trace_path) as f:
+        events = json.load(f)
+    thread_names = {e["tid"]: e["args"]["name"] for e in events if e["ph"] == "M"}
+    spans = [e for e in events if e["ph"] in ("B", "E")]
+    assert all(isinstance(e["ts"], float) for e in spans)
+
+    def names_on(thread_prefix):
+        return [e["name"] for e in spans if thread_names[e["tid"]].startswith(thread_prefix) and e["ph"] == "B"]
+
+    python_spans = names_on("python_")
+    assert python_spans.count("traced_kernel") == 2
+    assert python_spans.count("materialize") == 1
+    assert python_spans.count("compile_kernel") == 1
+    assert python_spans.count("launch_kernel") == 2
+    assert any(name.startswith("traced_kernel_c") for name in python_spans)
+    launch = next(e for e in spans if e["name"] == "launch_kernel")
+    assert launch["args"] == {"kernel": "traced_kernel", "instance": 0}
+    assert any(name.startswith("traced_kernel_c") for name in names_on("cpu_worker_"))